@@ -4,29 +4,294 @@ API Dependencies
 Shared dependencies for API routes.
 """
 
+import secrets
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
+
+from app.config import get_settings
+from app.core.exceptions import (
+    DeadlineExceededError,
+    ModelNotFoundError,
+    ModelNotReadyError,
+    RequestRejectedError,
+)
+from app.services.admission import (
+    ARCHIVE_ADMISSION,
+    REQUEST_ADMISSION,
+    AdmissionController,
+    get_admission_controller,
+)
+from app.services.archive_service import ArchiveService, get_archive_service
+from app.services.batching import BatchScheduler, get_batch_scheduler
+from app.services.deadlines import Deadline, DeadlineTracker, deadline_scope, get_deadline_tracker, parse_timeout
+from app.services.executor import BULK_LANE, INTERACTIVE_LANE, InferenceExecutor, get_inference_executor, work_scope
 from app.services.image_service import ImageService, get_image_service
-from app.services.model_service import ModelService, get_model_service
-from app.services.digit_model_service import DigitModelService, get_digit_model_service
+from app.services.model_registry import ModelRegistry, get_model_registry
+from app.services.model_service import ModelService
+from app.services.prediction_cache import PredictionCache, get_prediction_cache
+from app.services.singleflight import SingleFlight, get_singleflight
+from app.services.tensor_cache import TensorCache, get_tensor_cache
+
+settings = get_settings()
+
+
+def get_models() -> ModelRegistry:
+    """
+    Dependency to get the model registry.
+
+    Returns:
+        ModelRegistry instance
+    """
+    return get_model_registry()
+
+
+@asynccontextmanager
+async def _acquire_model(registry: ModelRegistry, model_name: str) -> AsyncIterator[ModelService]:
+    """
+    Lease a model service for the block, loading it on first use.
+
+    Raises:
+        HTTPException: 404 if no model with that name is configured, or a
+            fast 503 with Retry-After while the model's startup load runs
+    """
+    try:
+        lease = await registry.acquire(model_name)
+    except ModelNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.message,
+        )
+    except ModelNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
+    try:
+        yield lease.service
+    finally:
+        lease.release()
 
-def get_model() -> ModelService:
+
+async def get_model(registry: ModelRegistry = Depends(get_models)) -> AsyncIterator[ModelService]:
+    """
+    Dependency holding the character model service until the response is sent.
+
+    Returns:
+        ModelService instance
+    """
+    async with _acquire_model(registry, "character") as service:
+        yield service
+
+
+async def get_digit_model(registry: ModelRegistry = Depends(get_models)) -> AsyncIterator[ModelService]:
     """
-    Dependency to get model service.
+    Dependency holding the digit model service until the response is sent.
 
     Returns:
         ModelService instance
     """
-    return get_model_service()
+    async with _acquire_model(registry, "digit") as service:
+        yield service
 
 
-def get_digit_model() -> DigitModelService:
+async def get_named_model(
+    model_name: str, registry: ModelRegistry = Depends(get_models)
+) -> AsyncIterator[ModelService]:
     """
-    Dependency to get digit model service.
+    Dependency holding the model named in the request path until the response is sent.
+
+    Args:
+        model_name: Model name path parameter
+        registry: Model registry
 
     Returns:
-        DigitModelService instance
+        ModelService instance
+
+    Raises:
+        HTTPException: If no model with that name is configured, or the model is still loading
+    """
+    async with _acquire_model(registry, model_name) as service:
+        yield service
+
+
+def get_deadlines() -> DeadlineTracker:
+    """
+    Dependency to get the deadline tracker.
+
+    Returns:
+        DeadlineTracker instance
+    """
+    return get_deadline_tracker()
+
+
+class RequestDeadline:
+    """
+    Dependency giving the request a deadline that follows it through the prediction path.
+
+    The deadline comes from the X-Request-Timeout header (milliseconds) or
+    REQUEST_TIMEOUT_MS, and also lapses when the client disconnects.
+    """
+
+    def __init__(self, watch_disconnect: bool = True) -> None:
+        """
+        Initialize the dependency.
+
+        Args:
+            watch_disconnect: Watch for the client disconnecting from the start;
+                routes that read the body themselves start the watch once they have
+        """
+        self.watch_disconnect = watch_disconnect
+
+    async def __call__(
+        self,
+        request: Request,
+        x_request_timeout: Optional[str] = Header(None),
+        tracker: DeadlineTracker = Depends(get_deadlines),
+    ) -> AsyncIterator[Deadline]:
+        """
+        Make the request's deadline current until the response is sent.
+
+        Raises:
+            HTTPException: 400 if the X-Request-Timeout header is invalid
+        """
+        try:
+            timeout_ms = parse_timeout(x_request_timeout)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid X-Request-Timeout header: {x_request_timeout!r}",
+            )
+
+        deadline = Deadline(timeout_ms)
+        if timeout_ms is not None:
+            tracker.record_request()
+        if self.watch_disconnect:
+            deadline.watch(request.receive)
+
+        try:
+            with deadline_scope(deadline):
+                yield deadline
+        finally:
+            deadline.stop_watching()
+
+
+request_deadline = RequestDeadline()
+# Batch routes read the body in the handler, so they watch for disconnects afterwards
+batch_request_deadline = RequestDeadline(watch_disconnect=False)
+
+
+def get_admission() -> AdmissionController:
+    """
+    Dependency to get the admission controller.
+
+    Returns:
+        AdmissionController instance
+    """
+    return get_admission_controller()
+
+
+class AdmissionSlot:
+    """
+    Dependency holding one of a model's admission slots while the request runs.
+
+    Requests the model can't take on are rejected before any work is done.
+    Admitted requests have their executor work scheduled in the route's lane,
+    against the model's worker budget.
     """
-    return get_digit_model_service()
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        lane: str = BULK_LANE,
+        kind: str = REQUEST_ADMISSION,
+    ) -> None:
+        """
+        Initialize the dependency.
+
+        Args:
+            model_name: Model the route serves; None for routes naming it in the path
+            lane: Executor lane of the route's work
+            kind: Kind of request, whose duration is averaged separately for wait estimates
+        """
+        self.model_name = model_name
+        self.lane = lane
+        self.kind = kind
+
+    async def __call__(
+        self,
+        request: Request,
+        registry: ModelRegistry = Depends(get_models),
+        controller: AdmissionController = Depends(get_admission),
+    ) -> AsyncIterator[None]:
+        """
+        Hold an admission slot until the response is sent.
+
+        Raises:
+            HTTPException: 429 when the model's queue is full, or 503 when the
+                estimated wait is too long, both with Retry-After; 504 when
+                the request's deadline lapses while it is queued
+        """
+        model_name = self.model_name or request.path_params["model_name"]
+        if model_name not in registry:
+            # The model dependency answers 404
+            yield
+            return
+
+        try:
+            async with controller.admit(model_name, self.kind):
+                with work_scope(self.lane, model_name):
+                    yield
+        except RequestRejectedError as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.message,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except DeadlineExceededError as e:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=e.message,
+            )
+
+
+admit_character = AdmissionSlot("character")
+admit_digit = AdmissionSlot("digit")
+admit_named = AdmissionSlot()
+# Canvas drawings are latency-sensitive: a user is waiting on the result
+admit_character_interactive = AdmissionSlot("character", lane=INTERACTIVE_LANE)
+admit_digit_interactive = AdmissionSlot("digit", lane=INTERACTIVE_LANE)
+admit_named_interactive = AdmissionSlot(lane=INTERACTIVE_LANE)
+# Archive streams hold their slot for the whole stream
+admit_character_archive = AdmissionSlot("character", kind=ARCHIVE_ADMISSION)
+admit_digit_archive = AdmissionSlot("digit", kind=ARCHIVE_ADMISSION)
+admit_named_archive = AdmissionSlot(kind=ARCHIVE_ADMISSION)
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding the admin endpoints.
+
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+
+    Raises:
+        HTTPException: 403 if ADMIN_TOKEN isn't set, so the endpoints are
+            disabled; 401 if the header doesn't match it
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled: ADMIN_TOKEN is not set",
+        )
+    if not secrets.compare_digest(x_admin_token or "", settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing admin token",
+        )
 
 
 def get_image_processor() -> ImageService:
@@ -37,3 +302,88 @@ def get_image_processor() -> ImageService:
         ImageService instance
     """
     return get_image_service()
+
+
+def get_scheduler() -> BatchScheduler:
+    """
+    Dependency to get the batch scheduler.
+
+    Returns:
+        BatchScheduler instance
+    """
+    return get_batch_scheduler()
+
+
+def get_executor() -> InferenceExecutor:
+    """
+    Dependency to get the inference executor.
+
+    Returns:
+        InferenceExecutor instance
+    """
+    return get_inference_executor()
+
+
+def get_archive_processor() -> ArchiveService:
+    """
+    Dependency to get the archive service.
+
+    Returns:
+        ArchiveService instance
+    """
+    return get_archive_service()
+
+
+def get_cache() -> PredictionCache:
+    """
+    Dependency to get the prediction cache.
+
+    Returns:
+        PredictionCache instance
+    """
+    return get_prediction_cache()
+
+
+def get_near_duplicate_cache() -> TensorCache:
+    """
+    Dependency to get the tensor cache.
+
+    Returns:
+        TensorCache instance
+    """
+    return get_tensor_cache()
+
+
+def get_coalescer() -> SingleFlight:
+    """
+    Dependency to get the request coalescing layer.
+
+    Returns:
+        SingleFlight instance
+    """
+    return get_singleflight()
+
+
+class PredictionPipeline:
+    """
+    Dependency bundling the shared services used by single-image predictions.
+
+    Every model is served through the same image service, scheduler,
+    executor, caches and coalescing layer.
+    """
+
+    def __init__(
+        self,
+        image_service: ImageService = Depends(get_image_processor),
+        scheduler: BatchScheduler = Depends(get_scheduler),
+        executor: InferenceExecutor = Depends(get_executor),
+        cache: PredictionCache = Depends(get_cache),
+        tensor_cache: TensorCache = Depends(get_near_duplicate_cache),
+        singleflight: SingleFlight = Depends(get_coalescer),
+    ) -> None:
+        self.image_service = image_service
+        self.scheduler = scheduler
+        self.executor = executor
+        self.cache = cache
+        self.tensor_cache = tensor_cache
+        self.singleflight = singleflight
@@ -0,0 +1,94 @@
+"""
+Admin Endpoints
+
+API endpoints for operating the served models without a restart.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.dependencies import get_models, verify_admin_token
+from app.core.exceptions import ModelLoadError, ModelNotFoundError, ModelRollbackError
+from app.logger import get_logger
+from app.models.schemas import ErrorResponse, ModelVersionResponse
+from app.services.model_registry import ModelRegistry
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["Admin"],
+    dependencies=[Depends(verify_admin_token)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid or missing admin token"},
+        403: {"model": ErrorResponse, "description": "Admin endpoints disabled: no ADMIN_TOKEN configured"},
+        404: {"model": ErrorResponse, "description": "Unknown model"},
+    },
+)
+
+
+@router.post(
+    "/models/{model_name}/reload",
+    response_model=ModelVersionResponse,
+    responses={500: {"model": ErrorResponse, "description": "New version failed to load"}},
+)
+async def reload_model(
+    model_name: str,
+    registry: ModelRegistry = Depends(get_models),
+) -> ModelVersionResponse:
+    """
+    Hot reload a model from its artifact.
+
+    The new version is loaded and warmed up while the current one keeps
+    serving, then swapped in atomically. The replaced version stays resident
+    for rollback. If loading fails, the current version keeps serving.
+
+    Returns:
+        Version now serving predictions and the version kept for rollback
+    """
+    logger.info(f"Hot reload of {model_name} model requested")
+
+    try:
+        await registry.reload_async(model_name)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except ModelLoadError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+
+    service = registry.get(model_name)
+    return ModelVersionResponse(
+        name=model_name,
+        version=service.version,
+        previous_version=service.previous_version,
+    )
+
+
+@router.post(
+    "/models/{model_name}/rollback",
+    response_model=ModelVersionResponse,
+    responses={409: {"model": ErrorResponse, "description": "No previous version to roll back to"}},
+)
+async def rollback_model(
+    model_name: str,
+    registry: ModelRegistry = Depends(get_models),
+) -> ModelVersionResponse:
+    """
+    Swap the previous version of a model back in.
+
+    Returns:
+        Version now serving predictions and the version kept for rollback
+    """
+    logger.info(f"Rollback of {model_name} model requested")
+
+    try:
+        registry.rollback(model_name)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except ModelRollbackError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
+
+    service = registry.get(model_name)
+    return ModelVersionResponse(
+        name=model_name,
+        version=service.version,
+        previous_version=service.previous_version,
+    )
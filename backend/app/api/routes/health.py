@@ -4,13 +4,13 @@ Health Check Endpoints
 API endpoints for health status monitoring.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, status
 
-from app.api.dependencies import get_model
+from app.api.dependencies import get_models
 from app.config import get_settings
 from app.logger import get_logger
-from app.models.schemas import HealthResponse
-from app.services.model_service import ModelService
+from app.models.schemas import HealthResponse, ReadyResponse
+from app.services.model_registry import ModelRegistry
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -20,11 +20,14 @@ router = APIRouter(tags=["Health"])
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check(
-    model_service: ModelService = Depends(get_model),
+    registry: ModelRegistry = Depends(get_models),
 ) -> HealthResponse:
     """
     Check API health status.
 
+    Models load on their first request, so this reports whether the
+    character model is resident without loading it.
+
     Returns:
         Health status including model loading state
     """
@@ -32,7 +35,7 @@ async def health_check(
 
     response = HealthResponse(
         status="healthy",
-        model_loaded=model_service.is_loaded,
+        model_loaded="character" in registry and registry.get("character").is_loaded,
         version=settings.VERSION,
     )
 
@@ -41,6 +44,35 @@ async def health_check(
     return response
 
 
+@router.get(
+    "/ready",
+    response_model=ReadyResponse,
+    responses={503: {"model": ReadyResponse, "description": "Required models still loading"}},
+)
+async def readiness_check(
+    response: Response,
+    registry: ModelRegistry = Depends(get_models),
+) -> ReadyResponse:
+    """
+    Check whether the API is ready to serve predictions.
+
+    Unlike /health, which only reports that the process is up, this answers
+    503 with Retry-After until every preloaded model is loaded and warm.
+
+    Returns:
+        Readiness status and the load state of each required model
+    """
+    models = registry.readiness()
+    ready = registry.is_ready()
+
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        response.headers["Retry-After"] = str(settings.READY_RETRY_AFTER_S)
+        logger.info(f"Readiness check: not ready, models: {models}")
+
+    return ReadyResponse(status="ready" if ready else "not_ready", models=models)
+
+
 @router.get("/")
 async def root() -> dict:
     """
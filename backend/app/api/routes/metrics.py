@@ -0,0 +1,80 @@
+"""
+Metrics Endpoints
+
+API endpoints exposing runtime serving metrics.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import (
+    get_admission,
+    get_cache,
+    get_coalescer,
+    get_deadlines,
+    get_executor,
+    get_models,
+    get_near_duplicate_cache,
+    get_scheduler,
+)
+from app.logger import get_logger
+from app.services.admission import AdmissionController
+from app.services.batching import BatchScheduler
+from app.services.deadlines import DeadlineTracker
+from app.services.executor import InferenceExecutor
+from app.services.inference_process import get_inference_process
+from app.services.model_registry import ModelRegistry
+from app.services.prediction_cache import PredictionCache
+from app.services.singleflight import SingleFlight
+from app.services.tensor_cache import TensorCache
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics(
+    executor: InferenceExecutor = Depends(get_executor),
+    scheduler: BatchScheduler = Depends(get_scheduler),
+    cache: PredictionCache = Depends(get_cache),
+    tensor_cache: TensorCache = Depends(get_near_duplicate_cache),
+    singleflight: SingleFlight = Depends(get_coalescer),
+    registry: ModelRegistry = Depends(get_models),
+    admission: AdmissionController = Depends(get_admission),
+    deadlines: DeadlineTracker = Depends(get_deadlines),
+) -> dict:
+    """
+    Get runtime serving metrics.
+
+    Returns:
+        Executor queue depth, utilization and per-lane queue times, batching
+        statistics and autotuner decisions, prediction/tensor cache counters,
+        request coalescing counters,
+        per-model load state, admission queue depths and shed requests,
+        work skipped because its request deadline lapsed, and the
+        inference processes' ring occupancy, CPUs and per-worker utilization
+    """
+    logger.debug("Metrics requested")
+
+    # Model and engine statistics wait on the inference processes (each call
+    # bounded by STATS_TIMEOUT_S), so they are collected off the event loop and
+    # off the inference executor, which may be the thing that is saturated
+    loop = asyncio.get_running_loop()
+    models, inference_process = await asyncio.gather(
+        loop.run_in_executor(None, registry.stats),
+        loop.run_in_executor(None, get_inference_process().stats),
+    )
+
+    return {
+        "executor": executor.stats(),
+        "batching": scheduler.stats(),
+        "prediction_cache": cache.stats(),
+        "tensor_cache": tensor_cache.stats(),
+        "singleflight": singleflight.stats(),
+        "models": models,
+        "admission": admission.stats(),
+        "deadlines": deadlines.stats(),
+        "inference_process": inference_process,
+    }
@@ -1,61 +1,325 @@
 """
 Prediction Endpoints
 
-API endpoints for Urdu character and digit prediction.
+API endpoints for Urdu character and digit prediction. Every configured model
+is served by name under /api/v1/models/{model_name}; the character and digit
+models also keep their original routes.
 """
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-
-from app.api.dependencies import get_image_processor, get_model, get_digit_model
-from app.config import URDU_CHARACTERS, get_settings
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.api.dependencies import (
+    PredictionPipeline,
+    admit_character,
+    admit_character_archive,
+    admit_character_interactive,
+    admit_digit,
+    admit_digit_archive,
+    admit_digit_interactive,
+    admit_named,
+    admit_named_archive,
+    admit_named_interactive,
+    batch_request_deadline,
+    get_archive_processor,
+    get_digit_model,
+    get_executor,
+    get_image_processor,
+    get_model,
+    get_models,
+    get_named_model,
+    request_deadline,
+)
+from app.config import get_settings
 from app.core.exceptions import (
+    DeadlineExceededError,
     ImageProcessingError,
-    ImageTooLargeError,
+    UrduOCRException,
     InvalidImageError,
     ModelNotLoadedError,
     PredictionError,
-    UnsupportedImageFormatError,
 )
 from app.logger import get_logger
 from app.models.schemas import (
     Base64ImageRequest,
+    BatchBase64ImageRequest,
+    BatchPredictionItem,
+    BatchPredictionResponse,
     ClassesResponse,
     ErrorResponse,
+    ModelInfo,
+    ModelsResponse,
     PredictionResponse,
     TopPrediction,
 )
+from app.services.archive_service import ArchiveService
+from app.services.batching import BatchScheduler
+from app.services.deadlines import Deadline, current_deadline
+from app.services.executor import InferenceExecutor
 from app.services.image_service import ImageService
+from app.services.model_registry import ModelRegistry
 from app.services.model_service import ModelService
-from app.services.digit_model_service import DigitModelService, URDU_DIGITS
+from app.services.prediction_cache import PredictionCache
+from app.services.singleflight import SingleFlight
+from app.services.tensor_cache import TensorCache
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 router = APIRouter(prefix="/api/v1", tags=["Prediction"])
 
-
-@router.post(
-    "/predict",
-    response_model=PredictionResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Invalid image"},
-        500: {"model": ErrorResponse, "description": "Prediction error"},
-        503: {"model": ErrorResponse, "description": "Model not loaded"},
+# Batch endpoints accept either multipart uploads or a JSON list of base64 images
+BATCH_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                            "description": "Image files to predict",
+                        }
+                    },
+                    "required": ["files"],
+                }
+            },
+            "application/json": {"schema": BatchBase64ImageRequest.model_json_schema()},
+        },
+    }
+}
+
+ARCHIVE_RESPONSES = {
+    200: {
+        "content": {"application/x-ndjson": {}},
+        "description": "One JSON line per archive member, followed by a summary line",
     },
-)
-async def predict_from_image(
-    file: UploadFile = File(..., description="Image file to predict"),
-    model_service: ModelService = Depends(get_model),
-    image_service: ImageService = Depends(get_image_processor),
+    400: {"model": ErrorResponse, "description": "Invalid or oversized archive"},
+    429: {"model": ErrorResponse, "description": "Model's request queue is full (see Retry-After)"},
+    503: {"model": ErrorResponse, "description": "Model still loading or overloaded (see Retry-After)"},
+}
+
+
+# Error responses shared by the single-image endpoints
+PREDICTION_RESPONSES = {
+    400: {"model": ErrorResponse, "description": "Invalid image"},
+    429: {"model": ErrorResponse, "description": "Model's request queue is full (see Retry-After)"},
+    500: {"model": ErrorResponse, "description": "Prediction error"},
+    503: {"model": ErrorResponse, "description": "Model not loaded, still loading or overloaded (see Retry-After)"},
+    504: {"model": ErrorResponse, "description": "Request deadline (X-Request-Timeout) exceeded"},
+}
+
+BATCH_RESPONSES = {
+    400: {"model": ErrorResponse, "description": "Empty or oversized batch"},
+    415: {"model": ErrorResponse, "description": "Unsupported request body"},
+    429: {"model": ErrorResponse, "description": "Model's request queue is full (see Retry-After)"},
+    500: {"model": ErrorResponse, "description": "Prediction error"},
+    503: {"model": ErrorResponse, "description": "Model not loaded, still loading or overloaded (see Retry-After)"},
+    504: {"model": ErrorResponse, "description": "Request deadline (X-Request-Timeout) exceeded"},
+}
+
+# Error response added by the endpoints that resolve a model by name
+UNKNOWN_MODEL_RESPONSE = {404: {"model": ErrorResponse, "description": "Unknown model"}}
+
+
+def _item_error_message(error: BaseException) -> str:
+    """Get a client-facing error message for a failed batch item."""
+    if isinstance(error, UrduOCRException):
+        return error.message
+    return f"An unexpected error occurred: {str(error)}"
+
+
+def _get_cached_prediction(
+    cache: PredictionCache,
+    model_service: Any,
+    content: bytes,
+) -> Tuple[Tuple, Optional[PredictionResponse]]:
+    """
+    Look up the response for byte-identical content predicted by the same model.
+
+    Args:
+        cache: Prediction cache
+        model_service: Model service that will serve the request
+        content: Raw upload bytes
+
+    Returns:
+        Tuple of (cache key, cached response or None)
+    """
+    cache_key = cache.make_key(model_service, content)
+
+    # Mock predictions are never cached, so don't count lookups while unloaded
+    if not model_service.is_loaded:
+        return cache_key, None
+
+    cached_response = cache.get(cache_key)
+    if cached_response is None:
+        return cache_key, None
+
+    logger.info(f"Serving {model_service.name} prediction from cache: {cached_response.prediction}")
+    return cache_key, cached_response.model_copy(update={"cached": True, "processing_time_ms": 0.0, "batch_size": 1})
+
+
+async def _predict_image(
+    scheduler: BatchScheduler,
+    tensor_cache: TensorCache,
+    singleflight: SingleFlight,
+    model_service: Any,
+    processed_image: np.ndarray,
+) -> Tuple[str, float, List[Dict[str, Any]], float, Optional[str], int, bool]:
+    """
+    Predict a preprocessed image, reusing the result for near-duplicate tensors.
+
+    Concurrent near-duplicate requests share one forward pass.
+
+    Args:
+        scheduler: Batch scheduler running the forward pass
+        tensor_cache: Cache keyed by a perceptual hash of the tensor
+        singleflight: Coalescing layer for in-flight forward passes
+        model_service: Model service used for the forward pass
+        processed_image: Preprocessed image with shape (1, 64, 64, 1)
+
+    Returns:
+        Tuple of (prediction, confidence, top_5_predictions, processing_time_ms,
+        model_version, batch_size, cached)
+    """
+    tensor_key = tensor_cache.make_key(model_service, processed_image)
+    cached_prediction = tensor_cache.get(tensor_key)
+    if cached_prediction is not None:
+        logger.info(f"Near-duplicate {model_service.name} input, skipping forward pass")
+        prediction, confidence, top_5, model_version = cached_prediction
+        return prediction, confidence, top_5, 0.0, model_version, 1, True
+
+    async def forward_pass() -> Tuple[str, float, List[Dict[str, Any]], float, str, int]:
+        result = await scheduler.submit(model_service, processed_image)
+        tensor_cache.put(tensor_key, result[:3] + result[4:5])
+        return result
+
+    prediction, confidence, top_5, processing_time, model_version, batch_size = await singleflight.do(
+        ("predict", *tensor_key), forward_pass
+    )
+
+    return prediction, confidence, top_5, processing_time, model_version, batch_size, False
+
+
+def _mock_prediction(model_service: ModelService) -> PredictionResponse:
+    """Build the placeholder response returned while a model isn't loaded."""
+    labels = model_service.class_labels
+    return PredictionResponse(
+        prediction=labels.get(0, "Unknown"),
+        confidence=0.0,
+        top_5=[TopPrediction(character=char, probability=0.0) for char in list(labels.values())[:5]],
+        processing_time_ms=0.0,
+    )
+
+
+async def _predict_decoded(
+    model_service: ModelService,
+    pipeline: PredictionPipeline,
+    cache_key: Tuple,
+    decode: Callable[[], Awaitable[np.ndarray]],
 ) -> PredictionResponse:
     """
-    Predict Urdu character from uploaded image.
+    Decode an uncached upload and predict it through the shared batch scheduler.
 
-    - **file**: Image file (PNG, JPG, JPEG, BMP) max 5MB
+    Args:
+        model_service: Model service used for the forward pass
+        pipeline: Shared prediction services
+        cache_key: Prediction cache key of the upload
+        decode: Coroutine function decoding the upload on the executor
 
-    Returns prediction with confidence score and top 5 predictions.
+    Returns:
+        Prediction response
+    """
+    # Concurrent identical uploads share one decode
+    processed_image = await pipeline.singleflight.do(("decode", cache_key[2]), decode)
+
+    # Check if model is loaded
+    if not model_service.is_loaded:
+        logger.warning(f"{model_service.name} model not loaded, returning mock prediction")
+        # Return mock prediction for demo purposes when model isn't loaded
+        return _mock_prediction(model_service)
+
+    # Make prediction
+    prediction, confidence, top_5, processing_time, model_version, batch_size, cached = await _predict_image(
+        pipeline.scheduler, pipeline.tensor_cache, pipeline.singleflight, model_service, processed_image
+    )
+
+    logger.info(f"{model_service.name} prediction completed - {prediction}, Confidence: {confidence:.4f}")
+    logger.info(f"Processing time: {processing_time:.2f}ms, batch size: {batch_size}")
+
+    response = PredictionResponse(
+        prediction=prediction,
+        confidence=confidence,
+        top_5=[TopPrediction(**p) for p in top_5],
+        processing_time_ms=round(processing_time, 2),
+        batch_size=batch_size,
+        cached=cached,
+        model_version=model_version,
+    )
+    pipeline.cache.put(cache_key, response)
+
+    return response
+
+
+def _prediction_http_error(model_service: ModelService, error: Exception) -> HTTPException:
+    """Map an exception raised while predicting one image to an HTTP error."""
+    if isinstance(error, InvalidImageError):
+        logger.error(f"Invalid image: {str(error)}")
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error.message))
+
+    if isinstance(error, ImageProcessingError):
+        logger.error(f"Image processing error: {str(error)}")
+        return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error.message))
+
+    if isinstance(error, ModelNotLoadedError):
+        logger.error(f"{model_service.name} model not loaded: {str(error)}")
+        return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error.message))
+
+    if isinstance(error, DeadlineExceededError):
+        logger.warning(f"{model_service.name} prediction dropped at {error.stage}: {str(error)}")
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(error.message))
+
+    if isinstance(error, PredictionError):
+        logger.error(f"{model_service.name} prediction error: {str(error)}")
+        return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error.message))
+
+    logger.error(f"Unexpected error: {str(error)}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"An unexpected error occurred: {str(error)}",
+    )
+
+
+async def _predict_upload(
+    file: UploadFile,
+    model_service: ModelService,
+    pipeline: PredictionPipeline,
+) -> PredictionResponse:
     """
-    logger.info(f"Received prediction request - File: {file.filename}, Content-Type: {file.content_type}")
+    Predict an uploaded image file with the given model.
+
+    Args:
+        file: Uploaded image file
+        model_service: Model service used for the forward pass
+        pipeline: Shared prediction services
+
+    Returns:
+        Prediction response
+
+    Raises:
+        HTTPException: If the image is invalid or prediction fails
+    """
+    logger.info(
+        f"Received {model_service.name} prediction request - File: {file.filename}, "
+        f"Content-Type: {file.content_type}"
+    )
 
     try:
         # Read file content
@@ -64,75 +328,277 @@ async def predict_from_image(
 
         logger.info(f"File size: {file_size} bytes")
 
-        # Validate file
-        image_service.validate_file(file.filename or "unknown", file_size)
+        # Validate file (unsupported formats and oversized files are InvalidImageErrors)
+        pipeline.image_service.validate_file(file.filename or "unknown", file_size)
+
+        # Byte-identical uploads skip decoding and inference
+        cache_key, cached_response = _get_cached_prediction(pipeline.cache, model_service, file_content)
+        if cached_response is not None:
+            return cached_response
+
+        # Preprocess image off the event loop
+        return await _predict_decoded(
+            model_service,
+            pipeline,
+            cache_key,
+            lambda: pipeline.executor.run(
+                pipeline.image_service.preprocess_file_content, file_content, file.filename or "unknown"
+            ),
+        )
+
+    except Exception as e:
+        raise _prediction_http_error(model_service, e)
+
+
+async def _predict_canvas(
+    request: Base64ImageRequest,
+    model_service: ModelService,
+    pipeline: PredictionPipeline,
+) -> PredictionResponse:
+    """
+    Predict a base64 encoded canvas drawing with the given model.
+
+    Args:
+        request: Canvas request with base64 image data
+        model_service: Model service used for the forward pass
+        pipeline: Shared prediction services
+
+    Returns:
+        Prediction response
+
+    Raises:
+        HTTPException: If the image data is invalid or prediction fails
+    """
+    logger.info(f"Received {model_service.name} canvas prediction request")
 
-        # Preprocess image
-        processed_image = await image_service.process_uploaded_file(
-            file_content, file.filename or "unknown"
+    try:
+        # Identical canvas payloads skip decoding and inference
+        cache_key, cached_response = _get_cached_prediction(
+            pipeline.cache, model_service, request.image_data.encode()
+        )
+        if cached_response is not None:
+            return cached_response
+
+        # Process base64 image off the event loop
+        return await _predict_decoded(
+            model_service,
+            pipeline,
+            cache_key,
+            lambda: pipeline.executor.run(pipeline.image_service.process_base64_image, request.image_data),
         )
 
-        # Check if model is loaded
-        if not model_service.is_loaded:
-            logger.warning("Model not loaded, returning mock prediction")
-            # Return mock prediction for demo purposes when model isn't loaded
-            return PredictionResponse(
-                prediction="ا",
-                confidence=0.0,
-                top_5=[TopPrediction(character=char, probability=0.0) for char in list(URDU_CHARACTERS.values())[:5]],
-                processing_time_ms=0.0,
+    except Exception as e:
+        raise _prediction_http_error(model_service, e)
+
+
+async def _decode_batch_items(
+    request: Request,
+    image_service: ImageService,
+    executor: InferenceExecutor,
+) -> List[Tuple[Optional[str], Any]]:
+    """
+    Read a batch request and decode its images concurrently on the executor.
+
+    Args:
+        request: Incoming request with a multipart or JSON body
+        image_service: Image service used for validation and preprocessing
+        executor: Executor running the decode work
+
+    Returns:
+        List of (filename, preprocessed image or exception) in request order
+
+    Raises:
+        HTTPException: If the request body is malformed or has too many items
+        DeadlineExceededError: If the request's deadline lapsed while its images were decoded
+    """
+    content_type = request.headers.get("content-type", "")
+    decoders: List[Tuple[Optional[str], Callable[[], Awaitable[np.ndarray]]]] = []
+
+    if content_type.startswith("application/json"):
+        try:
+            payload = BatchBase64ImageRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid batch request: {str(e)}",
             )
 
-        # Make prediction
-        prediction, confidence, top_5, processing_time = model_service.predict(processed_image)
+        for image_data in payload.images:
+            decoders.append((None, lambda data=image_data: executor.run(image_service.process_base64_image, data)))
 
-        logger.info(f"Prediction completed - Character: {prediction}, Confidence: {confidence:.4f}")
-        logger.info(f"Processing time: {processing_time:.2f}ms")
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form(max_files=settings.BATCH_MAX_ITEMS + 1)
+        uploads = [item for item in form.getlist("files") if not isinstance(item, str)]
 
-        return PredictionResponse(
-            prediction=prediction,
-            confidence=confidence,
-            top_5=[TopPrediction(**p) for p in top_5],
-            processing_time_ms=round(processing_time, 2),
-        )
+        async def decode_upload(upload: UploadFile) -> np.ndarray:
+            filename = upload.filename or "unknown"
+            file_content = await upload.read()
+            image_service.validate_file(filename, len(file_content))
+            return await executor.run(image_service.preprocess_file_content, file_content, filename)
+
+        for upload in uploads:
+            decoders.append((upload.filename, lambda upload=upload: decode_upload(upload)))
 
-    except UnsupportedImageFormatError as e:
-        logger.error(f"Unsupported image format: {str(e)}")
+    else:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Batch requests must be multipart/form-data or application/json",
         )
 
-    except ImageTooLargeError as e:
-        logger.error(f"Image too large: {str(e)}")
+    if not decoders:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
+            detail="Batch request contains no images",
         )
 
-    except InvalidImageError as e:
-        logger.error(f"Invalid image: {str(e)}")
+    if len(decoders) > settings.BATCH_MAX_ITEMS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
+            detail=f"Batch request contains {len(decoders)} images, maximum is {settings.BATCH_MAX_ITEMS}",
         )
 
-    except ImageProcessingError as e:
-        logger.error(f"Image processing error: {str(e)}")
+    # The body has been read, so the connection can now be watched for a disconnect
+    deadline = current_deadline()
+    if isinstance(deadline, Deadline):
+        deadline.watch(request.receive)
+
+    logger.info(f"Decoding {len(decoders)} batch items")
+    outcomes = await asyncio.gather(*[decode() for _, decode in decoders], return_exceptions=True)
+
+    # Items dropped because the request lapsed fail the whole request rather than one item
+    for outcome in outcomes:
+        if isinstance(outcome, DeadlineExceededError):
+            raise outcome
+
+    return [(filename, outcome) for (filename, _), outcome in zip(decoders, outcomes)]
+
+
+async def _predict_batch(
+    request: Request,
+    model_service: Any,
+    image_service: ImageService,
+    executor: InferenceExecutor,
+) -> BatchPredictionResponse:
+    """
+    Decode a batch request and predict all valid images in one forward pass.
+
+    Items that fail validation or decoding are reported individually and do
+    not affect the rest of the batch.
+
+    Args:
+        request: Incoming request with a multipart or JSON body
+        model_service: Model service used for the forward pass
+        image_service: Image service used for validation and preprocessing
+        executor: Executor running decode and inference work
+
+    Returns:
+        Batch prediction response with per-item results
+    """
+    items = await _decode_batch_items(request, image_service, executor)
+
+    results: List[BatchPredictionItem] = []
+    valid_indices = [i for i, (_, outcome) in enumerate(items) if isinstance(outcome, np.ndarray)]
+    predictions: Dict[int, Tuple[str, float, List[Dict[str, Any]]]] = {}
+    processing_time = 0.0
+    model_version = None
+
+    if valid_indices:
+        if not model_service.is_loaded:
+            logger.warning(f"{model_service.name} model not loaded, returning mock batch predictions")
+            mock = _mock_prediction(model_service)
+            for i in valid_indices:
+                predictions[i] = (mock.prediction, 0.0, [p.model_dump() for p in mock.top_5])
+        else:
+            image_batch = np.concatenate([items[i][1] for i in valid_indices], axis=0)
+            batch_results = await executor.run(model_service.predict_batch, image_batch)
+            for i, (prediction, confidence, top_5, batch_time, version) in zip(valid_indices, batch_results):
+                predictions[i] = (prediction, confidence, top_5)
+                processing_time = batch_time
+                model_version = version
+
+    for i, (filename, outcome) in enumerate(items):
+        if i in predictions:
+            prediction, confidence, top_5 = predictions[i]
+            results.append(
+                BatchPredictionItem(
+                    index=i,
+                    filename=filename,
+                    success=True,
+                    prediction=prediction,
+                    confidence=confidence,
+                    top_5=[TopPrediction(**p) for p in top_5],
+                )
+            )
+        else:
+            logger.warning(f"Batch item {i} failed: {str(outcome)}")
+            results.append(
+                BatchPredictionItem(
+                    index=i,
+                    filename=filename,
+                    success=False,
+                    error=_item_error_message(outcome),
+                )
+            )
+
+    succeeded = len(predictions)
+    logger.info(f"Batch prediction completed - {succeeded}/{len(items)} succeeded")
+    logger.info(f"Processing time: {processing_time:.2f}ms")
+
+    return BatchPredictionResponse(
+        results=results,
+        count=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        processing_time_ms=round(processing_time, 2),
+        model_version=model_version,
+    )
+
+
+async def _run_batch_request(
+    request: Request,
+    model_service: ModelService,
+    image_service: ImageService,
+    executor: InferenceExecutor,
+) -> BatchPredictionResponse:
+    """
+    Serve a batch request and map prediction failures to HTTP errors.
+
+    Args:
+        request: Incoming request with a multipart or JSON body
+        model_service: Model service used for the forward pass
+        image_service: Image service used for validation and preprocessing
+        executor: Executor running decode and inference work
+
+    Returns:
+        Batch prediction response with per-item results
+
+    Raises:
+        HTTPException: If the request is malformed or prediction fails
+    """
+    logger.info(f"Received {model_service.name} batch prediction request")
+
+    try:
+        return await _predict_batch(request, model_service, image_service, executor)
+
+    except HTTPException:
+        raise
+
+    except ModelNotLoadedError as e:
+        logger.error(f"{model_service.name} model not loaded: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=str(e.message),
         )
 
-    except ModelNotLoadedError as e:
-        logger.error(f"Model not loaded: {str(e)}")
+    except DeadlineExceededError as e:
+        logger.warning(f"{model_service.name} batch prediction dropped at {e.stage}: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=str(e.message),
         )
 
     except PredictionError as e:
-        logger.error(f"Prediction error: {str(e)}")
+        logger.error(f"{model_service.name} batch prediction error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e.message),
@@ -146,19 +612,208 @@ async def predict_from_image(
         )
 
 
+async def _stream_archive(
+    file: UploadFile,
+    model_service: Any,
+    image_service: ImageService,
+    executor: InferenceExecutor,
+    archive_service: ArchiveService,
+) -> StreamingResponse:
+    """
+    Validate an uploaded archive and stream its predictions as NDJSON.
+
+    Args:
+        file: Uploaded ZIP or TAR archive
+        model_service: Model service used for the forward passes
+        image_service: Image service used for validation and preprocessing
+        executor: Executor running archive reads, decoding and inference
+        archive_service: Archive service producing the NDJSON lines
+
+    Returns:
+        Streaming NDJSON response
+
+    Raises:
+        HTTPException: If the upload is not a supported archive or is too large
+    """
+    if file.size is not None and file.size > settings.ARCHIVE_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Archive size ({file.size / (1024 * 1024):.2f} MB) exceeds maximum allowed size",
+        )
+
+    try:
+        archive_format = await executor.run(archive_service.detect_format, file.file)
+    except InvalidImageError as e:
+        logger.error(f"Invalid archive: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e.message),
+        )
+
+    logger.info(f"Streaming predictions for {archive_format} archive: {file.filename}")
+
+    return StreamingResponse(
+        archive_service.stream_predictions(
+            file.file, model_service, image_service, executor, model_service.class_labels
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+# ==================== MODEL REGISTRY ENDPOINTS ====================
+
+
+@router.get(
+    "/models",
+    response_model=ModelsResponse,
+)
+async def list_models(
+    registry: ModelRegistry = Depends(get_models),
+) -> ModelsResponse:
+    """
+    List every configured model, whether it is loaded and its resident memory.
+
+    Each model is served at /api/v1/models/{model_name}/predict, /canvas,
+    /batch, /archive and /classes.
+    """
+    models = [ModelInfo(**service.info(), state=registry.state(service.name)) for service in registry]
+    return ModelsResponse(models=models, count=len(models))
+
+
+@router.post(
+    "/models/{model_name}/predict",
+    dependencies=[Depends(request_deadline), Depends(admit_named)],
+    response_model=PredictionResponse,
+    responses={**PREDICTION_RESPONSES, **UNKNOWN_MODEL_RESPONSE},
+)
+async def predict_with_model(
+    file: UploadFile = File(..., description="Image file to predict"),
+    model_service: ModelService = Depends(get_named_model),
+    pipeline: PredictionPipeline = Depends(),
+) -> PredictionResponse:
+    """
+    Predict an uploaded image with the named model.
+
+    - **model_name**: Configured model name (see GET /api/v1/models)
+    - **file**: Image file (PNG, JPG, JPEG, BMP) max 5MB
+    """
+    return await _predict_upload(file, model_service, pipeline)
+
+
+@router.post(
+    "/models/{model_name}/canvas",
+    dependencies=[Depends(request_deadline), Depends(admit_named_interactive)],
+    response_model=PredictionResponse,
+    responses={**PREDICTION_RESPONSES, **UNKNOWN_MODEL_RESPONSE},
+)
+async def predict_canvas_with_model(
+    request: Base64ImageRequest,
+    model_service: ModelService = Depends(get_named_model),
+    pipeline: PredictionPipeline = Depends(),
+) -> PredictionResponse:
+    """
+    Predict a canvas drawing (base64 encoded) with the named model.
+
+    - **model_name**: Configured model name (see GET /api/v1/models)
+    - **image_data**: Base64 encoded image string
+    """
+    return await _predict_canvas(request, model_service, pipeline)
+
+
+@router.post(
+    "/models/{model_name}/batch",
+    dependencies=[Depends(batch_request_deadline), Depends(admit_named)],
+    response_model=BatchPredictionResponse,
+    responses={**BATCH_RESPONSES, **UNKNOWN_MODEL_RESPONSE},
+    openapi_extra=BATCH_REQUEST_BODY,
+)
+async def predict_batch_with_model(
+    request: Request,
+    model_service: ModelService = Depends(get_named_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+) -> BatchPredictionResponse:
+    """
+    Predict many images in one request with the named model.
+
+    - **files**: Multipart image files (PNG, JPG, JPEG, BMP), or
+    - **images**: JSON list of base64 encoded images
+    """
+    return await _run_batch_request(request, model_service, image_service, executor)
+
+
+@router.post(
+    "/models/{model_name}/archive",
+    dependencies=[Depends(admit_named_archive)],
+    response_class=StreamingResponse,
+    responses={**ARCHIVE_RESPONSES, **UNKNOWN_MODEL_RESPONSE},
+)
+async def predict_archive_with_model(
+    file: UploadFile = File(..., description="ZIP or TAR archive of images"),
+    model_service: ModelService = Depends(get_named_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+    archive_service: ArchiveService = Depends(get_archive_processor),
+) -> StreamingResponse:
+    """
+    Predict every image in an archive with the named model, streamed as NDJSON.
+
+    - **file**: ZIP or TAR (optionally compressed) archive of images
+    """
+    logger.info(f"Received {model_service.name} archive prediction request - File: {file.filename}")
+
+    return await _stream_archive(file, model_service, image_service, executor, archive_service)
+
+
+@router.get(
+    "/models/{model_name}/classes",
+    response_model=ClassesResponse,
+    responses=UNKNOWN_MODEL_RESPONSE,
+)
+async def get_model_classes(
+    model_service: ModelService = Depends(get_named_model),
+) -> ClassesResponse:
+    """
+    Get the classes the named model can recognize.
+    """
+    classes = model_service.get_classes()
+    return ClassesResponse(classes=classes, count=len(classes))
+
+
+# ==================== CHARACTER PREDICTION ENDPOINTS ====================
+
+
+@router.post(
+    "/predict",
+    dependencies=[Depends(request_deadline), Depends(admit_character)],
+    response_model=PredictionResponse,
+    responses=PREDICTION_RESPONSES,
+)
+async def predict_from_image(
+    file: UploadFile = File(..., description="Image file to predict"),
+    model_service: ModelService = Depends(get_model),
+    pipeline: PredictionPipeline = Depends(),
+) -> PredictionResponse:
+    """
+    Predict Urdu character from uploaded image.
+
+    - **file**: Image file (PNG, JPG, JPEG, BMP) max 5MB
+
+    Returns prediction with confidence score and top 5 predictions.
+    """
+    return await _predict_upload(file, model_service, pipeline)
+
+
 @router.post(
     "/predict/canvas",
+    dependencies=[Depends(request_deadline), Depends(admit_character_interactive)],
     response_model=PredictionResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Invalid image data"},
-        500: {"model": ErrorResponse, "description": "Prediction error"},
-        503: {"model": ErrorResponse, "description": "Model not loaded"},
-    },
+    responses=PREDICTION_RESPONSES,
 )
 async def predict_from_canvas(
     request: Base64ImageRequest,
     model_service: ModelService = Depends(get_model),
-    image_service: ImageService = Depends(get_image_processor),
+    pipeline: PredictionPipeline = Depends(),
 ) -> PredictionResponse:
     """
     Predict Urdu character from canvas drawing (base64 encoded).
@@ -167,69 +822,58 @@ async def predict_from_canvas(
 
     Returns prediction with confidence score and top 5 predictions.
     """
-    logger.info("Received canvas prediction request")
+    return await _predict_canvas(request, model_service, pipeline)
 
-    try:
-        # Process base64 image
-        processed_image = image_service.process_base64_image(request.image_data)
 
-        # Check if model is loaded
-        if not model_service.is_loaded:
-            logger.warning("Model not loaded, returning mock prediction")
-            return PredictionResponse(
-                prediction="ا",
-                confidence=0.0,
-                top_5=[TopPrediction(character=char, probability=0.0) for char in list(URDU_CHARACTERS.values())[:5]],
-                processing_time_ms=0.0,
-            )
-
-        # Make prediction
-        prediction, confidence, top_5, processing_time = model_service.predict(processed_image)
+@router.post(
+    "/predict/batch",
+    dependencies=[Depends(batch_request_deadline), Depends(admit_character)],
+    response_model=BatchPredictionResponse,
+    responses=BATCH_RESPONSES,
+    openapi_extra=BATCH_REQUEST_BODY,
+)
+async def predict_batch(
+    request: Request,
+    model_service: ModelService = Depends(get_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+) -> BatchPredictionResponse:
+    """
+    Predict Urdu characters for many images in one request.
 
-        logger.info(f"Canvas prediction completed - Character: {prediction}, Confidence: {confidence:.4f}")
-        logger.info(f"Processing time: {processing_time:.2f}ms")
+    - **files**: Multipart image files (PNG, JPG, JPEG, BMP), or
+    - **images**: JSON list of base64 encoded images
 
-        return PredictionResponse(
-            prediction=prediction,
-            confidence=confidence,
-            top_5=[TopPrediction(**p) for p in top_5],
-            processing_time_ms=round(processing_time, 2),
-        )
+    All valid images are predicted in a single forward pass. Items that fail
+    validation or decoding get a per-item error instead of failing the batch.
+    """
+    return await _run_batch_request(request, model_service, image_service, executor)
 
-    except InvalidImageError as e:
-        logger.error(f"Invalid image data: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
-        )
 
-    except ImageProcessingError as e:
-        logger.error(f"Image processing error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
+@router.post(
+    "/predict/archive",
+    dependencies=[Depends(admit_character_archive)],
+    response_class=StreamingResponse,
+    responses=ARCHIVE_RESPONSES,
+)
+async def predict_archive(
+    file: UploadFile = File(..., description="ZIP or TAR archive of character images"),
+    model_service: ModelService = Depends(get_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+    archive_service: ArchiveService = Depends(get_archive_processor),
+) -> StreamingResponse:
+    """
+    Predict Urdu characters for every image in an archive, streamed as NDJSON.
 
-    except ModelNotLoadedError as e:
-        logger.error(f"Model not loaded: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=str(e.message),
-        )
+    - **file**: ZIP or TAR (optionally compressed) archive of images
 
-    except PredictionError as e:
-        logger.error(f"Prediction error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
+    Each member produces one JSON line as soon as its inference batch
+    completes; a final line holds the summary counts.
+    """
+    logger.info(f"Received archive prediction request - File: {file.filename}")
 
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}",
-        )
+    return await _stream_archive(file, model_service, image_service, executor, archive_service)
 
 
 @router.get(
@@ -261,17 +905,14 @@ async def get_classes(
 
 @router.post(
     "/predict/digit",
+    dependencies=[Depends(request_deadline), Depends(admit_digit)],
     response_model=PredictionResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Invalid image"},
-        500: {"model": ErrorResponse, "description": "Prediction error"},
-        503: {"model": ErrorResponse, "description": "Model not loaded"},
-    },
+    responses=PREDICTION_RESPONSES,
 )
 async def predict_digit_from_image(
     file: UploadFile = File(..., description="Image file to predict"),
-    digit_model_service: DigitModelService = Depends(get_digit_model),
-    image_service: ImageService = Depends(get_image_processor),
+    digit_model_service: ModelService = Depends(get_digit_model),
+    pipeline: PredictionPipeline = Depends(),
 ) -> PredictionResponse:
     """
     Predict Urdu digit from uploaded image.
@@ -280,110 +921,19 @@ async def predict_digit_from_image(
 
     Returns prediction with confidence score and top predictions.
     """
-    logger.info(f"Received digit prediction request - File: {file.filename}, Content-Type: {file.content_type}")
-
-    try:
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-
-        logger.info(f"File size: {file_size} bytes")
-
-        # Validate file
-        image_service.validate_file(file.filename or "unknown", file_size)
-
-        # Preprocess image
-        processed_image = await image_service.process_uploaded_file(
-            file_content, file.filename or "unknown"
-        )
-
-        # Check if model is loaded
-        if not digit_model_service.is_loaded:
-            logger.warning("Digit model not loaded, returning mock prediction")
-            # Return mock prediction for demo purposes when model isn't loaded
-            return PredictionResponse(
-                prediction="۰",
-                confidence=0.0,
-                top_5=[TopPrediction(character=char, probability=0.0) for char in list(URDU_DIGITS.values())[:5]],
-                processing_time_ms=0.0,
-            )
-
-        # Make prediction
-        prediction, confidence, top_5, processing_time = digit_model_service.predict(processed_image)
-
-        logger.info(f"Digit prediction completed - Digit: {prediction}, Confidence: {confidence:.4f}")
-        logger.info(f"Processing time: {processing_time:.2f}ms")
-
-        return PredictionResponse(
-            prediction=prediction,
-            confidence=confidence,
-            top_5=[TopPrediction(**p) for p in top_5],
-            processing_time_ms=round(processing_time, 2),
-        )
-
-    except UnsupportedImageFormatError as e:
-        logger.error(f"Unsupported image format: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
-        )
-
-    except ImageTooLargeError as e:
-        logger.error(f"Image too large: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
-        )
-
-    except InvalidImageError as e:
-        logger.error(f"Invalid image: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
-        )
-
-    except ImageProcessingError as e:
-        logger.error(f"Image processing error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
-
-    except ModelNotLoadedError as e:
-        logger.error(f"Digit model not loaded: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=str(e.message),
-        )
-
-    except PredictionError as e:
-        logger.error(f"Digit prediction error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
-
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}",
-        )
+    return await _predict_upload(file, digit_model_service, pipeline)
 
 
 @router.post(
     "/predict/digit/canvas",
+    dependencies=[Depends(request_deadline), Depends(admit_digit_interactive)],
     response_model=PredictionResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Invalid image data"},
-        500: {"model": ErrorResponse, "description": "Prediction error"},
-        503: {"model": ErrorResponse, "description": "Model not loaded"},
-    },
+    responses=PREDICTION_RESPONSES,
 )
 async def predict_digit_from_canvas(
     request: Base64ImageRequest,
-    digit_model_service: DigitModelService = Depends(get_digit_model),
-    image_service: ImageService = Depends(get_image_processor),
+    digit_model_service: ModelService = Depends(get_digit_model),
+    pipeline: PredictionPipeline = Depends(),
 ) -> PredictionResponse:
     """
     Predict Urdu digit from canvas drawing (base64 encoded).
@@ -392,69 +942,58 @@ async def predict_digit_from_canvas(
 
     Returns prediction with confidence score and top predictions.
     """
-    logger.info("Received digit canvas prediction request")
+    return await _predict_canvas(request, digit_model_service, pipeline)
 
-    try:
-        # Process base64 image
-        processed_image = image_service.process_base64_image(request.image_data)
-
-        # Check if model is loaded
-        if not digit_model_service.is_loaded:
-            logger.warning("Digit model not loaded, returning mock prediction")
-            return PredictionResponse(
-                prediction="۰",
-                confidence=0.0,
-                top_5=[TopPrediction(character=char, probability=0.0) for char in list(URDU_DIGITS.values())[:5]],
-                processing_time_ms=0.0,
-            )
 
-        # Make prediction
-        prediction, confidence, top_5, processing_time = digit_model_service.predict(processed_image)
+@router.post(
+    "/predict/digit/batch",
+    dependencies=[Depends(batch_request_deadline), Depends(admit_digit)],
+    response_model=BatchPredictionResponse,
+    responses=BATCH_RESPONSES,
+    openapi_extra=BATCH_REQUEST_BODY,
+)
+async def predict_digit_batch(
+    request: Request,
+    digit_model_service: ModelService = Depends(get_digit_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+) -> BatchPredictionResponse:
+    """
+    Predict Urdu digits for many images in one request.
 
-        logger.info(f"Digit canvas prediction completed - Digit: {prediction}, Confidence: {confidence:.4f}")
-        logger.info(f"Processing time: {processing_time:.2f}ms")
+    - **files**: Multipart image files (PNG, JPG, JPEG, BMP), or
+    - **images**: JSON list of base64 encoded images
 
-        return PredictionResponse(
-            prediction=prediction,
-            confidence=confidence,
-            top_5=[TopPrediction(**p) for p in top_5],
-            processing_time_ms=round(processing_time, 2),
-        )
+    All valid images are predicted in a single forward pass. Items that fail
+    validation or decoding get a per-item error instead of failing the batch.
+    """
+    return await _run_batch_request(request, digit_model_service, image_service, executor)
 
-    except InvalidImageError as e:
-        logger.error(f"Invalid image data: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e.message),
-        )
 
-    except ImageProcessingError as e:
-        logger.error(f"Image processing error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
+@router.post(
+    "/predict/digit/archive",
+    dependencies=[Depends(admit_digit_archive)],
+    response_class=StreamingResponse,
+    responses=ARCHIVE_RESPONSES,
+)
+async def predict_digit_archive(
+    file: UploadFile = File(..., description="ZIP or TAR archive of digit images"),
+    digit_model_service: ModelService = Depends(get_digit_model),
+    image_service: ImageService = Depends(get_image_processor),
+    executor: InferenceExecutor = Depends(get_executor),
+    archive_service: ArchiveService = Depends(get_archive_processor),
+) -> StreamingResponse:
+    """
+    Predict Urdu digits for every image in an archive, streamed as NDJSON.
 
-    except ModelNotLoadedError as e:
-        logger.error(f"Digit model not loaded: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=str(e.message),
-        )
+    - **file**: ZIP or TAR (optionally compressed) archive of images
 
-    except PredictionError as e:
-        logger.error(f"Digit prediction error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e.message),
-        )
+    Each member produces one JSON line as soon as its inference batch
+    completes; a final line holds the summary counts.
+    """
+    logger.info(f"Received digit archive prediction request - File: {file.filename}")
 
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}",
-        )
+    return await _stream_archive(file, digit_model_service, image_service, executor, archive_service)
 
 
 @router.get(
@@ -462,7 +1001,7 @@ async def predict_digit_from_canvas(
     response_model=ClassesResponse,
 )
 async def get_digit_classes(
-    digit_model_service: DigitModelService = Depends(get_digit_model),
+    digit_model_service: ModelService = Depends(get_digit_model),
 ) -> ClassesResponse:
     """
     Get list of all Urdu digits the model can recognize.
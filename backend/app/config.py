@@ -8,10 +8,88 @@ Supports environment variables and .env files.
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Directory that relative model, label and log paths are resolved against
+BASE_DIR = Path(__file__).parent.parent
+
+
+class ModelConfig(BaseModel):
+    """Configuration of one model served by the model registry."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_path: str
+    class_labels_path: Optional[str] = None
+    default_labels: Dict[int, str] = Field(default_factory=dict)
+    # Processed training data (X_train.npy, ...) the model was trained on
+    processed_data_dir: Optional[str] = None
+
+    @property
+    def model_path_resolved(self) -> Path:
+        """Get the resolved model path."""
+        return BASE_DIR / self.model_path
+
+    @property
+    def class_labels_path_resolved(self) -> Optional[Path]:
+        """Get the resolved class labels path."""
+        return BASE_DIR / self.class_labels_path if self.class_labels_path else None
+
+    @property
+    def processed_data_dir_resolved(self) -> Optional[Path]:
+        """Get the resolved processed data directory."""
+        return BASE_DIR / self.processed_data_dir if self.processed_data_dir else None
+
+
+# Performance profiles selectable with PERFORMANCE_PROFILE. Each one sets the
+# thread, executor, batching, cache and logging settings together for one
+# deployment role; settings given explicitly still take precedence, and with
+# TF_THREAD_CALIBRATION the measured thread pool sizes replace the profile's.
+PERFORMANCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Interactive API behind the frontend: few forward passes run at once, each
+    # spread over every core so a single drawing is served as soon as possible,
+    # batches stay small and barely wait, queues are short so overload is shed
+    # instead of queued, and the caches are large since users redraw and
+    # resubmit the same characters.
+    "latency": {
+        "TF_INTRA_OP_THREADS": 0,
+        "TF_INTER_OP_THREADS": 1,
+        "EXECUTOR_MAX_WORKERS": 2,
+        "EXECUTOR_MODEL_MAX_WORKERS": 2,
+        "EXECUTOR_MAX_QUEUE_SIZE": 32,
+        "BATCH_MAX_SIZE": 8,
+        "BATCH_MAX_WAIT_MS": 1.0,
+        "BATCH_TARGET_P95_MS": 50.0,
+        "PREDICTION_CACHE_MAX_ENTRIES": 8192,
+        "PREDICTION_CACHE_MAX_BYTES": 32 * 1024 * 1024,
+        "TENSOR_CACHE_MAX_ENTRIES": 8192,
+        "TENSOR_CACHE_MAX_BYTES": 16 * 1024 * 1024,
+        "LOG_LEVEL": "WARNING",
+    },
+    # Offline bulk scoring: many forward passes run side by side on a core or
+    # two each instead of contending for every core, large batches wait to fill
+    # up, deep queues absorb bursts rather than shed them, and the caches are
+    # small since bulk inputs rarely repeat.
+    "throughput": {
+        "TF_INTRA_OP_THREADS": 1,
+        "TF_INTER_OP_THREADS": 2,
+        "EXECUTOR_MAX_WORKERS": 8,
+        "EXECUTOR_MODEL_MAX_WORKERS": 8,
+        "EXECUTOR_MAX_QUEUE_SIZE": 512,
+        "BATCH_MAX_SIZE": 64,
+        "BATCH_MAX_WAIT_MS": 10.0,
+        "BATCH_TARGET_P95_MS": 1000.0,
+        "PREDICTION_CACHE_MAX_ENTRIES": 1024,
+        "PREDICTION_CACHE_MAX_BYTES": 4 * 1024 * 1024,
+        "TENSOR_CACHE_MAX_ENTRIES": 1024,
+        "TENSOR_CACHE_MAX_BYTES": 2 * 1024 * 1024,
+        "LOG_LEVEL": "INFO",
+    },
+}
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
@@ -22,6 +100,10 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "development"
 
+    # Performance profile: "latency" or "throughput" (see PERFORMANCE_PROFILES),
+    # or empty to use the individual defaults below
+    PERFORMANCE_PROFILE: str = ""
+
     # Model settings
     MODEL_PATH: str = "saved_models/urdu_cnn_model.h5"
     CLASS_LABELS_PATH: str = "saved_models/class_labels.json"
@@ -30,13 +112,142 @@ class Settings(BaseSettings):
     DIGIT_MODEL_PATH: str = "saved_models/urdu_digit_cnn_model.h5"
     DIGIT_CLASS_LABELS_PATH: str = "saved_models/digit_class_labels.json"
 
+    # Processed training data written by ml/preprocess.py and the training scripts
+    PROCESSED_DATA_DIR: str = "data/processed"
+    DIGIT_PROCESSED_DATA_DIR: str = "data/processed/digits"
+
+    # Additional models served next to "character" and "digit", as JSON, e.g.
+    # {"nastaliq": {"model_path": "saved_models/nastaliq.h5", "class_labels_path": "saved_models/nastaliq_labels.json"}}
+    EXTRA_MODELS: Dict[str, ModelConfig] = {}
+
+    # Inference backend: keras, tflite, tflite_int8, onnxruntime or numpy
+    # (tflite/onnxruntime/numpy load artifacts exported with `python -m ml.export`,
+    # tflite_int8 loads the artifact written by `python -m ml.quantize`;
+    # keras falls back to numpy when TensorFlow is not installed)
+    INFERENCE_BACKEND: str = "keras"
+
+    # Model loading: PRELOAD_MODELS load concurrently in the background at
+    # startup, are required by /ready and are never evicted; until one is
+    # ready its routes answer 503 with Retry-After. Other models load on their
+    # first request. Idle models are evicted least recently used first once the
+    # loaded models' resident memory exceeds the budget (0 disables eviction).
+    PRELOAD_MODELS: List[str] = ["character", "digit"]
+    MODEL_MEMORY_BUDGET_MB: int = 1024
+    READY_RETRY_AFTER_S: int = 5
+
+    # Warmup: every model version runs WARMUP_RUNS forward passes at each of
+    # WARMUP_BATCH_SIZES before it serves traffic (0 runs disables). The keras
+    # backend compiles one fixed-shape inference function per batch size and
+    # pads each batch up to the nearest one, so serving never retraces; the
+    # tflite backends allocate their interpreters for the same sizes.
+    WARMUP_BATCH_SIZES: List[int] = [1, 2, 4, 8, 16, 32, 64]
+    WARMUP_RUNS: int = 1
+
+    # TensorFlow thread pools of the keras backend: threads parallelizing a
+    # single op, and ops run concurrently (0 lets TensorFlow use every core)
+    TF_INTRA_OP_THREADS: int = 0
+    TF_INTER_OP_THREADS: int = 0
+
+    # Thread calibration: instead of the sizes above, the keras backend uses the
+    # best sizes measured for the loaded model on this host's cores with WORKERS
+    # processes running it, at TF_THREAD_CALIBRATION_BATCH_SIZES. The result is
+    # cached in TF_THREAD_CALIBRATION_CACHE, so only the first boot calibrates.
+    TF_THREAD_CALIBRATION: bool = False
+    TF_THREAD_CALIBRATION_CACHE: str = "saved_models/thread_calibration.json"
+    TF_THREAD_CALIBRATION_BATCH_SIZES: List[int] = [1, 8, 32]
+
+    # Inference process: run the models in a dedicated process. Each API
+    # process hands it preprocessed batches through a shared-memory ring of
+    # INFERENCE_RING_SLOTS slots of up to INFERENCE_RING_SLOT_IMAGES images;
+    # the pre-fork server's workers all feed one engine, which merges their
+    # requests for a model into batches of up to BATCH_MAX_SIZE images.
+    INFERENCE_PROCESS: bool = False
+    INFERENCE_RING_SLOTS: int = 16
+    INFERENCE_RING_SLOT_IMAGES: int = 64
+
+    # Inference workers: INFERENCE_WORKERS engines, each with its own replica
+    # of every model; each batch goes to the engine with the fewest images in
+    # flight. INFERENCE_PIN_CPUS pins each engine to a disjoint share of the
+    # available cores and sizes its thread pools to that share.
+    INFERENCE_WORKERS: int = 1
+    INFERENCE_PIN_CPUS: bool = False
+
+    # Admission control: each model runs at most ADMISSION_MAX_CONCURRENCY
+    # prediction requests at once and queues up to ADMISSION_MAX_QUEUE more.
+    # Requests are rejected immediately with Retry-After once the queue is
+    # full (429) or their estimated wait exceeds ADMISSION_MAX_WAIT_MS (503).
+    # 0 disables the corresponding limit.
+    ADMISSION_MAX_CONCURRENCY: int = 32
+    ADMISSION_MAX_QUEUE: int = 128
+    ADMISSION_MAX_WAIT_MS: float = 5000.0
+
+    # Request deadlines: prediction requests expire X-Request-Timeout
+    # milliseconds after they arrive, or REQUEST_TIMEOUT_MS when the header is
+    # absent (0 disables the default). Work for expired requests, and for
+    # requests whose client disconnected, is dropped before it reaches the model.
+    REQUEST_TIMEOUT_MS: float = 30000.0
+
+    # Hot reload: loaded models whose artifact changes on disk are reloaded
+    # after it has been stable for one poll interval (0 disables the watch).
+    # The admin endpoints require the X-Admin-Token header to match ADMIN_TOKEN,
+    # and are disabled (403) while it is unset.
+    MODEL_WATCH_INTERVAL_S: float = 0.0
+    ADMIN_TOKEN: Optional[str] = None
+
     # File upload settings
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     ALLOWED_EXTENSIONS: List[str] = [".png", ".jpg", ".jpeg", ".bmp"]
+    BATCH_MAX_ITEMS: int = 256  # Maximum images per batch prediction request
+
+    # Archive streaming settings
+    ARCHIVE_BATCH_SIZE: int = 64
+    ARCHIVE_DECODE_CONCURRENCY: int = 16
+    ARCHIVE_MAX_SIZE: int = 2 * 1024 * 1024 * 1024  # 2GB
 
     # Image processing settings
     IMAGE_SIZE: Tuple[int, int] = (64, 64)
 
+    # Micro-batching settings
+    BATCH_MAX_SIZE: int = 32
+    BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Batch autotuning: when enabled, each model starts at the limits above and
+    # its max batch size and max wait are retuned every BATCH_AUTOTUNE_INTERVAL_S
+    # within the bounds below, to keep p95 latency under BATCH_TARGET_P95_MS
+    # while batching as much as the arrival rate allows.
+    BATCH_AUTOTUNE: bool = False
+    BATCH_TARGET_P95_MS: float = 100.0
+    BATCH_AUTOTUNE_MIN_SIZE: int = 1
+    BATCH_AUTOTUNE_MAX_SIZE: int = 64
+    BATCH_AUTOTUNE_MIN_WAIT_MS: float = 0.0
+    BATCH_AUTOTUNE_MAX_WAIT_MS: float = 20.0
+    BATCH_AUTOTUNE_INTERVAL_S: float = 5.0
+
+    # Executor settings (decode, preprocessing and inference worker pool)
+    EXECUTOR_MAX_WORKERS: int = 4
+    EXECUTOR_MAX_QUEUE_SIZE: int = 64
+
+    # Executor lanes: canvas routes run in the interactive lane, upload, batch
+    # and archive routes in the bulk lane. Free workers take waiting tasks from
+    # the lanes in proportion to their weights. One model's tasks occupy at
+    # most EXECUTOR_MODEL_MAX_WORKERS workers at once (overridable per model in
+    # EXECUTOR_MODEL_WORKERS; 0 for no limit), so no model can starve the others.
+    EXECUTOR_LANE_WEIGHTS: Dict[str, int] = {"interactive": 4, "bulk": 1}
+    EXECUTOR_MODEL_MAX_WORKERS: int = 3
+    EXECUTOR_MODEL_WORKERS: Dict[str, int] = {}
+
+    # Prediction cache settings (byte-identical uploads; 0 entries disables)
+    PREDICTION_CACHE_MAX_ENTRIES: int = 4096
+    PREDICTION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # 16MB
+
+    # Tensor cache settings (near-duplicate preprocessed images; 0 entries disables).
+    # The hash averages the 64x64 tensor down to GRID_SIZE x GRID_SIZE and
+    # quantizes it to LEVELS intensities; lower values match more loosely.
+    TENSOR_CACHE_MAX_ENTRIES: int = 4096
+    TENSOR_CACHE_MAX_BYTES: int = 8 * 1024 * 1024  # 8MB
+    TENSOR_CACHE_GRID_SIZE: int = 32
+    TENSOR_CACHE_LEVELS: int = 16
+
     # Logging settings
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
@@ -47,6 +258,18 @@ class Settings(BaseSettings):
     # Server settings
     HOST: str = "0.0.0.0"
     PORT: int = 3000
+    # Worker processes forked by `python -m app.server`. With a fork-safe
+    # backend (numpy) the parent loads PRELOAD_MODELS once before forking and
+    # the workers share the weights as copy-on-write pages.
+    WORKERS: int = 1
+    # A worker that exits within WORKER_MIN_UPTIME_S of starting is restarted
+    # after a delay doubling from WORKER_RESTART_BACKOFF_S up to
+    # WORKER_RESTART_MAX_BACKOFF_S. After WORKER_MAX_RAPID_FAILURES such exits
+    # in a row, the server stops and exits with an error.
+    WORKER_MIN_UPTIME_S: float = 10.0
+    WORKER_RESTART_BACKOFF_S: float = 0.5
+    WORKER_RESTART_MAX_BACKOFF_S: float = 30.0
+    WORKER_MAX_RAPID_FAILURES: int = 5
 
     # Model configuration
     model_config = SettingsConfigDict(
@@ -56,30 +279,66 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def apply_performance_profile(cls, values: Any) -> Any:
+        """Fill in the selected performance profile's settings that weren't given explicitly."""
+        if not isinstance(values, dict):
+            return values
+
+        profile = values.get("PERFORMANCE_PROFILE")
+        if not profile:
+            return values
+        if profile not in PERFORMANCE_PROFILES:
+            raise ValueError(
+                f"Unknown performance profile: {profile}. "
+                f"Available profiles: {', '.join(PERFORMANCE_PROFILES)}"
+            )
+        return {**PERFORMANCE_PROFILES[profile], **values}
+
     @property
     def model_path_resolved(self) -> Path:
         """Get the resolved model path."""
-        return Path(__file__).parent.parent / self.MODEL_PATH
+        return BASE_DIR / self.MODEL_PATH
 
     @property
     def class_labels_path_resolved(self) -> Path:
         """Get the resolved class labels path."""
-        return Path(__file__).parent.parent / self.CLASS_LABELS_PATH
+        return BASE_DIR / self.CLASS_LABELS_PATH
 
     @property
     def digit_model_path_resolved(self) -> Path:
         """Get the resolved digit model path."""
-        return Path(__file__).parent.parent / self.DIGIT_MODEL_PATH
+        return BASE_DIR / self.DIGIT_MODEL_PATH
 
     @property
     def digit_class_labels_path_resolved(self) -> Path:
         """Get the resolved digit class labels path."""
-        return Path(__file__).parent.parent / self.DIGIT_CLASS_LABELS_PATH
+        return BASE_DIR / self.DIGIT_CLASS_LABELS_PATH
 
     @property
     def log_file_resolved(self) -> Path:
         """Get the resolved log file path."""
-        return Path(__file__).parent.parent / self.LOG_FILE
+        return BASE_DIR / self.LOG_FILE
+
+    @property
+    def model_configs(self) -> Dict[str, ModelConfig]:
+        """Get the configuration of every served model, by name."""
+        return {
+            "character": ModelConfig(
+                model_path=self.MODEL_PATH,
+                class_labels_path=self.CLASS_LABELS_PATH,
+                default_labels=URDU_CHARACTERS,
+                processed_data_dir=self.PROCESSED_DATA_DIR,
+            ),
+            "digit": ModelConfig(
+                model_path=self.DIGIT_MODEL_PATH,
+                class_labels_path=self.DIGIT_CLASS_LABELS_PATH,
+                default_labels=URDU_DIGITS,
+                processed_data_dir=self.DIGIT_PROCESSED_DATA_DIR,
+            ),
+            **self.EXTRA_MODELS,
+        }
 
 
 @lru_cache
@@ -143,6 +402,20 @@ URDU_CHARACTERS = {
     45: "۹",  # Nine
 }
 
+# Urdu digit mappings (0-9)
+URDU_DIGITS = {
+    0: "۰",
+    1: "۱",
+    2: "۲",
+    3: "۳",
+    4: "۴",
+    5: "۵",
+    6: "۶",
+    7: "۷",
+    8: "۸",
+    9: "۹",
+}
+
 URDU_CHARACTER_NAMES = {
     "ا": "Alif",
     "ب": "Bay",
@@ -32,6 +32,20 @@ class ModelLoadError(UrduOCRException):
         super().__init__(message, details)
 
 
+class ModelNotFoundError(UrduOCRException):
+    """Exception raised when a model name is not configured in the registry."""
+
+    def __init__(
+        self,
+        model_name: str,
+        available_models: Optional[list] = None,
+    ) -> None:
+        message = f"Unknown model: {model_name}"
+        if available_models:
+            message += f". Available models: {', '.join(available_models)}"
+        super().__init__(message, {"model_name": model_name, "available_models": available_models})
+
+
 class ModelNotLoadedError(UrduOCRException):
     """Exception raised when prediction is attempted without a loaded model."""
 
@@ -116,3 +130,62 @@ class ClassLabelsNotFoundError(UrduOCRException):
     ) -> None:
         details = {"path": path} if path else {}
         super().__init__(message, details)
+
+
+class ModelRollbackError(UrduOCRException):
+    """Exception raised when no previous model version is resident to roll back to."""
+
+    def __init__(
+        self,
+        message: str = "No previous model version to roll back to",
+        model_name: Optional[str] = None,
+    ) -> None:
+        details = {"model_name": model_name} if model_name else {}
+        super().__init__(message, details)
+
+
+class ModelNotReadyError(UrduOCRException):
+    """Exception raised when a model is still loading in the background."""
+
+    def __init__(
+        self,
+        model_name: str,
+        retry_after: int,
+    ) -> None:
+        message = f"Model {model_name} is still loading. Retry after {retry_after} seconds."
+        self.retry_after = retry_after
+        super().__init__(message, {"model_name": model_name, "retry_after": retry_after})
+
+
+class RequestRejectedError(UrduOCRException):
+    """Exception raised when admission control sheds a request instead of queueing it."""
+
+    def __init__(
+        self,
+        model_name: str,
+        reason: str,
+        retry_after: int,
+        status_code: int = 503,
+    ) -> None:
+        message = f"Model {model_name} is overloaded ({reason}). Retry after {retry_after} seconds."
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+        super().__init__(message, {"model_name": model_name, "reason": reason, "retry_after": retry_after})
+
+
+class DeadlineExceededError(UrduOCRException):
+    """Exception raised when work is dropped because its request expired or its client disconnected."""
+
+    def __init__(
+        self,
+        reason: str,
+        stage: str,
+    ) -> None:
+        message = (
+            "Client disconnected before the request was served" if reason == "disconnected"
+            else "Request deadline exceeded before the request was served"
+        )
+        self.reason = reason
+        self.stage = stage
+        super().__init__(message, {"reason": reason, "stage": stage})
@@ -11,6 +11,8 @@ import sys
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+from app.config import get_settings
+
 
 class CustomFormatter(logging.Formatter):
     """Custom formatter with color support for console output."""
@@ -66,13 +68,16 @@ def setup_logger(
         Configured logger instance
     """
     logger = logging.getLogger(name)
+    level = getattr(logging, log_level.upper(), logging.INFO)
 
-    # Avoid adding handlers multiple times
+    # Avoid adding handlers multiple times, but apply the requested level
     if logger.handlers:
+        logger.setLevel(level)
+        for handler in logger.handlers:
+            handler.setLevel(level)
         return logger
 
     # Set log level
-    level = getattr(logging, log_level.upper(), logging.INFO)
     logger.setLevel(level)
 
     # Console handler with custom formatter
@@ -98,8 +103,8 @@ def setup_logger(
     return logger
 
 
-# Create default logger instance
-logger = setup_logger()
+# Create default logger instance, at the configured level so import-time messages honor it
+logger = setup_logger(log_level=get_settings().LOG_LEVEL)
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
@@ -6,18 +6,19 @@ Main application file for the Urdu Character Recognition API.
 
 import sys
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import health, prediction
+from app.api.routes import admin, health, metrics, prediction
 from app.config import get_settings
 from app.core.exceptions import UrduOCRException
 from app.logger import get_logger, setup_logger
-from app.services.model_service import get_model_service
-from app.services.digit_model_service import get_digit_model_service
+from app.services.executor import get_inference_executor
+from app.services.inference_process import get_inference_process
+from app.services.model_registry import get_model_registry
+from app.services.model_watcher import get_model_watcher
 
 # Initialize settings
 settings = get_settings()
@@ -46,52 +47,26 @@ async def lifespan(app: FastAPI):
 
     logger.info("Starting Urdu Character Recognition API Server...")
     logger.info("Loading configuration...")
-
-    # Initialize character model service
-    logger.info("Initializing character model service...")
-    model_service = get_model_service()
-
-    try:
-        model_path = settings.model_path_resolved
-        logger.info(f"Attempting to load character model from: {model_path}")
-
-        if model_path.exists():
-            model_service.load_model(str(model_path))
-            logger.info(f"Character model loaded successfully from {model_path}")
-            logger.info(f"Model input shape: {model_service.model.input_shape}")
-            logger.info(f"Number of classes: {model_service.num_classes}")
-        else:
-            logger.warning(f"Character model file not found at: {model_path}")
-            logger.info("Running in demo mode without trained character model")
-            logger.info("To train a character model, run: python -m ml.train")
-
-    except Exception as e:
-        logger.warning(f"Could not load character model: {str(e)}")
-        logger.info("Running in demo mode without trained character model")
-
-    # Initialize digit model service
-    logger.info("Initializing digit model service...")
-    digit_model_service = get_digit_model_service()
-
-    try:
-        digit_model_path = settings.digit_model_path_resolved
-        logger.info(f"Attempting to load digit model from: {digit_model_path}")
-
-        if digit_model_path.exists():
-            digit_model_service.load_model(str(digit_model_path))
-            logger.info(f"Digit model loaded successfully from {digit_model_path}")
-            logger.info(f"Model input shape: {digit_model_service.model.input_shape}")
-            logger.info(f"Number of classes: {digit_model_service.num_classes}")
-        else:
-            logger.warning(f"Digit model file not found at: {digit_model_path}")
-            logger.info("Running in demo mode without trained digit model")
-            logger.info("To train a digit model, run: python -m ml.digit_cnn.train")
-
-    except Exception as e:
-        logger.warning(f"Could not load digit model: {str(e)}")
-        logger.info("Running in demo mode without trained digit model")
-
-    logger.info("Server ready to accept requests")
+    logger.info(f"Inference backend: {settings.INFERENCE_BACKEND}")
+    logger.info(f"Performance profile: {settings.PERFORMANCE_PROFILE or 'default'}")
+
+    # Models run in a dedicated inference process (already started by the
+    # pre-fork server's parent when running under it)
+    if settings.INFERENCE_PROCESS:
+        get_inference_process().start()
+
+    # PRELOAD_MODELS load concurrently in the background so the server binds
+    # right away; /ready reports when they are warm. Other models load on first request.
+    logger.info("Initializing model registry...")
+    registry = get_model_registry()
+    registry.preload_in_background(settings.PRELOAD_MODELS)
+
+    # Hot reload models whose artifact is replaced on disk
+    watcher = get_model_watcher()
+    if settings.MODEL_WATCH_INTERVAL_S > 0:
+        watcher.start()
+
+    logger.info("Server accepting requests; models are loading in the background (see /ready)")
     logger.info(f"API documentation available at: http://{settings.HOST}:{settings.PORT}/docs")
 
     yield
@@ -100,9 +75,13 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down server...")
     logger.info("Cleaning up resources...")
 
-    # Unload models to free memory
-    model_service.unload_model()
-    digit_model_service.unload_model()
+    # Stop watching model artifacts and unload models to free memory
+    await watcher.stop()
+    registry.unload_all()
+    get_inference_process().stop()
+
+    # Wait for in-flight decode and inference work
+    get_inference_executor().shutdown()
 
     logger.info("Server shutdown complete")
 
@@ -123,8 +102,18 @@ app = FastAPI(
     ### Endpoints:
     - **POST /api/v1/predict** - Predict character from uploaded image
     - **POST /api/v1/predict/canvas** - Predict character from canvas drawing
+    - **POST /api/v1/predict/batch** - Predict characters for many images in one request
+    - **POST /api/v1/predict/digit/batch** - Predict digits for many images in one request
+    - **POST /api/v1/predict/archive** - Stream NDJSON predictions for a ZIP/TAR archive
+    - **POST /api/v1/predict/digit/archive** - Stream NDJSON digit predictions for an archive
     - **GET /api/v1/classes** - Get list of supported characters
-    - **GET /api/v1/health** - Check API health status
+    - **GET /api/v1/models** - List the configured models
+    - **POST /api/v1/models/{model_name}/predict** - Predict with any configured model (also /canvas, /batch, /archive, /classes)
+    - **POST /api/v1/admin/models/{model_name}/reload** - Hot reload a model without downtime
+    - **POST /api/v1/admin/models/{model_name}/rollback** - Swap the previous model version back in
+    - **GET /health** - Liveness: the process is up
+    - **GET /ready** - Readiness: the preloaded models are loaded and warm
+    - **GET /metrics** - Executor and batching metrics
     """,
     version=settings.VERSION,
     lifespan=lifespan,
@@ -173,7 +162,9 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 # Include routers
+app.include_router(admin.router)
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(prediction.router)
 
 
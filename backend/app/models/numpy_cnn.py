@@ -0,0 +1,175 @@
+"""
+NumPy CNN
+
+TensorFlow-free inference for the CNN architecture. Weights are exported by
+``python -m ml.export --formats numpy`` into a compact ``.npz`` with
+BatchNormalization folded into the preceding Conv2D/Dense layer and dropout
+removed, and the forward pass is a handful of vectorized NumPy operations.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Key of the JSON layer spec stored alongside the weights in the .npz
+SPEC_KEY = "__spec__"
+
+ACTIVATIONS = ("linear", "relu", "softmax")
+
+
+def relu(x: np.ndarray) -> np.ndarray:
+    """Rectified linear unit, in place."""
+    return np.maximum(x, 0, out=x)
+
+
+def softmax(x: np.ndarray) -> np.ndarray:
+    """Numerically stable softmax over the last axis."""
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+def apply_activation(x: np.ndarray, activation: str) -> np.ndarray:
+    """Apply a named activation function."""
+    if activation == "relu":
+        return relu(x)
+    if activation == "softmax":
+        return softmax(x)
+    return x
+
+
+def conv2d(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray, padding: str) -> np.ndarray:
+    """
+    Stride-1 2D convolution as an im2col matrix multiply.
+
+    Args:
+        x: Input batch with shape (N, H, W, C_in)
+        kernel: Kernel with shape (KH, KW, C_in, C_out), as stored by Keras
+        bias: Bias with shape (C_out,)
+        padding: "same" or "valid"
+
+    Returns:
+        Output batch with shape (N, H_out, W_out, C_out)
+    """
+    kh, kw, c_in, c_out = kernel.shape
+
+    if padding == "same":
+        pad_h, pad_w = kh - 1, kw - 1
+        x = np.pad(x, ((0, 0), (pad_h // 2, pad_h - pad_h // 2), (pad_w // 2, pad_w - pad_w // 2), (0, 0)))
+
+    # (N, H_out, W_out, C_in, KH, KW) view without copying
+    windows = sliding_window_view(x, (kh, kw), axis=(1, 2))
+    n, h_out, w_out = windows.shape[:3]
+
+    # Reorder to the kernel's (KH, KW, C_in) layout; the reshape is the im2col copy
+    columns = windows.transpose(0, 1, 2, 4, 5, 3).reshape(n * h_out * w_out, kh * kw * c_in)
+    out = columns @ kernel.reshape(kh * kw * c_in, c_out)
+    out += bias
+
+    return out.reshape(n, h_out, w_out, c_out)
+
+
+def max_pool2d(x: np.ndarray, pool_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Non-overlapping max pooling with "valid" padding.
+
+    Args:
+        x: Input batch with shape (N, H, W, C)
+        pool_size: Pool height and width (equal to the strides)
+
+    Returns:
+        Pooled batch with shape (N, H // PH, W // PW, C)
+    """
+    ph, pw = pool_size
+    n, h, w, c = x.shape
+    h_out, w_out = h // ph, w // pw
+    x = x[:, :h_out * ph, :w_out * pw, :]
+    return x.reshape(n, h_out, ph, w_out, pw, c).max(axis=(2, 4))
+
+
+class NumpyCNN:
+    """Forward pass of an exported CNN using only NumPy."""
+
+    def __init__(self, layers: List[Dict[str, Any]], weights: Dict[str, np.ndarray]) -> None:
+        """
+        Initialize the network.
+
+        Args:
+            layers: Layer spec, one dictionary per operation
+            weights: Arrays referenced by the layer spec
+        """
+        self.layers = layers
+        self.weights = {key: np.ascontiguousarray(value, dtype=np.float32) for key, value in weights.items()}
+        self.input_shape: Tuple = tuple(layers[0]["input_shape"]) if layers else ()
+        self.output_shape: Tuple = tuple(layers[-1]["output_shape"]) if layers else ()
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyCNN":
+        """
+        Load an exported network from a .npz file.
+
+        Args:
+            path: Path to the .npz file
+
+        Returns:
+            Loaded network
+        """
+        with np.load(path, allow_pickle=False) as data:
+            layers = json.loads(str(data[SPEC_KEY]))
+            weights = {key: data[key] for key in data.files if key != SPEC_KEY}
+        return cls(layers, weights)
+
+    def save(self, path: str) -> None:
+        """
+        Save the network to a .npz file.
+
+        Args:
+            path: Path to the .npz file
+        """
+        with open(path, "wb") as f:
+            np.savez(f, **{SPEC_KEY: np.array(json.dumps(self.layers))}, **self.weights)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """
+        Run a forward pass.
+
+        Args:
+            x: Input batch with shape (N, H, W, C)
+
+        Returns:
+            Network output with shape (N, num_classes)
+        """
+        x = np.asarray(x, dtype=np.float32)
+
+        for layer in self.layers:
+            op = layer["op"]
+            if op == "conv2d":
+                x = conv2d(x, self.weights[layer["kernel"]], self.weights[layer["bias"]], layer["padding"])
+            elif op == "dense":
+                x = x @ self.weights[layer["kernel"]]
+                x += self.weights[layer["bias"]]
+            elif op == "scale":
+                x = x * self.weights[layer["scale"]] + self.weights[layer["offset"]]
+            elif op == "max_pool2d":
+                x = max_pool2d(x, tuple(layer["pool_size"]))
+            elif op == "flatten":
+                x = x.reshape(x.shape[0], -1)
+            elif op != "activation":
+                raise ValueError(f"Unsupported operation in layer spec: {op}")
+
+            x = apply_activation(x, layer.get("activation", "linear"))
+
+        return x
+
+    def summary(self) -> List[str]:
+        """Describe the network, one line per operation."""
+        lines = []
+        for layer in self.layers:
+            params = sum(self.weights[layer[key]].size for key in ("kernel", "bias", "scale", "offset") if key in layer)
+            activation = layer.get("activation", "linear")
+            lines.append(f"{layer['op']:<12} -> {str(tuple(layer['output_shape'])):<22} "
+                         f"{activation:<8} params: {params}")
+        return lines
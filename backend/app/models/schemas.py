@@ -4,9 +4,9 @@ Pydantic Schemas
 Request and response schemas for the API.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TopPrediction(BaseModel):
@@ -23,8 +23,12 @@ class PredictionResponse(BaseModel):
     confidence: float = Field(..., ge=0, le=1, description="Confidence score of the prediction")
     top_5: List[TopPrediction] = Field(..., description="Top 5 predictions with probabilities")
     processing_time_ms: float = Field(..., ge=0, description="Processing time in milliseconds")
+    batch_size: int = Field(1, ge=1, description="Number of requests served by the same forward pass")
+    cached: bool = Field(False, description="Whether the result was served from the prediction cache")
+    model_version: Optional[str] = Field(None, description="Version of the model that served the prediction (None for mock predictions)")
 
     class Config:
+        protected_namespaces = ()
         json_schema_extra = {
             "example": {
                 "prediction": "ا",
@@ -37,6 +41,9 @@ class PredictionResponse(BaseModel):
                     {"character": "ٹ", "probability": 0.01},
                 ],
                 "processing_time_ms": 45.23,
+                "batch_size": 4,
+                "cached": False,
+                "model_version": "3f9a1c07b2e4",
             }
         }
 
@@ -58,6 +65,54 @@ class HealthResponse(BaseModel):
         }
 
 
+class ReadyResponse(BaseModel):
+    """Response schema for the readiness endpoint."""
+
+    status: str = Field(..., description="ready, or not_ready while required models load")
+    models: Dict[str, str] = Field(
+        ..., description="Load state of each required model: ready, loading, failed, missing or unloaded"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "not_ready",
+                "models": {"character": "ready", "digit": "loading"},
+            }
+        }
+
+
+class ModelInfo(BaseModel):
+    """Description of one model served by the model registry."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    name: str = Field(..., description="Model name used in /api/v1/models/{model_name} routes")
+    loaded: bool = Field(..., description="Whether the model is loaded")
+    state: str = Field("unloaded", description="Load state: ready, loading, failed, missing or unloaded")
+    backend: Optional[str] = Field(None, description="Inference backend serving the model")
+    generation: int = Field(..., ge=0, description="Incremented whenever the model is (re)loaded or unloaded")
+    num_classes: int = Field(..., ge=0, description="Number of classes the model recognizes")
+    version: Optional[str] = Field(None, description="Version serving predictions")
+    previous_version: Optional[str] = Field(None, description="Version kept resident for rollback")
+    resident_bytes: int = Field(0, ge=0, description="Memory held by the loaded model versions in bytes")
+
+
+class ModelsResponse(BaseModel):
+    """Response schema for the model listing endpoint."""
+
+    models: List[ModelInfo] = Field(..., description="Configured models")
+    count: int = Field(..., description="Number of configured models")
+
+
+class ModelVersionResponse(BaseModel):
+    """Response schema for the model reload and rollback endpoints."""
+
+    name: str = Field(..., description="Model name")
+    version: Optional[str] = Field(None, description="Version now serving predictions")
+    previous_version: Optional[str] = Field(None, description="Version kept resident for rollback")
+
+
 class ClassesResponse(BaseModel):
     """Response schema for classes endpoint."""
 
@@ -99,3 +154,73 @@ class Base64ImageRequest(BaseModel):
                 "image_data": "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
             }
         }
+
+
+class BatchBase64ImageRequest(BaseModel):
+    """Request schema for batch predictions on base64 encoded images."""
+
+    images: List[str] = Field(..., min_length=1, description="Base64 encoded images")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "images": [
+                    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==",
+                    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==",
+                ]
+            }
+        }
+
+
+class BatchPredictionItem(BaseModel):
+    """Prediction result (or error) for a single item of a batch request."""
+
+    index: int = Field(..., ge=0, description="Position of the item in the request")
+    filename: Optional[str] = Field(None, description="Uploaded filename, if any")
+    success: bool = Field(..., description="Whether the item was predicted successfully")
+    prediction: Optional[str] = Field(None, description="Top predicted Urdu character")
+    confidence: Optional[float] = Field(None, ge=0, le=1, description="Confidence score of the prediction")
+    top_5: Optional[List[TopPrediction]] = Field(None, description="Top 5 predictions with probabilities")
+    error: Optional[str] = Field(None, description="Error message if the item failed")
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response schema for batch prediction endpoints."""
+
+    results: List[BatchPredictionItem] = Field(..., description="Per-item results in request order")
+    count: int = Field(..., description="Number of items in the request")
+    succeeded: int = Field(..., description="Number of items predicted successfully")
+    failed: int = Field(..., description="Number of items that failed")
+    processing_time_ms: float = Field(..., ge=0, description="Forward pass time for the whole batch in milliseconds")
+    model_version: Optional[str] = Field(None, description="Version of the model that served the batch (None for mock predictions)")
+
+    class Config:
+        protected_namespaces = ()
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {
+                        "index": 0,
+                        "filename": "alif.png",
+                        "success": True,
+                        "prediction": "ا",
+                        "confidence": 0.95,
+                        "top_5": [{"character": "ا", "probability": 0.95}],
+                        "error": None,
+                    },
+                    {
+                        "index": 1,
+                        "filename": "notes.gif",
+                        "success": False,
+                        "prediction": None,
+                        "confidence": None,
+                        "top_5": None,
+                        "error": "Unsupported image format: .gif",
+                    },
+                ],
+                "count": 2,
+                "succeeded": 1,
+                "failed": 1,
+                "processing_time_ms": 52.1,
+            }
+        }
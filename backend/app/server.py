@@ -0,0 +1,245 @@
+"""
+Pre-fork Server
+
+Serves the API from several worker processes forked from one parent. The
+parent imports the app and loads the preloaded models once, then freezes its
+heap, so the workers share the imported modules and the model weights as
+copy-on-write pages instead of each holding its own copy.
+
+Usage:
+    python -m app.server --workers 4
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def shareable_models(names: List[str]) -> List[str]:
+    """
+    Get the models among names that can be loaded before forking.
+
+    Args:
+        names: Model names
+
+    Returns:
+        names if the configured backend survives a fork, otherwise an empty
+        list (each worker then loads its own copy)
+    """
+    from app.services.inference_backends import get_backend_class, resolve_backend_name
+
+    if settings.INFERENCE_PROCESS:
+        logger.info("Models are served by the inference process, shared by every worker")
+        return []
+
+    backend = get_backend_class(resolve_backend_name(settings.INFERENCE_BACKEND))
+    if not backend.fork_safe:
+        logger.warning(f"Models served by the {backend.name} backend can't be shared across a fork; "
+                       f"each worker loads its own copy")
+        return []
+    return list(names)
+
+
+class PreforkServer:
+    """
+    Forks uvicorn workers that share the parent's listening socket and loaded models.
+
+    Workers that die are restarted. One that dies soon after starting is
+    restarted with exponential backoff, and if workers keep dying that way
+    the server gives up rather than fork-looping.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        share_models: bool = True,
+    ) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            workers: Number of worker processes
+            host: Address to bind
+            port: Port to bind
+            share_models: Load PRELOAD_MODELS in the parent so the workers share them
+        """
+        self.workers = workers or settings.WORKERS
+        self.host = host or settings.HOST
+        self.port = port if port is not None else settings.PORT
+        self.share_models = share_models
+
+        self._app = None
+        self._socket: Optional[socket.socket] = None
+        # Worker pids and when each started
+        self._pids: Dict[int, float] = {}
+        self._stopping = False
+        self._rapid_failures = 0
+        self._gave_up = False
+
+    def _bind(self) -> socket.socket:
+        """Open the listening socket inherited by every worker."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self) -> None:
+        """Fork one worker."""
+        pid = os.fork()
+        if pid:
+            self._pids[pid] = time.monotonic()
+            return
+
+        # Worker: let uvicorn handle signals and collect only its own garbage
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        gc.enable()
+        exit_code = 0
+        try:
+            self._serve()
+        except BaseException:
+            logger.exception(f"Worker {os.getpid()} crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _serve(self) -> None:
+        """Run uvicorn on the inherited socket in a worker."""
+        import uvicorn
+
+        logger.info(f"Worker {os.getpid()} serving")
+        server = uvicorn.Server(uvicorn.Config(self._app, log_level=settings.LOG_LEVEL.lower()))
+        server.run(sockets=[self._socket])
+
+    def _stop(self, signum: int, frame) -> None:
+        """Stop the workers and exit once they have."""
+        logger.info(f"Received signal {signum}, stopping {len(self._pids)} workers")
+        self._stop_workers()
+
+    def _stop_workers(self) -> None:
+        """Ask every worker to stop and stop restarting them."""
+        self._stopping = True
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def restart_delay(self, uptime_s: float) -> Optional[float]:
+        """
+        Record a worker's death and decide when to restart it.
+
+        Args:
+            uptime_s: How long the worker ran
+
+        Returns:
+            Seconds to wait before forking its replacement, or None to give up
+            because workers keep dying right after they start
+        """
+        if uptime_s >= settings.WORKER_MIN_UPTIME_S:
+            self._rapid_failures = 0
+            return 0.0
+
+        self._rapid_failures += 1
+        if settings.WORKER_MAX_RAPID_FAILURES and self._rapid_failures >= settings.WORKER_MAX_RAPID_FAILURES:
+            return None
+        return min(
+            settings.WORKER_RESTART_BACKOFF_S * 2 ** (self._rapid_failures - 1),
+            settings.WORKER_RESTART_MAX_BACKOFF_S,
+        )
+
+    def _sleep(self, seconds: float) -> None:
+        """Wait before a restart, waking early if the server is stopping."""
+        wake_at = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < wake_at:
+            time.sleep(min(0.1, wake_at - time.monotonic()))
+
+    def run(self) -> None:
+        """Load the shared state, fork the workers and restart any that die."""
+        # Garbage collection in the parent would leave holes in pages the workers share
+        gc.disable()
+
+        from app.main import app
+        from app.services.inference_process import get_inference_process
+        from app.services.model_registry import get_model_registry
+
+        self._app = app
+        if settings.INFERENCE_PROCESS:
+            # Started before forking so every worker feeds the same engine
+            get_inference_process().start()
+        if self.share_models:
+            get_model_registry().preload(shareable_models(settings.PRELOAD_MODELS))
+
+        self._socket = self._bind()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        # Move everything allocated so far out of the collector's reach, so
+        # collections in the workers don't write to the shared pages
+        gc.freeze()
+
+        logger.info(f"Forking {self.workers} workers on http://{self.host}:{self.port}")
+        for _ in range(self.workers):
+            self._spawn()
+
+        while self._pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self._pids:
+                # The inference process is a child too
+                logger.error(f"Inference process {pid} exited with status {status}")
+                continue
+            uptime_s = time.monotonic() - self._pids.pop(pid)
+            if self._stopping:
+                continue
+
+            delay = self.restart_delay(uptime_s)
+            if delay is None:
+                logger.error(f"Worker {pid} exited with status {status} after {uptime_s:.1f}s; "
+                             f"{self._rapid_failures} workers in a row died within "
+                             f"{settings.WORKER_MIN_UPTIME_S}s of starting, stopping the server")
+                self._gave_up = True
+                self._stop_workers()
+                continue
+
+            logger.warning(f"Worker {pid} exited with status {status} after {uptime_s:.1f}s, "
+                           f"restarting it in {delay:.1f}s")
+            self._sleep(delay)
+            if not self._stopping:
+                self._spawn()
+
+        self._socket.close()
+        get_inference_process().stop()
+        logger.info("All workers stopped")
+        if self._gave_up:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the API in pre-forked workers sharing the model weights")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Number of worker processes")
+    parser.add_argument("--host", type=str, default=settings.HOST, help="Address to bind")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="Port to bind")
+    parser.add_argument("--no-share", action="store_true",
+                        help="Load the models in each worker instead of once in the parent")
+
+    args = parser.parse_args()
+
+    PreforkServer(workers=args.workers, host=args.host, port=args.port, share_models=not args.no_share).run()
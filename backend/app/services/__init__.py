@@ -2,14 +2,47 @@
 Services module initialization.
 """
 
-from app.services.model_service import ModelService, get_model_service
-from app.services.digit_model_service import DigitModelService, get_digit_model_service
+from app.services.admission import AdmissionController, get_admission_controller
+from app.services.deadlines import Deadline, DeadlineTracker, get_deadline_tracker
+from app.services.model_service import ModelService
+from app.services.model_registry import ModelRegistry, get_model_registry
+from app.services.model_watcher import ModelWatcher, get_model_watcher
 from app.services.image_service import ImageService
+from app.services.batch_tuner import BatchTuner
+from app.services.batching import BatchScheduler, get_batch_scheduler
+from app.services.executor import InferenceExecutor, get_inference_executor
+from app.services.inference_process import InferencePool, InferenceProcess, get_inference_process
+from app.services.archive_service import ArchiveService, get_archive_service
+from app.services.prediction_cache import PredictionCache, get_prediction_cache
+from app.services.tensor_cache import TensorCache, get_tensor_cache
+from app.services.singleflight import SingleFlight, get_singleflight
 
 __all__ = [
+    "AdmissionController",
+    "get_admission_controller",
+    "Deadline",
+    "DeadlineTracker",
+    "get_deadline_tracker",
     "ModelService",
-    "get_model_service",
-    "DigitModelService",
-    "get_digit_model_service",
+    "ModelRegistry",
+    "get_model_registry",
+    "ModelWatcher",
+    "get_model_watcher",
     "ImageService",
+    "BatchTuner",
+    "BatchScheduler",
+    "get_batch_scheduler",
+    "InferenceExecutor",
+    "get_inference_executor",
+    "InferencePool",
+    "InferenceProcess",
+    "get_inference_process",
+    "ArchiveService",
+    "get_archive_service",
+    "PredictionCache",
+    "get_prediction_cache",
+    "TensorCache",
+    "get_tensor_cache",
+    "SingleFlight",
+    "get_singleflight",
 ]
@@ -0,0 +1,270 @@
+"""
+Admission Control
+
+Bounds the prediction requests each model works on at once and the number
+waiting behind them. Requests that would overflow the queue, or whose
+estimated wait is already longer than clients are willing to wait, are
+rejected immediately instead of queueing until they time out.
+
+Archive streams hold their slot for the whole stream, so their durations are
+averaged separately from single requests and the wait estimate accounts for
+each queued and in-flight request by its own kind.
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.core.exceptions import RequestRejectedError
+from app.logger import get_logger
+from app.services.deadlines import check_deadline, current_deadline, get_deadline_tracker
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Weight of the newest request in the moving average of request durations
+DURATION_SMOOTHING = 0.2
+
+# Kinds of admitted work, whose durations are averaged separately
+REQUEST_ADMISSION = "request"
+ARCHIVE_ADMISSION = "archive"
+
+
+class _ModelAdmission:
+    """Admission state of one model."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.in_flight_kinds: Counter = Counter()
+        self.waiters: Deque[Tuple["asyncio.Future[None]", str]] = deque()
+        self.avg_duration_ms: Dict[str, float] = {}
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_wait = 0
+        self.max_queue_depth = 0
+
+
+class AdmissionController:
+    """Per-model concurrency limit with a bounded queue and load shedding."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Requests per model served at once (0 disables admission control)
+            max_queue: Requests per model waiting for a slot (0 for unbounded)
+            max_wait_ms: Longest estimated wait before a request is shed (0 disables)
+        """
+        self.max_concurrency = max(0, max_concurrency if max_concurrency is not None
+                                   else settings.ADMISSION_MAX_CONCURRENCY)
+        self.max_queue = max(0, max_queue if max_queue is not None else settings.ADMISSION_MAX_QUEUE)
+        self.max_wait_ms = max(0.0, max_wait_ms if max_wait_ms is not None else settings.ADMISSION_MAX_WAIT_MS)
+
+        self._models: Dict[str, _ModelAdmission] = {}
+
+        logger.info(
+            f"AdmissionController initialized with max concurrency: {self.max_concurrency}, "
+            f"max queue: {self.max_queue}, max wait: {self.max_wait_ms}ms"
+        )
+
+    def _state(self, model_name: str) -> _ModelAdmission:
+        """Get the admission state of a model, creating it on first use."""
+        state = self._models.get(model_name)
+        if state is None:
+            state = self._models[model_name] = _ModelAdmission()
+        return state
+
+    @staticmethod
+    def _expected_duration_ms(state: _ModelAdmission, kind: str) -> float:
+        """Get how long a request of a kind is expected to hold its slot (0 until one has completed)."""
+        duration_ms = state.avg_duration_ms.get(kind, state.avg_duration_ms.get(REQUEST_ADMISSION))
+        return duration_ms if duration_ms is not None else 0.0
+
+    def estimated_wait_ms(self, model_name: str) -> float:
+        """
+        Estimate how long a request arriving now would wait for a slot.
+
+        The queued requests must all be served, and one of the in-flight
+        requests must finish, before a new request gets a slot.
+
+        Args:
+            model_name: Model name
+
+        Returns:
+            Estimated wait in milliseconds (0 until a request has completed)
+        """
+        state = self._state(model_name)
+        if not self.max_concurrency or not state.avg_duration_ms:
+            return 0.0
+        if state.in_flight < self.max_concurrency and not state.waiters:
+            return 0.0
+
+        queued_ms = sum(self._expected_duration_ms(state, kind) for _, kind in state.waiters)
+        in_flight = sum(state.in_flight_kinds.values())
+        if in_flight:
+            slot_ms = sum(
+                count * self._expected_duration_ms(state, kind) for kind, count in state.in_flight_kinds.items()
+            ) / in_flight
+        else:
+            slot_ms = self._expected_duration_ms(state, REQUEST_ADMISSION)
+        return (queued_ms + slot_ms) / self.max_concurrency
+
+    def _reject(self, model_name: str, reason: str, status_code: int, wait_ms: float) -> RequestRejectedError:
+        """Build the error for a shed request."""
+        retry_after = max(1, math.ceil(wait_ms / 1000))
+        logger.warning(f"Shedding {model_name} request ({reason}), retry after {retry_after}s")
+        return RequestRejectedError(model_name, reason, retry_after, status_code)
+
+    async def acquire(self, model_name: str, kind: str = REQUEST_ADMISSION) -> None:
+        """
+        Take a slot for a request, waiting in the model's queue if all are busy.
+
+        Args:
+            model_name: Model the request is for
+            kind: Kind of request, for estimating how long it holds the slot
+
+        Raises:
+            RequestRejectedError: If the queue is full (status 429) or the
+                estimated wait exceeds the limit (status 503)
+            DeadlineExceededError: If the request's deadline lapses before it gets a slot
+        """
+        state = self._state(model_name)
+        check_deadline("admission")
+
+        if not self.max_concurrency or (state.in_flight < self.max_concurrency and not state.waiters):
+            state.in_flight += 1
+            state.in_flight_kinds[kind] += 1
+            state.admitted += 1
+            return
+
+        wait_ms = self.estimated_wait_ms(model_name)
+        if self.max_queue and len(state.waiters) >= self.max_queue:
+            state.shed_queue_full += 1
+            raise self._reject(model_name, "queue full", 429, wait_ms)
+        if self.max_wait_ms and wait_ms > self.max_wait_ms:
+            state.shed_wait += 1
+            raise self._reject(model_name, "estimated wait too long", 503, wait_ms)
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        state.waiters.append((waiter, kind))
+        state.queued += 1
+        state.max_queue_depth = max(state.max_queue_depth, len(state.waiters))
+        deadline = current_deadline()
+        try:
+            # Stop waiting once the request's deadline expires
+            await asyncio.wait_for(waiter, deadline.remaining_s if deadline is not None else None)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request went away; pass it on
+                self._release_slot(state, kind)
+            elif (waiter, kind) in state.waiters:
+                state.waiters.remove((waiter, kind))
+            if isinstance(e, asyncio.TimeoutError):
+                raise get_deadline_tracker().skip("admission", deadline.reason or "expired") from None
+            raise
+        state.admitted += 1
+
+    def release(
+        self,
+        model_name: str,
+        duration_ms: Optional[float] = None,
+        kind: str = REQUEST_ADMISSION,
+    ) -> None:
+        """
+        Free a request's slot, handing it to the next queued request.
+
+        Args:
+            model_name: Model the request was for
+            duration_ms: How long the request held the slot
+            kind: Kind of request it was
+        """
+        state = self._state(model_name)
+        if duration_ms is not None:
+            average = state.avg_duration_ms.get(kind)
+            if average is None:
+                state.avg_duration_ms[kind] = duration_ms
+            else:
+                state.avg_duration_ms[kind] = average + DURATION_SMOOTHING * (duration_ms - average)
+        self._release_slot(state, kind)
+
+    def _release_slot(self, state: _ModelAdmission, kind: str) -> None:
+        """Hand a slot of a request of the given kind to the first live waiter, or free it."""
+        if state.in_flight_kinds[kind] > 0:
+            state.in_flight_kinds[kind] -= 1
+        while state.waiters:
+            waiter, waiter_kind = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                state.in_flight_kinds[waiter_kind] += 1
+                return
+        state.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self, model_name: str, kind: str = REQUEST_ADMISSION) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            model_name: Model the request is for
+            kind: Kind of request, averaged separately in the wait estimate
+
+        Raises:
+            RequestRejectedError: If the request is shed
+        """
+        await self.acquire(model_name, kind)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(model_name, (time.perf_counter() - start_time) * 1000, kind)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Dictionary with the limits and, per model, in-flight requests,
+            queue depth, estimated wait and shed-request counters
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_ms": self.max_wait_ms,
+            "shed": sum(state.shed_queue_full + state.shed_wait for state in self._models.values()),
+            "models": {
+                name: {
+                    "in_flight": state.in_flight,
+                    "queue_depth": len(state.waiters),
+                    "max_queue_depth": state.max_queue_depth,
+                    "estimated_wait_ms": round(self.estimated_wait_ms(name), 2),
+                    "avg_duration_ms": {
+                        kind: round(duration_ms, 2) for kind, duration_ms in sorted(state.avg_duration_ms.items())
+                    },
+                    "admitted": state.admitted,
+                    "queued": state.queued,
+                    "shed_queue_full": state.shed_queue_full,
+                    "shed_wait": state.shed_wait,
+                }
+                for name, state in self._models.items()
+            },
+        }
+
+
+# Singleton instance
+admission_controller = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the admission controller instance."""
+    return admission_controller
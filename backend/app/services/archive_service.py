@@ -0,0 +1,316 @@
+"""
+Archive Service
+
+Streaming bulk inference over ZIP and TAR archives of glyph images.
+Members are read lazily, decoded on the inference executor with a bounded
+number in flight, and predicted in fixed-size batches, so memory use does
+not depend on the size of the archive.
+"""
+
+import asyncio
+import json
+import tarfile
+import zipfile
+import zlib
+from collections import deque
+from pathlib import PurePosixPath
+from typing import Any, AsyncIterator, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.exceptions import InvalidImageError, UrduOCRException
+from app.logger import get_logger
+from app.models.schemas import BatchPredictionItem, TopPrediction
+from app.services.executor import InferenceExecutor
+from app.services.image_service import ImageService
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Archive metadata entries that are not glyph images
+IGNORED_MEMBER_PREFIXES = ("__MACOSX/",)
+
+# Errors raised while reading a corrupt or truncated archive
+ARCHIVE_READ_ERRORS = (zipfile.BadZipFile, zlib.error, tarfile.TarError, EOFError, OSError)
+
+
+class ArchiveService:
+    """Service producing NDJSON predictions for archive members."""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        decode_concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the archive service.
+
+        Args:
+            batch_size: Number of images per inference batch
+            decode_concurrency: Maximum number of members being decoded at once
+        """
+        self.batch_size = max(1, batch_size or settings.ARCHIVE_BATCH_SIZE)
+        self.decode_concurrency = max(1, decode_concurrency or settings.ARCHIVE_DECODE_CONCURRENCY)
+
+        logger.info(
+            f"ArchiveService initialized with batch size: {self.batch_size}, "
+            f"decode concurrency: {self.decode_concurrency}"
+        )
+
+    @staticmethod
+    def _is_ignored(name: str) -> bool:
+        """Check whether an archive member is metadata rather than an image."""
+        path = PurePosixPath(name)
+        return name.startswith(IGNORED_MEMBER_PREFIXES) or path.name.startswith(".")
+
+    @staticmethod
+    def detect_format(fileobj: BinaryIO) -> str:
+        """
+        Detect whether a file object holds a ZIP or TAR archive.
+
+        Args:
+            fileobj: Seekable binary file object
+
+        Returns:
+            "zip" or "tar"
+
+        Raises:
+            InvalidImageError: If the file is neither a ZIP nor a TAR archive
+        """
+        try:
+            fileobj.seek(0)
+            if zipfile.is_zipfile(fileobj):
+                return "zip"
+
+            fileobj.seek(0)
+            with tarfile.open(fileobj=fileobj, mode="r|*"):
+                return "tar"
+
+        except tarfile.TarError as e:
+            raise InvalidImageError(message=f"Unsupported or corrupt archive: {str(e)}")
+
+        finally:
+            fileobj.seek(0)
+
+    def iter_members(
+        self,
+        fileobj: BinaryIO,
+        image_service: ImageService,
+    ) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+        """
+        Lazily iterate over the image members of a ZIP or TAR archive.
+
+        Each member is validated by name and size before it is read, so
+        oversized or unsupported members are never loaded into memory. A
+        member that can't be read, such as one with corrupt compressed data,
+        is yielded with the read error.
+
+        Args:
+            fileobj: Seekable binary file object containing the archive
+            image_service: Image service used for member validation
+
+        Yields:
+            Tuples of (member name, raw bytes or validation error)
+
+        Raises:
+            InvalidImageError: If the file is not a ZIP or TAR archive
+            zipfile.BadZipFile, tarfile.TarError, EOFError, OSError: If the
+                archive itself is corrupt or truncated
+        """
+        if self.detect_format(fileobj) == "zip":
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or self._is_ignored(info.filename):
+                        continue
+                    try:
+                        image_service.validate_file(info.filename, info.file_size)
+                    except InvalidImageError as e:
+                        yield info.filename, e
+                        continue
+                    try:
+                        content = archive.read(info)
+                    except ARCHIVE_READ_ERRORS as e:
+                        content = self._read_error(info.filename, e)
+                    yield info.filename, content
+            return
+
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile() or self._is_ignored(member.name):
+                    continue
+                try:
+                    image_service.validate_file(member.name, member.size)
+                except InvalidImageError as e:
+                    yield member.name, e
+                    continue
+                try:
+                    extracted = archive.extractfile(member)
+                    content = extracted.read() if extracted else InvalidImageError(filename=member.name)
+                except ARCHIVE_READ_ERRORS as e:
+                    content = self._read_error(member.name, e)
+                yield member.name, content
+
+    @staticmethod
+    def _read_error(name: str, error: Exception) -> InvalidImageError:
+        """Build the error reported for an archive member that couldn't be read."""
+        logger.warning(f"Could not read archive member {name}: {error}")
+        return InvalidImageError(message=f"Could not read archive member: {error}", filename=name)
+
+    async def stream_predictions(
+        self,
+        fileobj: BinaryIO,
+        model_service: Any,
+        image_service: ImageService,
+        executor: InferenceExecutor,
+        mock_labels: Dict[int, str],
+    ) -> AsyncIterator[str]:
+        """
+        Predict every image in an archive, yielding NDJSON lines as batches complete.
+
+        One line is emitted per member, in archive order, followed by a final
+        summary line. Failed members produce an error line without stopping
+        the stream. If the archive itself turns out to be corrupt or truncated,
+        the members read so far are still predicted, then an error line and
+        the summary end the stream.
+
+        Args:
+            fileobj: Seekable binary file object containing the archive
+            model_service: Model service used for the forward passes
+            image_service: Image service used for validation and preprocessing
+            executor: Executor running archive reads, decoding and inference
+            mock_labels: Labels used for mock predictions when the model isn't loaded
+
+        Yields:
+            NDJSON encoded lines
+        """
+        members = self.iter_members(fileobj, image_service)
+        in_flight: Deque[Tuple[int, str, "asyncio.Future[Any]"]] = deque()
+        ready: List[Tuple[int, str, Union[np.ndarray, Exception]]] = []
+        counts = {"count": 0, "succeeded": 0, "failed": 0}
+
+        async def decode(name: str, content: Union[bytes, Exception]) -> np.ndarray:
+            if isinstance(content, Exception):
+                raise content
+            return await executor.run(image_service.preprocess_file_content, content, name)
+
+        async def collect_oldest() -> None:
+            index, name, task = in_flight.popleft()
+            try:
+                ready.append((index, name, await task))
+            except Exception as e:
+                ready.append((index, name, e))
+
+        index = 0
+        read: Optional["asyncio.Future[Any]"] = None
+        archive_error: Optional[str] = None
+        try:
+            while True:
+                # Shielded so a disconnect doesn't abandon a read still running on a worker
+                read = asyncio.ensure_future(executor.run(next, members, None))
+                try:
+                    member = await asyncio.shield(read)
+                except ARCHIVE_READ_ERRORS as e:
+                    archive_error = f"Corrupt or truncated archive: {e}"
+                    logger.error(f"Archive reading stopped after {index} members: {e}")
+                    break
+                if member is None:
+                    break
+
+                name, content = member
+                in_flight.append((index, name, asyncio.ensure_future(decode(name, content))))
+                index += 1
+
+                # Bound the number of raw members held in memory at once
+                while len(in_flight) >= self.decode_concurrency:
+                    await collect_oldest()
+
+                if len(ready) >= self.batch_size:
+                    for line in await self._predict_ready(ready, model_service, executor, mock_labels, counts):
+                        yield line
+                    ready = []
+
+            while in_flight:
+                await collect_oldest()
+                if len(ready) >= self.batch_size:
+                    for line in await self._predict_ready(ready, model_service, executor, mock_labels, counts):
+                        yield line
+                    ready = []
+
+            if ready:
+                for line in await self._predict_ready(ready, model_service, executor, mock_labels, counts):
+                    yield line
+
+            if archive_error is not None:
+                yield json.dumps({"error": archive_error}, ensure_ascii=False) + "\n"
+
+        except UrduOCRException as e:
+            logger.error(f"Archive processing aborted: {e.message}")
+            yield json.dumps({"error": e.message}, ensure_ascii=False) + "\n"
+
+        finally:
+            for _, _, task in in_flight:
+                task.cancel()
+            if read is not None and not read.done():
+                # Closing the generator while a worker is inside next() raises "generator already executing"
+                await asyncio.wait({read})
+            members.close()
+
+        logger.info(
+            f"Archive prediction completed - {counts['succeeded']}/{counts['count']} succeeded"
+        )
+        yield json.dumps({"summary": counts}, ensure_ascii=False) + "\n"
+
+    async def _predict_ready(
+        self,
+        ready: List[Tuple[int, str, Union[np.ndarray, Exception]]],
+        model_service: Any,
+        executor: InferenceExecutor,
+        mock_labels: Dict[int, str],
+        counts: Dict[str, int],
+    ) -> List[str]:
+        """Run one inference batch over decoded members and encode the result lines."""
+        valid = [(i, name, image) for i, name, image in ready if isinstance(image, np.ndarray)]
+        predictions: Dict[int, Tuple[str, float, List[Dict[str, Any]]]] = {}
+
+        if valid:
+            if not model_service.is_loaded:
+                mock_top_5 = [{"character": char, "probability": 0.0} for char in list(mock_labels.values())[:5]]
+                for i, _, _ in valid:
+                    predictions[i] = (mock_labels.get(0, "Unknown"), 0.0, mock_top_5)
+            else:
+                image_batch = np.concatenate([image for _, _, image in valid], axis=0)
+                batch_results = await executor.run(model_service.predict_batch, image_batch)
+                for (i, _, _), (prediction, confidence, top_5, *_) in zip(valid, batch_results):
+                    predictions[i] = (prediction, confidence, top_5)
+
+        lines = []
+        for i, name, outcome in ready:
+            counts["count"] += 1
+            if i in predictions:
+                counts["succeeded"] += 1
+                prediction, confidence, top_5 = predictions[i]
+                item = BatchPredictionItem(
+                    index=i,
+                    filename=name,
+                    success=True,
+                    prediction=prediction,
+                    confidence=confidence,
+                    top_5=[TopPrediction(**p) for p in top_5],
+                )
+            else:
+                counts["failed"] += 1
+                message = outcome.message if isinstance(outcome, UrduOCRException) else str(outcome)
+                item = BatchPredictionItem(index=i, filename=name, success=False, error=message)
+            lines.append(item.model_dump_json() + "\n")
+
+        return lines
+
+
+# Singleton instance
+archive_service = ArchiveService()
+
+
+def get_archive_service() -> ArchiveService:
+    """Get the archive service instance."""
+    return archive_service
@@ -0,0 +1,317 @@
+"""
+Batch Tuner
+
+Online controller for the micro-batching limits. For each model it watches
+the request arrival rate, request latency (from submission to result), the
+time requests spend waiting for their batch and for an executor worker, and
+the forward-pass time at each batch size. Every interval it moves the model's
+maximum batch size and maximum wait within the configured bounds: down while
+p95 latency is over target, up while there is headroom under it, waiting
+only as long as it takes to fill a batch at the current arrival rate.
+
+Every change is logged together with the measurements that led to it.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Below this fraction of the target p95 the tuner spends the headroom on throughput
+HEADROOM_RATIO = 0.7
+
+# Completed requests a model needs in an interval before its latency is acted on
+MIN_SAMPLES = 20
+
+# Fraction of batches dispatched full above which a larger batch size would be used
+FULL_BATCH_RATIO = 0.5
+
+# Weight of the newest forward pass in the per-batch-size moving average
+FORWARD_SMOOTHING = 0.2
+
+# Number of decisions kept for auditing
+DECISION_HISTORY = 100
+
+
+class _ModelTuning:
+    """Tuned limits of one model and its measurements since the last evaluation."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float, now: float) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.window_start = now
+        self.arrivals = 0
+        self.latencies_ms: List[float] = []
+        self.batch_waits_ms: List[float] = []
+        self.queue_waits_ms: List[float] = []
+        self.batches = 0
+        self.full_batches = 0
+        # Moving average of the forward-pass time at each batch size, kept across intervals
+        self.forward_ms: Dict[int, float] = {}
+        self.last_evaluation: Optional[Dict[str, Any]] = None
+
+    def reset_window(self, now: float) -> None:
+        """Start a new measurement interval."""
+        self.window_start = now
+        self.arrivals = 0
+        self.latencies_ms = []
+        self.batch_waits_ms = []
+        self.queue_waits_ms = []
+        self.batches = 0
+        self.full_batches = 0
+
+
+def _p95(values: List[float]) -> float:
+    """Get the 95th percentile of values, or 0 if there are none."""
+    return float(np.percentile(values, 95)) if values else 0.0
+
+
+class BatchTuner:
+    """Adjusts each model's maximum batch size and wait to meet a p95 latency target."""
+
+    def __init__(
+        self,
+        target_p95_ms: Optional[float] = None,
+        min_batch_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        min_wait_ms: Optional[float] = None,
+        max_wait_ms: Optional[float] = None,
+        interval_s: Optional[float] = None,
+        initial_batch_size: Optional[int] = None,
+        initial_wait_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the tuner.
+
+        Args:
+            target_p95_ms: p95 request latency to stay under
+            min_batch_size: Smallest maximum batch size the tuner may set
+            max_batch_size: Largest maximum batch size the tuner may set
+            min_wait_ms: Shortest maximum wait the tuner may set
+            max_wait_ms: Longest maximum wait the tuner may set
+            interval_s: Time between evaluations of a model's measurements
+            initial_batch_size: Maximum batch size models start with
+            initial_wait_ms: Maximum wait models start with
+        """
+        self.target_p95_ms = target_p95_ms if target_p95_ms is not None else settings.BATCH_TARGET_P95_MS
+        self.min_batch_size = max(1, min_batch_size or settings.BATCH_AUTOTUNE_MIN_SIZE)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size or settings.BATCH_AUTOTUNE_MAX_SIZE)
+        self.min_wait_ms = max(0.0, min_wait_ms if min_wait_ms is not None else settings.BATCH_AUTOTUNE_MIN_WAIT_MS)
+        self.max_wait_ms = max(
+            self.min_wait_ms, max_wait_ms if max_wait_ms is not None else settings.BATCH_AUTOTUNE_MAX_WAIT_MS
+        )
+        self.interval_s = interval_s if interval_s is not None else settings.BATCH_AUTOTUNE_INTERVAL_S
+
+        initial_batch_size = initial_batch_size or settings.BATCH_MAX_SIZE
+        initial_wait_ms = initial_wait_ms if initial_wait_ms is not None else settings.BATCH_MAX_WAIT_MS
+        self.initial_batch_size = min(max(initial_batch_size, self.min_batch_size), self.max_batch_size)
+        self.initial_wait_ms = min(max(initial_wait_ms, self.min_wait_ms), self.max_wait_ms)
+
+        self._models: Dict[str, _ModelTuning] = {}
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=DECISION_HISTORY)
+
+        logger.info(
+            f"BatchTuner initialized with target p95: {self.target_p95_ms}ms, "
+            f"batch size {self.min_batch_size}-{self.max_batch_size}, "
+            f"wait {self.min_wait_ms}-{self.max_wait_ms}ms, interval: {self.interval_s}s"
+        )
+
+    def _state(self, model_name: str) -> _ModelTuning:
+        """Get the tuning state of a model, creating it on first use."""
+        state = self._models.get(model_name)
+        if state is None:
+            state = self._models[model_name] = _ModelTuning(
+                self.initial_batch_size, self.initial_wait_ms, time.monotonic()
+            )
+        return state
+
+    def limits(self, model_name: str) -> Tuple[int, float]:
+        """
+        Get a model's current batching limits.
+
+        Args:
+            model_name: Model name
+
+        Returns:
+            Tuple of (max batch size, max wait in milliseconds)
+        """
+        state = self._state(model_name)
+        return state.max_batch_size, state.max_wait_ms
+
+    def record_arrival(self, model_name: str) -> None:
+        """Record a request submitted for batching."""
+        self._state(model_name).arrivals += 1
+
+    def record_batch(
+        self,
+        model_name: str,
+        batch_size: int,
+        full: bool,
+        forward_ms: float,
+        queue_wait_ms: float,
+        batch_waits_ms: List[float],
+        latencies_ms: List[float],
+    ) -> None:
+        """
+        Record a completed forward pass and evaluate the model once its interval is up.
+
+        Args:
+            model_name: Model name
+            batch_size: Images in the batch
+            full: Whether the batch was dispatched because it reached the maximum size
+            forward_ms: Forward-pass time
+            queue_wait_ms: Time the batch waited for an executor worker
+            batch_waits_ms: Time each request waited for the batch to be dispatched
+            latencies_ms: Time from each request's submission to its result
+        """
+        state = self._state(model_name)
+        state.batches += 1
+        state.full_batches += int(full)
+        state.latencies_ms.extend(latencies_ms)
+        state.batch_waits_ms.extend(batch_waits_ms)
+        state.queue_waits_ms.append(queue_wait_ms)
+
+        previous = state.forward_ms.get(batch_size)
+        state.forward_ms[batch_size] = (
+            forward_ms if previous is None else previous + FORWARD_SMOOTHING * (forward_ms - previous)
+        )
+
+        now = time.monotonic()
+        if now - state.window_start >= self.interval_s:
+            self._evaluate(model_name, state, now)
+
+    def estimate_forward_ms(self, model_name: str, batch_size: int) -> Optional[float]:
+        """
+        Estimate the forward-pass time of a batch size from the sizes measured so far.
+
+        Unmeasured sizes are scaled linearly from the nearest measured smaller
+        size, which overestimates since per-image cost falls with batch size.
+
+        Args:
+            model_name: Model name
+            batch_size: Batch size
+
+        Returns:
+            Estimated forward-pass time in milliseconds, or None before any measurement
+        """
+        forward_ms = self._state(model_name).forward_ms
+        if batch_size in forward_ms:
+            return forward_ms[batch_size]
+        if not forward_ms:
+            return None
+
+        smaller = [size for size in forward_ms if size < batch_size]
+        base = max(smaller) if smaller else min(forward_ms)
+        return forward_ms[base] * batch_size / base
+
+    def _evaluate(self, model_name: str, state: _ModelTuning, now: float) -> None:
+        """Adjust a model's limits from the measurements of the interval that just ended."""
+        elapsed = max(now - state.window_start, 1e-9)
+        samples = len(state.latencies_ms)
+        arrival_rate = state.arrivals / elapsed
+        p95_ms = _p95(state.latencies_ms)
+        queue_p95_ms = _p95(state.queue_waits_ms)
+        full_ratio = state.full_batches / state.batches if state.batches else 0.0
+
+        size, wait = state.max_batch_size, state.max_wait_ms
+        new_size, new_wait, reason = size, wait, None
+
+        if samples >= MIN_SAMPLES and p95_ms > self.target_p95_ms:
+            forward_ms = self.estimate_forward_ms(model_name, size) or 0.0
+            if forward_ms > self.target_p95_ms - queue_p95_ms and size > self.min_batch_size:
+                new_size = max(self.min_batch_size, size // 2)
+                reason = (f"p95 {p95_ms:.1f}ms over target and a batch of {size} takes "
+                          f"{forward_ms:.1f}ms: halving batch size")
+            elif wait > self.min_wait_ms:
+                # Below a millisecond, halving again would barely move latency
+                new_wait = max(self.min_wait_ms, round(wait / 2, 1) if wait > 1 else self.min_wait_ms)
+                reason = f"p95 {p95_ms:.1f}ms over target: halving wait"
+            elif size > self.min_batch_size:
+                new_size = max(self.min_batch_size, size // 2)
+                reason = f"p95 {p95_ms:.1f}ms over target at minimum wait: halving batch size"
+
+        elif samples < MIN_SAMPLES or p95_ms < self.target_p95_ms * HEADROOM_RATIO:
+            headroom_ms = self.target_p95_ms * HEADROOM_RATIO - queue_p95_ms
+
+            # Larger batches, while they keep filling up and their forward pass fits the target
+            if full_ratio >= FULL_BATCH_RATIO and size < self.max_batch_size:
+                candidate = min(self.max_batch_size, size * 2)
+                forward_ms = self.estimate_forward_ms(model_name, candidate)
+                if forward_ms is not None and forward_ms <= headroom_ms:
+                    new_size = candidate
+
+            # Wait just long enough to fill a batch at the current arrival rate, within the
+            # latency left over by the forward pass; don't wait when not even one more
+            # request would arrive in that time
+            wait_budget_ms = headroom_ms - (self.estimate_forward_ms(model_name, new_size) or 0.0)
+            fill_ms = (new_size - 1) / arrival_rate * 1000 if arrival_rate > 0 else math.inf
+            target_wait = min(fill_ms, wait_budget_ms, self.max_wait_ms)
+            if arrival_rate * target_wait / 1000 < 1:
+                target_wait = self.min_wait_ms
+            target_wait = round(max(self.min_wait_ms, target_wait), 1)
+            # Ignore small moves so the limits don't jitter from one interval to the next
+            if abs(target_wait - wait) > max(0.1, 0.1 * wait):
+                new_wait = target_wait
+
+            if new_size != size or new_wait != wait:
+                reason = (f"p95 {p95_ms:.1f}ms with headroom at {arrival_rate:.1f} req/s: "
+                          f"batch size {size} -> {new_size}, wait {wait}ms -> {new_wait}ms")
+
+        evaluation = {
+            "timestamp": time.time(),
+            "samples": samples,
+            "arrival_rate": round(arrival_rate, 2),
+            "p95_ms": round(p95_ms, 2),
+            "batch_wait_p95_ms": round(_p95(state.batch_waits_ms), 2),
+            "queue_wait_p95_ms": round(queue_p95_ms, 2),
+            "full_batch_ratio": round(full_ratio, 3),
+            "mean_batch_size": round(samples / state.batches, 2) if state.batches else 0.0,
+        }
+        state.last_evaluation = evaluation
+        state.reset_window(now)
+
+        if reason is None:
+            return
+
+        state.max_batch_size, state.max_wait_ms = new_size, new_wait
+        self._decisions.append({
+            "model": model_name,
+            **evaluation,
+            "max_batch_size": [size, new_size],
+            "max_wait_ms": [wait, new_wait],
+            "reason": reason,
+        })
+        logger.info(f"Retuned {model_name} batching: {reason}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get tuning statistics.
+
+        Returns:
+            Dictionary with the target and bounds, each model's current limits,
+            forward-pass times and last evaluation, and the recent decisions
+        """
+        return {
+            "target_p95_ms": self.target_p95_ms,
+            "batch_size_bounds": [self.min_batch_size, self.max_batch_size],
+            "wait_ms_bounds": [self.min_wait_ms, self.max_wait_ms],
+            "interval_s": self.interval_s,
+            "models": {
+                name: {
+                    "max_batch_size": state.max_batch_size,
+                    "max_wait_ms": state.max_wait_ms,
+                    "forward_ms": {str(size): round(ms, 3) for size, ms in sorted(state.forward_ms.items())},
+                    "last_evaluation": state.last_evaluation,
+                }
+                for name, state in self._models.items()
+            },
+            "decisions": list(self._decisions),
+        }
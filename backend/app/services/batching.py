@@ -0,0 +1,256 @@
+"""
+Batching Service
+
+Dynamic micro-batching for model predictions. Concurrent requests for the
+same model are collected until either the maximum batch size is reached or
+the maximum wait time expires, and are then served by a single forward pass.
+With BATCH_AUTOTUNE enabled, both limits are tuned per model at runtime.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.logger import get_logger
+from app.services.batch_tuner import BatchTuner
+from app.services.deadlines import DeadlineGroup, current_deadline, deadline_scope, get_deadline_tracker
+from app.services.executor import InferenceExecutor, SharedLane, current_work, get_inference_executor, work_scope
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class _PendingBatch:
+    """Requests waiting to be dispatched together for one model."""
+
+    def __init__(self, service: Any, loop: asyncio.AbstractEventLoop) -> None:
+        self.service = service
+        self.loop = loop
+        self.images: List[np.ndarray] = []
+        self.futures: List[asyncio.Future] = []
+        self.deadlines: List[Any] = []
+        self.lanes: List[Union[str, SharedLane]] = []
+        self.enqueued_at: List[float] = []
+        self.full = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.dispatched = False
+
+
+class BatchScheduler:
+    """
+    Collects concurrent prediction requests into batched forward passes.
+
+    One pending batch is kept per model (keyed by the service ``name``), so
+    character and digit requests are never mixed in the same batch. Requests
+    whose deadline lapsed while they waited are left out of the forward pass,
+    which runs in the executor lane of its most urgent request.
+
+    With a tuner, each model's batch size and wait limits come from the tuner,
+    which is fed the arrivals, waits and forward-pass times of its batches.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        executor: Optional[InferenceExecutor] = None,
+        tuner: Optional[BatchTuner] = None,
+    ) -> None:
+        """
+        Initialize the batch scheduler.
+
+        Args:
+            max_batch_size: Maximum number of images per forward pass
+            max_wait_ms: Maximum time the first request of a batch waits for others
+            executor: Executor running the forward passes off the event loop
+            tuner: Tuner setting per-model limits in place of the fixed ones
+        """
+        self.max_batch_size = max(1, max_batch_size or settings.BATCH_MAX_SIZE)
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else settings.BATCH_MAX_WAIT_MS
+        self.executor = executor or get_inference_executor()
+        self.tuner = tuner
+
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._batch_size_counts: Dict[str, Counter] = {}
+
+        logger.info(
+            f"BatchScheduler initialized with max batch size: {self.max_batch_size}, "
+            f"max wait: {self.max_wait_ms}ms, autotune: {tuner is not None}"
+        )
+
+    def limits(self, model_name: str) -> Tuple[int, float]:
+        """
+        Get the batching limits of a model.
+
+        Args:
+            model_name: Model name
+
+        Returns:
+            Tuple of (max batch size, max wait in milliseconds)
+        """
+        if self.tuner is not None:
+            return self.tuner.limits(model_name)
+        return self.max_batch_size, self.max_wait_ms
+
+    async def submit(
+        self,
+        service: Any,
+        image_array: np.ndarray,
+    ) -> Tuple[Any, ...]:
+        """
+        Queue a preprocessed image for the next batched prediction.
+
+        Args:
+            service: Model service exposing ``name`` and ``predict_batch``
+            image_array: Preprocessed image array with shape (1, 64, 64, 1)
+
+        Returns:
+            The model service's per-image result tuple (prediction, confidence,
+            top_5_predictions, processing_time_ms, model_version) followed by the batch size
+
+        Raises:
+            ModelNotLoadedError: If model is not loaded
+            PredictionError: If prediction fails
+            DeadlineExceededError: If the request's deadline lapsed before its batch ran
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        max_batch_size, max_wait_ms = self.limits(service.name)
+        if self.tuner is not None:
+            self.tuner.record_arrival(service.name)
+
+        batch = self._pending.get(service.name)
+        if batch is None or batch.loop is not loop:
+            batch = _PendingBatch(service, loop)
+            self._pending[service.name] = batch
+            batch.timer = loop.call_later(max_wait_ms / 1000, self._dispatch, batch)
+
+        batch.images.append(image_array)
+        batch.futures.append(future)
+        batch.deadlines.append(current_deadline())
+        batch.lanes.append(current_work()[0])
+        batch.enqueued_at.append(time.monotonic())
+
+        if len(batch.images) >= max_batch_size:
+            batch.full = True
+            self._dispatch(batch)
+
+        return await future
+
+    def _dispatch(self, batch: _PendingBatch) -> None:
+        """Close a pending batch and schedule its forward pass."""
+        if batch.dispatched:
+            return
+        batch.dispatched = True
+
+        if batch.timer is not None:
+            batch.timer.cancel()
+        if self._pending.get(batch.service.name) is batch:
+            del self._pending[batch.service.name]
+
+        batch.loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: _PendingBatch) -> None:
+        """Run one forward pass and fan the results out to the waiting requests."""
+        dispatched_at = time.monotonic()
+
+        # Leave out requests that went away or whose deadline lapsed while they waited
+        images: List[np.ndarray] = []
+        futures: List[asyncio.Future] = []
+        lanes: List[Union[str, SharedLane]] = []
+        enqueued_at: List[float] = []
+        deadline = DeadlineGroup()
+        for image, future, request_deadline, lane, enqueued in zip(
+            batch.images, batch.futures, batch.deadlines, batch.lanes, batch.enqueued_at
+        ):
+            if future.done():
+                continue
+            if request_deadline is not None and request_deadline.reason is not None:
+                future.set_exception(get_deadline_tracker().skip("batch_queue", request_deadline.reason, len(image)))
+                continue
+            images.append(image)
+            futures.append(future)
+            lanes.append(lane)
+            enqueued_at.append(enqueued)
+            deadline.add(request_deadline)
+
+        if not images:
+            return
+
+        batch_size = len(images)
+        self._batch_size_counts.setdefault(batch.service.name, Counter())[batch_size] += 1
+        logger.debug(f"Dispatching {batch.service.name} batch of size {batch_size}")
+
+        try:
+            image_batch = np.concatenate(images, axis=0)
+            # The forward pass is only dropped if every request in it lapses while it waits for a
+            # worker, and waits in the most urgent lane of the requests it serves
+            with deadline_scope(deadline), work_scope(self.executor.priority_lane(lanes), batch.service.name):
+                results = await self.executor.run(batch.service.predict_batch, image_batch)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result((*result, batch_size))
+
+        if self.tuner is not None and results:
+            finished_at = time.monotonic()
+            # Every result carries the batch's forward-pass time; the rest of the run was
+            # spent waiting for a worker
+            forward_ms = float(results[0][3])
+            run_ms = (finished_at - dispatched_at) * 1000
+            self.tuner.record_batch(
+                batch.service.name,
+                batch_size,
+                full=batch.full,
+                forward_ms=forward_ms,
+                queue_wait_ms=max(0.0, run_ms - forward_ms),
+                batch_waits_ms=[(dispatched_at - enqueued) * 1000 for enqueued in enqueued_at],
+                latencies_ms=[(finished_at - enqueued) * 1000 for enqueued in enqueued_at],
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with configuration, per-model limits and batch size
+            histograms, and the tuner's decisions when autotuning is enabled
+        """
+        models = {}
+        for name, counts in self._batch_size_counts.items():
+            batches = sum(counts.values())
+            requests = sum(size * count for size, count in counts.items())
+            max_batch_size, max_wait_ms = self.limits(name)
+            models[name] = {
+                "max_batch_size": max_batch_size,
+                "max_wait_ms": max_wait_ms,
+                "batches": batches,
+                "requests": requests,
+                "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+                "batch_size_histogram": {str(size): count for size, count in sorted(counts.items())},
+            }
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "models": models,
+            "autotune": self.tuner.stats() if self.tuner is not None else None,
+        }
+
+
+# Singleton instance
+batch_scheduler = BatchScheduler(tuner=BatchTuner() if settings.BATCH_AUTOTUNE else None)
+
+
+def get_batch_scheduler() -> BatchScheduler:
+    """Get the batch scheduler instance."""
+    return batch_scheduler
@@ -0,0 +1,285 @@
+"""
+Request Deadlines
+
+Per-request deadlines that follow a prediction through admission, image
+decoding, batching and inference. A request's deadline lapses when its
+timeout expires or its client disconnects; work for a lapsed request is
+dropped at the next checkpoint instead of reaching the model.
+
+The deadline of the request being served is carried in a context variable,
+so it follows the request into executor threads and the tasks it spawns
+without being passed through every call.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from app.config import get_settings
+from app.core.exceptions import DeadlineExceededError
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Header clients set to their own timeout, in milliseconds
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+
+class Deadline:
+    """Deadline of one request: a timeout and whether its client is still connected."""
+
+    def __init__(self, timeout_ms: Optional[float] = None) -> None:
+        """
+        Initialize the deadline.
+
+        Args:
+            timeout_ms: Time the request may take from now (None for no timeout)
+        """
+        self.timeout_ms = timeout_ms
+        self.expires_at = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.disconnected = False
+        self._watcher: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def remaining_s(self) -> Optional[float]:
+        """Get the seconds left before the deadline expires (None for no timeout)."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Get why the deadline has lapsed ("disconnected" or "expired"), or None if it hasn't."""
+        if self.disconnected:
+            return "disconnected"
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            return "expired"
+        return None
+
+    def watch(self, receive: Callable[[], Any]) -> None:
+        """
+        Watch the request's connection and lapse the deadline if the client disconnects.
+
+        Must only be called once the request body has been read, since the
+        watch consumes the connection's remaining messages.
+
+        Args:
+            receive: ASGI receive callable of the request
+        """
+        if self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(receive))
+
+    async def _watch(self, receive: Callable[[], Any]) -> None:
+        """Wait for the client to disconnect."""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                self.disconnected = True
+                return
+
+    def stop_watching(self) -> None:
+        """Stop watching the connection."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+
+class DeadlineGroup:
+    """
+    Deadline of work shared by several requests.
+
+    It lapses only once the deadline of every request sharing the work has;
+    a request without a deadline keeps the work alive indefinitely.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty group."""
+        self._members: List[Union[Deadline, "DeadlineGroup"]] = []
+        self._unbounded = False
+
+    def add(self, deadline: Optional[Union[Deadline, "DeadlineGroup"]]) -> None:
+        """
+        Add the deadline of another request sharing the work.
+
+        Args:
+            deadline: The request's deadline, or None if it has none
+        """
+        if deadline is None:
+            self._unbounded = True
+        else:
+            self._members.append(deadline)
+
+    @property
+    def remaining_s(self) -> Optional[float]:
+        """Get the seconds left before the last member expires (None for no timeout)."""
+        remaining = [member.remaining_s for member in self._members]
+        if self._unbounded or not remaining or None in remaining:
+            return None
+        return max(remaining)
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Get why every member has lapsed, or None while any member is live."""
+        if self._unbounded or not self._members:
+            return None
+        reasons = [member.reason for member in self._members]
+        if None in reasons:
+            return None
+        return "disconnected" if all(reason == "disconnected" for reason in reasons) else "expired"
+
+
+_current_deadline: ContextVar[Optional[Union[Deadline, DeadlineGroup]]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Union[Deadline, DeadlineGroup]]:
+    """Get the deadline of the work being done, or None if it has none."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Union[Deadline, DeadlineGroup]]) -> Iterator[None]:
+    """
+    Make a deadline the current one for the duration of the block.
+
+    Args:
+        deadline: Deadline of the work done in the block
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """
+    Get a request's timeout from its X-Request-Timeout header.
+
+    Args:
+        value: Header value in milliseconds, or None if the header is absent
+
+    Returns:
+        Timeout in milliseconds, or None if the request has no deadline
+
+    Raises:
+        ValueError: If the header is not a positive number
+    """
+    if value is None:
+        return settings.REQUEST_TIMEOUT_MS or None
+
+    timeout_ms = float(value)
+    if not timeout_ms > 0 or timeout_ms == float("inf"):
+        raise ValueError(f"{TIMEOUT_HEADER} must be a positive number of milliseconds, got {value!r}")
+    return timeout_ms
+
+
+class DeadlineTracker:
+    """Counts requests served with a deadline and the work dropped because one lapsed."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._skipped: Counter = Counter()
+        self._skipped_images: Counter = Counter()
+        self._reasons: Counter = Counter()
+
+    def record_request(self) -> None:
+        """Record a request served with a deadline."""
+        with self._lock:
+            self._requests += 1
+
+    def check(
+        self,
+        stage: str,
+        deadline: Optional[Union[Deadline, DeadlineGroup]] = None,
+        images: int = 1,
+    ) -> None:
+        """
+        Drop work whose deadline has lapsed.
+
+        Args:
+            stage: Checkpoint the work has reached, reported in the counters
+            deadline: Deadline to check (defaults to the current one)
+            images: Number of images the work covers
+
+        Raises:
+            DeadlineExceededError: If the deadline has lapsed
+        """
+        deadline = deadline if deadline is not None else current_deadline()
+        reason = deadline.reason if deadline is not None else None
+        if reason is not None:
+            raise self.skip(stage, reason, images)
+
+    def skip(self, stage: str, reason: str, images: int = 1) -> DeadlineExceededError:
+        """
+        Record work dropped because its deadline lapsed.
+
+        Args:
+            stage: Checkpoint the work had reached
+            reason: "expired" or "disconnected"
+            images: Number of images the work covered
+
+        Returns:
+            The error to raise in place of the work's result
+        """
+        with self._lock:
+            self._skipped[stage] += 1
+            self._skipped_images[stage] += images
+            self._reasons[reason] += 1
+        logger.info(f"Dropping work at {stage} for {images} image(s): request {reason}")
+        return DeadlineExceededError(reason, stage)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get deadline statistics.
+
+        Returns:
+            Dictionary with the default timeout, requests served with a
+            deadline and the work skipped per checkpoint and per reason
+        """
+        with self._lock:
+            return {
+                "default_timeout_ms": settings.REQUEST_TIMEOUT_MS,
+                "requests": self._requests,
+                "skipped": sum(self._skipped.values()),
+                "skipped_images": sum(self._skipped_images.values()),
+                "skipped_by_stage": {
+                    stage: {"work": self._skipped[stage], "images": self._skipped_images[stage]}
+                    for stage in sorted(self._skipped)
+                },
+                "skipped_by_reason": dict(sorted(self._reasons.items())),
+            }
+
+
+# Singleton instance
+deadline_tracker = DeadlineTracker()
+
+
+def get_deadline_tracker() -> DeadlineTracker:
+    """Get the deadline tracker instance."""
+    return deadline_tracker
+
+
+def check_deadline(
+    stage: str,
+    deadline: Optional[Union[Deadline, DeadlineGroup]] = None,
+    images: int = 1,
+) -> None:
+    """
+    Drop work whose deadline has lapsed, counting it in the deadline tracker.
+
+    Args:
+        stage: Checkpoint the work has reached
+        deadline: Deadline to check (defaults to the current one)
+        images: Number of images the work covers
+
+    Raises:
+        DeadlineExceededError: If the deadline has lapsed
+    """
+    get_deadline_tracker().check(stage, deadline, images)
@@ -0,0 +1,505 @@
+"""
+Executor Service
+
+Bounded worker pool for CPU-bound work (image decoding, preprocessing and
+model inference) so that it never runs on the asyncio event loop.
+
+Work is scheduled in priority lanes: interactive work (canvas drawings) and
+bulk work (uploads, batches and archives) wait in separate queues, and free
+workers take from them in proportion to the lanes' weights. Each model has a
+budget of workers its work may occupy at once, so a backlog for one model
+can't starve the others.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.exceptions import DeadlineExceededError
+from app.logger import get_logger
+from app.services.deadlines import check_deadline
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Latency-sensitive work: canvas drawings a user is waiting on
+INTERACTIVE_LANE = "interactive"
+# Throughput-oriented work: uploads, batch requests and archives
+BULK_LANE = "bulk"
+
+# Number of recent queue times per lane the percentiles are computed over
+QUEUE_TIME_WINDOW = 1024
+
+
+class SharedLane:
+    """
+    Lane of work shared by several requests: the most urgent of their lanes.
+
+    Requests joining the work later add their lanes; executor tasks of the
+    work still waiting for a worker move to the most urgent lane.
+    """
+
+    def __init__(self, lane: Union[str, "SharedLane"]) -> None:
+        """
+        Initialize the shared lane.
+
+        Args:
+            lane: Lane of the first request sharing the work
+        """
+        self.lanes: List[str] = []
+        self._listeners: List[Callable[[], None]] = []
+        self.add(lane)
+
+    def add(self, lane: Union[str, "SharedLane"]) -> None:
+        """
+        Add the lane of another request sharing the work.
+
+        Args:
+            lane: The request's lane
+        """
+        self.lanes.extend(lane.lanes if isinstance(lane, SharedLane) else [lane])
+        for listener in list(self._listeners):
+            listener()
+
+    def subscribe(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """
+        Call a function whenever a lane is added.
+
+        Args:
+            listener: Function to call
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+
+_current_work: ContextVar[Tuple[Union[str, SharedLane], Optional[str]]] = ContextVar("work", default=(BULK_LANE, None))
+
+
+def current_work() -> Tuple[Union[str, SharedLane], Optional[str]]:
+    """Get the lane and model of the work being done."""
+    return _current_work.get()
+
+
+@contextmanager
+def work_scope(lane: Union[str, SharedLane], model_name: Optional[str]) -> Iterator[None]:
+    """
+    Schedule executor work started in the block in a lane, against a model's worker budget.
+
+    Args:
+        lane: Lane the work is scheduled in, or the shared lane of work several requests share
+        model_name: Model the work is for, or None for work outside any model's budget
+    """
+    token = _current_work.set((lane, model_name))
+    try:
+        yield
+    finally:
+        _current_work.reset(token)
+
+
+class _Lane:
+    """Tasks of one lane waiting for a worker."""
+
+    def __init__(self, weight: int) -> None:
+        self.weight = weight
+        # (future resolved when the task gets a worker, model name, enqueue time)
+        self.waiters: Deque[Tuple["asyncio.Future[None]", Optional[str], float]] = deque()
+        self.credit = 0
+        self.dispatched = 0
+        self.queue_times_ms: Deque[float] = deque(maxlen=QUEUE_TIME_WINDOW)
+
+
+class InferenceExecutor:
+    """
+    Thread pool with priority lanes, per-model worker budgets and utilization accounting.
+
+    A thread pool is used rather than a process pool because the loaded
+    models live in this process; PIL decoding and TensorFlow kernels release
+    the GIL for the heavy parts of the work.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        lane_weights: Optional[Dict[str, int]] = None,
+        model_max_workers: Optional[int] = None,
+        model_workers: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Number of worker threads
+            max_queue_size: Maximum number of tasks per lane waiting for a free worker
+            lane_weights: Share of free workers given to each lane's waiting tasks
+            model_max_workers: Workers one model's tasks may occupy at once (0 for no limit)
+            model_workers: Per-model overrides of model_max_workers
+        """
+        self.max_workers = max(1, max_workers or settings.EXECUTOR_MAX_WORKERS)
+        self.max_queue_size = max(0, max_queue_size if max_queue_size is not None else settings.EXECUTOR_MAX_QUEUE_SIZE)
+        self.lane_weights = {
+            lane: max(1, weight)
+            for lane, weight in (lane_weights if lane_weights is not None else settings.EXECUTOR_LANE_WEIGHTS).items()
+        }
+        self.model_max_workers = max(
+            0, model_max_workers if model_max_workers is not None else settings.EXECUTOR_MODEL_MAX_WORKERS
+        )
+        self.model_workers = dict(model_workers if model_workers is not None else settings.EXECUTOR_MODEL_WORKERS)
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Scheduling state, only touched on the event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lanes: Dict[str, _Lane] = {lane: _Lane(weight) for lane, weight in self.lane_weights.items()}
+        self._running = 0
+        self._model_running: Counter = Counter()
+
+        self._waiting = 0
+        self._admitted = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._skipped = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.perf_counter()
+
+        logger.info(
+            f"InferenceExecutor initialized with {self.max_workers} workers, "
+            f"max queue size: {self.max_queue_size}, lane weights: {self.lane_weights}, "
+            f"model max workers: {self.model_max_workers or self.max_workers}"
+        )
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get the worker pool, creating it on first use."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+            return self._pool
+
+    def _bind_loop(self) -> None:
+        """Reset the scheduling state when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphores = {}
+            for lane in self._lanes.values():
+                lane.waiters.clear()
+                lane.credit = 0
+            self._running = 0
+            self._model_running = Counter()
+
+    def _get_lane(self, name: str) -> _Lane:
+        """Get a lane, creating lanes without a configured weight on first use."""
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = _Lane(1)
+        return lane
+
+    def _get_semaphore(self, lane: str) -> asyncio.Semaphore:
+        """Get the admission semaphore of a lane, bound to the running event loop."""
+        semaphore = self._semaphores.get(lane)
+        if semaphore is None:
+            semaphore = self._semaphores[lane] = asyncio.Semaphore(self.max_workers + self.max_queue_size)
+        return semaphore
+
+    def model_budget(self, model_name: Optional[str]) -> int:
+        """
+        Get the number of workers a model's tasks may occupy at once.
+
+        Args:
+            model_name: Model name, or None for work outside any model's budget
+
+        Returns:
+            Worker budget, at most max_workers
+        """
+        if model_name is None:
+            return self.max_workers
+        budget = self.model_workers.get(model_name, self.model_max_workers)
+        return min(budget, self.max_workers) if budget > 0 else self.max_workers
+
+    def priority_lane(self, lanes: Iterable[Union[str, SharedLane]]) -> str:
+        """
+        Get the lane with the largest weight among lanes.
+
+        Args:
+            lanes: Lanes of the requests sharing a piece of work
+
+        Returns:
+            Lane the shared work should be scheduled in
+        """
+        names = [name for lane in lanes for name in (lane.lanes if isinstance(lane, SharedLane) else [lane])]
+        return max(names, key=lambda lane: self._get_lane(lane).weight, default=BULK_LANE)
+
+    def _next_waiter(self) -> Optional[Tuple[_Lane, Tuple["asyncio.Future[None]", Optional[str], float]]]:
+        """
+        Pick the next task to get a free worker.
+
+        Each lane offers its oldest task whose model has a free worker in its
+        budget; lanes are chosen by smooth weighted round robin among those
+        with a task to offer.
+        """
+        candidates = []
+        for lane in self._lanes.values():
+            for waiter in lane.waiters:
+                if self._model_running[waiter[1]] < self.model_budget(waiter[1]):
+                    candidates.append((lane, waiter))
+                    break
+        if not candidates:
+            return None
+
+        total_weight = sum(lane.weight for lane, _ in candidates)
+        for lane, _ in candidates:
+            lane.credit += lane.weight
+        lane, waiter = max(candidates, key=lambda candidate: candidate[0].credit)
+        lane.credit -= total_weight
+        return lane, waiter
+
+    def _dispatch(self) -> None:
+        """Hand free workers to waiting tasks."""
+        while self._running < self.max_workers:
+            chosen = self._next_waiter()
+            if chosen is None:
+                return
+            lane, waiter = chosen
+            lane.waiters.remove(waiter)
+            future, model_name, enqueued_at = waiter
+
+            self._running += 1
+            self._model_running[model_name] += 1
+            lane.dispatched += 1
+            lane.queue_times_ms.append((time.perf_counter() - enqueued_at) * 1000)
+            future.set_result(None)
+
+    async def _acquire_worker(
+        self,
+        lane_name: str,
+        model_name: Optional[str],
+        enqueued_at: float,
+        shared: Optional[SharedLane] = None,
+    ) -> None:
+        """Wait in a lane until the task gets a worker, moving up if the shared lane becomes more urgent."""
+        lane = self._get_lane(lane_name)
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        waiter = (future, model_name, enqueued_at)
+        lane.waiters.append(waiter)
+
+        def promote() -> None:
+            nonlocal lane
+            urgent = self._get_lane(self.priority_lane([shared]))
+            if urgent is not lane and waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+                urgent.waiters.append(waiter)
+                lane = urgent
+                self._dispatch()
+
+        unsubscribe = shared.subscribe(promote) if shared is not None else None
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The worker was handed over just as the caller went away; pass it on
+                self._release_worker(model_name)
+            elif waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+            raise
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+
+    def _release_worker(self, model_name: Optional[str]) -> None:
+        """Free a task's worker and hand it to the next waiting task."""
+        self._running -= 1
+        self._model_running[model_name] -= 1
+        self._dispatch()
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop, model_name: Optional[str]) -> None:
+        """Free a finished task's worker on the event loop it was acquired on."""
+
+        def release() -> None:
+            # Scheduling state was reset if the executor moved to another loop
+            if self._loop is loop:
+                self._release_worker(model_name)
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # The loop closed before the task finished
+            pass
+
+    def _call(self, func: Callable[..., T]) -> T:
+        """Run a task on a worker thread, tracking busy time."""
+        # Drop work whose request lapsed while it waited for a worker
+        check_deadline("executor_queue")
+
+        with self._lock:
+            self._active += 1
+
+        start_time = time.perf_counter()
+        try:
+            return func()
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                self._active -= 1
+                self._busy_seconds += elapsed
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        The task waits for a worker in the lane, and against the model budget,
+        set by the caller's work_scope (the bulk lane outside any model's
+        budget by default). When a lane's queue is full, further callers in
+        that lane wait for room instead of piling more work onto the pool.
+
+        The task runs in a copy of the caller's context, so it sees the
+        caller's request deadline, and is dropped if that deadline lapses
+        before a worker picks it up.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            DeadlineExceededError: If the request's deadline lapsed before the task started
+        """
+        enqueued_at = time.perf_counter()
+        work_lane, model_name = current_work()
+        lane = self.priority_lane([work_lane])
+        self._bind_loop()
+        semaphore = self._get_semaphore(lane)
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        with self._lock:
+            self._admitted += 1
+        try:
+            await self._acquire_worker(
+                lane, model_name, enqueued_at, work_lane if isinstance(work_lane, SharedLane) else None
+            )
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            try:
+                task = self._get_pool().submit(context.run, self._call, partial(func, *args, **kwargs))
+            except BaseException:
+                self._release_worker(model_name)
+                raise
+            # The worker is freed when the task finishes, not when the caller stops waiting,
+            # so a cancelled caller can't free a worker whose thread is still busy
+            task.add_done_callback(lambda _: self._release_from_thread(loop, model_name))
+            result = await asyncio.wrap_future(task)
+            with self._lock:
+                self._completed += 1
+            return result
+        except DeadlineExceededError:
+            with self._lock:
+                self._skipped += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._admitted -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dictionary with pool size, queue depth, utilization, per-lane
+            queue depth and queue time percentiles, and per-model worker usage
+        """
+        lanes = {}
+        for name, lane in self._lanes.items():
+            queue_times: List[float] = list(lane.queue_times_ms)
+            if queue_times:
+                p50, p95, p99 = np.percentile(queue_times, [50, 95, 99])
+                queue_time_ms = {
+                    "avg": round(float(np.mean(queue_times)), 3),
+                    "p50": round(float(p50), 3),
+                    "p95": round(float(p95), 3),
+                    "p99": round(float(p99), 3),
+                    "max": round(max(queue_times), 3),
+                }
+            else:
+                queue_time_ms = {"avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+            lanes[name] = {
+                "weight": lane.weight,
+                "queue_depth": len(lane.waiters),
+                "dispatched": lane.dispatched,
+                "queue_time_ms": queue_time_ms,
+            }
+
+        models = {
+            name: {"running": running, "budget": self.model_budget(name)}
+            for name, running in sorted(self._model_running.items())
+            if name is not None
+        }
+
+        with self._lock:
+            elapsed = time.perf_counter() - self._started_at
+            capacity = elapsed * self.max_workers
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "active": self._active,
+                "queue_depth": max(0, self._admitted - self._active),
+                "waiting_for_slot": self._waiting,
+                "completed": self._completed,
+                "failed": self._failed,
+                "skipped": self._skipped,
+                "utilization": round(self._active / self.max_workers, 4),
+                "average_utilization": round(self._busy_seconds / capacity, 4) if capacity else 0.0,
+                "lanes": lanes,
+                "models": models,
+            }
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool, waiting for running tasks."""
+        logger.info("Shutting down inference executor...")
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        logger.info("Inference executor shut down")
+
+
+# Singleton instance
+inference_executor = InferenceExecutor()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get the inference executor instance."""
+    return inference_executor
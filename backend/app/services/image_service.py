@@ -8,18 +8,19 @@ import io
 from pathlib import Path
 from typing import Tuple, Optional
 
-import cv2
 import numpy as np
 from PIL import Image, ImageOps
 
 from app.config import get_settings
 from app.core.exceptions import (
+    DeadlineExceededError,
     ImageProcessingError,
     ImageTooLargeError,
     InvalidImageError,
     UnsupportedImageFormatError,
 )
 from app.logger import get_logger
+from app.services.deadlines import check_deadline
 from app.utils.helpers import base64_to_image, get_file_extension
 
 logger = get_logger(__name__)
@@ -122,7 +123,11 @@ class ImageService:
 
         Raises:
             ImageProcessingError: If preprocessing fails
+            DeadlineExceededError: If the request's deadline lapsed while the image was decoded
         """
+        # Don't resize and normalize images nobody is waiting for
+        check_deadline("preprocess")
+
         logger.info(f"Preprocessing image: {filename}")
         logger.info(f"Original size: {image.size}, mode: {image.mode}")
 
@@ -180,18 +185,21 @@ class ImageService:
                 step="preprocessing",
             )
 
-    async def process_uploaded_file(
+    def preprocess_file_content(
         self,
         file_content: bytes,
         filename: str,
     ) -> np.ndarray:
         """
-        Process an uploaded file for prediction.
+        Decode and preprocess uploaded file content for prediction.
 
         Uploaded images may have either dark or light backgrounds. This method
         automatically detects and inverts colors when necessary to match the
         training data format (dark background with light characters).
 
+        This is blocking, CPU-bound work; request handlers should run it on
+        the inference executor rather than on the event loop.
+
         Args:
             file_content: Raw file content bytes
             filename: Name of the uploaded file
@@ -213,7 +221,7 @@ class ImageService:
             return self.preprocess_image(image, filename, invert_if_light_background=True)
 
         except Exception as e:
-            if isinstance(e, (ImageProcessingError,)):
+            if isinstance(e, (ImageProcessingError, DeadlineExceededError)):
                 raise
             logger.error(f"Failed to open image file: {str(e)}")
             raise InvalidImageError(
@@ -246,7 +254,7 @@ class ImageService:
             return self.preprocess_image(image, "canvas_image", invert_if_light_background=True)
 
         except Exception as e:
-            if isinstance(e, (ImageProcessingError,)):
+            if isinstance(e, (ImageProcessingError, DeadlineExceededError)):
                 raise
             logger.error(f"Failed to process base64 image: {str(e)}")
             raise InvalidImageError(
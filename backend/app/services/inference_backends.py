@@ -0,0 +1,567 @@
+"""
+Inference Backends
+
+Pluggable inference engines used by the model services. The backend is
+selected with the INFERENCE_BACKEND setting; non-Keras backends load an
+artifact exported next to the Keras model by ``python -m ml.export``.
+"""
+
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.exceptions import ModelLoadError
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def configure_tf_threading(intra_op_threads: int, inter_op_threads: int) -> bool:
+    """
+    Size TensorFlow's intra-op and inter-op thread pools.
+
+    The pools are process-wide and fixed once TensorFlow's runtime starts, so
+    this only takes effect before the first model is loaded or run.
+
+    Args:
+        intra_op_threads: Threads parallelizing a single op (0 for TensorFlow's default)
+        inter_op_threads: Ops run concurrently (0 for TensorFlow's default)
+
+    Returns:
+        Whether the pools have the requested sizes
+    """
+    import tensorflow as tf
+
+    threading_config = tf.config.threading
+    try:
+        if intra_op_threads:
+            threading_config.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            threading_config.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError:
+        # Only the default sizes (0) can be requested after the runtime has started
+        pass
+
+    configured = (
+        threading_config.get_intra_op_parallelism_threads() == intra_op_threads
+        and threading_config.get_inter_op_parallelism_threads() == inter_op_threads
+    )
+    if not configured:
+        logger.warning(
+            f"TensorFlow was already initialized with {threading_config.get_intra_op_parallelism_threads()} "
+            f"intra-op and {threading_config.get_inter_op_parallelism_threads()} inter-op threads; "
+            f"requested {intra_op_threads} and {inter_op_threads}"
+        )
+    return configured
+
+
+def pad_to_batch_sizes(image_batch: np.ndarray, batch_sizes: Sequence[int]) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    Split a batch into chunks padded up to the nearest of a fixed set of batch sizes.
+
+    Args:
+        image_batch: Batch of inputs
+        batch_sizes: Sorted batch sizes the runtime was prepared for
+
+    Yields:
+        Tuples of (float32 chunk whose length is one of batch_sizes, number of
+        real inputs at its start)
+    """
+    image_batch = np.asarray(image_batch, dtype=np.float32)
+    largest = batch_sizes[-1]
+    for start in range(0, len(image_batch), largest):
+        chunk = image_batch[start:start + largest]
+        size = len(chunk)
+        batch_size = next(b for b in batch_sizes if b >= size)
+        if batch_size > size:
+            chunk = np.concatenate([chunk, np.zeros((batch_size - size, *chunk.shape[1:]), dtype=np.float32)])
+        yield chunk, size
+
+
+class InferenceBackend:
+    """Base class for inference engines."""
+
+    name: str = "base"
+    file_suffix: str = ".h5"
+    # Whether a loaded model keeps working in a process forked after the load.
+    # Runtimes that start threads or allocate native state at load time don't.
+    fork_safe: bool = False
+
+    def __init__(self) -> None:
+        """Initialize the backend."""
+        self._input_shape: Optional[Tuple] = None
+        self._output_shape: Optional[Tuple] = None
+
+    @classmethod
+    def artifact_path(cls, model_path: str) -> str:
+        """
+        Get the path of this backend's artifact for a Keras model path.
+
+        Args:
+            model_path: Path to the Keras model file
+
+        Returns:
+            Path to the artifact loaded by this backend
+        """
+        return str(Path(model_path).with_suffix(cls.file_suffix))
+
+    @property
+    def input_shape(self) -> Optional[Tuple]:
+        """Get the model input shape, with None for the batch dimension."""
+        return self._input_shape
+
+    @property
+    def output_shape(self) -> Optional[Tuple]:
+        """Get the model output shape, with None for the batch dimension."""
+        return self._output_shape
+
+    def memory_bytes(self) -> Optional[int]:
+        """
+        Get the memory held by the loaded model's weights.
+
+        Returns:
+            Size in bytes, or None if the runtime doesn't expose it
+        """
+        return None
+
+    def load(self, artifact_path: str) -> None:
+        """
+        Load the model artifact.
+
+        Args:
+            artifact_path: Path to the artifact
+
+        Raises:
+            ModelLoadError: If the backend runtime is missing or loading fails
+        """
+        raise NotImplementedError
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        """
+        Run a forward pass.
+
+        Args:
+            image_batch: Preprocessed image batch with shape (N, 64, 64, 1)
+
+        Returns:
+            Class probabilities with shape (N, num_classes)
+        """
+        raise NotImplementedError
+
+    def warm_up(self, sample_shape: Tuple[int, ...], batch_sizes: Sequence[int], runs: int) -> None:
+        """
+        Run forward passes so the first requests don't pay for lazy initialization.
+
+        Args:
+            sample_shape: Shape of one input sample, without the batch dimension
+            batch_sizes: Batch sizes to run
+            runs: Forward passes per batch size
+        """
+        for batch_size in batch_sizes:
+            batch = np.zeros((batch_size, *sample_shape), dtype=np.float32)
+            for _ in range(runs):
+                self.predict(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get backend-specific runtime statistics.
+
+        Returns:
+            Dictionary of statistics, empty if the backend has none
+        """
+        return {}
+
+    def summary(self, print_fn: Callable[[str], None]) -> None:
+        """
+        Print a description of the loaded model.
+
+        Args:
+            print_fn: Function receiving each line of the description
+        """
+        print_fn(f"{self.name} backend - input: {self.input_shape}, output: {self.output_shape}")
+
+
+class KerasBackend(InferenceBackend):
+    """
+    Backend running the Keras model through pre-traced, fixed-shape functions.
+
+    One concrete TensorFlow function is compiled per configured batch size.
+    Batches are padded up to the nearest compiled size (and split when larger
+    than the largest), so inference never retraces on a new input shape.
+    """
+
+    name = "keras"
+    file_suffix = ".h5"
+
+    @classmethod
+    def artifact_path(cls, model_path: str) -> str:
+        """The Keras backend loads the model file as-is."""
+        return model_path
+
+    def __init__(self, batch_sizes: Optional[Sequence[int]] = None) -> None:
+        super().__init__()
+        self._model = None
+        self.batch_sizes: List[int] = sorted({max(1, int(size)) for size in (batch_sizes or settings.WARMUP_BATCH_SIZES)})
+
+        self._forward = None
+        self._signatures: Dict[int, Any] = {}
+        self._signature_lock = threading.Lock()
+        self._warming_up = False
+        self._traces = 0
+        self._serving_traces = 0
+
+    def load(self, artifact_path: str) -> None:
+        # Import TensorFlow here to avoid import errors if not installed
+        try:
+            from tensorflow import keras
+        except ImportError as e:
+            logger.error(f"TensorFlow is not installed: {str(e)}")
+            raise ModelLoadError(
+                message="TensorFlow is not installed. Please install it to use the keras backend.",
+            )
+
+        import tensorflow as tf
+
+        from app.services.thread_calibration import get_thread_calibration
+
+        configure_tf_threading(*get_thread_calibration().resolve(artifact_path))
+        self._model = keras.models.load_model(artifact_path)
+        self._input_shape = tuple(self._model.input_shape)
+        self._output_shape = tuple(self._model.output_shape)
+
+        model = self._model
+
+        def forward(image_batch):
+            # Python code here only runs while TensorFlow traces a new signature
+            self._on_trace(tuple(image_batch.shape))
+            return model(image_batch, training=False)
+
+        self._forward = tf.function(forward, autograph=False)
+        self._signatures = {}
+
+    def _on_trace(self, shape: Tuple) -> None:
+        """Count a trace, warning when it happens on the request path instead of during warmup."""
+        self._traces += 1
+        if self._warming_up:
+            logger.debug(f"Traced {self.name} inference signature for input shape {shape}")
+            return
+
+        self._serving_traces += 1
+        logger.warning(
+            f"Traced {self.name} inference signature for input shape {shape} while serving "
+            f"({self._serving_traces} so far); warm up this batch size or check for shape-polymorphic calls"
+        )
+
+    def _signature(self, batch_size: int):
+        """Get the concrete function for a batch size, tracing it on first use."""
+        signature = self._signatures.get(batch_size)
+        if signature is None:
+            import tensorflow as tf
+
+            with self._signature_lock:
+                signature = self._signatures.get(batch_size)
+                if signature is None:
+                    spec = tf.TensorSpec((batch_size, *self._input_shape[1:]), tf.float32)
+                    signature = self._forward.get_concrete_function(spec)
+                    self._signatures[batch_size] = signature
+        return signature
+
+    def memory_bytes(self) -> Optional[int]:
+        return sum(int(np.prod(weight.shape)) * np.dtype(weight.dtype).itemsize for weight in self._model.weights)
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        outputs = [
+            np.asarray(self._signature(len(chunk))(chunk))[:size]
+            for chunk, size in pad_to_batch_sizes(image_batch, self.batch_sizes)
+        ]
+
+        return np.concatenate(outputs) if outputs else np.zeros((0, *self._output_shape[1:]), dtype=np.float32)
+
+    def warm_up(self, sample_shape: Tuple[int, ...], batch_sizes: Sequence[int], runs: int) -> None:
+        self._warming_up = True
+        try:
+            super().warm_up(sample_shape, batch_sizes, runs)
+        finally:
+            self._warming_up = False
+
+    def stats(self) -> Dict[str, Any]:
+        from app.services.thread_calibration import get_thread_calibration
+
+        return {
+            "compiled_batch_sizes": sorted(self._signatures),
+            "traces": self._traces,
+            "serving_traces": self._serving_traces,
+            "thread_pools": get_thread_calibration().stats(),
+        }
+
+    def summary(self, print_fn: Callable[[str], None]) -> None:
+        self._model.summary(print_fn=print_fn)
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Backend running a TensorFlow Lite flatbuffer.
+
+    Like the keras backend, batches are padded up to the nearest configured
+    batch size (and split when larger than the largest). Each interpreter is
+    allocated once for one batch size and is never resized. An interpreter
+    runs one forward pass at a time, so idle interpreters are kept per batch
+    size and a new one is allocated when all are busy: concurrent passes run
+    side by side, up to the executor's per-model worker budget.
+    """
+
+    name = "tflite"
+    file_suffix = ".tflite"
+
+    # Standalone interpreters are preferred so TensorFlow isn't required
+    INTERPRETER_MODULES = ("ai_edge_litert.interpreter", "tflite_runtime.interpreter")
+
+    def __init__(self, num_threads: Optional[int] = None, batch_sizes: Optional[Sequence[int]] = None) -> None:
+        super().__init__()
+        self.num_threads = num_threads
+        self.batch_sizes: List[int] = sorted({max(1, int(size)) for size in (batch_sizes or settings.WARMUP_BATCH_SIZES)})
+        self._interpreter_factory = None
+        self._model_content: Optional[bytes] = None
+        self._input_index = 0
+        self._output_index = 0
+        # Idle interpreters per batch size; a busy one is checked out of its list
+        self._idle: Dict[int, List[Any]] = {}
+        self._interpreters: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _interpreter_class(cls):
+        """Find an available TFLite interpreter implementation."""
+        for module_name in cls.INTERPRETER_MODULES:
+            try:
+                return importlib.import_module(module_name).Interpreter
+            except ImportError:
+                continue
+
+        try:
+            import tensorflow as tf
+
+            return tf.lite.Interpreter
+        except ImportError:
+            pass
+
+        raise ModelLoadError(
+            message="No TFLite interpreter found. Install ai-edge-litert, tflite-runtime or tensorflow.",
+        )
+
+    def load(self, artifact_path: str) -> None:
+        self._interpreter_factory = self._interpreter_class()
+        self._model_content = Path(artifact_path).read_bytes()
+        interpreter = self._interpreter_factory(model_content=self._model_content, num_threads=self.num_threads)
+        interpreter.allocate_tensors()
+
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+        self._input_index = input_details["index"]
+        self._output_index = output_details["index"]
+        self._input_shape = (None, *[int(d) for d in input_details["shape"][1:]])
+        self._output_shape = (None, *[int(d) for d in output_details["shape"][1:]])
+
+        # The interpreter used to read the shapes serves its own batch size if that is one of ours
+        batch_size = int(input_details["shape"][0])
+        with self._lock:
+            if batch_size in self.batch_sizes:
+                self._idle = {batch_size: [interpreter]}
+                self._interpreters = {batch_size: 1}
+            else:
+                self._idle = {}
+                self._interpreters = {}
+
+    def _checkout(self, batch_size: int):
+        """Take an idle interpreter allocated for a batch size, allocating a new one if none is idle."""
+        with self._lock:
+            idle = self._idle.get(batch_size)
+            if idle:
+                return idle.pop()
+            self._interpreters[batch_size] = self._interpreters.get(batch_size, 0) + 1
+
+        interpreter = self._interpreter_factory(model_content=self._model_content, num_threads=self.num_threads)
+        interpreter.resize_tensor_input(self._input_index, [batch_size, *self._input_shape[1:]])
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _checkin(self, batch_size: int, interpreter) -> None:
+        """Return an interpreter to the idle ones of its batch size."""
+        with self._lock:
+            self._idle.setdefault(batch_size, []).append(interpreter)
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        outputs = []
+        for chunk, size in pad_to_batch_sizes(image_batch, self.batch_sizes):
+            batch_size = len(chunk)
+            interpreter = self._checkout(batch_size)
+            try:
+                interpreter.set_tensor(self._input_index, chunk)
+                interpreter.invoke()
+                outputs.append(interpreter.get_tensor(self._output_index)[:size].copy())
+            finally:
+                self._checkin(batch_size, interpreter)
+
+        return np.concatenate(outputs) if outputs else np.zeros((0, *self._output_shape[1:]), dtype=np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "compiled_batch_sizes": sorted(self._interpreters),
+                "interpreters": dict(sorted(self._interpreters.items())),
+            }
+
+
+class TFLiteInt8Backend(TFLiteBackend):
+    """Backend running the INT8-quantized TFLite artifact from ``python -m ml.quantize``."""
+
+    name = "tflite_int8"
+    file_suffix = ".tflite"
+
+    @classmethod
+    def artifact_path(cls, model_path: str) -> str:
+        path = Path(model_path)
+        return str(path.with_name(f"{path.stem}_int8{cls.file_suffix}"))
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """Backend running an ONNX model with ONNX Runtime."""
+
+    name = "onnxruntime"
+    file_suffix = ".onnx"
+
+    def __init__(self, num_threads: Optional[int] = None) -> None:
+        super().__init__()
+        self.num_threads = num_threads
+        self._session = None
+        self._input_name = ""
+
+    def load(self, artifact_path: str) -> None:
+        try:
+            import onnxruntime
+        except ImportError as e:
+            logger.error(f"ONNX Runtime is not installed: {str(e)}")
+            raise ModelLoadError(
+                message="ONNX Runtime is not installed. Please install onnxruntime to use this backend.",
+            )
+
+        options = onnxruntime.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+
+        self._session = onnxruntime.InferenceSession(
+            artifact_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+        model_input = self._session.get_inputs()[0]
+        model_output = self._session.get_outputs()[0]
+        self._input_name = model_input.name
+        self._input_shape = (None, *model_input.shape[1:])
+        self._output_shape = (None, *model_output.shape[1:])
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: image_batch.astype(np.float32, copy=False)})[0]
+
+
+class NumpyBackend(InferenceBackend):
+    """Backend running the BatchNorm-folded NumPy network, without TensorFlow."""
+
+    name = "numpy"
+    file_suffix = ".npz"
+    fork_safe = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._network = None
+
+    def load(self, artifact_path: str) -> None:
+        from app.models.numpy_cnn import NumpyCNN
+
+        self._network = NumpyCNN.load(artifact_path)
+        self._input_shape = (None, *self._network.input_shape[1:])
+        self._output_shape = (None, *self._network.output_shape[1:])
+
+    def memory_bytes(self) -> Optional[int]:
+        return sum(weight.nbytes for weight in self._network.weights.values())
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        return self._network.predict(image_batch)
+
+    def summary(self, print_fn: Callable[[str], None]) -> None:
+        for line in self._network.summary():
+            print_fn(line)
+
+
+# Registered backends by INFERENCE_BACKEND name
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    TFLiteInt8Backend.name: TFLiteInt8Backend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+
+def get_backend_class(name: str) -> Type[InferenceBackend]:
+    """
+    Get a backend class by name.
+
+    Args:
+        name: Backend name (keras, tflite, tflite_int8, onnxruntime or numpy)
+
+    Returns:
+        Backend class
+
+    Raises:
+        ModelLoadError: If the backend name is unknown
+    """
+    try:
+        return BACKENDS[name.lower()]
+    except KeyError:
+        raise ModelLoadError(
+            message=f"Unknown inference backend: {name}. Available backends: {', '.join(BACKENDS)}",
+        )
+
+
+@lru_cache
+def resolve_backend_name(name: str) -> str:
+    """
+    Resolve the configured backend name to one that can run here.
+
+    The keras backend falls back to the TensorFlow-free numpy backend when
+    TensorFlow is not installed. The result is cached, so the lookup and the
+    fallback warning happen once per process rather than on every model load.
+
+    Args:
+        name: Configured backend name
+
+    Returns:
+        Backend name to use
+    """
+    name = name.lower()
+    if name == KerasBackend.name and importlib.util.find_spec("tensorflow") is None:
+        logger.warning("TensorFlow is not installed, falling back to the numpy inference backend")
+        return NumpyBackend.name
+    return name
+
+
+def create_backend(name: str) -> InferenceBackend:
+    """
+    Create a backend instance by name.
+
+    Args:
+        name: Backend name (keras, tflite, tflite_int8, onnxruntime or numpy)
+
+    Returns:
+        Unloaded backend instance
+    """
+    return get_backend_class(name)()
@@ -0,0 +1,949 @@
+"""
+Inference Process
+
+Runs the model backends in a dedicated process, so forward passes don't
+contend for the GIL with request handling. Each API process writes
+preprocessed batches into its own shared-memory ring of fixed-size slots.
+The engine reads them through zero-copy NumPy views and sends the class
+probabilities back over a pipe. Several API processes can feed one engine,
+which batches their requests for the same model into one forward pass.
+
+The engines form a pool of INFERENCE_WORKERS processes, each with its own
+replica of every model; each batch goes to the engine with the fewest images
+in flight. With INFERENCE_PIN_CPUS, every engine is pinned to a disjoint set
+of the available cores and sizes its thread pools to them.
+"""
+
+import itertools
+import os
+import queue
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.exceptions import ModelLoadError, PredictionError
+from app.logger import get_logger
+from app.services.inference_backends import InferenceBackend, create_backend
+from app.services.thread_calibration import get_thread_calibration
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Seconds to wait for a newly started engine to accept connections
+ENGINE_START_TIMEOUT_S = 30.0
+
+# Seconds to wait for an engine's statistics before reporting it unavailable
+STATS_TIMEOUT_S = 2.0
+
+# Size of one preprocessed image in a ring slot (float32)
+IMAGE_BYTES = settings.IMAGE_SIZE[0] * settings.IMAGE_SIZE[1] * 4
+
+
+def partition_cpus(cpus: Sequence[int], workers: int) -> List[List[int]]:
+    """
+    Split CPUs into one contiguous, disjoint set per worker.
+
+    Args:
+        cpus: CPUs to split
+        workers: Number of workers
+
+    Returns:
+        One CPU set per worker. With more workers than CPUs, the CPUs are
+        shared round-robin, one per worker.
+    """
+    cpus = sorted(cpus)
+    if workers > len(cpus):
+        logger.warning(f"{workers} inference workers but only {len(cpus)} cores; workers will share cores")
+        return [[cpus[i % len(cpus)]] for i in range(workers)]
+    return [[int(cpu) for cpu in part] for part in np.array_split(cpus, workers)]
+
+
+def pin_to_cpus(cpus: Sequence[int]) -> None:
+    """
+    Pin every thread of this process to a set of CPUs.
+
+    ``os.sched_setaffinity`` applies to a single thread, and threads already
+    started at import time (such as BLAS pools) keep their own mask, so each
+    thread is pinned; threads started later inherit the mask.
+
+    Args:
+        cpus: CPUs to run on
+    """
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except ProcessLookupError:
+            # The thread exited in the meantime
+            pass
+
+
+class SlotRing:
+    """
+    Shared memory segment divided into fixed-size slots, each holding one batch.
+
+    The creating process hands out free slots in the order they were
+    released, so the slots are reused round-robin.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None) -> None:
+        """
+        Create a ring, or attach to an existing one when name is given.
+
+        Args:
+            slots: Number of slots
+            slot_bytes: Size of each slot in bytes
+            name: Name of an existing shared memory segment
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        self.shm = SharedMemory(name=name, create=self.owner, size=slots * slot_bytes if self.owner else 0)
+
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for slot in range(slots if self.owner else 0):
+            self._free.put(slot)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment."""
+        return self.shm.name
+
+    @property
+    def free_slots(self) -> int:
+        """Number of slots not holding an in-flight batch."""
+        return self._free.qsize()
+
+    def view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        """Get a float32 array backed by a slot, without copying."""
+        return np.ndarray(shape, dtype=np.float32, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def acquire(self) -> int:
+        """Take a free slot, waiting for one if all are in flight."""
+        return self._free.get()
+
+    def release(self, slot: int) -> None:
+        """Return a slot to the ring."""
+        self._free.put(slot)
+
+    def close(self) -> None:
+        """Detach from the segment, and remove it if this process created it."""
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view is still referenced; the mapping goes away with the process
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class _EngineModel:
+    """A backend loaded by the engine and the requests queued for it."""
+
+    def __init__(self, handle: int, key: Tuple, backend: InferenceBackend) -> None:
+        self.handle = handle
+        self.key = key
+        self.backend = backend
+        self.refs = 0
+        self.warmed_up = False
+        self.requests: "queue.Queue[Optional[Tuple[np.ndarray, int, Callable]]]" = queue.Queue()
+        self.batches = 0
+        self.images = 0
+        self.busy_seconds = 0.0
+
+
+class InferenceEngine:
+    """Serves forward passes for the API processes connected to it. Runs in the inference process."""
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        max_batch_size: int,
+        cpus: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            address: Unix socket the engine listens on
+            authkey: Key clients must authenticate with
+            max_batch_size: Most images merged into one forward pass
+            cpus: CPUs the engine is pinned to (None if it isn't)
+        """
+        self.address = address
+        self.authkey = authkey
+        self.max_batch_size = max(1, max_batch_size)
+        self.cpus = list(cpus) if cpus else None
+
+        self._started_at = time.monotonic()
+        self._batches = 0
+        self._images = 0
+        self._busy_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple, threading.Lock] = defaultdict(threading.Lock)
+        self._models: Dict[int, _EngineModel] = {}
+        self._handles: Dict[Tuple, int] = {}
+        self._next_handle = itertools.count(1)
+
+    def serve(self) -> None:
+        """Accept API process connections until the process is terminated."""
+        listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        logger.info(f"Inference engine {os.getpid()} listening on {self.address}")
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception as e:
+                logger.warning(f"Rejected inference client connection: {str(e)}")
+                continue
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection: Connection) -> None:
+        """Read the requests of one API process until it disconnects."""
+        send_lock = threading.Lock()
+        ring: Optional[SlotRing] = None
+        held: Dict[int, int] = defaultdict(int)
+
+        def send(message: Tuple) -> None:
+            with send_lock:
+                try:
+                    connection.send(message)
+                except (OSError, ValueError):
+                    pass
+
+        try:
+            while True:
+                op, request_id, *args = connection.recv()
+
+                if op == "attach":
+                    name, slots, slot_bytes = args
+                    ring = SlotRing(slots, slot_bytes, name=name)
+                elif op == "predict":
+                    handle, slot, shape = args
+                    model = self._models.get(handle)
+                    if model is None:
+                        send((request_id, False, f"Model handle {handle} is not loaded"))
+                    else:
+                        model.requests.put((ring.view(slot, shape), request_id, send))
+                elif op == "release":
+                    with self._lock:
+                        if held[args[0]] <= 0:
+                            continue
+                        held[args[0]] -= 1
+                    self._release(args[0])
+                elif op == "load":
+                    threading.Thread(
+                        target=self._reply, args=(send, request_id, self._load, *args, held), daemon=True
+                    ).start()
+                elif op == "warm_up":
+                    threading.Thread(
+                        target=self._reply, args=(send, request_id, self._warm_up, *args), daemon=True
+                    ).start()
+                elif op == "stats":
+                    self._reply(send, request_id, self._stats, *args)
+                elif op == "engine_stats":
+                    self._reply(send, request_id, self._engine_stats)
+        except (EOFError, OSError):
+            pass
+        finally:
+            for handle, count in held.items():
+                for _ in range(count):
+                    self._release(handle)
+            if ring is not None:
+                ring.close()
+            connection.close()
+
+    @staticmethod
+    def _reply(send: Callable, request_id: int, fn: Callable, *args: Any) -> None:
+        """Run fn and send its result, or its error, back to the client."""
+        try:
+            send((request_id, True, fn(*args)))
+        except Exception as e:
+            send((request_id, False, str(e)))
+
+    def _load(self, backend_name: str, artifact_path: str, held: Dict[int, int]) -> Dict[str, Any]:
+        """
+        Load an artifact, sharing the backend with clients that loaded the same one.
+
+        Returns:
+            Handle, shapes and memory of the loaded model
+        """
+        key = (backend_name, artifact_path, os.path.getmtime(artifact_path))
+
+        with self._lock:
+            load_lock = self._load_locks[key]
+
+        with load_lock:
+            with self._lock:
+                handle = self._handles.get(key)
+                if handle is not None:
+                    self._models[handle].refs += 1
+
+            if handle is None:
+                backend = create_backend(backend_name)
+                if self.cpus and hasattr(backend, "num_threads"):
+                    # Runtimes with their own thread pool get one thread per pinned core
+                    backend.num_threads = len(self.cpus)
+                backend.load(artifact_path)
+                handle = next(self._next_handle)
+                model = _EngineModel(handle, key, backend)
+                model.refs = 1
+                threading.Thread(target=self._serve_model, args=(model,), daemon=True).start()
+                with self._lock:
+                    self._models[handle] = model
+                    self._handles[key] = handle
+                logger.info(f"Inference engine loaded {artifact_path} with the {backend_name} backend")
+
+        with self._lock:
+            held[handle] += 1
+        backend = self._models[handle].backend
+        return {
+            "handle": handle,
+            "input_shape": backend.input_shape,
+            "output_shape": backend.output_shape,
+            "memory_bytes": backend.memory_bytes(),
+        }
+
+    def _warm_up(self, handle: int, sample_shape: Tuple[int, ...], batch_sizes: Sequence[int], runs: int) -> None:
+        """Warm up a model once, however many clients load it."""
+        model = self._models[handle]
+        with self._lock:
+            if model.warmed_up:
+                return
+            model.warmed_up = True
+        model.backend.warm_up(tuple(sample_shape), batch_sizes, runs)
+
+    def _release(self, handle: int) -> None:
+        """Drop one reference to a model, unloading it when none are left."""
+        with self._lock:
+            model = self._models[handle]
+            model.refs -= 1
+            if model.refs > 0:
+                return
+            del self._models[handle]
+            del self._handles[model.key]
+        model.requests.put(None)
+        logger.info(f"Inference engine unloaded {model.key[1]}")
+
+    def _stats(self, handle: int) -> Dict[str, Any]:
+        """Get a model's backend statistics and engine batching counters."""
+        model = self._models[handle]
+        return {
+            **model.backend.stats(),
+            "engine": {
+                "clients": model.refs,
+                "batches": model.batches,
+                "images": model.images,
+                "avg_batch_size": model.images / model.batches if model.batches else 0.0,
+                "busy_seconds": model.busy_seconds,
+            },
+        }
+
+    def _engine_stats(self) -> Dict[str, Any]:
+        """Get the engine's CPU set, thread pools and forward-pass counters over all models."""
+        uptime_s = time.monotonic() - self._started_at
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "cpus": self.cpus,
+                "thread_pools": get_thread_calibration().stats(),
+                "batches": self._batches,
+                "images": self._images,
+                "busy_seconds": round(self._busy_seconds, 3),
+                "uptime_s": round(uptime_s, 3),
+                # Forward-pass seconds per second since the engine started
+                "utilization": round(self._busy_seconds / uptime_s, 4) if uptime_s > 0 else 0.0,
+            }
+
+    def _serve_model(self, model: _EngineModel) -> None:
+        """Run the queued requests for one model, merging those waiting together into one batch."""
+        while True:
+            request = model.requests.get()
+            if request is None:
+                return
+
+            batch = [request]
+            images = request[0].shape[0]
+            while images < self.max_batch_size:
+                try:
+                    request = model.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    model.requests.put(None)
+                    break
+                batch.append(request)
+                images += request[0].shape[0]
+
+            # A single request runs straight from its shared memory slot
+            inputs = batch[0][0] if len(batch) == 1 else np.concatenate([view for view, _, _ in batch])
+
+            start_time = time.perf_counter()
+            try:
+                outputs = model.backend.predict(inputs)
+            except Exception as e:
+                for _, request_id, send in batch:
+                    send((request_id, False, str(e)))
+                continue
+            finally:
+                busy_seconds = time.perf_counter() - start_time
+                model.busy_seconds += busy_seconds
+                with self._lock:
+                    self._busy_seconds += busy_seconds
+
+            model.batches += 1
+            model.images += images
+            with self._lock:
+                self._batches += 1
+                self._images += images
+            offset = 0
+            for view, request_id, send in batch:
+                send((request_id, True, outputs[offset:offset + view.shape[0]]))
+                offset += view.shape[0]
+
+
+def run_engine(address: str, authkey: bytes, max_batch_size: int, cpus: Optional[Sequence[int]] = None) -> None:
+    """Entry point of the inference process."""
+    if cpus:
+        pin_to_cpus(cpus)
+        # Size the thread pools to the pinned cores, unless calibration picks them
+        get_thread_calibration().set_defaults(len(cpus), 1, source="pinned")
+        logger.info(f"Inference engine {os.getpid()} pinned to CPUs {list(cpus)}")
+    InferenceEngine(address, authkey, max_batch_size, cpus).serve()
+
+
+class InferenceProcess:
+    """
+    Starts the inference process and connects this API process to it.
+
+    The process that calls start() owns the engine. Processes forked from it
+    afterwards (the pre-fork server's workers) connect to the same engine
+    with their own ring and pipe.
+    """
+
+    def __init__(
+        self,
+        ring_slots: Optional[int] = None,
+        ring_slot_images: Optional[int] = None,
+        cpus: Optional[Sequence[int]] = None,
+        name: str = "inference-engine",
+    ) -> None:
+        """
+        Initialize the inference process handle.
+
+        Args:
+            ring_slots: Number of slots in each API process's ring
+            ring_slot_images: Most images one slot holds
+            cpus: CPUs to pin the engine to (None to leave it unpinned)
+            name: Name of the engine process
+        """
+        self.ring_slots = max(1, ring_slots or settings.INFERENCE_RING_SLOTS)
+        self.ring_slot_images = max(1, ring_slot_images or settings.INFERENCE_RING_SLOT_IMAGES)
+        self.cpus = list(cpus) if cpus else None
+        self.name = name
+
+        self.address: Optional[str] = None
+        self._authkey: Optional[bytes] = None
+        self._process = None
+        self._owner_pid: Optional[int] = None
+        self._started_at = 0.0
+
+        # Per-process client state; reset in processes forked after connecting
+        self._client_pid: Optional[int] = None
+        self._connection: Optional[Connection] = None
+        self._ring: Optional[SlotRing] = None
+        self._pending: Dict[int, Future] = {}
+        self._request_ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        """Whether an engine was started by this process or the one it was forked from."""
+        return self.address is not None
+
+    def start(self) -> None:
+        """Start the engine process."""
+        if self.started:
+            return
+
+        self.address = os.path.join(tempfile.mkdtemp(prefix="urdu-ocr-inference-"), "engine.sock")
+        self._authkey = secrets.token_bytes(32)
+        self._process = get_context("spawn").Process(
+            target=run_engine,
+            args=(self.address, self._authkey, settings.BATCH_MAX_SIZE, self.cpus),
+            name=self.name,
+            daemon=True,
+        )
+        self._process.start()
+        self._owner_pid = os.getpid()
+        self._started_at = time.monotonic()
+        logger.info(f"Started inference process {self._process.pid}"
+                    + (f" on CPUs {self.cpus}" if self.cpus else ""))
+
+    def stop(self) -> None:
+        """Disconnect, and stop the engine if this process started it."""
+        self._disconnect()
+        if self._owner_pid != os.getpid():
+            return
+
+        self._process.terminate()
+        self._process.join(timeout=10)
+        shutil.rmtree(os.path.dirname(self.address), ignore_errors=True)
+        logger.info(f"Stopped inference process {self._process.pid}")
+        self.address = None
+        self._process = None
+        self._owner_pid = None
+
+    def _engine_alive(self) -> bool:
+        """Check whether the engine process still exists."""
+        if self._owner_pid == os.getpid():
+            return self._process.is_alive()
+        try:
+            os.kill(self._process.pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+    def _connect(self) -> Connection:
+        """Get this process's connection to the engine, connecting on first use."""
+        with self._connect_lock:
+            if self._client_pid == os.getpid() and self._connection is not None:
+                return self._connection
+            if not self.started:
+                raise PredictionError(message="Inference process is not running")
+
+            # Only a newly started engine gets time to start listening
+            deadline = self._started_at + ENGINE_START_TIMEOUT_S
+            while True:
+                try:
+                    connection = Client(self.address, family="AF_UNIX", authkey=self._authkey)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    if not self._engine_alive():
+                        raise PredictionError(message="Inference process is not running")
+                    if time.monotonic() > deadline:
+                        raise PredictionError(message="Inference process did not start")
+                    time.sleep(0.05)
+
+            # State inherited from the process this one was forked from belongs to that process
+            self._client_pid = os.getpid()
+            self._pending = {}
+            self._send_lock = threading.Lock()
+            self._ring = SlotRing(self.ring_slots, self.ring_slot_images * IMAGE_BYTES)
+            connection.send(("attach", None, self._ring.name, self._ring.slots, self._ring.slot_bytes))
+            self._connection = connection
+
+            threading.Thread(target=self._read, args=(connection, self._pending), daemon=True).start()
+            logger.info(f"Connected to inference process with a {self.ring_slots}-slot ring")
+            return connection
+
+    def _read(self, connection: Connection, pending: Dict[int, Future]) -> None:
+        """Resolve pending requests as the engine's replies arrive."""
+        try:
+            while True:
+                request_id, ok, payload = connection.recv()
+                future = pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(PredictionError(message=payload))
+        except (EOFError, OSError):
+            pass
+
+        with self._connect_lock:
+            unexpected = self._connection is connection
+            if unexpected:
+                self._connection = None
+        if unexpected:
+            logger.warning("Disconnected from inference process")
+        for request_id in list(pending):
+            future = pending.pop(request_id, None)
+            if future is not None:
+                future.set_exception(PredictionError(message="Inference process disconnected"))
+
+    def _disconnect(self) -> None:
+        """Close this process's connection and ring."""
+        with self._connect_lock:
+            if self._client_pid != os.getpid():
+                return
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+            self._client_pid = None
+
+    def call(self, op: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Send a request to the engine and wait for its reply.
+
+        Args:
+            op: Engine operation
+            *args: Arguments of the request
+            timeout: Seconds to wait for the reply (None to wait until it arrives)
+
+        Raises:
+            PredictionError: If the engine fails the request, is unreachable or
+                doesn't reply within the timeout
+        """
+        connection = self._connect()
+        request_id = next(self._request_ids)
+        future: Future = Future()
+        self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                connection.send((op, request_id, *args))
+        except (OSError, ValueError) as e:
+            self._pending.pop(request_id, None)
+            raise PredictionError(message="Inference process disconnected", original_error=str(e))
+        if self._connection is not connection and self._pending.pop(request_id, None) is not None:
+            # The reader stopped before it could see this request
+            raise PredictionError(message="Inference process disconnected")
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # A late reply finds no pending request and is dropped
+            self._pending.pop(request_id, None)
+            raise PredictionError(message=f"Inference process did not answer {op} within {timeout}s")
+
+    def predict(self, handle: int, image_batch: np.ndarray) -> np.ndarray:
+        """
+        Run a forward pass in the engine.
+
+        The batch is copied into a free ring slot, and the engine reads it
+        from there without copying.
+
+        Args:
+            handle: Engine handle of the loaded model
+            image_batch: Preprocessed batch no larger than one slot
+
+        Returns:
+            Class probabilities
+        """
+        self._connect()
+        ring = self._ring
+        slot = ring.acquire()
+        try:
+            ring.view(slot, image_batch.shape)[...] = image_batch
+            return self.call("predict", handle, slot, image_batch.shape)
+        finally:
+            ring.release(slot)
+
+    def release(self, handle: int) -> None:
+        """Drop this process's reference to a model in the engine."""
+        if self._client_pid != os.getpid() or self._connection is None:
+            return
+        try:
+            with self._send_lock:
+                self._connection.send(("release", None, handle))
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def connected(self) -> bool:
+        """Whether this process is connected to the engine."""
+        return self._client_pid == os.getpid() and self._connection is not None
+
+    def engine_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the engine's CPU set, thread pools and utilization.
+
+        Returns:
+            Engine statistics, or None if this process isn't connected to it
+            or the engine doesn't answer within STATS_TIMEOUT_S
+        """
+        if not self.connected:
+            return None
+        try:
+            return self.call("engine_stats", timeout=STATS_TIMEOUT_S)
+        except PredictionError as e:
+            logger.warning(f"Inference engine statistics unavailable: {e.message}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state of the inference process and this process's ring.
+
+        Returns:
+            Dictionary with engine state and ring occupancy
+        """
+        connected = self.connected
+        return {
+            "enabled": settings.INFERENCE_PROCESS,
+            "running": self.started,
+            "connected": connected,
+            "ring_slots": self.ring_slots,
+            "ring_slot_bytes": self.ring_slot_images * IMAGE_BYTES,
+            "free_slots": self._ring.free_slots if connected and self._ring is not None else None,
+            "pending_requests": len(self._pending) if connected else 0,
+        }
+
+
+class InferencePool:
+    """
+    The inference processes this API process sends its forward passes to.
+
+    Every worker runs its own engine with its own replica of each model, and
+    each batch goes to the worker with the fewest images in flight from this
+    process. With CPU pinning, each worker's engine runs on a disjoint set of
+    the available cores, so the replicas don't compete for them.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        pin_cpus: Optional[bool] = None,
+        ring_slots: Optional[int] = None,
+        ring_slot_images: Optional[int] = None,
+        processes: Optional[Sequence[InferenceProcess]] = None,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of inference processes (defaults to INFERENCE_WORKERS)
+            pin_cpus: Whether to pin each process to its own cores (defaults to INFERENCE_PIN_CPUS)
+            ring_slots: Number of slots in each API process's ring, per worker
+            ring_slot_images: Most images one slot holds
+            processes: Existing inference processes to pool instead of creating them
+        """
+        if processes is not None:
+            self.workers = list(processes)
+            self.pinned = any(process.cpus for process in self.workers)
+        else:
+            count = max(1, workers or settings.INFERENCE_WORKERS)
+            self.pinned = settings.INFERENCE_PIN_CPUS if pin_cpus is None else pin_cpus
+            cpu_sets = (
+                partition_cpus(sorted(os.sched_getaffinity(0)), count) if self.pinned else [None] * count
+            )
+            self.workers = [
+                InferenceProcess(
+                    ring_slots,
+                    ring_slot_images,
+                    cpus=cpus,
+                    name="inference-engine" if count == 1 else f"inference-engine-{index}",
+                )
+                for index, cpus in enumerate(cpu_sets)
+            ]
+
+        self._lock = threading.Lock()
+        self._in_flight = [0] * len(self.workers)
+        self._batches = [0] * len(self.workers)
+        self._images = [0] * len(self.workers)
+
+    @property
+    def started(self) -> bool:
+        """Whether the engines were started by this process or the one it was forked from."""
+        return all(worker.started for worker in self.workers)
+
+    @property
+    def ring_slots(self) -> int:
+        """Number of slots in each of this process's rings."""
+        return self.workers[0].ring_slots
+
+    @property
+    def ring_slot_images(self) -> int:
+        """Most images one ring slot holds."""
+        return self.workers[0].ring_slot_images
+
+    def start(self) -> None:
+        """Start every engine process."""
+        if len(self.workers) > settings.EXECUTOR_MODEL_MAX_WORKERS:
+            logger.warning(
+                f"{len(self.workers)} inference workers but EXECUTOR_MODEL_MAX_WORKERS is "
+                f"{settings.EXECUTOR_MODEL_MAX_WORKERS}; some workers will sit idle"
+            )
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self) -> None:
+        """Disconnect from every engine, and stop those this process started."""
+        for worker in self.workers:
+            worker.stop()
+
+    def call_each(self, op: str, args: Sequence[Tuple], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Send a request to every engine at once and wait for all the replies.
+
+        Args:
+            op: Engine operation
+            args: Arguments of the request to each worker, in worker order
+            timeout: Seconds to wait for each reply (None to wait until they arrive)
+
+        Returns:
+            Each worker's reply, in worker order
+
+        Raises:
+            PredictionError: If any engine fails its request or doesn't reply in time
+        """
+        if len(self.workers) == 1:
+            return [self.workers[0].call(op, *args[0], timeout=timeout)]
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            futures = [executor.submit(worker.call, op, *worker_args, timeout=timeout)
+                       for worker, worker_args in zip(self.workers, args)]
+            return [future.result() for future in futures]
+
+    def route(self, images: int) -> int:
+        """
+        Pick the worker for a batch and count the batch as in flight on it.
+
+        Args:
+            images: Images in the batch
+
+        Returns:
+            Index of the worker with the fewest images in flight
+        """
+        with self._lock:
+            index = min(range(len(self.workers)), key=lambda i: (self._in_flight[i], self._images[i]))
+            self._in_flight[index] += images
+            self._batches[index] += 1
+            self._images[index] += images
+            return index
+
+    def finish(self, index: int, images: int) -> None:
+        """Count a batch routed to a worker as answered."""
+        with self._lock:
+            self._in_flight[index] -= images
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state of the engines and of this process's rings.
+
+        Returns:
+            Dictionary with the pool's state, and each worker's CPUs, load from
+            this process and, once connected, its engine's utilization
+        """
+        worker_stats = [worker.stats() for worker in self.workers]
+        connected = any(stats["connected"] for stats in worker_stats)
+
+        workers = []
+        for index, (worker, stats) in enumerate(zip(self.workers, worker_stats)):
+            with self._lock:
+                load = {
+                    "in_flight_images": self._in_flight[index],
+                    "batches": self._batches[index],
+                    "images": self._images[index],
+                }
+            workers.append({
+                "index": index,
+                "cpus": worker.cpus,
+                "connected": stats["connected"],
+                "free_slots": stats["free_slots"],
+                **load,
+                "engine": worker.engine_stats(),
+            })
+
+        return {
+            "enabled": settings.INFERENCE_PROCESS,
+            "running": self.started,
+            "connected": connected,
+            "pinned": self.pinned,
+            "ring_slots": self.ring_slots,
+            "ring_slot_bytes": self.ring_slot_images * IMAGE_BYTES,
+            "free_slots": (
+                sum(stats["free_slots"] or 0 for stats in worker_stats) if connected else None
+            ),
+            "pending_requests": sum(stats["pending_requests"] for stats in worker_stats),
+            "workers": workers,
+        }
+
+
+class RemoteBackend(InferenceBackend):
+    """Backend whose model is loaded and run in the inference processes, one replica per worker."""
+
+    def __init__(
+        self,
+        backend_name: str,
+        process: Optional[Union[InferenceProcess, InferencePool]] = None,
+    ) -> None:
+        """
+        Initialize the backend.
+
+        Args:
+            backend_name: Backend the engines load the model with
+            process: Inference process or pool (defaults to the shared pool)
+        """
+        super().__init__()
+        self.name = backend_name
+        process = process or get_inference_process()
+        self._pool = process if isinstance(process, InferencePool) else InferencePool(processes=[process])
+        self._handles: List[int] = []
+        self._memory_bytes: Optional[int] = None
+
+    def load(self, artifact_path: str) -> None:
+        workers = self._pool.workers
+        try:
+            infos = self._pool.call_each("load", [(self.name, artifact_path)] * len(workers))
+        except PredictionError as e:
+            raise ModelLoadError(message=e.message, model_path=artifact_path)
+
+        self._handles = [info["handle"] for info in infos]
+        self._input_shape = tuple(infos[0]["input_shape"])
+        self._output_shape = tuple(infos[0]["output_shape"])
+        memory = [info["memory_bytes"] for info in infos]
+        self._memory_bytes = None if None in memory else sum(memory)
+
+        # Release the engines' copies once no version snapshot references this backend
+        for worker, handle in zip(workers, self._handles):
+            weakref.finalize(self, worker.release, handle)
+
+    def memory_bytes(self) -> Optional[int]:
+        return self._memory_bytes
+
+    def warm_up(self, sample_shape: Tuple[int, ...], batch_sizes: Sequence[int], runs: int) -> None:
+        self._pool.call_each("warm_up", [(handle, sample_shape, list(batch_sizes), runs) for handle in self._handles])
+
+    def _predict_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        """Run one slot-sized chunk on the least-loaded worker."""
+        index = self._pool.route(len(chunk))
+        try:
+            return self._pool.workers[index].predict(self._handles[index], chunk)
+        finally:
+            self._pool.finish(index, len(chunk))
+
+    def predict(self, image_batch: np.ndarray) -> np.ndarray:
+        image_batch = np.ascontiguousarray(image_batch, dtype=np.float32)
+        capacity = max(1, self._pool.ring_slot_images * IMAGE_BYTES // max(1, image_batch[0].nbytes))
+
+        # Batches larger than a ring slot go through in slot-sized chunks
+        outputs: List[np.ndarray] = [
+            self._predict_chunk(image_batch[start:start + capacity])
+            for start in range(0, len(image_batch), capacity)
+        ]
+        return outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            replicas = self._pool.call_each("stats", [(handle,) for handle in self._handles], timeout=STATS_TIMEOUT_S)
+        except PredictionError as e:
+            logger.warning(f"{self.name} model statistics unavailable: {e.message}")
+            return {"available": False}
+        if len(replicas) == 1:
+            return replicas[0]
+        # Each replica's counters, with the first's for the fields that are the same everywhere
+        return {**replicas[0], "replicas": replicas}
+
+
+# Singleton instance
+inference_process = InferencePool()
+
+
+def get_inference_process() -> InferencePool:
+    """Get the inference process pool."""
+    return inference_process
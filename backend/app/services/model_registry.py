@@ -0,0 +1,545 @@
+"""
+Model Registry
+
+Owns one ModelService per configured model. Every model is served through
+the same batch scheduler, inference executor and metrics surface, so adding
+a model is a configuration entry rather than a new service module.
+
+Models load on their first request; concurrent first requests share one
+load. Each request holds a lease on its model until its response is sent.
+Once the loaded models exceed the memory budget, idle models (no leases and
+no forward passes running) are evicted least recently used first and reload
+on their next request.
+
+Preloaded models load concurrently in the background at startup. Until one
+is ready, requests for it fail fast with ModelNotReadyError instead of
+waiting, and preloaded models are never evicted.
+
+A new version of a loaded model can be hot reloaded without a restart; the
+previous version stays resident so it can be rolled back to instantly.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set
+
+from app.config import ModelConfig, get_settings
+from app.core.exceptions import ModelLoadError, ModelNotFoundError, ModelNotReadyError
+from app.logger import get_logger
+from app.services.executor import get_inference_executor
+from app.services.model_service import ModelService
+from app.services.singleflight import get_singleflight
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class ModelLease:
+    """
+    A request's hold on a model service.
+
+    A model with outstanding leases is never evicted, so a request keeps the
+    model it acquired while it decodes, waits for a batch and streams its
+    response. Release the lease once the response has been sent.
+    """
+
+    def __init__(self, service: ModelService) -> None:
+        """
+        Take a lease on a model service.
+
+        Args:
+            service: Model service to hold
+        """
+        self.service = service
+        self._released = False
+        service.add_lease()
+
+    def release(self) -> None:
+        """Release the lease; later calls do nothing."""
+        if not self._released:
+            self._released = True
+            self.service.drop_lease()
+
+
+class ModelRegistry:
+    """Registry of named model services."""
+
+    # Number of load/evict events kept for the metrics endpoint
+    MAX_EVENTS = 100
+
+    def __init__(
+        self,
+        configs: Optional[Dict[str, ModelConfig]] = None,
+        memory_budget_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            configs: Model configurations by name. Uses settings if not provided.
+            memory_budget_bytes: Resident memory allowed for loaded models (0 disables eviction)
+        """
+        configs = configs if configs is not None else settings.model_configs
+        self._services: Dict[str, ModelService] = {
+            name: ModelService(name, config) for name, config in configs.items()
+        }
+        self.memory_budget_bytes = (
+            memory_budget_bytes if memory_budget_bytes is not None
+            else settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in self._services}
+        # Artifact modification time of the last failed load, so a broken file isn't retried per request
+        self._failed_artifacts: Dict[str, float] = {}
+        # Models loading now, models whose startup load hasn't finished, and models never evicted
+        self._loading: Set[str] = set()
+        self._background: Set[str] = set()
+        self._pinned: Set[str] = set()
+        # Strong references keep the background load tasks from being garbage collected
+        self._background_tasks: List["asyncio.Task[bool]"] = []
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=self.MAX_EVENTS)
+        # Per-model counters by event type
+        self._event_counts: Dict[str, Counter] = defaultdict(Counter)
+
+        logger.info(
+            f"ModelRegistry initialized with models: {', '.join(self._services)}, "
+            f"memory budget: {self.memory_budget_bytes / 1024 / 1024:.0f} MB"
+        )
+
+    def get(self, name: str) -> ModelService:
+        """
+        Get a model service by name.
+
+        Args:
+            name: Model name
+
+        Returns:
+            Model service
+
+        Raises:
+            ModelNotFoundError: If no model with that name is configured
+        """
+        try:
+            return self._services[name]
+        except KeyError:
+            raise ModelNotFoundError(name, self.names())
+
+    def names(self) -> List[str]:
+        """Get the names of all configured models."""
+        return list(self._services)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._services
+
+    def __iter__(self) -> Iterator[ModelService]:
+        return iter(self._services.values())
+
+    def state(self, name: str) -> str:
+        """
+        Get the load state of a model.
+
+        Args:
+            name: Model name
+
+        Returns:
+            "ready", "loading", "failed", "missing" (no artifact) or "unloaded"
+        """
+        service = self.get(name)
+        if service.is_loaded:
+            return "ready"
+        if name in self._loading or name in self._background:
+            return "loading"
+        if name in self._failed_artifacts:
+            return "failed"
+        if not Path(service.artifact_path()).exists():
+            return "missing"
+        return "unloaded"
+
+    async def acquire(self, name: str) -> ModelLease:
+        """
+        Lease a model service by name, loading the model if it isn't resident.
+
+        The load runs on the inference executor, and concurrent first
+        requests for the same model share it. If the artifact is missing or
+        fails to load, the unloaded service is leased so callers can serve
+        mock predictions. The model isn't evicted until the lease is released.
+
+        Args:
+            name: Model name
+
+        Returns:
+            Lease on the model service; the caller must release it
+
+        Raises:
+            ModelNotFoundError: If no model with that name is configured
+            ModelNotReadyError: If the model's startup load hasn't finished
+        """
+        service = self.get(name)
+        service.touch()
+        lease = ModelLease(service)
+
+        try:
+            if not service.is_loaded and name in self._background:
+                raise ModelNotReadyError(name, settings.READY_RETRY_AFTER_S)
+
+            if not service.is_loaded:
+                await get_singleflight().do(
+                    ("load", name), lambda: get_inference_executor().run(self.ensure_loaded, name)
+                )
+        except BaseException:
+            lease.release()
+            raise
+
+        return lease
+
+    def ensure_loaded(self, name: str) -> bool:
+        """
+        Load a model if it isn't resident, then enforce the memory budget.
+
+        Blocking; safe to call from several threads at once.
+
+        Args:
+            name: Model name
+
+        Returns:
+            True if the model is loaded
+        """
+        service = self.get(name)
+
+        with self._load_locks[name]:
+            if service.is_loaded:
+                return True
+
+            self._loading.add(name)
+            try:
+                loaded = self._load(service)
+            finally:
+                self._loading.discard(name)
+
+        if not loaded:
+            return False
+
+        self._enforce_budget(keep=service)
+        return service.is_loaded
+
+    def _load(self, service: ModelService) -> bool:
+        """
+        Load a model, recording the outcome. Called with the model's load lock held.
+
+        Args:
+            service: Model service to load
+
+        Returns:
+            True if the model was loaded
+        """
+        name = service.name
+
+        artifact = Path(service.artifact_path())
+        if not artifact.exists():
+            return False
+
+        mtime = artifact.stat().st_mtime
+        if self._failed_artifacts.get(name) == mtime:
+            return False
+
+        start_time = time.perf_counter()
+        try:
+            loaded = service.load_model()
+        except ModelLoadError as e:
+            logger.warning(f"Could not load {name} model: {e.message}")
+            self._failed_artifacts[name] = mtime
+            self._record("load_failed", service)
+            return False
+
+        if not loaded:
+            return False
+
+        self._failed_artifacts.pop(name, None)
+        self._record("load", service, duration_ms=(time.perf_counter() - start_time) * 1000)
+        return True
+
+    @staticmethod
+    def _busy(service: ModelService) -> bool:
+        """Check whether a model is held by a request or running a forward pass."""
+        return service.leases > 0 or service.in_flight > 0
+
+    def _enforce_budget(self, keep: ModelService) -> None:
+        """
+        Evict idle models, least recently used first, until the budget is met.
+
+        Args:
+            keep: Model that was just loaded and must stay resident
+        """
+        if self.memory_budget_bytes <= 0:
+            return
+
+        while self.resident_bytes() > self.memory_budget_bytes:
+            candidates = [
+                service for service in self
+                if service.is_loaded and service is not keep and not self._busy(service)
+                and service.name not in self._pinned
+            ]
+            if not candidates:
+                logger.warning(
+                    f"Resident models use {self.resident_bytes() / 1024 / 1024:.1f} MB, over the "
+                    f"{self.memory_budget_bytes / 1024 / 1024:.0f} MB budget, but none are idle"
+                )
+                return
+
+            victim = min(candidates, key=lambda service: service.last_used)
+            with self._load_locks[victim.name]:
+                if not victim.is_loaded or self._busy(victim):
+                    continue
+                resident_bytes = victim.resident_bytes
+                victim.unload_model()
+
+            logger.info(f"Evicted idle {victim.name} model to stay within the memory budget")
+            self._record("evict", victim, resident_bytes=resident_bytes)
+
+    async def reload_async(self, name: str) -> str:
+        """
+        Hot reload a model on the inference executor.
+
+        Concurrent reload requests for the same model share one reload.
+
+        Args:
+            name: Model name
+
+        Returns:
+            Version now serving predictions
+
+        Raises:
+            ModelNotFoundError: If no model with that name is configured
+            ModelLoadError: If the new version fails to load; the current version keeps serving
+        """
+        self.get(name)
+        return await get_singleflight().do(
+            ("reload", name), lambda: get_inference_executor().run(self.reload, name)
+        )
+
+    def reload(self, name: str, model_path: Optional[str] = None) -> str:
+        """
+        Load, warm up and atomically swap in a new version of a model.
+
+        Blocking. Requests keep being served by the current version until
+        the swap, and the replaced version stays resident for rollback.
+
+        Args:
+            name: Model name
+            model_path: Path to the model file. Uses the model config if not provided.
+
+        Returns:
+            Version now serving predictions
+
+        Raises:
+            ModelNotFoundError: If no model with that name is configured
+            ModelLoadError: If the new version fails to load; the current version keeps serving
+        """
+        service = self.get(name)
+
+        with self._load_locks[name]:
+            previous_version = service.version
+            start_time = time.perf_counter()
+            try:
+                version = service.reload(model_path)
+            except ModelLoadError as e:
+                logger.error(f"Hot reload of {name} model failed, keeping version {previous_version}: {e.message}")
+                self._record("reload_failed", service)
+                raise
+
+            self._failed_artifacts.pop(name, None)
+            self._record(
+                "reload", service,
+                version=version,
+                previous_version=previous_version,
+                duration_ms=(time.perf_counter() - start_time) * 1000,
+            )
+
+        self._enforce_budget(keep=service)
+        return version
+
+    def rollback(self, name: str) -> str:
+        """
+        Swap the previous version of a model back in.
+
+        Args:
+            name: Model name
+
+        Returns:
+            Version now serving predictions
+
+        Raises:
+            ModelNotFoundError: If no model with that name is configured
+            ModelRollbackError: If no previous version is resident
+        """
+        service = self.get(name)
+
+        with self._load_locks[name]:
+            replaced_version = service.version
+            version = service.rollback()
+            self._record("rollback", service, version=version, previous_version=replaced_version)
+
+        return version
+
+    def _record(self, event: str, service: ModelService, **fields: Any) -> None:
+        """Append a load/evict/reload event to the event log and update counters."""
+        entry = {
+            "event": event,
+            "model": service.name,
+            "timestamp": time.time(),
+            "resident_bytes": service.resident_bytes,
+            **fields,
+        }
+        if "duration_ms" in entry:
+            entry["duration_ms"] = round(entry["duration_ms"], 2)
+
+        with self._lock:
+            self._event_counts[event][service.name] += 1
+            self._events.append(entry)
+
+    def resident_bytes(self) -> int:
+        """Get the memory held by all loaded models."""
+        return sum(service.resident_bytes for service in self)
+
+    def preload(self, names: List[str]) -> None:
+        """
+        Load models now instead of on their first request, and pin them.
+
+        Blocking; loads one model after the other.
+
+        Args:
+            names: Names of the models to load
+        """
+        for name in self._pin(names):
+            self._log_preload(name, self.ensure_loaded(name))
+
+    def preload_in_background(self, names: List[str]) -> List["asyncio.Task[bool]"]:
+        """
+        Start loading models concurrently on the inference executor, and pin them.
+
+        Returns immediately. Until a model's load finishes, requests for it
+        raise ModelNotReadyError.
+
+        Args:
+            names: Names of the models to load
+
+        Returns:
+            One task per model, resolving to whether it loaded
+        """
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for name in self._pin(names):
+            self._background.add(name)
+            tasks.append(loop.create_task(self._load_in_background(name)))
+
+        self._background_tasks = tasks
+        return tasks
+
+    async def _load_in_background(self, name: str) -> bool:
+        """Load one preloaded model on the executor and mark its startup load finished."""
+        try:
+            loaded = await get_inference_executor().run(self.ensure_loaded, name)
+            self._log_preload(name, loaded)
+            return loaded
+        except Exception as e:
+            logger.error(f"Background load of {name} model failed: {str(e)}")
+            return False
+        finally:
+            self._background.discard(name)
+
+    def _pin(self, names: List[str]) -> List[str]:
+        """Pin the configured models among names against eviction and return them."""
+        known = []
+        for name in names:
+            if name not in self:
+                logger.warning(f"Cannot preload unknown model: {name}")
+                continue
+            self._pinned.add(name)
+            known.append(name)
+        return known
+
+    def _log_preload(self, name: str, loaded: bool) -> None:
+        """Log the outcome of a preload."""
+        service = self.get(name)
+        if loaded:
+            logger.info(f"Preloaded {name} model - input shape: {service.model.input_shape}, "
+                        f"classes: {service.num_classes}")
+        else:
+            logger.warning(f"{name} model is not available, serving mock predictions")
+            logger.info(f"To export it for this backend, run: python -m ml.export --model {name}")
+
+    def readiness(self) -> Dict[str, str]:
+        """
+        Get the load state of every model required for readiness (the preloaded models).
+
+        Returns:
+            Load state by model name
+        """
+        return {name: self.state(name) for name in self.names() if name in self._pinned}
+
+    def is_ready(self) -> bool:
+        """Check whether every model required for readiness is loaded and warm."""
+        return all(state == "ready" for state in self.readiness().values())
+
+    def unload_all(self) -> None:
+        """Unload every model to free memory."""
+        for service in self:
+            service.unload_model()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get model memory and load/evict statistics.
+
+        Returns:
+            Dictionary with the memory budget, resident memory, per-model
+            info and counters, and the most recent load/evict/reload events
+        """
+        # Only the counters are read under the lock: backend stats may wait on the inference process
+        with self._lock:
+            services = list(self)
+            counts = {
+                service.name: {
+                    "loads": self._event_counts["load"][service.name],
+                    "evictions": self._event_counts["evict"][service.name],
+                    "load_failures": self._event_counts["load_failed"][service.name],
+                    "reloads": self._event_counts["reload"][service.name],
+                    "reload_failures": self._event_counts["reload_failed"][service.name],
+                    "rollbacks": self._event_counts["rollback"][service.name],
+                }
+                for service in services
+            }
+            events = list(self._events)
+
+        models = {
+            service.name: {
+                **service.info(),
+                "state": self.state(service.name),
+                "pinned": service.name in self._pinned,
+                "in_flight": service.in_flight,
+                "leases": service.leases,
+                "idle_seconds": round(time.monotonic() - service.last_used, 3) if service.last_used else None,
+                **counts[service.name],
+                "inference": service.backend_stats(),
+            }
+            for service in services
+        }
+
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes(),
+            "models": models,
+            "events": events,
+        }
+
+
+# Singleton instance
+model_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the model registry instance."""
+    return model_registry
@@ -1,63 +1,161 @@
 """
 Model Service
 
-Service for loading and using the ML model for predictions.
-Uses singleton pattern for model instance management.
+Service for loading and using one ML model for predictions. Instances are
+created and owned by the model registry, one per configured model.
+
+A new model version can be loaded and warmed up next to the one serving
+traffic and then swapped in atomically. Forward passes already running keep
+the version they started on, and the previous version stays resident so it
+can be restored instantly.
 """
 
+import hashlib
 import json
 import os
+import threading
 import time
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
 import numpy as np
 
-from app.config import URDU_CHARACTERS, get_settings
+from app.config import ModelConfig, get_settings
 from app.core.exceptions import (
-    ClassLabelsNotFoundError,
     ModelLoadError,
     ModelNotLoadedError,
+    ModelRollbackError,
     PredictionError,
 )
 from app.logger import get_logger
+from app.services.inference_backends import create_backend, resolve_backend_name
+from app.services.inference_process import RemoteBackend
+from app.services.prediction_cache import get_prediction_cache
+from app.services.tensor_cache import get_tensor_cache
 from app.utils.helpers import format_confidence, get_top_k_predictions
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
-class ModelService:
+def artifact_version(path: str) -> str:
     """
-    Service for ML model management and predictions.
-    Implements singleton pattern for efficient model handling.
+    Get a content-derived version identifier for a model artifact.
+
+    Args:
+        path: Path to the artifact file
+
+    Returns:
+        Short hex digest of the file contents
     """
+    digest = hashlib.blake2b(digest_size=6)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    _instance: Optional["ModelService"] = None
-    _model = None
-    _class_labels: Dict[int, str] = {}
-    _is_loaded: bool = False
-
-    def __new__(cls) -> "ModelService":
-        """Implement singleton pattern."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self) -> None:
-        """Initialize the model service."""
-        # Only initialize once
-        if hasattr(self, "_initialized") and self._initialized:
-            return
 
-        self._initialized = True
-        logger.info("ModelService instance created")
+class ModelService:
+    """Service for one named model: loading, class labels and predictions."""
+
+    def __init__(self, name: str, config: ModelConfig) -> None:
+        """
+        Initialize the model service.
+
+        Args:
+            name: Model name used in routes, caches and metrics
+            config: Model paths and default class labels
+        """
+        self.name = name
+        self.config = config
+
+        self._model = None
+        self._class_labels: Dict[int, str] = {}
+        self._is_loaded = False
+        self._generation = 0
+
+        # Memory and usage bookkeeping for the registry's eviction policy
+        self._resident_bytes = 0
+        self._last_used = 0.0
+        self._in_flight = 0
+        self._leases = 0
+        self._usage_lock = threading.Lock()
+
+        # Version served now, its artifact's modification time, and the
+        # previous version kept resident for rollback
+        self._version: Optional[str] = None
+        self._artifact_mtime: Optional[float] = None
+        self._previous: Optional[Dict[str, Any]] = None
+        self._swap_lock = threading.Lock()
+
+        logger.info(f"ModelService created for model: {name}")
 
     @property
     def is_loaded(self) -> bool:
         """Check if the model is loaded."""
         return self._is_loaded
 
+    @property
+    def generation(self) -> int:
+        """Get the model generation, incremented whenever the model is (re)loaded or unloaded."""
+        return self._generation
+
+    @property
+    def version(self) -> Optional[str]:
+        """Get the version of the model serving predictions."""
+        return self._version
+
+    @property
+    def previous_version(self) -> Optional[str]:
+        """Get the version kept resident for rollback."""
+        return self._previous["version"] if self._previous else None
+
+    @property
+    def artifact_mtime(self) -> Optional[float]:
+        """Get the modification time of the artifact the serving version was loaded from."""
+        return self._artifact_mtime
+
+    @property
+    def resident_bytes(self) -> int:
+        """Get the memory held by the serving and previous versions, or 0 if not loaded."""
+        previous_bytes = self._previous["resident_bytes"] if self._previous else 0
+        return self._resident_bytes + previous_bytes
+
+    @property
+    def last_used(self) -> float:
+        """Get the monotonic time of the last request for this model."""
+        return self._last_used
+
+    @property
+    def in_flight(self) -> int:
+        """Get the number of forward passes currently running on this model."""
+        return self._in_flight
+
+    @property
+    def leases(self) -> int:
+        """Get the number of requests holding this model until their response is sent."""
+        return self._leases
+
+    def add_lease(self) -> None:
+        """Record a request holding this model."""
+        with self._usage_lock:
+            self._leases += 1
+
+    def drop_lease(self) -> None:
+        """Record that a request holding this model finished."""
+        with self._usage_lock:
+            self._leases -= 1
+
+    def touch(self) -> None:
+        """Record a request for this model."""
+        self._last_used = time.monotonic()
+
+    def _invalidate_cached_predictions(self) -> None:
+        """Start a new model generation and drop predictions cached for the previous one."""
+        self._generation += 1
+        dropped = get_prediction_cache().invalidate(self.name) + get_tensor_cache().invalidate(self.name)
+        if dropped:
+            logger.info(f"Invalidated {dropped} cached {self.name} predictions")
+
     @property
     def model(self):
         """Get the loaded model."""
@@ -69,7 +167,7 @@ class ModelService:
     def class_labels(self) -> Dict[int, str]:
         """Get class labels."""
         if not self._class_labels:
-            return URDU_CHARACTERS
+            return self.config.default_labels
         return self._class_labels
 
     @property
@@ -77,103 +175,256 @@ class ModelService:
         """Get number of classes."""
         return len(self.class_labels)
 
-    def load_model(self, model_path: Optional[str] = None) -> bool:
+    def artifact_path(self) -> str:
+        """Get the path of the artifact loaded by the configured inference backend."""
+        backend_name = resolve_backend_name(settings.INFERENCE_BACKEND)
+        return create_backend(backend_name).artifact_path(str(self.config.model_path_resolved))
+
+    def _load_version(self, model_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Load the trained model from file.
+        Load a model version without touching the one serving predictions.
 
         Args:
-            model_path: Path to the model file. Uses settings if not provided.
+            model_path: Path to the model file. Uses the model config if not provided.
 
         Returns:
-            True if model loaded successfully
+            The loaded version (model, class labels, version, resident bytes and
+            artifact modification time), or None if the artifact doesn't exist
 
         Raises:
             ModelLoadError: If model loading fails
         """
-        # Import TensorFlow here to avoid import errors if not installed
-        try:
-            from tensorflow import keras
-        except ImportError as e:
-            logger.error(f"TensorFlow is not installed: {str(e)}")
-            raise ModelLoadError(
-                message="TensorFlow is not installed. Please install it to use the model service.",
-            )
-
         if model_path is None:
-            model_path = str(settings.model_path_resolved)
+            model_path = str(self.config.model_path_resolved)
 
-        logger.info(f"Attempting to load model from: {model_path}")
+        # Non-Keras backends load an artifact exported next to the Keras model
+        backend = create_backend(resolve_backend_name(settings.INFERENCE_BACKEND))
+        model_path = backend.artifact_path(model_path)
+        logger.info(f"Using {backend.name} inference backend")
+        if settings.INFERENCE_PROCESS:
+            # The model is loaded and run by the inference process
+            backend = RemoteBackend(backend.name)
+
+        logger.info(f"Attempting to load {self.name} model from: {model_path}")
 
         if not os.path.exists(model_path):
-            logger.warning(f"Model file not found at: {model_path}")
+            logger.warning(f"{self.name} model file not found at: {model_path}")
             logger.info("Model will need to be trained first. Using placeholder mode.")
-            self._is_loaded = False
-            return False
+            return None
 
         try:
             # Log file size
             file_size = os.path.getsize(model_path)
+            artifact_mtime = os.path.getmtime(model_path)
             logger.info(f"Model file size: {file_size / 1024 / 1024:.2f} MB")
 
-            # Load model
-            self._model = keras.models.load_model(model_path)
-            self._is_loaded = True
+            # Load model and warm it up before it serves traffic
+            backend.load(model_path)
+            self._warm_up(backend)
+            version = artifact_version(model_path)
 
-            logger.info("Model loaded successfully")
-            logger.info(f"Model input shape: {self._model.input_shape}")
-            logger.info(f"Model output shape: {self._model.output_shape}")
+            logger.info(f"{self.name} model version {version} loaded successfully")
+            logger.info(f"Model input shape: {backend.input_shape}")
+            logger.info(f"Model output shape: {backend.output_shape}")
 
             # Log model summary
             logger.info("Model architecture summary:")
-            self._model.summary(print_fn=lambda x: logger.info(x))
-
-            # Load class labels if available
-            self._load_class_labels()
-
-            logger.info(f"Number of classes: {self.num_classes}")
+            backend.summary(print_fn=lambda x: logger.info(x))
 
-            return True
+            return {
+                "model": backend,
+                # Load class labels if available
+                "class_labels": self._read_class_labels(),
+                "version": version,
+                "resident_bytes": backend.memory_bytes() or file_size,
+                "artifact_mtime": artifact_mtime,
+            }
 
         except Exception as e:
-            logger.error(f"Failed to load model: {str(e)}")
-            self._is_loaded = False
+            logger.error(f"Failed to load {self.name} model: {str(e)}")
             raise ModelLoadError(
-                message=f"Failed to load model: {str(e)}",
+                message=f"Failed to load {self.name} model: {str(e)}",
                 model_path=model_path,
             )
 
-    def _load_class_labels(self, labels_path: Optional[str] = None) -> None:
+    def _current_version(self) -> Optional[Dict[str, Any]]:
+        """Get the serving version in the form returned by _load_version."""
+        if not self._is_loaded or self._model is None:
+            return None
+        return {
+            "model": self._model,
+            "class_labels": self._class_labels,
+            "version": self._version,
+            "resident_bytes": self._resident_bytes,
+            "artifact_mtime": self._artifact_mtime,
+        }
+
+    def _install(self, loaded: Optional[Dict[str, Any]], previous: Optional[Dict[str, Any]]) -> None:
         """
-        Load class labels from JSON file.
+        Atomically make a version the serving one.
+
+        Args:
+            loaded: Version to serve, or None to serve nothing
+            previous: Version to keep resident for rollback
+        """
+        with self._swap_lock:
+            self._model = loaded["model"] if loaded else None
+            self._class_labels = loaded["class_labels"] if loaded else {}
+            self._version = loaded["version"] if loaded else None
+            self._resident_bytes = loaded["resident_bytes"] if loaded else 0
+            self._artifact_mtime = loaded["artifact_mtime"] if loaded else None
+            self._is_loaded = loaded is not None
+            self._previous = previous
+            self._invalidate_cached_predictions()
+
+    def _warm_up(self, model: Any) -> None:
+        """
+        Run the configured warmup passes so the first requests don't pay for
+        tracing and allocation.
+
+        Args:
+            model: Loaded inference backend
+        """
+        if settings.WARMUP_RUNS <= 0 or not settings.WARMUP_BATCH_SIZES:
+            return
+
+        sample_shape = tuple(
+            dim if dim is not None else size
+            for dim, size in zip(model.input_shape[1:], (*settings.IMAGE_SIZE, 1))
+        )
+        start_time = time.perf_counter()
+        model.warm_up(sample_shape, settings.WARMUP_BATCH_SIZES, settings.WARMUP_RUNS)
+        logger.info(
+            f"{self.name} model warmed up at batch sizes {settings.WARMUP_BATCH_SIZES} "
+            f"in {(time.perf_counter() - start_time) * 1000:.2f}ms"
+        )
+
+    def backend_stats(self) -> Dict[str, Any]:
+        """Get runtime statistics of the serving backend, such as compiled signatures and traces."""
+        model = self._model
+        return model.stats() if self._is_loaded and model is not None else {}
+
+    def load_model(self, model_path: Optional[str] = None) -> bool:
+        """
+        Load the trained model from file with the configured inference backend.
+
+        Args:
+            model_path: Path to the model file. Uses the model config if not provided.
+
+        Returns:
+            True if model loaded successfully
+
+        Raises:
+            ModelLoadError: If model loading fails
+        """
+        try:
+            loaded = self._load_version(model_path)
+        except ModelLoadError:
+            self._install(None, None)
+            raise
+
+        self._install(loaded, None)
+        if loaded is None:
+            return False
+
+        logger.info(f"Number of classes: {self.num_classes}")
+        return True
+
+    def reload(self, model_path: Optional[str] = None) -> str:
+        """
+        Load and warm up a new model version, then swap it in atomically.
+
+        Predictions keep being served by the current version while the new
+        one loads. Forward passes already running finish on the current
+        version, which then stays resident for rollback.
+
+        Args:
+            model_path: Path to the model file. Uses the model config if not provided.
+
+        Returns:
+            Version now serving predictions
+
+        Raises:
+            ModelLoadError: If the artifact is missing or fails to load; the
+                current version keeps serving
+        """
+        loaded = self._load_version(model_path)
+        if loaded is None:
+            raise ModelLoadError(
+                message=f"No {self.name} model artifact to reload",
+                model_path=model_path or self.artifact_path(),
+            )
+
+        previous = self._current_version()
+        self._install(loaded, previous)
+
+        logger.info(
+            f"{self.name} model version {self._version} now serving"
+            + (f" (previous version {previous['version']} kept for rollback)" if previous else "")
+        )
+        return self._version
+
+    def rollback(self) -> str:
+        """
+        Swap the previous model version back in.
+
+        The version being replaced is kept resident in turn, so a rollback
+        can itself be undone.
+
+        Returns:
+            Version now serving predictions
+
+        Raises:
+            ModelRollbackError: If no previous version is resident
+        """
+        with self._swap_lock:
+            previous = self._previous
+        if previous is None:
+            raise ModelRollbackError(
+                message=f"No previous {self.name} model version to roll back to",
+                model_name=self.name,
+            )
+
+        self._install(previous, self._current_version())
+
+        logger.info(f"{self.name} model rolled back to version {self._version}")
+        return self._version
+
+    def _read_class_labels(self, labels_path: Optional[str] = None) -> Dict[int, str]:
+        """
+        Read class labels from JSON file.
 
         Args:
             labels_path: Path to class labels JSON file
+
+        Returns:
+            Class labels by index, or the default labels if the file is unavailable
         """
-        if labels_path is None:
-            labels_path = str(settings.class_labels_path_resolved)
+        if labels_path is None and self.config.class_labels_path_resolved is not None:
+            labels_path = str(self.config.class_labels_path_resolved)
 
-        logger.info(f"Attempting to load class labels from: {labels_path}")
+        logger.info(f"Attempting to load {self.name} class labels from: {labels_path}")
 
-        if not os.path.exists(labels_path):
-            logger.warning(f"Class labels file not found at: {labels_path}")
-            logger.info("Using default Urdu character mappings")
-            self._class_labels = URDU_CHARACTERS
-            return
+        if labels_path is None or not os.path.exists(labels_path):
+            logger.warning(f"{self.name} class labels file not found at: {labels_path}")
+            logger.info("Using default class mappings")
+            return self.config.default_labels
 
         try:
             with open(labels_path, "r", encoding="utf-8") as f:
                 labels = json.load(f)
 
             # Convert string keys to integers
-            self._class_labels = {int(k): v for k, v in labels.items()}
-            logger.info(f"Loaded {len(self._class_labels)} class labels")
+            class_labels = {int(k): v for k, v in labels.items()}
+            logger.info(f"Loaded {len(class_labels)} {self.name} class labels")
+            return class_labels
 
         except Exception as e:
-            logger.warning(f"Failed to load class labels: {str(e)}")
-            logger.info("Using default Urdu character mappings")
-            self._class_labels = URDU_CHARACTERS
+            logger.warning(f"Failed to load {self.name} class labels: {str(e)}")
+            logger.info("Using default class mappings")
+            return self.config.default_labels
 
-    def predict(self, image_array: np.ndarray) -> Tuple[str, float, List[Dict[str, Any]], float]:
+    def predict(self, image_array: np.ndarray) -> Tuple[str, float, List[Dict[str, Any]], float, str]:
         """
         Make a prediction on a preprocessed image.
 
@@ -181,70 +432,112 @@ class ModelService:
             image_array: Preprocessed image array with shape (1, 64, 64, 1)
 
         Returns:
-            Tuple of (prediction, confidence, top_5_predictions, processing_time_ms)
+            Tuple of (prediction, confidence, top_5_predictions, processing_time_ms, model_version)
 
         Raises:
             ModelNotLoadedError: If model is not loaded
             PredictionError: If prediction fails
         """
-        if not self._is_loaded or self._model is None:
-            logger.error("Prediction attempted without loaded model")
+        return self.predict_batch(image_array)[0]
+
+    def predict_batch(self, image_batch: np.ndarray) -> List[Tuple[str, float, List[Dict[str, Any]], float, str]]:
+        """
+        Make predictions on a batch of preprocessed images in one forward pass.
+
+        Args:
+            image_batch: Preprocessed image batch with shape (N, 64, 64, 1)
+
+        Returns:
+            List of (prediction, confidence, top_5_predictions, processing_time_ms,
+            model_version) tuples, one per image. The processing time is that of
+            the whole batch.
+
+        Raises:
+            ModelNotLoadedError: If model is not loaded
+            PredictionError: If prediction fails
+        """
+        # Hold the serving version so a swap or eviction during the forward pass can't change it
+        with self._swap_lock:
+            model, class_labels, version = self._model, self.class_labels, self._version
+        if not self._is_loaded or model is None:
+            logger.error(f"{self.name} prediction attempted without loaded model")
             raise ModelNotLoadedError()
 
-        logger.info(f"Making prediction on image with shape: {image_array.shape}")
+        logger.info(f"Making {self.name} prediction on batch with shape: {image_batch.shape}")
+
+        with self._usage_lock:
+            self._in_flight += 1
+        self.touch()
 
         try:
             start_time = time.perf_counter()
 
             # Make prediction
-            predictions = self._model.predict(image_array, verbose=0)
-            prediction_probs = predictions[0].tolist()
+            predictions = model.predict(image_batch)
 
             end_time = time.perf_counter()
             processing_time_ms = (end_time - start_time) * 1000
 
-            # Get top prediction
-            top_index = int(np.argmax(predictions[0]))
-            confidence = float(predictions[0][top_index])
-            prediction = self.class_labels.get(top_index, "Unknown")
+            # Get top 5 predictions (or fewer if less than 5 classes)
+            k = min(5, len(class_labels))
+
+            results = []
+            for probs in predictions:
+                # Get top prediction
+                top_index = int(np.argmax(probs))
+                confidence = float(probs[top_index])
+                prediction = class_labels.get(top_index, "Unknown")
 
-            # Get top 5 predictions
-            top_5 = get_top_k_predictions(prediction_probs, self.class_labels, k=5)
+                top_k = get_top_k_predictions(probs.tolist(), class_labels, k=k)
 
-            logger.info(f"Prediction completed - Character: {prediction}, Confidence: {confidence:.4f}")
+                logger.debug(f"Prediction - {self.name}: {prediction}, Confidence: {confidence:.4f}")
+                results.append((prediction, format_confidence(confidence), top_k, processing_time_ms, version))
+
+            logger.info(f"{self.name} prediction completed for {len(results)} image(s)")
             logger.info(f"Processing time: {processing_time_ms:.2f}ms")
-            logger.debug(f"Top 5 predictions: {top_5}")
 
-            return prediction, format_confidence(confidence), top_5, processing_time_ms
+            return results
 
         except Exception as e:
-            logger.error(f"Prediction failed: {str(e)}")
+            logger.error(f"{self.name} prediction failed: {str(e)}")
             raise PredictionError(
                 message=f"Prediction failed: {str(e)}",
                 original_error=str(e),
             )
 
+        finally:
+            with self._usage_lock:
+                self._in_flight -= 1
+
     def get_classes(self) -> List[str]:
         """
-        Get list of all character classes.
+        Get list of all classes.
 
         Returns:
-            List of Urdu characters
+            List of class labels
         """
         return list(self.class_labels.values())
 
-    def unload_model(self) -> None:
-        """Unload the model to free memory."""
-        logger.info("Unloading model...")
-        self._model = None
-        self._is_loaded = False
-        logger.info("Model unloaded")
-
-
-# Singleton instance
-model_service = ModelService()
+    def info(self) -> Dict[str, Any]:
+        """
+        Get a description of the model for listings and metrics.
 
+        Returns:
+            Dictionary with load state, backend, versions, generation and class count
+        """
+        return {
+            "name": self.name,
+            "loaded": self._is_loaded,
+            "backend": self._model.name if self._is_loaded and self._model is not None else None,
+            "version": self._version,
+            "previous_version": self.previous_version,
+            "generation": self._generation,
+            "num_classes": self.num_classes,
+            "resident_bytes": self.resident_bytes,
+        }
 
-def get_model_service() -> ModelService:
-    """Get the model service instance."""
-    return model_service
+    def unload_model(self) -> None:
+        """Unload the model, and the version kept for rollback, to free memory."""
+        logger.info(f"Unloading {self.name} model...")
+        self._install(None, None)
+        logger.info(f"{self.name} model unloaded")
@@ -0,0 +1,115 @@
+"""
+Model Watcher
+
+Polls the artifacts of loaded models and hot reloads a model when its
+artifact changes on disk, so deploying a retrained model is a file copy
+rather than a restart.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.core.exceptions import ModelLoadError
+from app.logger import get_logger
+from app.services.model_registry import ModelRegistry, get_model_registry
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class ModelWatcher:
+    """Reloads loaded models whose artifact modification time changes."""
+
+    def __init__(self, registry: Optional[ModelRegistry] = None, interval_s: Optional[float] = None) -> None:
+        """
+        Initialize the watcher.
+
+        Args:
+            registry: Registry whose models are watched
+            interval_s: Poll interval in seconds
+        """
+        self.registry = registry or get_model_registry()
+        self.interval_s = interval_s if interval_s is not None else settings.MODEL_WATCH_INTERVAL_S
+
+        # Modification time seen on the previous poll, so a file still being written isn't loaded
+        self._pending: Dict[str, float] = {}
+        # Modification time of the last failed reload, so a broken file isn't retried every poll
+        self._failed: Dict[str, float] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+        logger.info(f"ModelWatcher initialized with poll interval: {self.interval_s}s")
+
+    async def check(self) -> List[str]:
+        """
+        Poll the artifacts of loaded models once.
+
+        A changed artifact is reloaded once its modification time has been
+        the same on two consecutive polls.
+
+        Returns:
+            Names of the models reloaded by this poll
+        """
+        reloaded = []
+
+        for service in self.registry:
+            if not service.is_loaded:
+                continue
+
+            try:
+                mtime = os.path.getmtime(service.artifact_path())
+            except OSError:
+                continue
+
+            if mtime == service.artifact_mtime or mtime == self._failed.get(service.name):
+                self._pending.pop(service.name, None)
+                continue
+
+            if self._pending.get(service.name) != mtime:
+                logger.info(f"{service.name} model artifact changed, reloading once it is stable")
+                self._pending[service.name] = mtime
+                continue
+
+            del self._pending[service.name]
+            try:
+                await self.registry.reload_async(service.name)
+                reloaded.append(service.name)
+            except ModelLoadError:
+                self._failed[service.name] = mtime
+
+        return reloaded
+
+    async def _run(self) -> None:
+        """Poll until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Model watch poll failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start polling on the running event loop."""
+        if self._task is None:
+            logger.info("Watching model artifacts for changes")
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+model_watcher = ModelWatcher()
+
+
+def get_model_watcher() -> ModelWatcher:
+    """Get the model watcher instance."""
+    return model_watcher
@@ -0,0 +1,204 @@
+"""
+Prediction Cache
+
+LRU cache of prediction responses keyed by a hash of the raw upload bytes
+and the model identity, so byte-identical requests (canvas resubmits and
+client retries) skip decoding and inference entirely.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.config import get_settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total size in bytes.
+
+    Keys are tuples whose first element is the model name, so all entries of
+    one model can be invalidated together.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        sizeof: Callable[[Any], int],
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 disables the cache)
+            max_bytes: Maximum total size of the cached values in bytes
+            sizeof: Function returning the size of a value in bytes
+        """
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._sizeof = sizeof
+
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check whether the cache can hold any entries."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """
+        Look up a value and mark it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within bounds.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, model_name: Optional[Hashable] = None) -> int:
+        """
+        Drop all entries of one model, or every entry.
+
+        Args:
+            model_name: Model whose entries are dropped; None drops everything
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if model_name is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] == model_name]
+
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with bounds, occupancy and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+class PredictionCache(LRUCache):
+    """Cache of prediction responses keyed by upload content and model identity."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Initialize the prediction cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of the cached responses in bytes
+        """
+        super().__init__(
+            max_entries=max_entries if max_entries is not None else settings.PREDICTION_CACHE_MAX_ENTRIES,
+            max_bytes=max_bytes if max_bytes is not None else settings.PREDICTION_CACHE_MAX_BYTES,
+            sizeof=lambda response: len(response.model_dump_json()),
+        )
+
+        logger.info(
+            f"PredictionCache initialized with max entries: {self.max_entries}, "
+            f"max bytes: {self.max_bytes}"
+        )
+
+    @staticmethod
+    def make_key(model_service: Any, content: bytes) -> Tuple[str, int, bytes]:
+        """
+        Build the cache key for an upload.
+
+        The model generation is part of the key, so a response computed by a
+        previous model can never be returned after a reload.
+
+        Args:
+            model_service: Model service that will serve the request
+            content: Raw upload bytes (file content or base64 payload)
+
+        Returns:
+            Tuple of (model name, model generation, content digest)
+        """
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        return model_service.name, model_service.generation, digest
+
+
+# Singleton instance
+prediction_cache = PredictionCache()
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Get the prediction cache instance."""
+    return prediction_cache
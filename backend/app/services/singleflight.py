@@ -0,0 +1,130 @@
+"""
+Singleflight Service
+
+Request coalescing for identical in-flight work. While a computation for a
+key is running, concurrent callers with the same key await that computation
+instead of starting their own, and all of them receive its result.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app.logger import get_logger
+from app.services.deadlines import DeadlineGroup, current_deadline, deadline_scope
+from app.services.executor import SharedLane, current_work, work_scope
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    Keys are tuples whose first element names the kind of work (for example
+    "decode" or "predict"); counters are kept per kind.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the coalescing layer."""
+        self._in_flight: Dict[Tuple, "asyncio.Task[Any]"] = {}
+        self._deadlines: Dict[Tuple, DeadlineGroup] = {}
+        self._lanes: Dict[Tuple, SharedLane] = {}
+        self._calls: Counter = Counter()
+        self._executions: Counter = Counter()
+        self._coalesced: Counter = Counter()
+
+        logger.info("SingleFlight initialized")
+
+    async def do(self, key: Tuple[Hashable, ...], func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``func`` once for all concurrent callers with the same key.
+
+        The computation runs as its own task, so a caller that is cancelled
+        (e.g. a disconnected client) does not cancel it for the others. It
+        doesn't keep the first caller's scope: its deadline is that of all its
+        callers together, so it is only dropped once every caller's request
+        deadline has lapsed, and its executor work waits in the most urgent
+        lane among its callers.
+
+        Args:
+            key: Coalescing key; the first element names the kind of work
+            func: Coroutine function performing the work
+
+        Returns:
+            Result of the shared computation
+
+        Raises:
+            Exception: Whatever the shared computation raised
+        """
+        kind = key[0]
+        self._calls[kind] += 1
+
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        deadline = self._deadlines.get(key)
+        lane, model_name = current_work()
+
+        # A computation whose callers have all lapsed may already have been dropped
+        if task is not None and task.get_loop() is loop and deadline.reason is None:
+            self._coalesced[kind] += 1
+            deadline.add(current_deadline())
+            self._lanes[key].add(lane)
+            logger.debug(f"Coalesced {kind} request onto in-flight computation")
+        else:
+            self._executions[kind] += 1
+            deadline = DeadlineGroup()
+            deadline.add(current_deadline())
+            shared_lane = SharedLane(lane)
+            with deadline_scope(deadline), work_scope(shared_lane, model_name):
+                task = loop.create_task(func())
+            self._in_flight[key] = task
+            self._deadlines[key] = deadline
+            self._lanes[key] = shared_lane
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple, task: "asyncio.Task[Any]") -> None:
+        """Remove a finished computation so later calls start a new one."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._deadlines[key]
+            del self._lanes[key]
+
+        # Retrieve the exception so it isn't reported as never retrieved when all callers left
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with in-flight count and per-kind call, execution and coalesced counters
+        """
+        kinds = {}
+        for kind in sorted(self._calls):
+            calls = self._calls[kind]
+            kinds[kind] = {
+                "calls": calls,
+                "executions": self._executions[kind],
+                "coalesced": self._coalesced[kind],
+                "coalesced_ratio": round(self._coalesced[kind] / calls, 4) if calls else 0.0,
+            }
+
+        return {
+            "in_flight": len(self._in_flight),
+            "kinds": kinds,
+        }
+
+
+# Singleton instance
+singleflight = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Get the singleflight instance."""
+    return singleflight
@@ -0,0 +1,116 @@
+"""
+Tensor Cache
+
+Second-level prediction cache keyed by a perceptual hash of the preprocessed
+image tensor. Canvas drawings that differ only by a few anti-aliased pixels
+downsample and quantize to the same hash, so near-duplicate inputs reuse an
+earlier prediction instead of running a forward pass.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.logger import get_logger
+from app.services.prediction_cache import LRUCache
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def perceptual_hash(image: np.ndarray, grid_size: int, levels: int) -> bytes:
+    """
+    Hash a preprocessed image by its block-averaged, quantized thumbnail.
+
+    Args:
+        image: Preprocessed image with shape (1, H, W, 1) and values in [0, 1]
+        grid_size: Side length of the thumbnail the image is averaged down to
+        levels: Number of intensity levels each thumbnail pixel is quantized to
+
+    Returns:
+        Digest of the quantized thumbnail
+    """
+    pixels = np.asarray(image, dtype=np.float32).reshape(image.shape[-3], image.shape[-2])
+    height, width = pixels.shape
+
+    # Block means over a grid_size x grid_size partition (blocks differ by at most one pixel)
+    rows = np.linspace(0, height, grid_size + 1).astype(int)
+    cols = np.linspace(0, width, grid_size + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(pixels, rows[:-1], axis=0), cols[:-1], axis=1)
+    thumbnail = sums / np.outer(np.diff(rows), np.diff(cols))
+
+    quantized = np.clip(np.rint(thumbnail * (levels - 1)), 0, levels - 1).astype(np.uint8)
+    return hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+
+
+class TensorCache(LRUCache):
+    """Cache of predictions keyed by a perceptual hash of the preprocessed tensor."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        grid_size: Optional[int] = None,
+        levels: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the tensor cache.
+
+        Args:
+            max_entries: Maximum number of cached predictions (0 disables the cache)
+            max_bytes: Maximum total size of the cached predictions in bytes
+            grid_size: Hash thumbnail side length; smaller values match more loosely
+            levels: Hash intensity levels; fewer levels match more loosely
+        """
+        super().__init__(
+            max_entries=max_entries if max_entries is not None else settings.TENSOR_CACHE_MAX_ENTRIES,
+            max_bytes=max_bytes if max_bytes is not None else settings.TENSOR_CACHE_MAX_BYTES,
+            sizeof=lambda value: len(json.dumps(value, ensure_ascii=False).encode()),
+        )
+        self.grid_size = max(1, min(grid_size or settings.TENSOR_CACHE_GRID_SIZE, settings.IMAGE_SIZE[0]))
+        self.levels = max(2, min(levels or settings.TENSOR_CACHE_LEVELS, 256))
+
+        logger.info(
+            f"TensorCache initialized with max entries: {self.max_entries}, "
+            f"hash precision: {self.grid_size}x{self.grid_size} at {self.levels} levels"
+        )
+
+    def make_key(self, model_service: Any, image: np.ndarray) -> Tuple[str, int, bytes]:
+        """
+        Build the cache key for a preprocessed image.
+
+        Args:
+            model_service: Model service that will serve the request
+            image: Preprocessed image with shape (1, H, W, 1)
+
+        Returns:
+            Tuple of (model name, model generation, perceptual hash)
+        """
+        return model_service.name, model_service.generation, perceptual_hash(image, self.grid_size, self.levels)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with LRU counters, hash precision and inferences saved
+        """
+        stats = super().stats()
+        stats.update({
+            "grid_size": self.grid_size,
+            "levels": self.levels,
+            "inferences_saved": stats["hits"],
+        })
+        return stats
+
+
+# Singleton instance
+tensor_cache = TensorCache()
+
+
+def get_tensor_cache() -> TensorCache:
+    """Get the tensor cache instance."""
+    return tensor_cache
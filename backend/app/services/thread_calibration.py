@@ -0,0 +1,359 @@
+"""
+Thread Calibration
+
+Startup calibration of TensorFlow's intra-op and inter-op thread pools.
+TensorFlow sizes both pools to every core by default, so with several
+server workers on one host each worker's ops compete for all the cores.
+
+Calibration runs the loaded CNN at a few thread settings and batch sizes.
+Each setting is measured in fresh processes, since the pools are fixed once
+TensorFlow's runtime starts, with one process per server worker running at
+the same time so contention between workers is part of the measurement. The
+setting with the best throughput across the batch sizes is persisted to a
+cache file keyed by the host's core count, the worker count, the TensorFlow
+version and the model, so later boots skip the calibration.
+
+Calibrating ahead of time, e.g. when building an image, fills the cache:
+    python -m app.services.thread_calibration saved_models/urdu_cnn_model.h5
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import BASE_DIR, get_settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Minimum time each batch size is run for when measuring a setting
+MEASURE_S = 0.5
+
+
+def available_cores() -> int:
+    """Get the number of cores this process may run on."""
+    return len(os.sched_getaffinity(0))
+
+
+def model_workers() -> int:
+    """Get the number of processes on this host sharing the cores the models run on."""
+    if settings.INFERENCE_PROCESS:
+        # Pinned inference workers each have their cores to themselves
+        return 1 if settings.INFERENCE_PIN_CPUS else max(1, settings.INFERENCE_WORKERS)
+    return max(1, settings.WORKERS)
+
+
+def candidate_settings(cores: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Get the (intra-op, inter-op) thread settings worth measuring.
+
+    Intra-op sizes range from one thread to every core, through each worker's
+    fair share of the cores and half of it.
+
+    Args:
+        cores: Cores available on the host
+        workers: Processes running the models at the same time
+
+    Returns:
+        Candidate (intra-op threads, inter-op threads) pairs
+    """
+    share = max(1, cores // workers)
+    intra_options = sorted({1, max(1, share // 2), share, cores})
+    return [(intra, inter) for intra in intra_options for inter in (1, 2)]
+
+
+def calibration_key(model_path: str, cores: int, workers: int) -> str:
+    """Get the cache key of a calibration: what its result depends on."""
+    import tensorflow as tf
+
+    from app.services.model_service import artifact_version
+
+    batch_sizes = ",".join(map(str, settings.TF_THREAD_CALIBRATION_BATCH_SIZES))
+    return f"cores={cores};workers={workers};tf={tf.__version__};model={artifact_version(model_path)};batch={batch_sizes}"
+
+
+def measure(model_path: str, batch_sizes: List[int]) -> Dict[str, float]:
+    """
+    Measure the throughput of a model at each batch size in this process.
+
+    The thread pools are sized by the TF_INTRA_OP_THREADS and TF_INTER_OP_THREADS
+    settings when the model loads. Timing starts once a line is read from stdin,
+    so concurrent measurements can be started together.
+
+    Args:
+        model_path: Path to the Keras model file
+        batch_sizes: Batch sizes to measure
+
+    Returns:
+        Images per second by batch size
+    """
+    from app.services.inference_backends import KerasBackend
+
+    backend = KerasBackend(batch_sizes=batch_sizes)
+    backend.load(model_path)
+    sample_shape = backend.input_shape[1:]
+    backend.warm_up(sample_shape, batch_sizes, runs=2)
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    images_per_s = {}
+    for batch_size in batch_sizes:
+        batch = np.random.default_rng(batch_size).random((batch_size, *sample_shape), dtype=np.float32)
+        runs = 0
+        start = time.perf_counter()
+        while runs < 3 or time.perf_counter() - start < MEASURE_S:
+            backend.predict(batch)
+            runs += 1
+        images_per_s[str(batch_size)] = runs * batch_size / (time.perf_counter() - start)
+    return images_per_s
+
+
+def measure_setting(model_path: str, intra: int, inter: int, processes: int) -> Dict[str, float]:
+    """
+    Measure one thread setting in concurrent fresh processes.
+
+    Args:
+        model_path: Path to the Keras model file
+        intra: Intra-op threads
+        inter: Inter-op threads
+        processes: Processes measuring at the same time
+
+    Returns:
+        Images per second summed over the processes, by batch size
+    """
+    env = {
+        **os.environ,
+        "TF_THREAD_CALIBRATION": "false",
+        "TF_INTRA_OP_THREADS": str(intra),
+        "TF_INTER_OP_THREADS": str(inter),
+        "LOG_LEVEL": "ERROR",
+        "TF_CPP_MIN_LOG_LEVEL": "2",
+    }
+    command = [sys.executable, "-m", "app.services.thread_calibration", "--measure", model_path]
+    children = [
+        subprocess.Popen(command, cwd=BASE_DIR, env=env, stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(processes)
+    ]
+    try:
+        for child in children:
+            # Skip anything logged while the model loads
+            for line in child.stdout:
+                if line.strip() == "ready":
+                    break
+            else:
+                raise RuntimeError(f"Calibration run with {intra}/{inter} threads failed to load the model")
+        for child in children:
+            child.stdin.write("go\n")
+            child.stdin.flush()
+
+        totals: Dict[str, float] = {}
+        for child in children:
+            output, _ = child.communicate(timeout=300)
+            for batch_size, value in json.loads(output.strip().splitlines()[-1]).items():
+                totals[batch_size] = totals.get(batch_size, 0.0) + value
+        return totals
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.kill()
+
+
+def calibrate(model_path: str, cores: int, workers: int) -> Dict[str, Any]:
+    """
+    Measure every candidate thread setting and pick the best.
+
+    Each setting is scored by its throughput relative to the best setting at
+    each batch size, averaged over the batch sizes, so small batches count as
+    much as large ones.
+
+    Args:
+        model_path: Path to the Keras model file
+        cores: Cores available on the host
+        workers: Processes running the models at the same time
+
+    Returns:
+        The chosen setting and the measurements behind it
+    """
+    processes = min(workers, cores)
+    started = time.perf_counter()
+
+    results = []
+    for intra, inter in candidate_settings(cores, workers):
+        images_per_s = measure_setting(model_path, intra, inter, processes)
+        logger.info(f"Thread calibration: {intra} intra-op / {inter} inter-op threads: "
+                    + ", ".join(f"batch {size}: {value:.0f} img/s" for size, value in images_per_s.items()))
+        results.append({"intra_op_threads": intra, "inter_op_threads": inter, "images_per_s": images_per_s})
+
+    best_by_size = {
+        size: max(result["images_per_s"][size] for result in results) for size in results[0]["images_per_s"]
+    }
+    for result in results:
+        result["score"] = round(float(np.mean(
+            [result["images_per_s"][size] / best for size, best in best_by_size.items()]
+        )), 4)
+
+    best = max(results, key=lambda result: result["score"])
+    return {
+        "intra_op_threads": best["intra_op_threads"],
+        "inter_op_threads": best["inter_op_threads"],
+        "cores": cores,
+        "workers": workers,
+        "duration_s": round(time.perf_counter() - started, 1),
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+
+class ThreadCalibration:
+    """Resolves the TensorFlow thread pool sizes of this process, calibrating them once per host and model."""
+
+    def __init__(self, cache_path: Optional[str] = None) -> None:
+        """
+        Initialize the calibration.
+
+        Args:
+            cache_path: Calibration cache file (defaults to TF_THREAD_CALIBRATION_CACHE)
+        """
+        self.cache_path = Path(cache_path) if cache_path else BASE_DIR / settings.TF_THREAD_CALIBRATION_CACHE
+        self._lock = threading.Lock()
+        self._resolved: Optional[Dict[str, Any]] = None
+        self._defaults: Optional[Dict[str, Any]] = None
+
+    def set_defaults(self, intra: int, inter: int, source: str) -> None:
+        """
+        Use these thread pool sizes instead of the settings when calibration is disabled.
+
+        Args:
+            intra: Intra-op threads
+            inter: Inter-op threads
+            source: Where the sizes came from, reported in stats()
+        """
+        self._defaults = {"intra_op_threads": intra, "inter_op_threads": inter, "source": source}
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """Read the cached calibrations, by key."""
+        try:
+            return json.loads(self.cache_path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable thread calibration cache {self.cache_path}: {str(e)}")
+            return {}
+
+    def lookup(self, model_path: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Get the calibration of a model for this host from the cache, calibrating on a miss.
+
+        Args:
+            model_path: Path to the Keras model file
+
+        Returns:
+            Tuple of (calibration, "cache" or "calibrated")
+        """
+        cores, workers = available_cores(), model_workers()
+        key = calibration_key(model_path, cores, workers)
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Workers booting together wait for the first to calibrate instead of all measuring at once
+        with open(f"{self.cache_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            cache = self._read_cache()
+            if key in cache:
+                return cache[key], "cache"
+
+            logger.info(f"Calibrating TensorFlow thread pools for {cores} cores and {workers} worker(s)...")
+            calibration = calibrate(model_path, cores, workers)
+            cache[key] = calibration
+            temp_path = self.cache_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(cache, indent=2))
+            temp_path.replace(self.cache_path)
+            return calibration, "calibrated"
+
+    def resolve(self, model_path: str) -> Tuple[int, int]:
+        """
+        Get the thread pool sizes to load a Keras model with.
+
+        With TF_THREAD_CALIBRATION enabled, the first model loaded in the
+        process picks the sizes, from the cache or by calibrating; the pools are
+        process-wide, so later models use the same sizes. Otherwise, and if
+        calibration fails, the sizes given to set_defaults() are used, or the
+        TF_INTRA_OP_THREADS and TF_INTER_OP_THREADS settings.
+
+        Args:
+            model_path: Path to the Keras model file being loaded
+
+        Returns:
+            Tuple of (intra-op threads, inter-op threads)
+        """
+        with self._lock:
+            if self._resolved is None:
+                resolved = self._defaults or {
+                    "intra_op_threads": settings.TF_INTRA_OP_THREADS,
+                    "inter_op_threads": settings.TF_INTER_OP_THREADS,
+                    "source": "settings",
+                }
+                if settings.TF_THREAD_CALIBRATION:
+                    try:
+                        calibration, source = self.lookup(model_path)
+                        resolved = {
+                            "intra_op_threads": calibration["intra_op_threads"],
+                            "inter_op_threads": calibration["inter_op_threads"],
+                            "source": source,
+                        }
+                        logger.info(
+                            f"Using {resolved['intra_op_threads']} intra-op and "
+                            f"{resolved['inter_op_threads']} inter-op TensorFlow threads ({source})"
+                        )
+                    except Exception as e:
+                        logger.error(f"Thread calibration failed, using the configured thread pools: {str(e)}")
+                self._resolved = resolved
+            return self._resolved["intra_op_threads"], self._resolved["inter_op_threads"]
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the resolved thread pool sizes.
+
+        Returns:
+            Dictionary with the intra-op and inter-op threads and where they
+            came from ("settings", "cache", "calibrated" or a default's
+            source, such as "pinned"), or None before
+            a Keras model has loaded
+        """
+        return dict(self._resolved) if self._resolved is not None else None
+
+
+# Singleton instance
+thread_calibration = ThreadCalibration()
+
+
+def get_thread_calibration() -> ThreadCalibration:
+    """Get the thread calibration instance."""
+    return thread_calibration
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate TensorFlow thread pools for a Keras model")
+    parser.add_argument("model_path", help="Path to the Keras model file")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.model_path, settings.TF_THREAD_CALIBRATION_BATCH_SIZES)))
+        sys.exit(0)
+
+    calibration, source = get_thread_calibration().lookup(str(Path(args.model_path).resolve()))
+    print(json.dumps({**calibration, "source": source}, indent=2))
@@ -0,0 +1,222 @@
+"""
+Startup Profiler
+
+Reports where cold-start time goes: import time per module, model load time
+(including warmup) and first-inference time.
+
+Usage:
+    python -m app.startup_profile
+    python -m app.startup_profile --models character --top 20 --check
+"""
+
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Module whose import is profiled; it is what every worker imports on spawn
+IMPORT_TARGET = "app.main"
+
+# Heavy modules that must only be imported once a model needs them
+DEFERRED_MODULES = ("tensorflow", "keras", "cv2", "onnxruntime", "tf2onnx")
+
+# Cold-start budgets in milliseconds, enforced by --check and the test suite
+STARTUP_BUDGETS_MS = {
+    "import": 3000.0,
+    "model_load": 30000.0,
+    "first_inference": 500.0,
+}
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> List[Tuple[str, float, float]]:
+    """
+    Parse the output of ``python -X importtime``.
+
+    Args:
+        output: Text written to stderr by the interpreter
+
+    Returns:
+        List of (module, self_ms, cumulative_ms) tuples in import order
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def profile_imports(target: str = IMPORT_TARGET) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter and time every import it triggers.
+
+    Args:
+        target: Module to import
+
+    Returns:
+        Dictionary with the total import time, per-module and per-package
+        times, and the deferred modules the import pulled in
+    """
+    script = (
+        f"import sys, json; import {target}; "
+        f"print(json.dumps([m for m in {list(DEFERRED_MODULES)!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = parse_importtime(result.stderr)
+    packages: Dict[str, float] = defaultdict(float)
+    for name, self_ms, _ in modules:
+        packages[name.split(".")[0]] += self_ms
+
+    total_ms = next((cumulative for name, _, cumulative in modules if name == target), 0.0)
+
+    return {
+        "target": target,
+        "total_ms": total_ms,
+        "modules": sorted(modules, key=lambda module: module[2], reverse=True),
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+        "deferred_imported": json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+def profile_models(names: Optional[Iterable[str]] = None, registry: Optional[Any] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load models and time their load and first inference.
+
+    Args:
+        names: Models to profile (defaults to every configured model)
+        registry: Registry holding the models (defaults to the app's registry)
+
+    Returns:
+        Mapping of model name to its state, load time and first-inference
+        time. Times are None for models without an artifact.
+    """
+    import numpy as np
+
+    from app.config import get_settings
+    from app.services.model_registry import get_model_registry
+
+    settings = get_settings()
+    registry = registry if registry is not None else get_model_registry()
+    results = {}
+
+    for name in names or registry.names():
+        start_time = time.perf_counter()
+        loaded = registry.ensure_loaded(name)
+        load_ms = (time.perf_counter() - start_time) * 1000
+
+        first_inference_ms = None
+        if loaded:
+            sample = np.zeros((1, *settings.IMAGE_SIZE, 1), dtype=np.float32)
+            start_time = time.perf_counter()
+            registry.get(name).predict_batch(sample)
+            first_inference_ms = (time.perf_counter() - start_time) * 1000
+
+        results[name] = {
+            "state": registry.state(name),
+            "backend": settings.INFERENCE_BACKEND,
+            "load_ms": load_ms if loaded else None,
+            "first_inference_ms": first_inference_ms,
+        }
+
+    return results
+
+
+def check_budgets(report: Dict[str, Any], budgets: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    Compare a startup report against the cold-start budgets.
+
+    Args:
+        report: Report with "imports" and "models" sections
+        budgets: Budgets in milliseconds (defaults to STARTUP_BUDGETS_MS)
+
+    Returns:
+        Human-readable budget violations; empty if every budget is met
+    """
+    budgets = budgets or STARTUP_BUDGETS_MS
+    violations = []
+
+    imports = report.get("imports")
+    if imports:
+        if imports["total_ms"] > budgets["import"]:
+            violations.append(
+                f"import {imports['target']}: {imports['total_ms']:.0f}ms > {budgets['import']:.0f}ms"
+            )
+        for module in imports["deferred_imported"]:
+            violations.append(f"import {imports['target']}: pulls in deferred module {module}")
+
+    for name, model in report.get("models", {}).items():
+        for key, budget_key in (("load_ms", "model_load"), ("first_inference_ms", "first_inference")):
+            if model[key] is not None and model[key] > budgets[budget_key]:
+                violations.append(f"{name} {budget_key}: {model[key]:.0f}ms > {budgets[budget_key]:.0f}ms")
+
+    return violations
+
+
+def print_report(report: Dict[str, Any], top: int = 15) -> None:
+    """
+    Print a startup report.
+
+    Args:
+        report: Report with "imports" and "models" sections
+        top: Number of slowest modules to list
+    """
+    imports = report.get("imports")
+    if imports:
+        print(f"Import of {imports['target']}: {imports['total_ms']:.1f}ms")
+        print(f"\n  {'package':<40} {'self ms':>10}")
+        for package, self_ms in list(imports["packages"].items())[:top]:
+            print(f"  {package:<40} {self_ms:>10.1f}")
+        print(f"\n  {'module':<40} {'self ms':>10} {'cumulative ms':>14}")
+        for name, self_ms, cumulative_ms in imports["modules"][:top]:
+            print(f"  {name:<40} {self_ms:>10.1f} {cumulative_ms:>14.1f}")
+        deferred = ", ".join(imports["deferred_imported"]) or "none"
+        print(f"\n  Deferred modules imported: {deferred}")
+
+    models = report.get("models")
+    if models:
+        print(f"\n  {'model':<16} {'state':<10} {'backend':<12} {'load ms':>10} {'first inference ms':>20}")
+        for name, model in models.items():
+            load = f"{model['load_ms']:.1f}" if model["load_ms"] is not None else "-"
+            first = f"{model['first_inference_ms']:.1f}" if model["first_inference_ms"] is not None else "-"
+            print(f"  {name:<16} {model['state']:<10} {model['backend']:<12} {load:>10} {first:>20}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile the cold start of the API")
+    parser.add_argument("--models", type=str, nargs="*", default=None,
+                        help="Models to load and time (defaults to every configured model)")
+    parser.add_argument("--skip-models", action="store_true", help="Only profile imports")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a startup budget is exceeded")
+
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"imports": profile_imports()}
+    if not args.skip_models:
+        report["models"] = profile_models(args.models)
+
+    violations = check_budgets(report)
+
+    print_report(report, top=args.top)
+    for violation in violations:
+        print(f"\nBudget exceeded: {violation}")
+
+    sys.exit(1 if args.check and violations else 0)
@@ -0,0 +1,136 @@
+"""
+Inference Worker Scaling Benchmark
+
+Measures how throughput scales with the number of core-pinned inference
+workers. For each worker count, a fresh pool of engines is started, each
+pinned to its own share of the available cores with its own replica of the
+character CNN, and closed-loop clients send batches through the pool as fast
+as they are answered.
+
+With disjoint cores, throughput should grow close to linearly with the worker
+count, until the workers run out of cores of their own.
+
+Usage:
+    python -m benchmarks.inference_workers --workers 1 2 4 8 --clients 16 --batch-size 8
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep the engines' logs out of the results
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+from benchmarks.serving_profiles import export_model  # noqa: E402
+
+
+def run_clients(backend: Any, clients: int, batch_size: int, duration_s: float) -> Dict[str, float]:
+    """
+    Send batches from concurrent closed-loop clients for a fixed time.
+
+    Args:
+        backend: Loaded remote backend
+        clients: Number of clients
+        batch_size: Images per batch
+        duration_s: How long to send for
+
+    Returns:
+        Throughput and latency percentiles
+    """
+    latencies: List[float] = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration_s
+
+    def client(seed: int) -> None:
+        batch = np.random.default_rng(seed).random((batch_size, 64, 64, 1), dtype=np.float32)
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            backend.predict(batch)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "images_per_s": len(latencies) * batch_size / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def measure_workers(model_path: str, workers: int, pin_cpus: bool,
+                    clients: int, batch_size: int, duration_s: float) -> Dict[str, Any]:
+    """
+    Measure a fresh pool of inference workers.
+
+    Args:
+        model_path: Path to the Keras model file
+        workers: Number of inference workers
+        pin_cpus: Whether to pin each worker to its own cores
+        clients: Number of concurrent clients
+        batch_size: Images per batch
+        duration_s: How long to send for
+
+    Returns:
+        Throughput, latency percentiles and each worker's utilization
+    """
+    from app.services.inference_process import InferencePool, RemoteBackend
+
+    pool = InferencePool(workers=workers, pin_cpus=pin_cpus)
+    pool.start()
+    try:
+        backend = RemoteBackend("keras", process=pool)
+        backend.load(model_path)
+        backend.warm_up((64, 64, 1), [batch_size], runs=2)
+
+        result = run_clients(backend, clients, batch_size, duration_s)
+        result["utilization"] = [worker["engine"]["utilization"] for worker in pool.stats()["workers"]]
+        return result
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure throughput scaling with core-pinned inference workers")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[n for n in (1, 2, 4, 8) if n <= len(os.sched_getaffinity(0))] or [1],
+                        help="Worker counts to measure")
+    parser.add_argument("--no-pin", action="store_true", help="Leave the workers unpinned, for comparison")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per batch")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to measure each worker count for")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = export_model(Path(directory))
+
+        print(f"{'workers':>8} {'img/s':>10} {'speedup':>8} {'p50 ms':>10} {'p95 ms':>10}  utilization")
+        baseline = None
+        for workers in args.workers:
+            result = measure_workers(model_path, workers, not args.no_pin,
+                                     args.clients, args.batch_size, args.duration)
+            baseline = baseline or result["images_per_s"]
+            print(
+                f"{workers:>8} {result['images_per_s']:>10.1f} {result['images_per_s'] / baseline:>8.2f} "
+                f"{result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f}  "
+                + " ".join(f"{value:.2f}" for value in result["utilization"])
+            )
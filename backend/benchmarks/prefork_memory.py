@@ -0,0 +1,186 @@
+"""
+Pre-fork Memory Benchmark
+
+Measures the total memory of `python -m app.server` at several worker counts,
+with the model weights loaded once in the parent and shared by the workers,
+and with each worker loading its own copy.
+
+Summed RSS counts a shared page once per process that maps it, so it grows
+linearly either way; PSS (proportional set size) splits each shared page
+between the processes sharing it and is the memory the server actually uses.
+
+Usage:
+    python -m benchmarks.prefork_memory --workers 1 2 4 --hidden-units 2048
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.numpy_cnn import NumpyCNN
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MODEL_NAMES = ("bench_a", "bench_b")
+NUM_CLASSES = 40
+
+
+def export_networks(directory: Path, hidden_units: int) -> Dict[str, Dict[str, str]]:
+    """
+    Export one NumPy network per benchmark model and return EXTRA_MODELS for them.
+
+    Args:
+        directory: Directory to write the .npz files to
+        hidden_units: Width of the hidden layer; sets the size of the weights
+
+    Returns:
+        EXTRA_MODELS configuration
+    """
+    rng = np.random.default_rng(0)
+    configs = {}
+    for name in MODEL_NAMES:
+        network = NumpyCNN(
+            layers=[
+                {"op": "flatten", "input_shape": [None, 64, 64, 1], "output_shape": [None, 4096]},
+                {"op": "dense", "kernel": "hidden_kernel", "bias": "hidden_bias", "activation": "relu",
+                 "input_shape": [None, 4096], "output_shape": [None, hidden_units]},
+                {"op": "dense", "kernel": "kernel", "bias": "bias", "activation": "softmax",
+                 "input_shape": [None, hidden_units], "output_shape": [None, NUM_CLASSES]},
+            ],
+            weights={
+                "hidden_kernel": rng.standard_normal((4096, hidden_units), dtype=np.float32) * 0.01,
+                "hidden_bias": np.zeros(hidden_units, dtype=np.float32),
+                "kernel": rng.standard_normal((hidden_units, NUM_CLASSES), dtype=np.float32) * 0.01,
+                "bias": np.zeros(NUM_CLASSES, dtype=np.float32),
+            },
+        )
+        network.save(str(directory / f"{name}.npz"))
+        configs[name] = {"model_path": str(directory / f"{name}.h5")}
+    return configs
+
+
+def free_port() -> int:
+    """Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree(pid: int) -> List[int]:
+    """Get a process and its direct children."""
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [pid, *map(int, children)]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Read the RSS and PSS of a process from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("Rss", "Pss"):
+            fields[key.lower()] = int(value.split()[0])
+    return fields
+
+
+def wait_until_ready(port: int, workers: int, timeout_s: float = 120.0) -> None:
+    """Wait until enough consecutive /ready probes succeed that every worker has answered."""
+    deadline = time.monotonic() + timeout_s
+    streak = 0
+    while streak < workers * 8:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Server did not become ready")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=5):
+                streak += 1
+        except (urllib.error.URLError, ConnectionError):
+            streak = 0
+            time.sleep(0.2)
+
+
+def send_predictions(port: int, count: int) -> None:
+    """Send canvas predictions to every benchmark model so the workers touch the weights."""
+    canvas = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+    body = json.dumps({"image_data": canvas}).encode()
+    for i in range(count):
+        name = MODEL_NAMES[i % len(MODEL_NAMES)]
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/api/v1/models/{name}/canvas",
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=30):
+            pass
+
+
+def measure(workers: int, share: bool, env: Dict[str, str], requests: int) -> Dict[str, float]:
+    """
+    Start the server, exercise it and measure its memory.
+
+    Returns:
+        Total RSS and PSS in MB over the parent and its workers
+    """
+    port = free_port()
+    command = [sys.executable, "-m", "app.server", "--workers", str(workers),
+               "--host", "127.0.0.1", "--port", str(port)]
+    if not share:
+        command.append("--no-share")
+
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, workers)
+        send_predictions(port, requests)
+        time.sleep(1.0)
+
+        totals = {"rss": 0, "pss": 0}
+        for pid in process_tree(server.pid):
+            for key, value in memory_kb(pid).items():
+                totals[key] += value
+        return {key: value / 1024 for key, value in totals.items()}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare server memory with shared and per-worker model weights")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to measure")
+    parser.add_argument("--hidden-units", type=int, default=2048,
+                        help="Hidden layer width of the benchmark models (2048 is 32 MB of weights each)")
+    parser.add_argument("--requests", type=int, default=64, help="Predictions sent before measuring")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configs = export_networks(Path(directory), args.hidden_units)
+        env = {
+            **os.environ,
+            "INFERENCE_BACKEND": "numpy",
+            "EXTRA_MODELS": json.dumps(configs),
+            "PRELOAD_MODELS": json.dumps(list(MODEL_NAMES)),
+            "PREDICTION_CACHE_MAX_ENTRIES": "0",
+            "TENSOR_CACHE_MAX_ENTRIES": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+
+        print(f"{'workers':>8} {'weights':>12} {'RSS MB':>10} {'PSS MB':>10}")
+        for workers in args.workers:
+            for share in (True, False):
+                result = measure(workers, share, env, args.requests)
+                mode = "shared" if share else "per-worker"
+                print(f"{workers:>8} {mode:>12} {result['rss']:>10.1f} {result['pss']:>10.1f}")
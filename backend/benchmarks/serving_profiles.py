@@ -0,0 +1,160 @@
+"""
+Serving Profile Benchmark
+
+Measures the latency/throughput trade-off of each performance profile. Every
+profile runs in its own process, since TensorFlow's thread pools are fixed
+once its runtime starts, and serves the character CNN through the batch
+scheduler and executor at increasing numbers of concurrent clients, each
+sending its next request as soon as the previous one is answered.
+
+Low concurrency shows the latency a single user sees; high concurrency shows
+the throughput the profile sustains and the latency it costs.
+
+Usage:
+    python -m benchmarks.serving_profiles --profiles default latency throughput --concurrency 1 4 16 64
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def export_model(directory: Path) -> str:
+    """
+    Save an untrained character CNN; its forward pass costs the same as a trained one's.
+
+    Args:
+        directory: Directory to write the model to
+
+    Returns:
+        Path to the saved model
+    """
+    from app.config import URDU_CHARACTERS
+    from app.models.cnn_model import create_cnn_model
+
+    model_path = directory / "urdu_cnn_model.h5"
+    create_cnn_model(num_classes=len(URDU_CHARACTERS)).save(str(model_path))
+    return str(model_path)
+
+
+async def run_clients(service: Any, concurrency: int, requests: int) -> Dict[str, float]:
+    """
+    Serve requests from concurrent closed-loop clients through the batch scheduler.
+
+    Args:
+        service: Loaded model service
+        concurrency: Number of clients
+        requests: Requests sent by each client
+
+    Returns:
+        Throughput, latency percentiles and mean batch size
+    """
+    from app.services.batching import get_batch_scheduler
+
+    scheduler = get_batch_scheduler()
+    rng = np.random.default_rng(concurrency)
+    latencies: List[float] = []
+    batch_sizes: List[int] = []
+
+    async def client() -> None:
+        for _ in range(requests):
+            image = rng.random((1, 64, 64, 1), dtype=np.float32)
+            start = time.perf_counter()
+            result = await scheduler.submit(service, image)
+            latencies.append((time.perf_counter() - start) * 1000)
+            batch_sizes.append(result[-1])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "mean_batch_size": float(np.mean(batch_sizes)),
+    }
+
+
+def measure_profile(concurrency_levels: List[int], requests: int) -> List[Dict[str, float]]:
+    """
+    Measure the profile selected in this process's environment.
+
+    Args:
+        concurrency_levels: Numbers of concurrent clients to measure
+        requests: Requests sent by each client at every level
+
+    Returns:
+        One result per concurrency level
+    """
+    from app.services.model_registry import get_model_registry
+
+    registry = get_model_registry()
+    if not registry.ensure_loaded("character"):
+        raise RuntimeError("The benchmark model failed to load")
+    service = registry.get("character")
+
+    # One untimed round so the first level doesn't pay for thread pool startup
+    asyncio.run(run_clients(service, max(concurrency_levels), 2))
+    return [asyncio.run(run_clients(service, concurrency, requests)) for concurrency in concurrency_levels]
+
+
+def run_profile(profile: str, model_path: str, concurrency_levels: List[int], requests: int) -> List[Dict[str, float]]:
+    """Measure a profile in a fresh process."""
+    env = {
+        **os.environ,
+        "PERFORMANCE_PROFILE": "" if profile == "default" else profile,
+        "MODEL_PATH": model_path,
+        "PRELOAD_MODELS": json.dumps(["character"]),
+        "INFERENCE_BACKEND": "keras",
+        # Results go to stdout, so keep the log quiet whatever the profile's verbosity
+        "LOG_LEVEL": "ERROR",
+        "TF_CPP_MIN_LOG_LEVEL": "2",
+    }
+    command = [sys.executable, "-m", "benchmarks.serving_profiles", "--measure",
+               "--concurrency", *map(str, concurrency_levels), "--requests", str(requests)]
+    output = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the latency/throughput trade-off of performance profiles")
+    parser.add_argument("--profiles", nargs="+", default=["default", "latency", "throughput"],
+                        help="Profiles to measure (default uses no profile)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="Numbers of concurrent clients")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per client at each level")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure_profile(args.concurrency, args.requests)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = export_model(Path(directory))
+
+        print(f"{'profile':>10} {'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'batch':>8}")
+        for profile in args.profiles:
+            for result in run_profile(profile, model_path, args.concurrency, args.requests):
+                print(
+                    f"{profile:>10} {result['concurrency']:>8} {result['throughput']:>10.1f} "
+                    f"{result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['mean_batch_size']:>8.1f}"
+                )
@@ -26,6 +26,7 @@ from ml.preprocess import (
     check_dataset_structure,
     get_dataset_paths,
     load_split_dataset,
+    processed_data_dir,
     save_class_mapping,
     save_processed_data,
 )
@@ -49,7 +50,7 @@ URDU_DIGITS = {
 
 def train_digit_model(
     data_dir: str = "data/raw",
-    processed_dir: str = "data/processed/digits",
+    processed_dir: str = processed_data_dir("digits"),
     model_save_path: str = "saved_models/urdu_digit_cnn_model.h5",
     class_labels_path: str = "saved_models/digit_class_labels.json",
     image_size: int = 64,
@@ -314,7 +315,7 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Train Urdu digit recognition model")
     parser.add_argument("--data-dir", type=str, default="data/raw", help="Path to raw dataset base directory")
-    parser.add_argument("--processed-dir", type=str, default="data/processed/digits", help="Path for processed data")
+    parser.add_argument("--processed-dir", type=str, default=processed_data_dir("digits"), help="Path for processed data")
     parser.add_argument("--model-path", type=str, default="saved_models/urdu_digit_cnn_model.h5", help="Model save path")
     parser.add_argument("--labels-path", type=str, default="saved_models/digit_class_labels.json", help="Class labels path")
     parser.add_argument("--image-size", type=int, default=64, help="Image size")
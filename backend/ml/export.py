@@ -0,0 +1,373 @@
+"""
+Model Export
+
+Convert trained Keras models to the artifacts loaded by the non-Keras
+inference backends (TFLite, ONNX Runtime and NumPy), and verify that the
+exported models produce the same outputs as the Keras model.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.logger import setup_logger
+from app.models.numpy_cnn import ACTIVATIONS, NumpyCNN
+from app.services.inference_backends import create_backend, get_backend_class
+
+logger = setup_logger(name="ml_export", log_level="INFO", log_file="logs/training.log")
+settings = get_settings()
+
+# Default Keras model path for each served model
+MODEL_PATHS = {name: config.model_path_resolved for name, config in settings.model_configs.items()}
+
+EXPORT_FORMATS = ["tflite", "onnxruntime", "numpy"]
+
+
+def export_tflite(model, output_path: str) -> None:
+    """
+    Convert a Keras model to a TFLite flatbuffer.
+
+    Args:
+        model: Loaded Keras model
+        output_path: Path to write the .tflite file
+    """
+    import tensorflow as tf
+
+    logger.info(f"Converting model to TFLite: {output_path}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    tflite_model = converter.convert()
+
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+
+
+def export_onnx(model, output_path: str, opset: int = 13) -> None:
+    """
+    Convert a Keras model to ONNX.
+
+    Args:
+        model: Loaded Keras model
+        output_path: Path to write the .onnx file
+        opset: ONNX opset version
+    """
+    import tensorflow as tf
+
+    try:
+        import tf2onnx
+    except ImportError:
+        raise RuntimeError("tf2onnx is not installed. Install it with: pip install tf2onnx")
+
+    logger.info(f"Converting model to ONNX (opset {opset}): {output_path}")
+
+    input_signature = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=opset, output_path=output_path)
+
+
+def _output_shape(layer) -> List[Any]:
+    """Get a layer's output shape as a JSON-serializable list."""
+    return [None if d is None else int(d) for d in layer.output.shape]
+
+
+def _activation_name(layer) -> str:
+    """Get the name of a layer's activation function."""
+    name = getattr(layer.activation, "__name__", str(layer.activation))
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation '{name}' in layer {layer.name}")
+    return name
+
+
+def fold_keras_model(model) -> NumpyCNN:
+    """
+    Convert a Keras model into a NumPy network for inference.
+
+    BatchNormalization layers are folded into the kernel and bias of the
+    preceding Conv2D or Dense layer, Activation layers are fused into the
+    preceding operation, and Dropout layers are removed.
+
+    Args:
+        model: Loaded Keras model made of a single chain of supported layers
+
+    Returns:
+        NumPy network with the same inference-mode outputs
+
+    Raises:
+        ValueError: If the model contains an unsupported layer or configuration
+    """
+    layers: List[Dict[str, Any]] = []
+    weights: Dict[str, np.ndarray] = {}
+
+    def add_weights(layer_index: int, **arrays: np.ndarray) -> Dict[str, str]:
+        keys = {}
+        for name, array in arrays.items():
+            keys[name] = f"{layer_index}_{name}"
+            weights[keys[name]] = np.asarray(array, dtype=np.float32)
+        return keys
+
+    input_shape = [None if d is None else int(d) for d in model.input_shape]
+
+    for layer in model.layers:
+        layer_type = type(layer).__name__
+        previous = layers[-1] if layers else None
+
+        if layer_type in ("InputLayer", "Dropout"):
+            continue
+
+        if layer_type == "Conv2D":
+            if tuple(layer.strides) != (1, 1) or tuple(layer.dilation_rate) != (1, 1) or layer.groups != 1:
+                raise ValueError(f"Only stride-1, undilated, ungrouped convolutions are supported: {layer.name}")
+            kernel, bias = layer.get_weights() if layer.use_bias else (layer.get_weights()[0], None)
+            if bias is None:
+                bias = np.zeros(kernel.shape[-1], dtype=np.float32)
+            layers.append({
+                "op": "conv2d",
+                "padding": layer.padding,
+                "activation": _activation_name(layer),
+                **add_weights(len(layers), kernel=kernel, bias=bias),
+            })
+
+        elif layer_type == "Dense":
+            kernel, bias = layer.get_weights() if layer.use_bias else (layer.get_weights()[0], None)
+            if bias is None:
+                bias = np.zeros(kernel.shape[-1], dtype=np.float32)
+            layers.append({
+                "op": "dense",
+                "activation": _activation_name(layer),
+                **add_weights(len(layers), kernel=kernel, bias=bias),
+            })
+
+        elif layer_type == "BatchNormalization":
+            gamma = layer.gamma.numpy() if layer.scale else 1.0
+            beta = layer.beta.numpy() if layer.center else 0.0
+            scale = gamma / np.sqrt(layer.moving_variance.numpy() + layer.epsilon)
+            offset = beta - layer.moving_mean.numpy() * scale
+
+            if previous and previous["op"] in ("conv2d", "dense") and previous["activation"] == "linear":
+                # y = (x @ W + b) * scale + offset = x @ (W * scale) + (b * scale + offset)
+                weights[previous["kernel"]] = weights[previous["kernel"]] * scale
+                weights[previous["bias"]] = weights[previous["bias"]] * scale + offset
+                previous["output_shape"] = _output_shape(layer)
+                continue
+
+            layers.append({"op": "scale", **add_weights(len(layers), scale=scale, offset=offset)})
+
+        elif layer_type in ("Activation", "ReLU", "Softmax"):
+            activation = layer_type.lower() if layer_type != "Activation" else _activation_name(layer)
+            if previous and previous.get("activation", "linear") == "linear":
+                previous["activation"] = activation
+                continue
+            layers.append({"op": "activation", "activation": activation})
+
+        elif layer_type == "MaxPooling2D":
+            if tuple(layer.strides) != tuple(layer.pool_size) or layer.padding != "valid":
+                raise ValueError(f"Only non-overlapping valid max pooling is supported: {layer.name}")
+            layers.append({"op": "max_pool2d", "pool_size": list(layer.pool_size)})
+
+        elif layer_type == "Flatten":
+            layers.append({"op": "flatten"})
+
+        else:
+            raise ValueError(f"Unsupported layer type for NumPy export: {layer_type} ({layer.name})")
+
+        layers[-1]["output_shape"] = _output_shape(layer)
+
+    if layers:
+        layers[0]["input_shape"] = input_shape
+
+    return NumpyCNN(layers, weights)
+
+
+def export_numpy(model, output_path: str) -> None:
+    """
+    Export a Keras model as NumPy weights with BatchNorm folded.
+
+    Args:
+        model: Loaded Keras model
+        output_path: Path to write the .npz file
+    """
+    logger.info(f"Folding model for NumPy inference: {output_path}")
+
+    network = fold_keras_model(model)
+    network.save(output_path)
+
+    logger.info(f"NumPy network: {len(network.layers)} operations (from {len(model.layers)} Keras layers)")
+
+
+EXPORTERS: Dict[str, Callable] = {
+    "tflite": export_tflite,
+    "onnxruntime": export_onnx,
+    "numpy": export_numpy,
+}
+
+
+def measure_latency(predict_fn: Callable[[np.ndarray], np.ndarray], image: np.ndarray, runs: int = 50) -> float:
+    """
+    Measure median single-image latency of a predict function.
+
+    Args:
+        predict_fn: Function running a forward pass
+        image: Single preprocessed image with shape (1, H, W, C)
+        runs: Number of timed runs after warmup
+
+    Returns:
+        Median latency in milliseconds
+    """
+    for _ in range(min(5, runs)):
+        predict_fn(image)
+
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        predict_fn(image)
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return float(np.median(timings))
+
+
+def verify_export(
+    model,
+    backend_name: str,
+    artifact_path: str,
+    inputs: np.ndarray,
+    atol: float,
+) -> Dict[str, float]:
+    """
+    Compare an exported artifact against the Keras model.
+
+    The artifact is loaded through the same backend class the API uses, so
+    the serving code path is what gets verified.
+
+    Args:
+        model: Loaded Keras model
+        backend_name: Backend used to load the artifact
+        artifact_path: Path to the exported artifact
+        inputs: Input batch to compare on
+        atol: Maximum allowed absolute difference between probabilities
+
+    Returns:
+        Dictionary with max_abs_diff, top1_agreement and passed
+    """
+    backend = create_backend(backend_name)
+    backend.load(artifact_path)
+
+    expected = np.asarray(model(inputs, training=False))
+    actual = backend.predict(inputs)
+
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    top1_agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+
+    return {
+        "max_abs_diff": max_abs_diff,
+        "top1_agreement": top1_agreement,
+        "passed": max_abs_diff <= atol and top1_agreement == 1.0,
+    }
+
+
+def export_model(
+    model_path: str,
+    formats: List[str],
+    atol: float = 1e-4,
+    num_samples: int = 64,
+    seed: int = 42,
+    latency_runs: int = 50,
+) -> bool:
+    """
+    Export a Keras model to the given backend formats and verify each artifact.
+
+    Artifacts that fail verification are deleted so they can't be served.
+
+    Args:
+        model_path: Path to the Keras model file
+        formats: Backend names to export for
+        atol: Maximum allowed absolute difference between probabilities
+        num_samples: Number of random inputs used for verification
+        seed: Random seed for the verification inputs
+        latency_runs: Number of timed runs for each latency measurement
+
+    Returns:
+        True if every export passed verification
+    """
+    from tensorflow import keras
+
+    logger.info("=" * 60)
+    logger.info(f"Exporting model: {model_path}")
+    logger.info("=" * 60)
+
+    model = keras.models.load_model(model_path)
+    rng = np.random.default_rng(seed)
+    inputs = rng.random((num_samples, *model.input_shape[1:]), dtype=np.float32)
+
+    keras_backend = create_backend("keras")
+    keras_backend.load(model_path)
+    keras_latency = measure_latency(keras_backend.predict, inputs[:1], latency_runs)
+    model_predict_latency = measure_latency(lambda x: model.predict(x, verbose=0), inputs[:1], latency_runs)
+    logger.info(f"keras (Model.predict) single-image latency: {model_predict_latency:.3f}ms")
+    logger.info(f"keras (direct call) single-image latency: {keras_latency:.3f}ms")
+
+    all_passed = True
+    for backend_name in formats:
+        artifact_path = get_backend_class(backend_name).artifact_path(model_path)
+
+        try:
+            EXPORTERS[backend_name](model, artifact_path)
+        except Exception as e:
+            logger.error(f"{backend_name} export failed: {str(e)}")
+            all_passed = False
+            continue
+
+        result = verify_export(model, backend_name, artifact_path, inputs, atol)
+        size_mb = os.path.getsize(artifact_path) / 1024 / 1024
+
+        logger.info(
+            f"{backend_name}: max abs diff {result['max_abs_diff']:.2e}, "
+            f"top-1 agreement {result['top1_agreement']:.2%}, size {size_mb:.2f} MB"
+        )
+
+        if not result["passed"]:
+            logger.error(f"{backend_name} outputs do not match Keras (atol={atol}); removing {artifact_path}")
+            os.remove(artifact_path)
+            all_passed = False
+            continue
+
+        backend = create_backend(backend_name)
+        backend.load(artifact_path)
+        latency = measure_latency(backend.predict, inputs[:1], latency_runs)
+        logger.info(
+            f"{backend_name} single-image latency: {latency:.3f}ms "
+            f"({model_predict_latency / latency:.1f}x faster than Model.predict)"
+        )
+        logger.info(f"{backend_name} artifact saved to: {artifact_path}")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export trained models for the TFLite, ONNX Runtime and NumPy backends")
+    parser.add_argument("--model", type=str, default="character", choices=list(MODEL_PATHS),
+                        help="Which served model to export")
+    parser.add_argument("--model-path", type=str, default=None,
+                        help="Keras model path (defaults to the configured path for --model)")
+    parser.add_argument("--formats", type=str, nargs="+", default=EXPORT_FORMATS, choices=EXPORT_FORMATS,
+                        help="Backends to export for")
+    parser.add_argument("--atol", type=float, default=1e-4, help="Maximum allowed absolute output difference")
+    parser.add_argument("--samples", type=int, default=64, help="Number of random inputs used for verification")
+
+    args = parser.parse_args()
+
+    model_path = args.model_path or str(MODEL_PATHS[args.model])
+    if not os.path.exists(model_path):
+        logger.error(f"Model file not found at: {model_path}")
+        sys.exit(1)
+
+    passed = export_model(model_path, args.formats, atol=args.atol, num_samples=args.samples)
+    sys.exit(0 if passed else 1)
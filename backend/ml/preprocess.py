@@ -18,15 +18,30 @@ from sklearn.model_selection import train_test_split
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.config import get_settings
 from app.logger import setup_logger
 
 logger = setup_logger(name="ml_preprocess", log_level="INFO", log_file="logs/training.log")
+settings = get_settings()
 
 
 # Supported image extensions
 IMAGE_EXTENSIONS = ["*.png", "*.jpg", "*.jpeg", "*.bmp"]
 
 
+def processed_data_dir(dataset_type: str) -> str:
+    """
+    Get the directory a dataset type's processed data is saved to and loaded from.
+
+    Args:
+        dataset_type: Type of dataset ('characters' or 'digits')
+
+    Returns:
+        Processed data directory, relative to the backend directory
+    """
+    return settings.DIGIT_PROCESSED_DATA_DIR if dataset_type == "digits" else settings.PROCESSED_DATA_DIR
+
+
 def get_image_files(directory: Path) -> List[Path]:
     """
     Get all image files from a directory.
@@ -485,7 +500,8 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Preprocess Urdu character dataset")
     parser.add_argument("--data-dir", type=str, default="data/raw", help="Path to raw dataset base directory")
-    parser.add_argument("--output-dir", type=str, default="data/processed", help="Path to save processed data")
+    parser.add_argument("--output-dir", type=str, default=None,
+                       help="Path to save processed data (default: where the training scripts load it from)")
     parser.add_argument("--image-size", type=int, default=64, help="Target image size")
     parser.add_argument("--dataset-type", type=str, default="characters",
                        choices=["characters", "digits"], help="Dataset type to preprocess")
@@ -513,8 +529,11 @@ if __name__ == "__main__":
         images = preprocess_images(images)
         X_train, X_val, X_test, y_train, y_val, y_test = split_dataset(images, labels)
 
-    # Create output directory based on dataset type
-    output_dir = Path(args.output_dir) / args.dataset_type if args.use_split else Path(args.output_dir)
+    # Default to the directory the dataset's training script loads processed data from
+    if args.output_dir is None:
+        output_dir = Path(processed_data_dir(args.dataset_type))
+    else:
+        output_dir = Path(args.output_dir) / args.dataset_type if args.use_split else Path(args.output_dir)
 
     # Save
     save_processed_data(X_train, X_val, X_test, y_train, y_val, y_test, str(output_dir))
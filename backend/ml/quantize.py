@@ -0,0 +1,251 @@
+"""
+Post-Training Quantization
+
+Quantize a trained character or digit model to INT8 TFLite using a
+calibration sample from the processed dataset, and only keep the artifact
+if its test accuracy stays within a configurable drop of the float model.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import BASE_DIR, get_settings
+from app.logger import setup_logger
+from app.services.inference_backends import TFLiteInt8Backend
+from ml.preprocess import load_processed_data
+
+logger = setup_logger(name="ml_quantize", log_level="INFO", log_file="logs/training.log")
+settings = get_settings()
+
+# Default Keras model path and processed data directory for each served model,
+# from the same settings the training scripts write the processed data to
+MODEL_DEFAULTS = {
+    name: (config.model_path_resolved, config.processed_data_dir_resolved or BASE_DIR / settings.PROCESSED_DATA_DIR)
+    for name, config in settings.model_configs.items()
+}
+
+
+def ensure_channel_dim(images: np.ndarray) -> np.ndarray:
+    """Add a trailing channel dimension to (N, H, W) image arrays."""
+    images = images.astype(np.float32, copy=False)
+    return images[..., np.newaxis] if images.ndim == 3 else images
+
+
+def sample_calibration_set(X_train: np.ndarray, num_samples: int, seed: int = 42) -> np.ndarray:
+    """
+    Draw a random calibration sample from the training split.
+
+    Args:
+        X_train: Training images
+        num_samples: Number of calibration images
+        seed: Random seed
+
+    Returns:
+        Calibration images
+    """
+    rng = np.random.default_rng(seed)
+    indices = rng.choice(len(X_train), size=min(num_samples, len(X_train)), replace=False)
+    return ensure_channel_dim(X_train[indices])
+
+
+def quantize_to_int8(model, calibration_images: np.ndarray) -> bytes:
+    """
+    Convert a Keras model to a fully INT8-quantized TFLite flatbuffer.
+
+    Weights and activations are quantized; the input and output tensors stay
+    float32 so the serving layer can feed the same preprocessed images.
+
+    Args:
+        model: Loaded Keras model
+        calibration_images: Images used to calibrate activation ranges
+
+    Returns:
+        TFLite flatbuffer bytes
+    """
+    import tensorflow as tf
+
+    logger.info(f"Quantizing model to INT8 with {len(calibration_images)} calibration images")
+
+    def representative_dataset() -> Iterator[List[np.ndarray]]:
+        for image in calibration_images:
+            yield [image[np.newaxis, ...]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    return converter.convert()
+
+
+def top1_accuracy(predict_fn, X: np.ndarray, y: np.ndarray, batch_size: int = 256) -> float:
+    """
+    Compute top-1 accuracy of a predict function.
+
+    Args:
+        predict_fn: Function mapping an image batch to class probabilities
+        X: Images
+        y: Integer labels
+        batch_size: Evaluation batch size
+
+    Returns:
+        Top-1 accuracy in [0, 1]
+    """
+    correct = 0
+    for start in range(0, len(X), batch_size):
+        probs = predict_fn(X[start:start + batch_size])
+        correct += int(np.sum(np.argmax(probs, axis=1) == y[start:start + batch_size]))
+    return correct / len(X)
+
+
+def per_image_latency_ms(predict_fn, X: np.ndarray, runs: int = 100) -> float:
+    """
+    Measure median single-image latency of a predict function.
+
+    Args:
+        predict_fn: Function mapping an image batch to class probabilities
+        X: Images to time on
+        runs: Number of timed single-image predictions
+
+    Returns:
+        Median latency in milliseconds
+    """
+    predict_fn(X[:1])
+
+    timings = []
+    for i in range(runs):
+        image = X[i % len(X)][np.newaxis, ...]
+        start_time = time.perf_counter()
+        predict_fn(image)
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return float(np.median(timings))
+
+
+def quantize_model(
+    model_path: str,
+    data_dir: str,
+    output_path: str,
+    calibration_samples: int = 500,
+    max_accuracy_drop: float = 0.01,
+    latency_runs: int = 100,
+) -> Dict[str, float]:
+    """
+    Quantize a model and write the artifact only if it passes the accuracy gate.
+
+    Args:
+        model_path: Path to the float Keras model
+        data_dir: Processed data directory (see ml.preprocess)
+        output_path: Path for the INT8 TFLite artifact
+        calibration_samples: Number of training images used for calibration
+        max_accuracy_drop: Maximum allowed top-1 accuracy drop (absolute, 0-1)
+        latency_runs: Number of timed single-image predictions per model
+
+    Returns:
+        Report with accuracies, latencies, sizes and whether the gate passed
+    """
+    from tensorflow import keras
+
+    logger.info("=" * 60)
+    logger.info("POST-TRAINING INT8 QUANTIZATION")
+    logger.info("=" * 60)
+
+    model = keras.models.load_model(model_path)
+    X_train, _, X_test, _, _, y_test = load_processed_data(data_dir)
+    X_test = ensure_channel_dim(X_test)
+    y_test = np.asarray(y_test).astype(np.int64)
+
+    calibration_images = sample_calibration_set(X_train, calibration_samples)
+    tflite_model = quantize_to_int8(model, calibration_images)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        candidate_path = os.path.join(tmp_dir, Path(output_path).name)
+        with open(candidate_path, "wb") as f:
+            f.write(tflite_model)
+
+        int8_backend = TFLiteInt8Backend()
+        int8_backend.load(candidate_path)
+
+        def float_predict(images: np.ndarray) -> np.ndarray:
+            return np.asarray(model(images, training=False))
+
+        logger.info(f"Evaluating on {len(X_test)} test images...")
+        float_accuracy = top1_accuracy(float_predict, X_test, y_test)
+        int8_accuracy = top1_accuracy(int8_backend.predict, X_test, y_test)
+
+        report = {
+            "float_accuracy": float_accuracy,
+            "int8_accuracy": int8_accuracy,
+            "accuracy_drop": float_accuracy - int8_accuracy,
+            "float_latency_ms": per_image_latency_ms(float_predict, X_test, latency_runs),
+            "int8_latency_ms": per_image_latency_ms(int8_backend.predict, X_test, latency_runs),
+            "float_size_mb": os.path.getsize(model_path) / 1024 / 1024,
+            "int8_size_mb": os.path.getsize(candidate_path) / 1024 / 1024,
+        }
+        report["passed"] = report["accuracy_drop"] <= max_accuracy_drop
+
+        logger.info("=" * 60)
+        logger.info("QUANTIZATION REPORT")
+        logger.info("=" * 60)
+        logger.info(f"Top-1 accuracy - float: {float_accuracy:.4f}, int8: {int8_accuracy:.4f} "
+                    f"(drop {report['accuracy_drop']:.4f}, allowed {max_accuracy_drop:.4f})")
+        logger.info(f"Per-image latency - float: {report['float_latency_ms']:.3f}ms, "
+                    f"int8: {report['int8_latency_ms']:.3f}ms")
+        logger.info(f"Model size - float: {report['float_size_mb']:.2f} MB, int8: {report['int8_size_mb']:.2f} MB")
+
+        if not report["passed"]:
+            logger.error("Accuracy drop exceeds the allowed threshold; INT8 artifact NOT written")
+            return report
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(candidate_path, output_path)
+
+    logger.info(f"INT8 artifact saved to: {output_path}")
+    logger.info("Serve it with INFERENCE_BACKEND=tflite_int8")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Quantize a trained model to INT8 TFLite with an accuracy gate")
+    parser.add_argument("--model", type=str, default="character", choices=list(MODEL_DEFAULTS),
+                        help="Which served model to quantize")
+    parser.add_argument("--model-path", type=str, default=None,
+                        help="Keras model path (defaults to the configured path for --model)")
+    parser.add_argument("--data-dir", type=str, default=None,
+                        help="Processed data directory (defaults per --model)")
+    parser.add_argument("--output-path", type=str, default=None,
+                        help="INT8 artifact path (defaults to <model>_int8.tflite, as loaded by the API)")
+    parser.add_argument("--calibration-samples", type=int, default=500, help="Number of calibration images")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Maximum allowed top-1 accuracy drop (e.g. 0.01 = 1 percentage point)")
+
+    args = parser.parse_args()
+
+    default_model_path, default_data_dir = MODEL_DEFAULTS[args.model]
+    model_path = args.model_path or str(default_model_path)
+    output_path = args.output_path or TFLiteInt8Backend.artifact_path(model_path)
+
+    if not os.path.exists(model_path):
+        logger.error(f"Model file not found at: {model_path}")
+        sys.exit(1)
+
+    report = quantize_model(
+        model_path=model_path,
+        data_dir=args.data_dir or default_data_dir,
+        output_path=output_path,
+        calibration_samples=args.calibration_samples,
+        max_accuracy_drop=args.max_accuracy_drop,
+    )
+    sys.exit(0 if report["passed"] else 1)
@@ -10,6 +10,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 from tensorflow import keras
@@ -29,6 +30,7 @@ from ml.preprocess import (
     load_processed_data,
     load_split_dataset,
     preprocess_images,
+    processed_data_dir,
     save_class_mapping,
     save_processed_data,
     split_dataset,
@@ -39,7 +41,7 @@ logger = setup_logger(name="ml_train", log_level="INFO", log_file="logs/training
 
 def train_model(
     data_dir: str = "data/raw",
-    processed_dir: str = "data/processed",
+    processed_dir: Optional[str] = None,
     model_save_path: str = "saved_models/urdu_cnn_model.h5",
     class_labels_path: str = "saved_models/class_labels.json",
     image_size: int = 64,
@@ -56,7 +58,7 @@ def train_model(
 
     Args:
         data_dir: Path to raw dataset base directory
-        processed_dir: Path to save/load processed data
+        processed_dir: Path to save/load processed data (defaults to the dataset type's directory)
         model_save_path: Path to save the trained model
         class_labels_path: Path to save class labels
         image_size: Target image size
@@ -73,6 +75,7 @@ def train_model(
     logger.info("=" * 60)
 
     start_time = time.time()
+    processed_dir = processed_dir or processed_data_dir(dataset_type)
     logger.info(f"Training started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     # Log training configuration
@@ -338,7 +341,8 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Train Urdu character recognition model")
     parser.add_argument("--data-dir", type=str, default="data/raw", help="Path to raw dataset base directory")
-    parser.add_argument("--processed-dir", type=str, default="data/processed", help="Path for processed data")
+    parser.add_argument("--processed-dir", type=str, default=None,
+                        help="Path for processed data (default: the dataset type's processed data directory)")
     parser.add_argument("--model-path", type=str, default="saved_models/urdu_cnn_model.h5", help="Model save path")
     parser.add_argument("--labels-path", type=str, default="saved_models/class_labels.json", help="Class labels path")
     parser.add_argument("--image-size", type=int, default=64, help="Image size")
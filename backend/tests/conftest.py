@@ -0,0 +1,43 @@
+"""
+Shared Test Fixtures
+
+Fixtures used by several test modules.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from tests.helpers import NUM_CLASSES, save_network
+
+
+@pytest.fixture
+def numpy_configs(tmp_path):
+    """Export two small NumPy networks and return model configs for them."""
+    from app.config import ModelConfig, get_settings
+
+    configs = {}
+    for name in ("alpha", "beta"):
+        save_network(tmp_path / f"{name}.npz")
+        configs[name] = ModelConfig(
+            model_path=str(tmp_path / f"{name}.h5"),
+            default_labels={i: f"{name}-{i}" for i in range(NUM_CLASSES)},
+        )
+
+    with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"):
+        yield configs
+
+
+@pytest.fixture(scope="module")
+def keras_model_path(tmp_path_factory):
+    """Save a small untrained CNN as a Keras model file."""
+    pytest.importorskip("tensorflow")
+
+    with patch("app.models.cnn_model.logger"):
+        from app.models.cnn_model import create_cnn_model
+
+        model = create_cnn_model(input_shape=(32, 32, 1), num_classes=10)
+
+    model_path = tmp_path_factory.mktemp("models") / "test_model.h5"
+    model.save(model_path)
+    return str(model_path)
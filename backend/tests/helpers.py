@@ -0,0 +1,47 @@
+"""
+Test Helpers
+
+Model artifacts and fake services shared by several test modules.
+"""
+
+import numpy as np
+
+NUM_CLASSES = 3
+
+
+def save_network(path) -> None:
+    """Export a small random NumPy network to path."""
+    from app.models.numpy_cnn import NumpyCNN
+
+    network = NumpyCNN(
+        layers=[
+            {"op": "flatten", "input_shape": [None, 64, 64, 1], "output_shape": [None, 4096]},
+            {"op": "dense", "kernel": "kernel", "bias": "bias", "activation": "softmax",
+             "input_shape": [None, 4096], "output_shape": [None, NUM_CLASSES]},
+        ],
+        weights={
+            "kernel": np.random.rand(4096, NUM_CLASSES),
+            "bias": np.zeros(NUM_CLASSES),
+        },
+    )
+    network.save(str(path))
+
+
+class FakeModelService:
+    """Minimal model service recording the batches it receives."""
+
+    def __init__(self, name: str = "fake") -> None:
+        self.name = name
+        self.batch_shapes = []
+
+    def predict_batch(self, image_batch: np.ndarray):
+        self.batch_shapes.append(image_batch.shape)
+        return [
+            (str(int(image[0, 0, 0])), 1.0, [], 1.0)
+            for image in image_batch
+        ]
+
+
+def make_image(value: float) -> np.ndarray:
+    """Create a (1, 64, 64, 1) image filled with a value."""
+    return np.full((1, 64, 64, 1), value, dtype=np.float32)
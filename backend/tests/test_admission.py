@@ -0,0 +1,261 @@
+"""
+Admission Control Tests
+
+Tests for per-model concurrency limits, bounded queues and load shedding.
+"""
+
+import asyncio
+import base64
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+
+def create_base64_image() -> str:
+    """Create a base64 encoded test image."""
+    img = Image.new("L", (64, 64), color=128)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+class TestAdmissionController:
+    """Tests for the admission controller."""
+
+    def test_requests_within_limit_are_admitted(self):
+        """Test that requests up to the concurrency limit get a slot immediately."""
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=2, max_queue=1, max_wait_ms=0)
+
+        async def run():
+            await controller.acquire("character")
+            await controller.acquire("character")
+
+        asyncio.run(run())
+
+        stats = controller.stats()["models"]["character"]
+        assert stats["in_flight"] == 2
+        assert stats["admitted"] == 2
+        assert stats["queue_depth"] == 0
+
+    def test_full_queue_sheds_with_429(self):
+        """Test that a request arriving at a full queue is rejected with 429."""
+        from app.core.exceptions import RequestRejectedError
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_ms=0)
+
+        async def run():
+            await controller.acquire("character")
+            queued = asyncio.ensure_future(controller.acquire("character"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(RequestRejectedError) as exc_info:
+                await controller.acquire("character")
+
+            controller.release("character")
+            await queued
+            return exc_info.value
+
+        error = asyncio.run(run())
+
+        assert error.status_code == 429
+        assert error.retry_after >= 1
+        stats = controller.stats()
+        assert stats["shed"] == 1
+        assert stats["models"]["character"]["shed_queue_full"] == 1
+        assert stats["models"]["character"]["queued"] == 1
+
+    def test_long_estimated_wait_sheds_with_503(self):
+        """Test that a request whose estimated wait exceeds the limit is rejected with 503."""
+        from app.core.exceptions import RequestRejectedError
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_ms=100)
+
+        async def run():
+            await controller.acquire("character")
+            controller.release("character", duration_ms=2500)
+            await controller.acquire("character")
+            await controller.acquire("character")
+
+        with pytest.raises(RequestRejectedError) as exc_info:
+            asyncio.run(run())
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.retry_after == 3
+        assert controller.stats()["models"]["character"]["shed_wait"] == 1
+
+    def test_archive_durations_are_estimated_separately(self):
+        """Test that long archive streams don't inflate the wait estimated for single requests."""
+        from app.services.admission import ARCHIVE_ADMISSION, AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_ms=1000)
+
+        async def run():
+            await controller.acquire("character", ARCHIVE_ADMISSION)
+            controller.release("character", duration_ms=60000, kind=ARCHIVE_ADMISSION)
+            for _ in range(3):
+                await controller.acquire("character")
+                controller.release("character", duration_ms=100)
+
+            # Only single requests in flight and queued: estimated from their own durations
+            await controller.acquire("character")
+            queued = asyncio.ensure_future(controller.acquire("character"))
+            await asyncio.sleep(0)
+            request_wait_ms = controller.estimated_wait_ms("character")
+            controller.release("character")
+            await queued
+
+            # A queued archive counts for as long as archives take
+            archive = asyncio.ensure_future(controller.acquire("character", ARCHIVE_ADMISSION))
+            await asyncio.sleep(0)
+            archive_wait_ms = controller.estimated_wait_ms("character")
+            controller.release("character")
+            await archive
+            return request_wait_ms, archive_wait_ms
+
+        request_wait_ms, archive_wait_ms = asyncio.run(run())
+
+        assert request_wait_ms == 200
+        assert archive_wait_ms == 60100
+        stats = controller.stats()["models"]["character"]
+        assert stats["avg_duration_ms"] == {"archive": 60000, "request": 100}
+        assert stats["in_flight"] == 1
+
+    def test_release_hands_slot_to_queued_requests_in_order(self):
+        """Test that queued requests are admitted first come, first served."""
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_ms=0)
+        order = []
+
+        async def request(name):
+            await controller.acquire("character")
+            order.append(name)
+
+        async def run():
+            await controller.acquire("character")
+            tasks = [asyncio.ensure_future(request(name)) for name in ("a", "b", "c")]
+            await asyncio.sleep(0)
+            for _ in tasks:
+                controller.release("character")
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert order == ["a", "b", "c"]
+        assert controller.stats()["models"]["character"]["in_flight"] == 1
+
+    def test_cancelled_request_leaves_queue(self):
+        """Test that a queued request that goes away doesn't keep its place or a slot."""
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_ms=0)
+
+        async def run():
+            await controller.acquire("character")
+            queued = asyncio.ensure_future(controller.acquire("character"))
+            await asyncio.sleep(0)
+            queued.cancel()
+            await asyncio.sleep(0)
+            controller.release("character")
+
+        asyncio.run(run())
+
+        stats = controller.stats()["models"]["character"]
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 0
+
+    def test_zero_concurrency_disables_admission_control(self):
+        """Test that a concurrency limit of 0 admits every request."""
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=0, max_queue=1, max_wait_ms=1)
+
+        async def run():
+            for _ in range(10):
+                await controller.acquire("character")
+
+        asyncio.run(run())
+
+        assert controller.stats()["models"]["character"]["in_flight"] == 10
+
+
+class TestAdmissionEndpoints:
+    """Tests for load shedding on the prediction routes."""
+
+    def test_overloaded_model_answers_429_with_retry_after(self):
+        """Test that a request beyond the queue is shed with 429 while the queued one completes."""
+        import httpx
+
+        from app.api.dependencies import get_admission
+        from app.main import app
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_ms=0)
+        payload = {"image_data": create_base64_image()}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await controller.acquire("character")
+                queued = asyncio.ensure_future(client.post("/api/v1/predict/canvas", json=payload))
+                while not controller.stats()["models"]["character"]["queue_depth"]:
+                    await asyncio.sleep(0.01)
+
+                shed = await client.post("/api/v1/predict/canvas", json=payload)
+                other_model = await client.post("/api/v1/predict/digit/canvas", json=payload)
+
+                controller.release("character")
+                return shed, other_model, await queued
+
+        with patch.dict(app.dependency_overrides, {get_admission: lambda: controller}):
+            shed, other_model, queued = asyncio.run(run())
+
+        assert shed.status_code == 429
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert other_model.status_code == 200
+        assert queued.status_code == 200
+        assert controller.stats()["models"]["character"]["in_flight"] == 0
+
+    @pytest.mark.parametrize("path,model_name", [
+        ("/api/v1/predict/archive", "character"),
+        ("/api/v1/predict/digit/archive", "digit"),
+        ("/api/v1/models/digit/archive", "digit"),
+    ])
+    def test_archive_routes_are_admitted_as_archives(self, path, model_name):
+        """Test that archive streams are averaged as archives, not as single requests."""
+        import zipfile
+
+        from fastapi.testclient import TestClient
+
+        from app.api.dependencies import get_admission
+        from app.main import app
+        from app.services.admission import AdmissionController
+
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_ms=0)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("glyph.png", base64.b64decode(create_base64_image().split(",", 1)[1]))
+        buffer.seek(0)
+
+        with patch.dict(app.dependency_overrides, {get_admission: lambda: controller}):
+            response = TestClient(app).post(path, files={"file": ("glyphs.zip", buffer, "application/zip")})
+
+        assert response.status_code == 200
+        assert set(controller.stats()["models"][model_name]["avg_duration_ms"]) == {"archive"}
+
+    def test_metrics_report_admission(self):
+        """Test that queue depth and shed counters are exposed on /metrics."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        data = TestClient(app).get("/metrics").json()
+
+        assert {"max_concurrency", "max_queue", "max_wait_ms", "shed", "models"} <= set(data["admission"])
@@ -0,0 +1,215 @@
+"""
+Archive Service Tests
+
+Tests for streaming archive inference.
+"""
+
+import asyncio
+import io
+import json
+import tarfile
+import threading
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+
+class FakeModelService:
+    """Loaded model service recording the batch sizes it receives."""
+
+    name = "fake"
+    is_loaded = True
+
+    def __init__(self) -> None:
+        self.batch_sizes = []
+
+    def predict_batch(self, image_batch: np.ndarray):
+        self.batch_sizes.append(len(image_batch))
+        return [("ا", 0.5, [{"character": "ا", "probability": 0.5}], 1.0)] * len(image_batch)
+
+
+def create_zip(count: int) -> io.BytesIO:
+    """Create a ZIP archive with the given number of PNG members."""
+    img = Image.new("L", (32, 32), color=200)
+    image_buffer = io.BytesIO()
+    img.save(image_buffer, format="PNG")
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(count):
+            archive.writestr(f"{i:03d}.png", image_buffer.getvalue())
+    buffer.seek(0)
+    return buffer
+
+
+def create_png() -> bytes:
+    """Create a PNG image of random noise, which compresses poorly."""
+    img = Image.fromarray(np.random.default_rng(0).integers(0, 255, (32, 32), dtype=np.uint8))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def create_tar(count: int, mode: str = "w") -> bytes:
+    """Create a TAR archive with the given number of PNG members."""
+    image = create_png()
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for i in range(count):
+            info = tarfile.TarInfo(f"{i:03d}.png")
+            info.size = len(image)
+            archive.addfile(info, io.BytesIO(image))
+    return buffer.getvalue()
+
+
+def stream_lines(archive: io.BytesIO) -> list:
+    """Stream predictions for an archive and decode the NDJSON lines."""
+    from app.config import URDU_CHARACTERS
+    from app.services.archive_service import ArchiveService
+    from app.services.executor import InferenceExecutor
+    from app.services.image_service import get_image_service
+
+    archive_service = ArchiveService(batch_size=4, decode_concurrency=3)
+    executor = InferenceExecutor(max_workers=2, max_queue_size=4)
+
+    async def run():
+        return [
+            json.loads(line)
+            async for line in archive_service.stream_predictions(
+                archive, FakeModelService(), get_image_service(), executor, URDU_CHARACTERS
+            )
+        ]
+
+    try:
+        return asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+
+class TestArchiveService:
+    """Tests for the archive service."""
+
+    def test_members_are_predicted_in_fixed_size_batches(self):
+        """Test that members are grouped into batches and streamed in order."""
+        from app.config import URDU_CHARACTERS
+        from app.services.archive_service import ArchiveService
+        from app.services.executor import InferenceExecutor
+        from app.services.image_service import get_image_service
+
+        archive_service = ArchiveService(batch_size=4, decode_concurrency=3)
+        executor = InferenceExecutor(max_workers=2, max_queue_size=4)
+        model_service = FakeModelService()
+
+        async def run():
+            lines = []
+            async for line in archive_service.stream_predictions(
+                create_zip(10), model_service, get_image_service(), executor, URDU_CHARACTERS
+            ):
+                lines.append(json.loads(line))
+            return lines
+
+        lines = asyncio.run(run())
+        executor.shutdown()
+
+        assert model_service.batch_sizes == [4, 4, 2]
+        assert [line["index"] for line in lines[:-1]] == list(range(10))
+        assert lines[-1]["summary"] == {"count": 10, "succeeded": 10, "failed": 0}
+
+    def test_corrupt_zip_member_gets_error_line(self):
+        """Test that a member with corrupt compressed data fails alone and the stream completes."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("000.png", create_png())
+            archive.writestr("001.png", create_png())
+            info = archive.getinfo("001.png")
+        data = bytearray(buffer.getvalue())
+        # Overwrite the middle of the second member's compressed data
+        start = info.header_offset + 30 + len(info.filename) + len(info.extra)
+        middle = start + info.compress_size // 2
+        data[middle:middle + 16] = b"\xff" * 16
+
+        lines = stream_lines(io.BytesIO(bytes(data)))
+
+        assert [line["success"] for line in lines[:-1]] == [True, False]
+        assert lines[1]["filename"] == "001.png"
+        assert "Could not read archive member" in lines[1]["error"]
+        assert lines[-1]["summary"] == {"count": 2, "succeeded": 1, "failed": 1}
+
+    def test_truncated_tar_member_gets_error_line(self):
+        """Test that a TAR cut off inside a member still streams the members before it and a summary."""
+        data = create_tar(3)
+        # Each member is a 512-byte header and its data padded to whole blocks
+        member_blocks = 512 + -(-len(create_png()) // 512) * 512
+        truncated = data[:member_blocks + 512 + 100]
+
+        lines = stream_lines(io.BytesIO(truncated))
+
+        assert [line.get("success") for line in lines[:2]] == [True, False]
+        assert lines[1]["filename"] == "001.png"
+        # Nothing can be read past the truncation
+        assert "Corrupt or truncated archive" in lines[2]["error"]
+        assert lines[-1]["summary"] == {"count": 2, "succeeded": 1, "failed": 1}
+        assert len(lines) == 4
+
+    def test_truncated_compressed_tar_ends_with_error_and_summary(self):
+        """Test that an archive that can't be read any further ends with an error line and the summary."""
+        data = create_tar(3, mode="w:gz")
+
+        lines = stream_lines(io.BytesIO(data[:len(data) // 2]))
+
+        assert "Corrupt or truncated archive" in lines[-2]["error"]
+        assert lines[-1]["summary"]["count"] == len(lines) - 2
+        assert lines[-1]["summary"]["succeeded"] + lines[-1]["summary"]["failed"] == lines[-1]["summary"]["count"]
+
+    def test_detect_format_rejects_non_archives(self):
+        """Test that arbitrary bytes are not accepted as an archive."""
+        import pytest
+
+        from app.core.exceptions import InvalidImageError
+        from app.services.archive_service import ArchiveService
+
+        with pytest.raises(InvalidImageError):
+            ArchiveService.detect_format(io.BytesIO(b"definitely not an archive" * 40))
+
+    def test_disconnect_waits_for_running_read_before_closing(self):
+        """Test that closing the stream mid-read doesn't close the member generator under a worker."""
+        from unittest.mock import patch
+
+        from app.config import URDU_CHARACTERS
+        from app.services.archive_service import ArchiveService
+        from app.services.executor import InferenceExecutor
+        from app.services.image_service import get_image_service
+
+        archive_service = ArchiveService(batch_size=4, decode_concurrency=3)
+        executor = InferenceExecutor(max_workers=2, max_queue_size=4)
+        reading = threading.Event()
+        release = threading.Event()
+
+        def slow_members(fileobj, image_service):
+            reading.set()
+            release.wait()
+            yield "000.png", b""
+
+        async def run():
+            stream = archive_service.stream_predictions(
+                create_zip(1), FakeModelService(), get_image_service(), executor, URDU_CHARACTERS
+            )
+            consumer = asyncio.ensure_future(stream.__anext__())
+            while not reading.is_set():
+                await asyncio.sleep(0.01)
+            # The client disconnects while a worker is inside next()
+            consumer.cancel()
+            asyncio.get_running_loop().call_later(0.05, release.set)
+            try:
+                await consumer
+            except asyncio.CancelledError:
+                pass
+            await stream.aclose()
+
+        try:
+            with patch.object(archive_service, "iter_members", side_effect=slow_members):
+                asyncio.run(run())
+        finally:
+            release.set()
+            executor.shutdown()
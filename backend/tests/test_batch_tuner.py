@@ -0,0 +1,166 @@
+"""
+Batch Tuner Tests
+
+Tests for tuning the micro-batching limits to a p95 latency target.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.helpers import FakeModelService, make_image
+
+
+class FakeClock:
+    """Monotonic clock the tests advance by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return time.time()
+
+
+@pytest.fixture
+def clock():
+    """Replace the tuner's clock with a fake one."""
+    fake = FakeClock()
+    with patch("app.services.batch_tuner.time", fake):
+        yield fake
+
+
+def make_tuner(**kwargs):
+    """Create a tuner evaluating once a second."""
+    from app.services.batch_tuner import BatchTuner
+
+    options = {
+        "target_p95_ms": 50.0,
+        "min_batch_size": 1,
+        "max_batch_size": 32,
+        "min_wait_ms": 0.0,
+        "max_wait_ms": 20.0,
+        "interval_s": 1.0,
+        "initial_batch_size": 8,
+        "initial_wait_ms": 8.0,
+    }
+    options.update(kwargs)
+    return BatchTuner(**options)
+
+
+def record_batches(clock, tuner, batch_size: int, forward_ms: float, latency_ms: float, full: bool = True) -> None:
+    """Record an interval of three batches of one size, which the last one evaluates."""
+    for batch in range(3):
+        if batch == 2:
+            clock.now += 1.0
+        for _ in range(batch_size):
+            tuner.record_arrival("character")
+        tuner.record_batch(
+            "character",
+            batch_size,
+            full=full,
+            forward_ms=forward_ms,
+            queue_wait_ms=0.0,
+            batch_waits_ms=[1.0] * batch_size,
+            latencies_ms=[latency_ms] * batch_size,
+        )
+
+
+class TestBatchTuner:
+    """Tests for the batch tuner's decisions."""
+
+    def test_over_target_shortens_wait_then_shrinks_batches(self, clock):
+        """Test that latency over target cuts the wait first and the batch size once it can't wait less."""
+        tuner = make_tuner()
+
+        waits = []
+        for _ in range(4):
+            record_batches(clock, tuner, 8, forward_ms=10.0, latency_ms=80.0)
+            waits.append(tuner.limits("character")[1])
+        assert waits == [4.0, 2.0, 1.0, 0.0]
+
+        record_batches(clock, tuner, 8, forward_ms=10.0, latency_ms=80.0)
+        assert tuner.limits("character") == (4, 0.0)
+
+        decisions = tuner.stats()["decisions"]
+        assert decisions[0]["max_wait_ms"] == [8.0, 4.0]
+        assert all("over target" in decision["reason"] for decision in decisions)
+        assert {"timestamp", "p95_ms", "arrival_rate", "samples"} <= set(decisions[0])
+
+    def test_slow_forward_pass_shrinks_batches_directly(self, clock):
+        """Test that a batch whose forward pass alone misses the target is halved without touching the wait."""
+        tuner = make_tuner()
+
+        record_batches(clock, tuner, 8, forward_ms=60.0, latency_ms=70.0, full=False)
+
+        assert tuner.limits("character") == (4, 8.0)
+
+    def test_headroom_grows_filling_batches(self, clock):
+        """Test that batches that fill up grow while their estimated forward pass fits the target."""
+        tuner = make_tuner(max_batch_size=64)
+
+        record_batches(clock, tuner, 8, forward_ms=5.0, latency_ms=10.0)
+
+        assert tuner.limits("character")[0] == 16
+        assert tuner.estimate_forward_ms("character", 16) == 10.0
+
+        # A batch of 64 would take an estimated 40ms, over the headroom below the 50ms target
+        record_batches(clock, tuner, 16, forward_ms=10.0, latency_ms=20.0)
+        record_batches(clock, tuner, 32, forward_ms=20.0, latency_ms=30.0)
+        assert tuner.limits("character")[0] == 32
+
+    def test_sparse_traffic_stops_waiting(self, clock):
+        """Test that the wait drops to the minimum when no other request would arrive during it."""
+        tuner = make_tuner()
+
+        tuner.record_arrival("character")
+        clock.now += 1.0
+        tuner.record_batch("character", 1, False, 5.0, 0.0, [8.0], [14.0])
+
+        assert tuner.limits("character") == (8, 0.0)
+        assert tuner.stats()["models"]["character"]["last_evaluation"]["samples"] == 1
+
+    def test_stable_latency_holds_limits(self, clock):
+        """Test that latency between the headroom and the target leaves the limits alone."""
+        tuner = make_tuner()
+
+        record_batches(clock, tuner, 8, forward_ms=10.0, latency_ms=45.0)
+
+        assert tuner.limits("character") == (8, 8.0)
+        assert tuner.stats()["decisions"] == []
+
+
+class TestBatchSchedulerTuning:
+    """Tests for the batch scheduler with a tuner."""
+
+    def test_scheduler_uses_and_feeds_tuned_limits(self):
+        """Test that batches follow the tuner's limits and report their timings back to it."""
+        from app.services.batching import BatchScheduler
+
+        tuner = make_tuner(initial_batch_size=2, initial_wait_ms=20.0, interval_s=60.0)
+        scheduler = BatchScheduler(max_batch_size=32, max_wait_ms=5, tuner=tuner)
+        service = FakeModelService("character")
+
+        async def run():
+            return await asyncio.gather(*[scheduler.submit(service, make_image(i)) for i in range(5)])
+
+        asyncio.run(run())
+
+        assert [shape[0] for shape in service.batch_shapes] == [2, 2, 1]
+        stats = scheduler.stats()
+        assert stats["models"]["character"]["max_batch_size"] == 2
+        assert stats["autotune"]["models"]["character"]["forward_ms"] == {"1": 1.0, "2": 1.0}
+
+    def test_metrics_expose_batching_limits(self):
+        """Test that the batching section of /metrics carries the autotune state."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        data = TestClient(app).get("/metrics").json()
+
+        assert "autotune" in data["batching"]
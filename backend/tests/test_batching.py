@@ -0,0 +1,87 @@
+"""
+Batching Tests
+
+Tests for the dynamic micro-batching scheduler.
+"""
+
+import asyncio
+
+from tests.helpers import FakeModelService, make_image
+
+
+class TestBatchScheduler:
+    """Tests for the batch scheduler."""
+
+    def test_concurrent_requests_share_forward_pass(self):
+        """Test that concurrent requests are served by one batch."""
+        from app.services.batching import BatchScheduler
+
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=20)
+        service = FakeModelService()
+
+        async def run():
+            return await asyncio.gather(*[scheduler.submit(service, make_image(i)) for i in range(5)])
+
+        results = asyncio.run(run())
+
+        assert service.batch_shapes == [(5, 64, 64, 1)]
+        assert [r[0] for r in results] == ["0", "1", "2", "3", "4"]
+        assert all(r[4] == 5 for r in results)
+
+    def test_batches_split_at_max_size(self):
+        """Test that a full batch is dispatched without waiting."""
+        from app.services.batching import BatchScheduler
+
+        scheduler = BatchScheduler(max_batch_size=3, max_wait_ms=20)
+        service = FakeModelService()
+
+        async def run():
+            return await asyncio.gather(*[scheduler.submit(service, make_image(i)) for i in range(7)])
+
+        results = asyncio.run(run())
+
+        assert [shape[0] for shape in service.batch_shapes] == [3, 3, 1]
+        assert [r[0] for r in results] == [str(i) for i in range(7)]
+        assert scheduler.stats()["models"]["fake"]["batch_size_histogram"] == {"1": 1, "3": 2}
+
+    def test_models_are_batched_separately(self):
+        """Test that requests for different models never share a batch."""
+        from app.services.batching import BatchScheduler
+
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=20)
+        characters = FakeModelService("character")
+        digits = FakeModelService("digit")
+
+        async def run():
+            await asyncio.gather(
+                scheduler.submit(characters, make_image(1)),
+                scheduler.submit(digits, make_image(2)),
+                scheduler.submit(characters, make_image(3)),
+            )
+
+        asyncio.run(run())
+
+        assert characters.batch_shapes == [(2, 64, 64, 1)]
+        assert digits.batch_shapes == [(1, 64, 64, 1)]
+
+    def test_errors_fan_out_to_all_requests(self):
+        """Test that a failed forward pass fails every request in the batch."""
+        from app.core.exceptions import PredictionError
+        from app.services.batching import BatchScheduler
+
+        class FailingService(FakeModelService):
+            def predict_batch(self, image_batch):
+                raise PredictionError(message="boom")
+
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=5)
+        service = FailingService()
+
+        async def run():
+            return await asyncio.gather(
+                *[scheduler.submit(service, make_image(i)) for i in range(3)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, PredictionError) for r in results)
@@ -0,0 +1,252 @@
+"""
+Request Deadline Tests
+
+Tests for per-request deadlines and dropping work for expired or
+disconnected requests before it reaches the model.
+"""
+
+import asyncio
+import base64
+import io
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tests.helpers import FakeModelService, make_image
+
+
+def create_base64_image() -> str:
+    """Create a base64 encoded test image."""
+    img = Image.new("L", (64, 64), color=128)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def skipped_at(stage: str) -> int:
+    """Get the work the deadline tracker has skipped at a checkpoint."""
+    from app.services.deadlines import get_deadline_tracker
+
+    return get_deadline_tracker().stats()["skipped_by_stage"].get(stage, {}).get("work", 0)
+
+
+class TestDeadline:
+    """Tests for deadlines and deadline groups."""
+
+    def test_deadline_expires(self):
+        """Test that a deadline lapses once its timeout has passed."""
+        from app.services.deadlines import Deadline
+
+        deadline = Deadline(timeout_ms=20)
+        assert deadline.reason is None
+        assert 0 < deadline.remaining_s <= 0.02
+
+        time.sleep(0.03)
+        assert deadline.reason == "expired"
+        assert deadline.remaining_s == 0.0
+        assert Deadline().reason is None
+
+    def test_disconnect_lapses_deadline(self):
+        """Test that a client disconnect seen by the watch lapses the deadline."""
+        from app.services.deadlines import Deadline
+
+        deadline = Deadline()
+
+        async def receive():
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def run():
+            deadline.watch(receive)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+
+        assert deadline.reason == "disconnected"
+
+    def test_group_lapses_only_when_every_member_has(self):
+        """Test that shared work stays live while any request sharing it is."""
+        from app.services.deadlines import Deadline, DeadlineGroup
+
+        expired = Deadline(timeout_ms=1)
+        live = Deadline(timeout_ms=60000)
+        time.sleep(0.01)
+
+        group = DeadlineGroup()
+        group.add(expired)
+        assert group.reason == "expired"
+
+        group.add(live)
+        assert group.reason is None
+
+        unbounded = DeadlineGroup()
+        unbounded.add(expired)
+        unbounded.add(None)
+        assert unbounded.reason is None
+
+    def test_parse_timeout(self):
+        """Test that the header overrides the default and invalid values are rejected."""
+        from app.config import get_settings
+        from app.services.deadlines import parse_timeout
+
+        assert parse_timeout("250") == 250.0
+        assert parse_timeout(None) == (get_settings().REQUEST_TIMEOUT_MS or None)
+        for value in ("0", "-5", "soon", "nan", "inf"):
+            with pytest.raises(ValueError):
+                parse_timeout(value)
+
+
+class TestDeadlineCheckpoints:
+    """Tests for dropping lapsed work in the executor, scheduler and admission queue."""
+
+    def test_executor_drops_expired_task(self):
+        """Test that a task whose deadline lapsed never runs on a worker."""
+        from app.core.exceptions import DeadlineExceededError
+        from app.services.deadlines import Deadline, deadline_scope
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+        work = MagicMock(return_value=1)
+        before = skipped_at("executor_queue")
+
+        async def run():
+            deadline = Deadline(timeout_ms=1)
+            await asyncio.sleep(0.01)
+            with deadline_scope(deadline):
+                return await executor.run(work)
+
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            asyncio.run(run())
+        executor.shutdown()
+
+        assert exc_info.value.reason == "expired"
+        work.assert_not_called()
+        assert executor.stats()["skipped"] == 1
+        assert executor.stats()["failed"] == 0
+        assert skipped_at("executor_queue") == before + 1
+
+    def test_scheduler_leaves_lapsed_requests_out_of_batch(self):
+        """Test that only requests with a live deadline reach the forward pass."""
+        from app.core.exceptions import DeadlineExceededError
+        from app.services.batching import BatchScheduler
+        from app.services.deadlines import Deadline, deadline_scope
+
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=30)
+        service = FakeModelService()
+        before = skipped_at("batch_queue")
+
+        async def submit(value, timeout_ms):
+            with deadline_scope(Deadline(timeout_ms=timeout_ms)):
+                return await scheduler.submit(service, make_image(value))
+
+        async def run():
+            return await asyncio.gather(
+                submit(1, 60000), submit(2, 5), submit(3, 60000), return_exceptions=True
+            )
+
+        live, lapsed, other = asyncio.run(run())
+
+        assert service.batch_shapes == [(2, 64, 64, 1)]
+        assert live[0] == "1" and other[0] == "3"
+        assert isinstance(lapsed, DeadlineExceededError)
+        assert lapsed.stage == "batch_queue"
+        assert skipped_at("batch_queue") == before + 1
+
+    def test_admission_wait_ends_at_deadline(self):
+        """Test that a request queued for a slot gives up its place when its deadline expires."""
+        from app.core.exceptions import DeadlineExceededError
+        from app.services.admission import AdmissionController
+        from app.services.deadlines import Deadline, deadline_scope
+
+        controller = AdmissionController(max_concurrency=1, max_queue=4, max_wait_ms=0)
+
+        async def run():
+            await controller.acquire("character")
+            with deadline_scope(Deadline(timeout_ms=20)):
+                await controller.acquire("character")
+
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            asyncio.run(run())
+
+        assert exc_info.value.stage == "admission"
+        stats = controller.stats()["models"]["character"]
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 1
+
+
+class TestDeadlineEndpoints:
+    """Tests for request deadlines on the prediction routes."""
+
+    def test_request_expired_during_decode_skips_inference(self):
+        """Test that a request whose deadline lapses while decoding answers 504 without a forward pass."""
+        import httpx
+
+        from app.api.dependencies import get_cache, get_image_processor, get_near_duplicate_cache
+        from app.main import app
+        from app.services.model_registry import get_model_registry
+        from app.services.prediction_cache import PredictionCache
+        from app.services.tensor_cache import TensorCache
+
+        service = get_model_registry().get("character")
+        stub_model = MagicMock()
+
+        def slow_decode(image_data):
+            time.sleep(0.1)
+            return np.zeros((1, 64, 64, 1), dtype=np.float32)
+
+        image_service = MagicMock()
+        image_service.process_base64_image.side_effect = slow_decode
+        before = skipped_at("batch_queue")
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(
+                    "/api/v1/predict/canvas",
+                    json={"image_data": create_base64_image()},
+                    headers={"X-Request-Timeout": "50"},
+                )
+
+        overrides = {
+            get_image_processor: lambda: image_service,
+            get_cache: lambda: PredictionCache(max_entries=0),
+            get_near_duplicate_cache: lambda: TensorCache(max_entries=0),
+        }
+
+        with patch.object(service, "_model", stub_model), patch.object(service, "_is_loaded", True), \
+                patch.dict(app.dependency_overrides, overrides):
+            response = asyncio.run(run())
+
+        assert response.status_code == 504
+        stub_model.predict.assert_not_called()
+        assert skipped_at("batch_queue") == before + 1
+
+    def test_invalid_timeout_header_is_rejected(self):
+        """Test that a malformed X-Request-Timeout header answers 400."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        response = TestClient(app).post(
+            "/api/v1/predict/canvas",
+            json={"image_data": create_base64_image()},
+            headers={"X-Request-Timeout": "soon"},
+        )
+
+        assert response.status_code == 400
+
+    def test_metrics_report_skipped_work(self):
+        """Test that the skipped-work counters are exposed on /metrics."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        data = TestClient(app).get("/metrics").json()
+
+        assert {"default_timeout_ms", "requests", "skipped", "skipped_images", "skipped_by_stage"} <= set(
+            data["deadlines"]
+        )
+        assert "skipped" in data["executor"]
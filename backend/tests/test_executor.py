@@ -0,0 +1,265 @@
+"""
+Executor Tests
+
+Tests for the bounded inference executor.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TestInferenceExecutor:
+    """Tests for the inference executor."""
+
+    def test_run_executes_off_event_loop_thread(self):
+        """Test that work runs on a worker thread, not the loop thread."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=2, max_queue_size=4)
+
+        async def run():
+            return threading.get_ident(), await executor.run(threading.get_ident)
+
+        loop_thread, worker_thread = asyncio.run(run())
+
+        assert loop_thread != worker_thread
+        assert executor.stats()["completed"] == 1
+        executor.shutdown()
+
+    def test_concurrency_is_bounded_by_pool_size(self):
+        """Test that no more than max_workers tasks run at once."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=2, max_queue_size=1)
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def work():
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.02)
+            with lock:
+                running["now"] -= 1
+
+        async def run():
+            await asyncio.gather(*[executor.run(work) for _ in range(6)])
+
+        asyncio.run(run())
+
+        assert running["peak"] == 2
+        assert executor.stats()["completed"] == 6
+        executor.shutdown()
+
+    def test_stats_report_queue_depth_and_utilization(self):
+        """Test that queue depth and utilization are reported while busy."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+        release = threading.Event()
+
+        async def run():
+            tasks = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            stats = executor.stats()
+            release.set()
+            await asyncio.gather(*tasks)
+            return stats
+
+        stats = asyncio.run(run())
+
+        assert stats["active"] == 1
+        assert stats["queue_depth"] == 2
+        assert stats["utilization"] == 1.0
+        executor.shutdown()
+
+    def test_errors_propagate_to_caller(self):
+        """Test that exceptions raised by work reach the awaiting caller."""
+        import pytest
+
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+
+        def fail():
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError):
+            asyncio.run(executor.run(fail))
+
+        assert executor.stats()["failed"] == 1
+        executor.shutdown()
+
+    def test_cancelled_caller_keeps_worker_until_task_finishes(self):
+        """Test that cancelling a caller doesn't free its worker while the task still runs."""
+        from app.services.executor import InferenceExecutor, work_scope
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+        release = threading.Event()
+        started = []
+
+        async def submit(label, func):
+            with work_scope("bulk", "alpha"):
+                await executor.run(func)
+            started.append(label)
+
+        async def run():
+            blocked = asyncio.ensure_future(submit("blocked", release.wait))
+            await asyncio.sleep(0.02)
+            blocked.cancel()
+            queued = asyncio.ensure_future(submit("queued", lambda: None))
+            await asyncio.sleep(0.05)
+            stats = executor.stats()
+            release.set()
+            await queued
+            return stats
+
+        stats = asyncio.run(run())
+
+        # The queued task still waits for the worker the cancelled task's thread holds
+        assert stats["models"]["alpha"]["running"] == 1
+        assert stats["lanes"]["bulk"]["queue_depth"] == 1
+        assert started == ["queued"]
+        executor.shutdown()
+
+
+class TestExecutorLanes:
+    """Tests for priority lanes and per-model worker budgets."""
+
+    def run_in_order(self, executor, tasks):
+        """
+        Queue tasks behind a blocked worker, then release it and record the order they run in.
+
+        Args:
+            executor: Executor with one worker
+            tasks: (lane, model name, label) of each task, in submission order
+
+        Returns:
+            Labels in the order the tasks ran
+        """
+        from app.services.executor import work_scope
+
+        release = threading.Event()
+        order = []
+
+        async def submit(lane, model_name, func):
+            with work_scope(lane, model_name):
+                await executor.run(func)
+
+        async def run():
+            blocker = asyncio.ensure_future(submit("bulk", None, release.wait))
+            await asyncio.sleep(0.02)
+            queued = [
+                asyncio.ensure_future(submit(lane, model_name, lambda label=label: order.append(label)))
+                for lane, model_name, label in tasks
+            ]
+            await asyncio.sleep(0.02)
+            release.set()
+            await asyncio.gather(blocker, *queued)
+
+        asyncio.run(run())
+        executor.shutdown()
+        return order
+
+    def test_interactive_work_overtakes_bulk_backlog(self):
+        """Test that interactive tasks don't wait behind a queue of bulk tasks."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=64, lane_weights={"interactive": 4, "bulk": 1})
+        tasks = [("bulk", None, f"bulk-{i}") for i in range(10)] + [("interactive", None, "canvas")]
+
+        order = self.run_in_order(executor, tasks)
+
+        assert order.index("canvas") <= 1
+        assert sorted(order) == sorted(label for _, _, label in tasks)
+
+    def test_lanes_share_workers_by_weight(self):
+        """Test that busy lanes get workers in proportion to their weights."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=64, lane_weights={"interactive": 3, "bulk": 1})
+        tasks = [("bulk", None, "bulk")] * 8 + [("interactive", None, "interactive")] * 8
+
+        order = self.run_in_order(executor, tasks)
+
+        assert order[:8].count("interactive") == 6
+        assert order[:8].count("bulk") == 2
+
+    def test_model_budget_keeps_a_worker_for_other_models(self):
+        """Test that one model's backlog can't occupy every worker."""
+        from app.services.executor import InferenceExecutor, work_scope
+
+        executor = InferenceExecutor(max_workers=2, max_queue_size=64, model_max_workers=1)
+        lock = threading.Lock()
+        running = {"digit": 0, "digit_peak": 0}
+        finished = []
+
+        def digit_work():
+            with lock:
+                running["digit"] += 1
+                running["digit_peak"] = max(running["digit_peak"], running["digit"])
+            time.sleep(0.02)
+            with lock:
+                running["digit"] -= 1
+                finished.append("digit")
+
+        async def submit(model_name, func):
+            with work_scope("bulk", model_name):
+                await executor.run(func)
+
+        async def run():
+            digits = [asyncio.ensure_future(submit("digit", digit_work)) for _ in range(6)]
+            await asyncio.sleep(0)
+            await submit("character", lambda: finished.append("character"))
+            await asyncio.gather(*digits)
+
+        asyncio.run(run())
+
+        assert running["digit_peak"] == 1
+        assert finished.index("character") <= 1
+        assert executor.stats()["models"]["digit"]["budget"] == 1
+        executor.shutdown()
+
+    def test_stats_report_lane_queue_times(self):
+        """Test that per-lane queue depth and queue time percentiles are reported."""
+        from app.services.executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue_size=64, lane_weights={"interactive": 4, "bulk": 1})
+        self.run_in_order(executor, [("bulk", None, "bulk")] * 3 + [("interactive", None, "interactive")])
+
+        lanes = executor.stats()["lanes"]
+        assert lanes["bulk"]["dispatched"] == 4
+        assert lanes["interactive"]["dispatched"] == 1
+        assert lanes["interactive"]["queue_depth"] == 0
+        assert set(lanes["bulk"]["queue_time_ms"]) == {"avg", "p50", "p95", "p99", "max"}
+        assert lanes["bulk"]["queue_time_ms"]["max"] >= lanes["bulk"]["queue_time_ms"]["p50"] > 0
+
+    def test_canvas_routes_run_in_interactive_lane(self):
+        """Test that canvas predictions are scheduled in the interactive lane and uploads in the bulk lane."""
+        import base64
+        import io
+
+        from fastapi.testclient import TestClient
+        from PIL import Image
+
+        from app.main import app
+        from app.services.executor import get_inference_executor
+
+        buffer = io.BytesIO()
+        Image.new("L", (64, 64), color=90).save(buffer, format="PNG")
+        image_bytes = buffer.getvalue()
+        canvas = "data:image/png;base64," + base64.b64encode(image_bytes).decode("utf-8")
+
+        client = TestClient(app)
+        lanes = get_inference_executor().stats()["lanes"]
+        interactive, bulk = lanes["interactive"]["dispatched"], lanes["bulk"]["dispatched"]
+
+        assert client.post("/api/v1/predict/digit/canvas", json={"image_data": canvas}).status_code == 200
+        lanes = get_inference_executor().stats()["lanes"]
+        assert lanes["interactive"]["dispatched"] > interactive
+        assert lanes["bulk"]["dispatched"] == bulk
+
+        files = {"file": ("digit.png", image_bytes, "image/png")}
+        assert client.post("/api/v1/predict/digit", files=files).status_code == 200
+        assert get_inference_executor().stats()["lanes"]["bulk"]["dispatched"] > bulk
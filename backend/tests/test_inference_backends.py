@@ -0,0 +1,289 @@
+"""
+Inference Backend Tests
+
+Tests for the pluggable inference backends and the export command.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+
+class TestBackendRegistry:
+    """Tests for backend lookup."""
+
+    def test_artifact_paths(self):
+        """Test that each backend derives its artifact from the Keras model path."""
+        from app.services.inference_backends import get_backend_class
+
+        assert get_backend_class("keras").artifact_path("models/m.h5") == "models/m.h5"
+        assert get_backend_class("tflite").artifact_path("models/m.h5") == "models/m.tflite"
+        assert get_backend_class("tflite_int8").artifact_path("models/m.h5") == "models/m_int8.tflite"
+        assert get_backend_class("onnxruntime").artifact_path("models/m.h5") == "models/m.onnx"
+        assert get_backend_class("numpy").artifact_path("models/m.h5") == "models/m.npz"
+
+    def test_keras_falls_back_to_numpy_without_tensorflow(self):
+        """Test that the keras backend resolves to numpy when TensorFlow is missing."""
+        from app.services.inference_backends import resolve_backend_name
+
+        resolve_backend_name.cache_clear()
+        try:
+            with patch("app.services.inference_backends.importlib.util.find_spec", return_value=None) as find_spec, \
+                    patch("app.services.inference_backends.logger") as logger:
+                assert resolve_backend_name("keras") == "numpy"
+                assert resolve_backend_name("keras") == "numpy"
+                assert resolve_backend_name("tflite") == "tflite"
+        finally:
+            resolve_backend_name.cache_clear()
+
+        # Resolved once, so reloads don't repeat the lookup or the warning
+        find_spec.assert_called_once_with("tensorflow")
+        logger.warning.assert_called_once()
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name raises ModelLoadError."""
+        from app.core.exceptions import ModelLoadError
+        from app.services.inference_backends import create_backend
+
+        with pytest.raises(ModelLoadError):
+            create_backend("caffe")
+
+
+class TestExport:
+    """Tests for exporting and verifying backend artifacts."""
+
+    @pytest.mark.parametrize("backend_name", ["tflite", "onnxruntime", "numpy"])
+    def test_export_matches_keras(self, keras_model_path, backend_name):
+        """Test that exported artifacts reproduce the Keras outputs."""
+        if backend_name == "onnxruntime":
+            pytest.importorskip("tf2onnx")
+            pytest.importorskip("onnxruntime")
+
+        from ml.export import export_model
+        from app.services.inference_backends import create_backend, get_backend_class
+
+        assert export_model(keras_model_path, [backend_name], num_samples=8, latency_runs=2)
+
+        backend = create_backend(backend_name)
+        backend.load(get_backend_class(backend_name).artifact_path(keras_model_path))
+
+        assert backend.input_shape == (None, 32, 32, 1)
+        assert backend.output_shape == (None, 10)
+
+        outputs = backend.predict(np.random.rand(3, 32, 32, 1).astype(np.float32))
+        assert outputs.shape == (3, 10)
+        np.testing.assert_allclose(outputs.sum(axis=1), 1.0, rtol=1e-5)
+
+    def test_numpy_export_folds_batchnorm(self):
+        """Test that the NumPy network matches Keras with non-trivial BatchNorm statistics."""
+        pytest.importorskip("tensorflow")
+
+        with patch("app.models.cnn_model.logger"):
+            from app.models.cnn_model import create_cnn_model
+
+            model = create_cnn_model(input_shape=(32, 32, 1), num_classes=10)
+
+        from ml.export import fold_keras_model
+
+        rng = np.random.default_rng(0)
+        for layer in model.layers:
+            if type(layer).__name__ == "BatchNormalization":
+                size = layer.moving_mean.shape[0]
+                layer.moving_mean.assign(rng.normal(0, 0.1, size).astype(np.float32))
+                layer.moving_variance.assign(rng.uniform(0.5, 1.5, size).astype(np.float32))
+                layer.gamma.assign(rng.uniform(0.5, 1.5, size).astype(np.float32))
+                layer.beta.assign(rng.normal(0, 0.1, size).astype(np.float32))
+
+        network = fold_keras_model(model)
+        ops = [layer["op"] for layer in network.layers]
+
+        # BatchNorm, Activation and Dropout layers are all fused away
+        assert ops.count("conv2d") == 4 and ops.count("dense") == 3
+        assert "scale" not in ops and "activation" not in ops
+
+        inputs = rng.random((4, 32, 32, 1), dtype=np.float32)
+        np.testing.assert_allclose(network.predict(inputs), np.asarray(model(inputs, training=False)), atol=1e-5)
+
+    def test_model_service_uses_configured_backend(self, keras_model_path):
+        """Test that the model service loads the artifact for INFERENCE_BACKEND."""
+        from ml.export import export_model
+        from app.config import get_settings
+        from app.services.inference_backends import TFLiteBackend
+        from app.services.model_registry import get_model_registry
+
+        assert export_model(keras_model_path, ["tflite"], num_samples=4, latency_runs=2)
+
+        service = get_model_registry().get("character")
+        with patch.object(service, "_class_labels", {}):
+            try:
+                with patch.object(get_settings(), "INFERENCE_BACKEND", "tflite"):
+                    assert service.load_model(keras_model_path)
+
+                assert isinstance(service.model, TFLiteBackend)
+                results = service.predict_batch(np.zeros((2, 32, 32, 1), dtype=np.float32))
+                assert len(results) == 2
+            finally:
+                service.unload_model()
+
+
+class TestCompiledSignatures:
+    """Tests for the keras backend's fixed-shape inference functions."""
+
+    def test_batches_are_padded_to_compiled_sizes(self, keras_model_path):
+        """Test that warmup traces each batch size once and serving never retraces."""
+        from tensorflow import keras
+        from app.services.inference_backends import KerasBackend
+
+        backend = KerasBackend(batch_sizes=[1, 4])
+        backend.load(keras_model_path)
+        backend.warm_up((32, 32, 1), [1, 4], runs=2)
+
+        stats = backend.stats()
+        assert {key: stats[key] for key in ("compiled_batch_sizes", "traces", "serving_traces")} == {
+            "compiled_batch_sizes": [1, 4], "traces": 2, "serving_traces": 0
+        }
+
+        inputs = np.random.rand(6, 32, 32, 1).astype(np.float32)
+        outputs = backend.predict(inputs)
+
+        # 6 images run as a batch of 4 and a batch of 2 padded to 4
+        assert outputs.shape == (6, 10)
+        expected = np.asarray(keras.models.load_model(keras_model_path)(inputs, training=False))
+        np.testing.assert_allclose(outputs, expected, atol=1e-5)
+        assert backend.stats()["traces"] == 2
+
+    def test_trace_while_serving_is_counted(self, keras_model_path):
+        """Test that a signature traced on the request path is counted as a serving trace."""
+        from app.services.inference_backends import KerasBackend
+
+        backend = KerasBackend(batch_sizes=[1, 4])
+        backend.load(keras_model_path)
+
+        backend.predict(np.zeros((3, 32, 32, 1), dtype=np.float32))
+        backend.predict(np.zeros((2, 32, 32, 1), dtype=np.float32))
+
+        stats = backend.stats()
+        assert {key: stats[key] for key in ("compiled_batch_sizes", "traces", "serving_traces")} == {
+            "compiled_batch_sizes": [4], "traces": 1, "serving_traces": 1
+        }
+
+    def test_model_service_warms_up_before_serving(self, keras_model_path):
+        """Test that loading a model runs the configured warmup batch sizes."""
+        from app.config import get_settings
+        from app.services.model_registry import get_model_registry
+
+        service = get_model_registry().get("character")
+        settings = get_settings()
+        try:
+            with patch.object(settings, "WARMUP_BATCH_SIZES", [1, 2, 8]), patch.object(settings, "WARMUP_RUNS", 1):
+                assert service.load_model(keras_model_path)
+
+            assert service.backend_stats()["compiled_batch_sizes"] == [1, 2, 8]
+            assert service.backend_stats()["serving_traces"] == 0
+        finally:
+            service.unload_model()
+
+
+class TestTFLiteInterpreters:
+    """Tests for the tflite backend's per-batch-size interpreters."""
+
+    def test_batches_are_padded_to_allocated_sizes(self, keras_model_path):
+        """Test that mixed batch sizes reuse one interpreter per size instead of reallocating."""
+        from tensorflow import keras
+
+        from ml.export import export_model
+        from app.services.inference_backends import TFLiteBackend
+
+        assert export_model(keras_model_path, ["tflite"], num_samples=4, latency_runs=2)
+        backend = TFLiteBackend(batch_sizes=[1, 4])
+        backend.load(TFLiteBackend.artifact_path(keras_model_path))
+
+        inputs = np.random.rand(6, 32, 32, 1).astype(np.float32)
+        # 6 images run as a batch of 4 and a batch of 2 padded to 4
+        outputs = backend.predict(inputs)
+        for size in (1, 3, 2, 4, 1):
+            backend.predict(inputs[:size])
+
+        expected = np.asarray(keras.models.load_model(keras_model_path)(inputs, training=False))
+        np.testing.assert_allclose(outputs, expected, atol=1e-5)
+        assert backend.stats() == {"compiled_batch_sizes": [1, 4], "interpreters": {1: 1, 4: 1}}
+
+    def test_concurrent_passes_get_their_own_interpreter(self, keras_model_path):
+        """Test that a pass finding every interpreter of its size busy gets a new one instead of waiting."""
+        from ml.export import export_model
+        from app.services.inference_backends import TFLiteBackend
+
+        assert export_model(keras_model_path, ["tflite"], num_samples=4, latency_runs=2)
+        backend = TFLiteBackend(batch_sizes=[4])
+        backend.load(TFLiteBackend.artifact_path(keras_model_path))
+
+        busy = backend._checkout(4)
+        outputs = backend.predict(np.zeros((3, 32, 32, 1), dtype=np.float32))
+        backend._checkin(4, busy)
+        backend.predict(np.zeros((4, 32, 32, 1), dtype=np.float32))
+
+        assert outputs.shape == (3, 10)
+        assert backend.stats()["interpreters"] == {4: 2}
+
+
+class TestQuantize:
+    """Tests for INT8 post-training quantization."""
+
+    @pytest.fixture
+    def processed_dir(self, tmp_path):
+        """Write a small random processed dataset with 32x32 images."""
+        rng = np.random.default_rng(0)
+        for split, size in (("train", 32), ("val", 8), ("test", 16)):
+            np.save(tmp_path / f"X_{split}.npy", rng.random((size, 32, 32, 1), dtype=np.float32))
+            np.save(tmp_path / f"y_{split}.npy", rng.integers(0, 10, size))
+        return str(tmp_path)
+
+    def test_quantized_artifact_is_served(self, keras_model_path, processed_dir, tmp_path):
+        """Test that a passing INT8 artifact is written and loads in the tflite_int8 backend."""
+        pytest.importorskip("sklearn")
+
+        from ml.quantize import quantize_model
+        from app.services.inference_backends import create_backend
+
+        output_path = tmp_path / "test_model_int8.tflite"
+        report = quantize_model(
+            keras_model_path, processed_dir, str(output_path),
+            calibration_samples=16, max_accuracy_drop=1.0, latency_runs=2,
+        )
+
+        assert report["passed"]
+        assert report["int8_size_mb"] < report["float_size_mb"]
+        assert output_path.exists()
+
+        backend = create_backend("tflite_int8")
+        backend.load(str(output_path))
+        outputs = backend.predict(np.random.rand(3, 32, 32, 1).astype(np.float32))
+        assert outputs.shape == (3, 10)
+
+    def test_gate_rejects_accuracy_drop(self, keras_model_path, processed_dir, tmp_path):
+        """Test that the artifact is not written when the accuracy gate fails."""
+        pytest.importorskip("sklearn")
+
+        from ml.quantize import quantize_model
+
+        output_path = tmp_path / "test_model_int8.tflite"
+        report = quantize_model(
+            keras_model_path, processed_dir, str(output_path),
+            calibration_samples=16, max_accuracy_drop=-1.0, latency_runs=2,
+        )
+
+        assert not report["passed"]
+        assert not output_path.exists()
+
+    def test_default_data_dirs_match_training_output(self):
+        """Test that calibration data is looked up where the training scripts save each dataset."""
+        pytest.importorskip("sklearn")
+
+        from app.config import BASE_DIR
+        from ml.preprocess import processed_data_dir
+        from ml.quantize import MODEL_DEFAULTS
+
+        assert MODEL_DEFAULTS["character"][1] == BASE_DIR / processed_data_dir("characters")
+        assert MODEL_DEFAULTS["digit"][1] == BASE_DIR / processed_data_dir("digits")
+        assert MODEL_DEFAULTS["digit"][1] != MODEL_DEFAULTS["character"][1]
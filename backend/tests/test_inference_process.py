@@ -0,0 +1,295 @@
+"""
+Inference Process Tests
+
+Tests for running the models in a dedicated process fed through a
+shared-memory ring.
+"""
+
+import gc
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from tests.helpers import save_network
+
+
+@pytest.fixture
+def inference_process():
+    """Start an inference engine with a small ring."""
+    from app.services.inference_process import InferenceProcess
+
+    process = InferenceProcess(ring_slots=2, ring_slot_images=8)
+    process.start()
+    yield process
+    process.stop()
+
+
+@pytest.fixture
+def network_path(tmp_path):
+    """Export a small NumPy network and return its path."""
+    path = tmp_path / "network.npz"
+    save_network(path)
+    return str(path)
+
+
+def wait_until_stopped(pid: int, timeout_s: float = 5.0) -> None:
+    """Wait until every thread of a process signalled with SIGSTOP has actually stopped."""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        states = set()
+        for stat in Path(f"/proc/{pid}/task").glob("*/stat"):
+            try:
+                # The state follows the parenthesized command name, which may itself contain spaces
+                states.add(stat.read_text().rsplit(")", 1)[1].split()[0])
+            except FileNotFoundError:
+                # The thread exited in the meantime
+                pass
+        if states == {"T"}:
+            return
+        assert time.monotonic() < deadline, f"Process {pid} did not stop (thread states {states})"
+        time.sleep(0.01)
+
+
+def expected_outputs(network_path, image_batch):
+    """Outputs of the network run in this process."""
+    from app.models.numpy_cnn import NumpyCNN
+
+    return NumpyCNN.load(network_path).predict(image_batch)
+
+
+class TestSlotRing:
+    """Tests for the shared-memory slot ring."""
+
+    def test_attached_views_share_memory(self):
+        """Test that a view written by the owner is visible through an attached ring."""
+        from app.services.inference_process import SlotRing
+
+        ring = SlotRing(slots=2, slot_bytes=64)
+        attached = SlotRing(slots=2, slot_bytes=64, name=ring.name)
+        try:
+            slot = ring.acquire()
+            ring.view(slot, (4, 4))[...] = 7.0
+
+            view = attached.view(slot, (4, 4))
+            assert np.all(view == 7.0)
+            assert ring.free_slots == 1
+
+            ring.release(slot)
+            assert ring.free_slots == 2
+            del view
+        finally:
+            attached.close()
+            ring.close()
+
+
+class TestRemoteBackend:
+    """Tests for forwarding forward passes to the inference process."""
+
+    def test_predictions_match_in_process_backend(self, inference_process, network_path):
+        """Test that a batch larger than a ring slot gives the same outputs as in-process inference."""
+        from app.services.inference_process import RemoteBackend
+
+        backend = RemoteBackend("numpy", process=inference_process)
+        backend.load(network_path)
+        image_batch = np.random.rand(20, 64, 64, 1).astype(np.float32)
+
+        outputs = backend.predict(image_batch)
+
+        assert backend.input_shape == (None, 64, 64, 1)
+        assert backend.memory_bytes() > 0
+        np.testing.assert_allclose(outputs, expected_outputs(network_path, image_batch), atol=1e-4)
+
+    def test_concurrent_requests_share_the_ring(self, inference_process, network_path):
+        """Test that more concurrent requests than ring slots all get their own results."""
+        from app.services.inference_process import RemoteBackend
+
+        backend = RemoteBackend("numpy", process=inference_process)
+        backend.load(network_path)
+        batches = [np.random.rand(3, 64, 64, 1).astype(np.float32) for _ in range(16)]
+        results = [None] * len(batches)
+
+        def run(index):
+            results[index] = backend.predict(batches[index])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(batches))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for batch, result in zip(batches, results):
+            np.testing.assert_allclose(result, expected_outputs(network_path, batch), atol=1e-4)
+        assert inference_process.stats()["free_slots"] == 2
+        assert backend.stats()["engine"]["images"] == 48
+
+    def test_same_artifact_is_loaded_once(self, inference_process, network_path):
+        """Test that backends loading the same artifact share the engine's copy until both are released."""
+        from app.services.inference_process import RemoteBackend
+
+        first = RemoteBackend("numpy", process=inference_process)
+        second = RemoteBackend("numpy", process=inference_process)
+        first.load(network_path)
+        second.load(network_path)
+
+        assert first.stats()["engine"]["clients"] == 2
+
+        del second
+        gc.collect()
+        deadline = time.monotonic() + 5
+        while first.stats()["engine"]["clients"] != 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    def test_missing_artifact_fails_to_load(self, inference_process, tmp_path):
+        """Test that a load error in the engine surfaces as ModelLoadError."""
+        from app.core.exceptions import ModelLoadError
+        from app.services.inference_process import RemoteBackend
+
+        with pytest.raises(ModelLoadError):
+            RemoteBackend("numpy", process=inference_process).load(str(tmp_path / "missing.npz"))
+
+    def test_engine_exit_fails_predictions(self, inference_process, network_path):
+        """Test that predictions fail instead of hanging when the engine dies."""
+        from app.core.exceptions import PredictionError
+        from app.services.inference_process import RemoteBackend
+
+        backend = RemoteBackend("numpy", process=inference_process)
+        backend.load(network_path)
+        inference_process._process.kill()
+        inference_process._process.join()
+
+        with pytest.raises(PredictionError):
+            backend.predict(np.zeros((1, 64, 64, 1), dtype=np.float32))
+
+    def test_stalled_engine_reports_stats_unavailable(self, inference_process, network_path):
+        """Test that statistics give up on an engine that stops answering instead of blocking."""
+        from app.services.inference_process import RemoteBackend
+
+        backend = RemoteBackend("numpy", process=inference_process)
+        backend.load(network_path)
+        assert backend.stats()
+
+        pid = inference_process._process.pid
+        os.kill(pid, signal.SIGSTOP)
+        try:
+            wait_until_stopped(pid)
+            with patch("app.services.inference_process.STATS_TIMEOUT_S", 0.2):
+                start = time.monotonic()
+                assert backend.stats() == {"available": False}
+                assert inference_process.engine_stats() is None
+                assert time.monotonic() - start < 2
+        finally:
+            os.kill(pid, signal.SIGCONT)
+
+        # Late replies are dropped, and the engine answers again once it resumes
+        assert inference_process.stats()["pending_requests"] == 0
+        assert backend.stats() != {"available": False}
+
+
+class TestInferencePool:
+    """Tests for spreading forward passes over several inference processes."""
+
+    def test_cpus_are_split_into_disjoint_sets(self):
+        """Test that each worker gets its own contiguous share of the cores."""
+        from app.services.inference_process import partition_cpus
+
+        assert partition_cpus([3, 0, 1, 2, 4, 5, 6, 7], 3) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+        assert partition_cpus([0, 1], 3) == [[0], [1], [0]]
+
+    def test_batches_go_to_least_loaded_worker(self):
+        """Test that routing picks the worker with the fewest images in flight."""
+        from app.services.inference_process import InferencePool
+
+        pool = InferencePool(workers=3, pin_cpus=False)
+
+        assert [pool.route(8), pool.route(2), pool.route(4)] == [0, 1, 2]
+        assert pool.route(1) == 1
+
+        pool.finish(0, 8)
+        assert pool.route(1) == 0
+        assert [worker["in_flight_images"] for worker in pool.stats()["workers"]] == [1, 3, 4]
+
+    def test_concurrent_batches_use_every_worker(self, network_path):
+        """Test that each worker loads a replica and serves part of a concurrent load."""
+        from app.services.inference_process import InferencePool, RemoteBackend
+
+        pool = InferencePool(workers=2, pin_cpus=False, ring_slots=2, ring_slot_images=8)
+        pool.start()
+        try:
+            backend = RemoteBackend("numpy", process=pool)
+            backend.load(network_path)
+            batches = [np.random.rand(2, 64, 64, 1).astype(np.float32) for _ in range(16)]
+            results = [None] * len(batches)
+
+            def run(index):
+                results[index] = backend.predict(batches[index])
+
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(len(batches))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for batch, result in zip(batches, results):
+                np.testing.assert_allclose(result, expected_outputs(network_path, batch), atol=1e-4)
+
+            stats = pool.stats()
+            replicas = backend.stats()["replicas"]
+        finally:
+            pool.stop()
+
+        assert stats["free_slots"] == 4
+        assert all(worker["images"] > 0 and worker["in_flight_images"] == 0 for worker in stats["workers"])
+        assert sum(worker["engine"]["images"] for worker in stats["workers"]) == 32
+        assert sum(replica["engine"]["images"] for replica in replicas) == 32
+        assert all(0 < worker["engine"]["utilization"] <= 1 for worker in stats["workers"])
+
+    def test_pinned_worker_runs_on_its_cpus(self, network_path):
+        """Test that a pinned engine is confined to its CPU set and sizes its threads to it."""
+        import os
+
+        from app.services.inference_process import InferencePool, RemoteBackend
+
+        pool = InferencePool(workers=1, pin_cpus=True, ring_slots=2, ring_slot_images=8)
+        cpus = pool.workers[0].cpus
+        pool.start()
+        try:
+            RemoteBackend("numpy", process=pool).load(network_path)
+            engine = pool.stats()["workers"][0]["engine"]
+            engine_cpus = os.sched_getaffinity(engine["pid"])
+        finally:
+            pool.stop()
+
+        assert cpus == sorted(os.sched_getaffinity(0))
+        assert engine["cpus"] == cpus
+        assert engine_cpus == set(cpus)
+
+
+class TestRegistryWithInferenceProcess:
+    """Tests for serving registry models from the inference process."""
+
+    def test_model_service_predicts_through_engine(self, numpy_configs, inference_process):
+        """Test that model services load and predict through the engine when INFERENCE_PROCESS is set."""
+        from app.config import get_settings
+        from app.services.inference_process import RemoteBackend
+        from app.services.model_registry import ModelRegistry
+
+        with patch.object(get_settings(), "INFERENCE_PROCESS", True), \
+                patch("app.services.inference_process.inference_process", inference_process):
+            registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+            assert registry.ensure_loaded("alpha")
+            service = registry.get("alpha")
+
+            results = service.predict_batch(np.random.rand(4, 64, 64, 1).astype(np.float32))
+
+        assert isinstance(service.model, RemoteBackend)
+        assert service.info()["backend"] == "numpy"
+        assert len(results) == 4
+        assert all(result[4] == service.version for result in results)
+        assert results[0][0].startswith("alpha-")
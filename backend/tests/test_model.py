@@ -52,26 +52,69 @@ class TestCNNModel:
 class TestModelService:
     """Tests for model service."""
 
-    def test_model_service_singleton(self):
-        """Test that model service is a singleton."""
-        from app.services.model_service import ModelService
+    def test_registry_returns_one_service_per_model(self):
+        """Test that the registry serves the same service for a name."""
+        from app.services.model_registry import get_model_registry
 
-        service1 = ModelService()
-        service2 = ModelService()
+        registry = get_model_registry()
 
-        assert service1 is service2
+        assert registry.get("character") is registry.get("character")
+        assert registry.get("character") is not registry.get("digit")
+        assert {"character", "digit"} <= set(registry.names())
+
+    def test_registry_unknown_model(self):
+        """Test that an unknown model name raises ModelNotFoundError."""
+        from app.core.exceptions import ModelNotFoundError
+        from app.services.model_registry import get_model_registry
+
+        with pytest.raises(ModelNotFoundError):
+            get_model_registry().get("nonexistent")
+
+    def test_registry_serves_configured_extra_model(self):
+        """Test that adding a model is a configuration entry."""
+        from app.config import ModelConfig
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry({
+            "symbols": ModelConfig(model_path="saved_models/symbols.h5", default_labels={0: "؟", 1: "،"}),
+        })
+        service = registry.get("symbols")
+
+        assert service.name == "symbols"
+        assert not service.is_loaded
+        assert service.get_classes() == ["؟", "،"]
+        assert registry.stats()["models"]["symbols"]["num_classes"] == 2
 
     def test_get_classes(self):
         """Test getting character classes."""
-        from app.services.model_service import get_model_service
+        from app.services.model_registry import get_model_registry
 
-        service = get_model_service()
+        service = get_model_registry().get("character")
         classes = service.get_classes()
 
         assert isinstance(classes, list)
         assert len(classes) > 0
         assert "ا" in classes  # Alif should be in the list
 
+    def test_predict_batch_returns_one_result_per_image(self):
+        """Test batched prediction with a stubbed model."""
+        from app.services.model_registry import get_model_registry
+
+        service = get_model_registry().get("character")
+        probs = np.zeros((3, 46), dtype=np.float32)
+        probs[np.arange(3), [0, 1, 2]] = 1.0
+
+        stub_model = MagicMock()
+        stub_model.predict.return_value = probs
+
+        with patch.object(service, "_model", stub_model), patch.object(service, "_is_loaded", True):
+            results = service.predict_batch(np.zeros((3, 64, 64, 1), dtype=np.float32))
+
+        assert stub_model.predict.call_count == 1
+        assert [r[0] for r in results] == ["ا", "ب", "پ"]
+        assert all(r[1] == 1.0 for r in results)
+        assert all(len(r[2]) == 5 for r in results)
+
 
 class TestImageService:
     """Tests for image service."""
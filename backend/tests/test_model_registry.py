@@ -0,0 +1,478 @@
+"""
+Model Registry Tests
+
+Tests for on-demand model loading, memory-bounded eviction and hot reload.
+"""
+
+import asyncio
+import io
+import os
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from tests.helpers import NUM_CLASSES, save_network
+
+# Size of one exported network's weights
+MODEL_BYTES = (4096 * NUM_CLASSES + NUM_CLASSES) * 4
+
+
+class TestLazyLoading:
+    """Tests for loading models on their first request."""
+
+    def test_models_are_not_loaded_until_requested(self, numpy_configs):
+        """Test that creating the registry loads nothing."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        assert not any(service.is_loaded for service in registry)
+        assert registry.resident_bytes() == 0
+
+    def test_concurrent_first_requests_share_one_load(self, numpy_configs):
+        """Test that concurrent first requests load the model once."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        async def run():
+            return await asyncio.gather(*[registry.acquire("alpha") for _ in range(8)])
+
+        leases = asyncio.run(run())
+
+        assert all(lease.service is registry.get("alpha") for lease in leases)
+        assert registry.get("alpha").leases == 8
+        for lease in leases:
+            lease.release()
+        assert registry.get("alpha").leases == 0
+        assert registry.get("alpha").is_loaded
+        assert not registry.get("beta").is_loaded
+
+        stats = registry.stats()
+        assert stats["models"]["alpha"]["loads"] == 1
+        assert stats["models"]["alpha"]["resident_bytes"] == MODEL_BYTES
+        assert [event["event"] for event in stats["events"]] == ["load"]
+
+        predictions = registry.get("alpha").predict_batch(np.zeros((2, 64, 64, 1), dtype=np.float32))
+        assert len(predictions) == 2
+
+    def test_missing_artifact_serves_unloaded_model(self, numpy_configs, tmp_path):
+        """Test that a model without an artifact stays unloaded for mock predictions."""
+        from app.services.model_registry import ModelRegistry
+
+        (tmp_path / "alpha.npz").unlink()
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        lease = asyncio.run(registry.acquire("alpha"))
+        lease.release()
+
+        assert not lease.service.is_loaded
+        assert registry.stats()["events"] == []
+
+    def test_broken_artifact_is_not_retried(self, numpy_configs, tmp_path):
+        """Test that a failed load is recorded once until the artifact changes."""
+        from app.services.model_registry import ModelRegistry
+
+        (tmp_path / "alpha.npz").write_bytes(b"not a model")
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        assert not registry.ensure_loaded("alpha")
+        assert not registry.ensure_loaded("alpha")
+
+        assert registry.stats()["models"]["alpha"]["load_failures"] == 1
+        assert [event["event"] for event in registry.stats()["events"]] == ["load_failed"]
+
+    def test_slow_backend_stats_do_not_block_loads(self, numpy_configs):
+        """Test that a load can record its event while stats wait on a model's backend."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+        release = threading.Event()
+
+        def slow_backend_stats():
+            release.wait(5)
+            return {}
+
+        with patch.object(registry.get("alpha"), "backend_stats", side_effect=slow_backend_stats):
+            reader = threading.Thread(target=registry.stats)
+            reader.start()
+            try:
+                loader = threading.Thread(target=registry.ensure_loaded, args=("beta",))
+                loader.start()
+                loader.join(2)
+                assert not loader.is_alive()
+            finally:
+                release.set()
+                reader.join()
+
+        assert registry.stats()["models"]["beta"]["loads"] == 1
+
+
+class TestEviction:
+    """Tests for memory-bounded LRU eviction."""
+
+    def test_least_recently_used_model_is_evicted(self, numpy_configs):
+        """Test that loading past the budget evicts the idle LRU model."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=MODEL_BYTES)
+
+        assert registry.ensure_loaded("alpha")
+        assert registry.ensure_loaded("beta")
+
+        assert not registry.get("alpha").is_loaded
+        assert registry.get("beta").is_loaded
+        assert registry.resident_bytes() == MODEL_BYTES
+
+        events = [(event["event"], event["model"]) for event in registry.stats()["events"]]
+        assert events == [("load", "alpha"), ("load", "beta"), ("evict", "alpha")]
+
+        # The evicted model reloads on its next request
+        asyncio.run(registry.acquire("alpha")).release()
+        assert registry.get("alpha").is_loaded
+        assert not registry.get("beta").is_loaded
+        assert registry.stats()["models"]["alpha"]["loads"] == 2
+
+    def test_busy_model_is_not_evicted(self, numpy_configs):
+        """Test that a model with a forward pass in flight stays resident."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=MODEL_BYTES)
+        assert registry.ensure_loaded("alpha")
+
+        with patch.object(registry.get("alpha"), "_in_flight", 1):
+            assert registry.ensure_loaded("beta")
+
+        assert registry.get("alpha").is_loaded and registry.get("beta").is_loaded
+        assert registry.stats()["models"]["alpha"]["evictions"] == 0
+
+    def test_model_waiting_in_batch_queue_is_not_evicted(self, numpy_configs):
+        """Test that a leased model stays resident while its request waits for a batch."""
+        from app.services.batching import BatchScheduler
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=MODEL_BYTES)
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            lease = await registry.acquire("alpha")
+            try:
+                queued = asyncio.ensure_future(
+                    scheduler.submit(lease.service, np.zeros((1, 64, 64, 1), dtype=np.float32))
+                )
+                await asyncio.sleep(0)
+
+                # Another model loads over the budget while the request sits in the batch queue
+                assert lease.service.in_flight == 0
+                assert registry.ensure_loaded("beta")
+                assert registry.get("alpha").is_loaded
+
+                return await queued
+            finally:
+                lease.release()
+
+        result = asyncio.run(run())
+
+        assert result[0].startswith("alpha-")
+        assert registry.stats()["models"]["alpha"]["evictions"] == 0
+
+        # Once the response is sent, the model is idle and the next load evicts it
+        registry.get("beta").unload_model()
+        assert registry.ensure_loaded("beta")
+        assert not registry.get("alpha").is_loaded
+
+    def test_zero_budget_disables_eviction(self, numpy_configs):
+        """Test that a budget of 0 keeps every model resident."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        assert registry.ensure_loaded("alpha") and registry.ensure_loaded("beta")
+        assert registry.resident_bytes() == 2 * MODEL_BYTES
+
+
+class TestBackgroundLoading:
+    """Tests for concurrent background loading with readiness gating."""
+
+    def test_requests_fail_fast_until_background_load_finishes(self, numpy_configs):
+        """Test that a preloading model raises ModelNotReadyError instead of blocking."""
+        from app.core.exceptions import ModelNotReadyError
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        service = registry.get("alpha")
+        release = threading.Event()
+        load_model = service.load_model
+
+        def slow_load_model(*args, **kwargs):
+            release.wait(5)
+            return load_model(*args, **kwargs)
+
+        async def run():
+            with patch.object(service, "load_model", side_effect=slow_load_model):
+                tasks = registry.preload_in_background(["alpha", "beta"])
+
+                with pytest.raises(ModelNotReadyError) as exc_info:
+                    await registry.acquire("alpha")
+                assert exc_info.value.retry_after > 0
+                assert registry.readiness()["alpha"] == "loading"
+                assert not registry.is_ready()
+
+                release.set()
+                return await asyncio.gather(*tasks)
+
+        assert asyncio.run(run()) == [True, True]
+        assert registry.readiness() == {"alpha": "ready", "beta": "ready"}
+        assert registry.is_ready()
+        assert asyncio.run(registry.acquire("alpha")).service.is_loaded
+
+    def test_missing_required_model_is_not_ready(self, numpy_configs, tmp_path):
+        """Test that a preloaded model without an artifact keeps the registry not ready."""
+        from app.services.model_registry import ModelRegistry
+
+        (tmp_path / "beta.npz").unlink()
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+
+        async def run():
+            return await asyncio.gather(*registry.preload_in_background(["alpha", "beta"]))
+
+        assert asyncio.run(run()) == [True, False]
+        assert registry.readiness() == {"alpha": "ready", "beta": "missing"}
+        assert not registry.is_ready()
+
+        # Once its startup load has finished, the missing model serves mock predictions again
+        assert not asyncio.run(registry.acquire("beta")).service.is_loaded
+
+    def test_preloaded_models_are_not_evicted(self, numpy_configs):
+        """Test that pinned models stay resident over the memory budget."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=MODEL_BYTES)
+        registry.preload(["alpha"])
+        assert registry.ensure_loaded("beta")
+
+        assert registry.get("alpha").is_loaded and registry.get("beta").is_loaded
+        assert registry.stats()["models"]["alpha"]["pinned"]
+
+    def test_routes_return_503_with_retry_after_while_loading(self, numpy_configs):
+        """Test the fast 503 and the /ready endpoint while a required model loads."""
+        from fastapi.testclient import TestClient
+
+        from app.api.dependencies import get_models
+        from app.main import app
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        # Simulate a startup load that hasn't finished
+        registry._pin(["alpha"])
+        registry._background.add("alpha")
+
+        with patch.dict(app.dependency_overrides, {get_models: lambda: registry}):
+            client = TestClient(app)
+
+            ready = client.get("/ready")
+            assert ready.status_code == 503
+            assert ready.headers["Retry-After"]
+            assert ready.json() == {"status": "not_ready", "models": {"alpha": "loading"}}
+
+            response = client.get("/api/v1/models/alpha/classes")
+            assert response.status_code == 503
+            assert response.headers["Retry-After"]
+
+            # Health stays distinct from readiness
+            assert client.get("/health").status_code == 200
+
+            registry._background.discard("alpha")
+            assert registry.ensure_loaded("alpha")
+
+            assert client.get("/ready").json() == {"status": "ready", "models": {"alpha": "ready"}}
+            assert client.get("/api/v1/models/alpha/classes").status_code == 200
+
+
+class TestHotReload:
+    """Tests for hot reloading with atomic swap and rollback."""
+
+    def test_reload_swaps_version_and_keeps_previous(self, numpy_configs, tmp_path):
+        """Test that a reload serves the new version and keeps the old one for rollback."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+        service = registry.get("alpha")
+        old_version = service.version
+
+        save_network(tmp_path / "alpha.npz")
+        new_version = registry.reload("alpha")
+
+        assert new_version != old_version
+        assert service.version == new_version
+        assert service.previous_version == old_version
+        assert service.resident_bytes == 2 * MODEL_BYTES
+
+        image = np.zeros((1, 64, 64, 1), dtype=np.float32)
+        assert service.predict_batch(image)[0][-1] == new_version
+
+        assert registry.rollback("alpha") == old_version
+        assert service.predict_batch(image)[0][-1] == old_version
+        assert service.previous_version == new_version
+
+        events = [event["event"] for event in registry.stats()["events"]]
+        assert events == ["load", "reload", "rollback"]
+
+    def test_in_flight_forward_pass_finishes_on_old_version(self, numpy_configs, tmp_path):
+        """Test that a forward pass running during the swap keeps its version."""
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+        service = registry.get("alpha")
+        old_version = service.version
+
+        started, release = threading.Event(), threading.Event()
+        old_predict = service.model.predict
+
+        def slow_predict(image_batch):
+            started.set()
+            release.wait(5)
+            return old_predict(image_batch)
+
+        results = []
+        with patch.object(service.model, "predict", side_effect=slow_predict):
+            worker = threading.Thread(
+                target=lambda: results.extend(service.predict_batch(np.zeros((1, 64, 64, 1), dtype=np.float32)))
+            )
+            worker.start()
+            assert started.wait(5)
+
+            save_network(tmp_path / "alpha.npz")
+            new_version = registry.reload("alpha")
+
+            release.set()
+            worker.join(5)
+
+        assert results[0][-1] == old_version
+        assert service.version == new_version
+
+    def test_failed_reload_keeps_current_version(self, numpy_configs, tmp_path):
+        """Test that a broken artifact doesn't replace the serving version."""
+        from app.core.exceptions import ModelLoadError
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+        version = registry.get("alpha").version
+
+        (tmp_path / "alpha.npz").write_bytes(b"not a model")
+        with pytest.raises(ModelLoadError):
+            registry.reload("alpha")
+
+        assert registry.get("alpha").is_loaded
+        assert registry.get("alpha").version == version
+        assert registry.stats()["models"]["alpha"]["reload_failures"] == 1
+
+    def test_rollback_without_previous_version(self, numpy_configs):
+        """Test that rolling back a freshly loaded model raises ModelRollbackError."""
+        from app.core.exceptions import ModelRollbackError
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+
+        with pytest.raises(ModelRollbackError):
+            registry.rollback("alpha")
+
+    def test_watcher_reloads_changed_artifact_once_stable(self, numpy_configs, tmp_path):
+        """Test that the watcher reloads after the artifact is unchanged for one poll."""
+        from app.services.model_registry import ModelRegistry
+        from app.services.model_watcher import ModelWatcher
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        assert registry.ensure_loaded("alpha")
+        old_version = registry.get("alpha").version
+        watcher = ModelWatcher(registry, interval_s=0.01)
+
+        artifact = tmp_path / "alpha.npz"
+        save_network(artifact)
+        mtime = registry.get("alpha").artifact_mtime + 10
+        os.utime(artifact, (mtime, mtime))
+
+        assert asyncio.run(watcher.check()) == []
+        assert asyncio.run(watcher.check()) == ["alpha"]
+        assert asyncio.run(watcher.check()) == []
+
+        assert registry.get("alpha").previous_version == old_version
+        assert registry.get("alpha").artifact_mtime == mtime
+
+
+class TestAdminEndpoints:
+    """Tests for the reload and rollback endpoints."""
+
+    @pytest.fixture
+    def client(self, numpy_configs):
+        """Test client serving a registry of the exported networks, sending the admin token."""
+        from fastapi.testclient import TestClient
+
+        from app.api.dependencies import get_models
+        from app.config import get_settings
+        from app.main import app
+        from app.services.model_registry import ModelRegistry
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        with patch.dict(app.dependency_overrides, {get_models: lambda: registry}), \
+                patch.object(get_settings(), "ADMIN_TOKEN", "secret"):
+            client = TestClient(app)
+            client.headers["X-Admin-Token"] = "secret"
+            yield client
+
+    def create_upload(self) -> dict:
+        """Create a multipart upload of a random image."""
+        from PIL import Image
+
+        img = Image.fromarray(np.random.randint(0, 255, (64, 64), dtype=np.uint8))
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        buffer.seek(0)
+        return {"file": ("test.png", buffer, "image/png")}
+
+    def test_predictions_report_served_version(self, client, tmp_path):
+        """Test that reload and rollback change the version in prediction responses."""
+        first = client.post("/api/v1/models/alpha/predict", files=self.create_upload()).json()
+        assert first["model_version"]
+
+        save_network(tmp_path / "alpha.npz")
+        reloaded = client.post("/api/v1/admin/models/alpha/reload").json()
+        assert reloaded["previous_version"] == first["model_version"]
+        assert reloaded["version"] != first["model_version"]
+
+        second = client.post("/api/v1/models/alpha/predict", files=self.create_upload()).json()
+        assert second["model_version"] == reloaded["version"]
+
+        rolled_back = client.post("/api/v1/admin/models/alpha/rollback").json()
+        assert rolled_back["version"] == first["model_version"]
+
+    def test_rollback_without_previous_version_conflicts(self, client):
+        """Test that a rollback with nothing to roll back to returns 409."""
+        client.post("/api/v1/models/alpha/predict", files=self.create_upload())
+
+        assert client.post("/api/v1/admin/models/alpha/rollback").status_code == 409
+
+    def test_unknown_model_returns_404(self, client):
+        """Test that reloading an unknown model returns 404."""
+        assert client.post("/api/v1/admin/models/nonexistent/reload").status_code == 404
+
+    def test_admin_token_required(self, client):
+        """Test that the admin endpoints check X-Admin-Token against ADMIN_TOKEN."""
+        assert client.post("/api/v1/admin/models/alpha/reload", headers={"X-Admin-Token": ""}).status_code == 401
+        assert client.post("/api/v1/admin/models/alpha/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+        assert client.post("/api/v1/admin/models/alpha/reload").status_code == 200
+
+    def test_admin_endpoints_disabled_without_token(self, client):
+        """Test that the admin endpoints fail closed when ADMIN_TOKEN is unset."""
+        from app.config import get_settings
+
+        with patch.object(get_settings(), "ADMIN_TOKEN", None):
+            assert client.post("/api/v1/admin/models/alpha/reload").status_code == 403
+            assert client.post("/api/v1/admin/models/alpha/rollback", headers={"X-Admin-Token": ""}).status_code == 403
@@ -31,6 +31,12 @@ class TestHealthEndpoint:
         assert "version" in data
         assert data["status"] == "healthy"
 
+    def test_ready_without_required_models(self):
+        """Test that readiness only waits for models preloaded at startup."""
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
     def test_root_endpoint(self):
         """Test root endpoint returns welcome message."""
         response = client.get("/")
@@ -42,6 +48,23 @@ class TestHealthEndpoint:
         assert "docs" in data
 
 
+class TestMetricsEndpoint:
+    """Tests for metrics endpoint."""
+
+    def test_metrics_report_executor_and_batching(self):
+        """Test metrics endpoint exposes executor and batching statistics."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert "queue_depth" in data["executor"]
+        assert "utilization" in data["executor"]
+        assert "max_batch_size" in data["batching"]
+        assert "hits" in data["prediction_cache"]
+        assert "inferences_saved" in data["tensor_cache"]
+        assert "in_flight" in data["singleflight"]
+
+
 class TestPredictionEndpoint:
     """Tests for prediction endpoints."""
 
@@ -148,6 +171,194 @@ class TestCanvasPrediction:
         assert response.status_code == 400
 
 
+class TestBatchPrediction:
+    """Tests for batch prediction endpoints."""
+
+    def create_test_image(self, color: int = 128) -> bytes:
+        """Create a PNG test image for upload."""
+        img = Image.new("L", (64, 64), color=color)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def create_base64_image(self) -> str:
+        """Create a base64 encoded test image."""
+        import base64
+
+        encoded = base64.b64encode(self.create_test_image()).decode("utf-8")
+        return f"data:image/png;base64,{encoded}"
+
+    def test_batch_multipart_reports_per_item_errors(self):
+        """Test that an invalid upload fails only its own item."""
+        response = client.post(
+            "/api/v1/predict/batch",
+            files=[
+                ("files", ("a.png", self.create_test_image(), "image/png")),
+                ("files", ("b.gif", self.create_test_image(), "image/gif")),
+                ("files", ("c.png", b"not an image", "image/png")),
+                ("files", ("d.png", self.create_test_image(200), "image/png")),
+            ],
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["count"] == 4
+        assert data["succeeded"] == 2
+        assert data["failed"] == 2
+        assert [item["index"] for item in data["results"]] == [0, 1, 2, 3]
+        assert [item["success"] for item in data["results"]] == [True, False, False, True]
+        assert data["results"][0]["filename"] == "a.png"
+        assert data["results"][0]["prediction"] is not None
+        assert "Unsupported image format" in data["results"][1]["error"]
+
+    def test_batch_json_base64_images(self):
+        """Test batch prediction from a JSON list of base64 images."""
+        response = client.post(
+            "/api/v1/predict/batch",
+            json={"images": [self.create_base64_image(), "invalid_base64_data"]},
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 1
+        assert data["results"][1]["success"] is False
+        assert data["results"][1]["error"]
+
+    def test_digit_batch(self):
+        """Test digit batch prediction endpoint."""
+        response = client.post(
+            "/api/v1/predict/digit/batch",
+            json={"images": [self.create_base64_image(), self.create_base64_image()]},
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert all(item["prediction"] in "۰۱۲۳۴۵۶۷۸۹" for item in data["results"])
+
+    def test_batch_predictions_use_one_forward_pass(self):
+        """Test that all valid items are stacked into one predict_batch call."""
+        from app.services.model_registry import get_model_registry
+
+        service = get_model_registry().get("character")
+        calls = []
+
+        def fake_predict_batch(image_batch):
+            calls.append(image_batch.shape)
+            return [("ب", 0.9, [{"character": "ب", "probability": 0.9}], 3.0, "test")] * len(image_batch)
+
+        with patch.object(service, "_is_loaded", True), patch.object(
+            service, "predict_batch", side_effect=fake_predict_batch
+        ):
+            response = client.post(
+                "/api/v1/predict/batch",
+                json={"images": [self.create_base64_image()] * 3},
+            )
+
+        assert response.status_code == 200
+        assert calls == [(3, 64, 64, 1)]
+        assert response.json()["processing_time_ms"] == 3.0
+
+    def test_batch_empty_request(self):
+        """Test that an empty batch is rejected."""
+        response = client.post("/api/v1/predict/batch", json={"images": []})
+
+        assert response.status_code == 422
+
+    def test_batch_too_many_items(self):
+        """Test that batches above the configured limit are rejected."""
+        from app.config import get_settings
+
+        with patch.object(get_settings(), "BATCH_MAX_ITEMS", 2):
+            response = client.post(
+                "/api/v1/predict/batch",
+                json={"images": [self.create_base64_image()] * 3},
+            )
+
+        assert response.status_code == 400
+
+
+class TestArchivePrediction:
+    """Tests for streaming archive prediction endpoints."""
+
+    def create_test_image(self) -> bytes:
+        """Create a PNG test image."""
+        img = Image.new("L", (64, 64), color=128)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def create_zip(self) -> bytes:
+        """Create a ZIP archive with valid, invalid and metadata members."""
+        import zipfile
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("glyphs/alif.png", self.create_test_image())
+            archive.writestr("glyphs/readme.txt", "not an image")
+            archive.writestr("__MACOSX/glyphs/._alif.png", "metadata")
+            archive.writestr("glyphs/baa.png", self.create_test_image())
+        return buffer.getvalue()
+
+    def parse_ndjson(self, body: str) -> list:
+        """Parse an NDJSON response body."""
+        import json
+
+        return [json.loads(line) for line in body.splitlines() if line]
+
+    def test_zip_archive_streams_ndjson(self):
+        """Test that each archive member gets one line, then a summary."""
+        response = client.post(
+            "/api/v1/predict/archive",
+            files={"file": ("glyphs.zip", self.create_zip(), "application/zip")},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = self.parse_ndjson(response.text)
+        items, summary = lines[:-1], lines[-1]["summary"]
+
+        assert [item["filename"] for item in items] == ["glyphs/alif.png", "glyphs/readme.txt", "glyphs/baa.png"]
+        assert [item["success"] for item in items] == [True, False, True]
+        assert summary == {"count": 3, "succeeded": 2, "failed": 1}
+
+    def test_tar_archive_for_digits(self):
+        """Test digit predictions over a gzipped TAR archive."""
+        import tarfile
+
+        image = self.create_test_image()
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for name in ["0.png", "1.png"]:
+                info = tarfile.TarInfo(name)
+                info.size = len(image)
+                archive.addfile(info, io.BytesIO(image))
+
+        response = client.post(
+            "/api/v1/predict/digit/archive",
+            files={"file": ("digits.tar.gz", buffer.getvalue(), "application/gzip")},
+        )
+
+        assert response.status_code == 200
+
+        lines = self.parse_ndjson(response.text)
+        assert lines[-1]["summary"]["succeeded"] == 2
+        assert all(item["prediction"] in "۰۱۲۳۴۵۶۷۸۹" for item in lines[:-1])
+
+    def test_non_archive_upload(self):
+        """Test that a non-archive upload is rejected before streaming."""
+        response = client.post(
+            "/api/v1/predict/archive",
+            files={"file": ("glyph.png", self.create_test_image(), "image/png")},
+        )
+
+        assert response.status_code == 400
+
+
 class TestDigitCanvasPrediction:
     """Tests for digit canvas prediction endpoint."""
 
@@ -254,3 +465,54 @@ class TestDigitCanvasPrediction:
         assert data["count"] > 0
         # Digits should have 10 classes (0-9)
         assert data["count"] == 10
+
+
+class TestModelRegistryEndpoints:
+    """Tests for the model-name parameterized endpoints."""
+
+    def create_base64_image(self) -> str:
+        """Create a base64 encoded test image."""
+        import base64
+
+        img = Image.new("L", (64, 64), color=128)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+
+        return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+    def test_list_models(self):
+        """Test that the configured models are listed."""
+        response = client.get("/api/v1/models")
+        assert response.status_code == 200
+
+        data = response.json()
+        names = [model["name"] for model in data["models"]]
+        assert {"character", "digit"} <= set(names)
+        assert data["count"] == len(names)
+
+    def test_predict_canvas_by_model_name(self):
+        """Test canvas prediction through the generic route."""
+        response = client.post(
+            "/api/v1/models/digit/canvas",
+            json={"image_data": self.create_base64_image()},
+        )
+
+        assert response.status_code == 200
+        assert "prediction" in response.json()
+
+    def test_classes_by_model_name(self):
+        """Test that the generic classes route matches the legacy one."""
+        generic = client.get("/api/v1/models/digit/classes").json()
+        legacy = client.get("/api/v1/classes/digits").json()
+
+        assert generic == legacy
+
+    def test_unknown_model_returns_404(self):
+        """Test that an unknown model name is rejected."""
+        response = client.post(
+            "/api/v1/models/nonexistent/canvas",
+            json={"image_data": self.create_base64_image()},
+        )
+
+        assert response.status_code == 404
+        assert "nonexistent" in response.json()["detail"]
@@ -0,0 +1,153 @@
+"""
+Prediction Cache Tests
+
+Tests for the content-hash prediction cache.
+"""
+
+import io
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def make_response(prediction: str = "ا"):
+    """Create a prediction response to cache."""
+    from app.models.schemas import PredictionResponse, TopPrediction
+
+    return PredictionResponse(
+        prediction=prediction,
+        confidence=0.9,
+        top_5=[TopPrediction(character=prediction, probability=0.9)],
+        processing_time_ms=12.5,
+    )
+
+
+class TestLRUCache:
+    """Tests for LRU bookkeeping."""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses."""
+        from app.services.prediction_cache import PredictionCache
+
+        cache = PredictionCache(max_entries=8, max_bytes=1 << 20)
+        key = ("character", 1, b"digest")
+
+        assert cache.get(key) is None
+        cache.put(key, make_response())
+        assert cache.get(key).prediction == "ا"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Test that the least recently used entry is evicted at the entry bound."""
+        from app.services.prediction_cache import PredictionCache
+
+        cache = PredictionCache(max_entries=2, max_bytes=1 << 20)
+        cache.put(("character", 1, b"a"), make_response("ا"))
+        cache.put(("character", 1, b"b"), make_response("ب"))
+        cache.get(("character", 1, b"a"))
+        cache.put(("character", 1, b"c"), make_response("پ"))
+
+        assert cache.get(("character", 1, b"b")) is None
+        assert cache.get(("character", 1, b"a")) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_by_bytes(self):
+        """Test that entries are evicted to stay within the byte bound."""
+        from app.services.prediction_cache import PredictionCache
+
+        size = len(make_response().model_dump_json())
+        cache = PredictionCache(max_entries=100, max_bytes=size * 2)
+        for i in range(5):
+            cache.put(("character", 1, bytes([i])), make_response())
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= size * 2
+        assert stats["evictions"] == 3
+
+    def test_disabled_cache(self):
+        """Test that a zero-sized cache stores nothing."""
+        from app.services.prediction_cache import PredictionCache
+
+        cache = PredictionCache(max_entries=0, max_bytes=1 << 20)
+        cache.put(("character", 1, b"a"), make_response())
+
+        assert cache.get(("character", 1, b"a")) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_one_model(self):
+        """Test that invalidation only drops the given model's entries."""
+        from app.services.prediction_cache import PredictionCache
+
+        cache = PredictionCache(max_entries=8, max_bytes=1 << 20)
+        cache.put(("character", 1, b"a"), make_response())
+        cache.put(("digit", 1, b"a"), make_response("۰"))
+
+        assert cache.invalidate("character") == 1
+        assert cache.get(("character", 1, b"a")) is None
+        assert cache.get(("digit", 1, b"a")) is not None
+
+
+class TestPredictionCaching:
+    """Tests for caching in the prediction routes."""
+
+    def create_test_image(self) -> bytes:
+        """Create a test image for upload."""
+        buffer = io.BytesIO()
+        Image.new("L", (64, 64), color=128).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def test_identical_upload_skips_inference(self):
+        """Test that a byte-identical upload is served from the cache."""
+        from app.services.model_registry import get_model_registry
+        from app.services.prediction_cache import get_prediction_cache
+        from app.services.tensor_cache import get_tensor_cache
+
+        service = get_model_registry().get("character")
+        probs = np.zeros((1, 46), dtype=np.float32)
+        probs[0, 1] = 1.0
+        stub_model = MagicMock()
+        stub_model.predict.return_value = probs
+
+        get_prediction_cache().invalidate()
+        get_tensor_cache().invalidate()
+        image_bytes = self.create_test_image()
+
+        with patch.object(service, "_model", stub_model), patch.object(service, "_is_loaded", True):
+            first = client.post("/api/v1/predict", files={"file": ("a.png", image_bytes, "image/png")})
+            second = client.post("/api/v1/predict", files={"file": ("b.png", image_bytes, "image/png")})
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["cached"] is False
+        assert second.json()["cached"] is True
+        assert second.json()["prediction"] == first.json()["prediction"] == "ب"
+        assert stub_model.predict.call_count == 1
+
+    def test_reload_invalidates_cache(self):
+        """Test that reloading the model drops its cached predictions."""
+        from app.services.model_registry import get_model_registry
+        from app.services.prediction_cache import PredictionCache
+
+        service = get_model_registry().get("character")
+        cache = PredictionCache(max_entries=8, max_bytes=1 << 20)
+
+        with patch("app.services.model_service.get_prediction_cache", return_value=cache):
+            old_key = cache.make_key(service, b"image")
+            cache.put(old_key, make_response())
+
+            service.load_model("does/not/exist.h5")
+
+            assert cache.make_key(service, b"image") != old_key
+            assert cache.stats()["entries"] == 0
+            assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,88 @@
+"""
+Performance Profile Tests
+
+Tests for the named performance profiles and the TensorFlow thread pool
+settings they control.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+class TestPerformanceProfiles:
+    """Tests for selecting a performance profile."""
+
+    def test_profile_sets_its_settings(self, monkeypatch):
+        """Test that a profile fills in its thread, executor, batching, cache and logging settings."""
+        from app.config import PERFORMANCE_PROFILES, Settings
+
+        monkeypatch.setenv("PERFORMANCE_PROFILE", "throughput")
+        settings = Settings()
+
+        for name, value in PERFORMANCE_PROFILES["throughput"].items():
+            assert getattr(settings, name) == value
+
+    def test_profiles_trade_workers_for_threads(self):
+        """Test that latency runs few passes on every core and throughput many on a core or two each."""
+        from app.config import PERFORMANCE_PROFILES
+
+        latency, throughput = PERFORMANCE_PROFILES["latency"], PERFORMANCE_PROFILES["throughput"]
+
+        assert latency["EXECUTOR_MAX_WORKERS"] < throughput["EXECUTOR_MAX_WORKERS"]
+        assert latency["TF_INTRA_OP_THREADS"] == 0
+        assert 1 <= throughput["TF_INTRA_OP_THREADS"] <= 2
+
+    def test_explicit_settings_override_profile(self, monkeypatch):
+        """Test that settings given explicitly win over the profile's values."""
+        from app.config import Settings
+
+        monkeypatch.setenv("PERFORMANCE_PROFILE", "latency")
+        monkeypatch.setenv("BATCH_MAX_SIZE", "16")
+        settings = Settings()
+
+        assert settings.BATCH_MAX_SIZE == 16
+        assert settings.BATCH_MAX_WAIT_MS == 1.0
+
+    def test_no_profile_keeps_defaults(self, monkeypatch):
+        """Test that without a profile every setting keeps its own default."""
+        from app.config import Settings
+
+        monkeypatch.delenv("PERFORMANCE_PROFILE", raising=False)
+        settings = Settings()
+
+        assert settings.PERFORMANCE_PROFILE == ""
+        assert settings.BATCH_MAX_SIZE == Settings.model_fields["BATCH_MAX_SIZE"].default
+
+    def test_unknown_profile_is_rejected(self, monkeypatch):
+        """Test that a misspelled profile fails at startup instead of being ignored."""
+        from pydantic import ValidationError
+
+        from app.config import Settings
+
+        monkeypatch.setenv("PERFORMANCE_PROFILE", "fast")
+
+        with pytest.raises(ValidationError, match="Unknown performance profile"):
+            Settings()
+
+
+class TestThreadPools:
+    """Tests for sizing TensorFlow's thread pools."""
+
+    def test_thread_pools_are_sized_before_runtime_starts(self):
+        """Test that the pools take the requested sizes and later requests are reported as ignored."""
+        pytest.importorskip("tensorflow")
+
+        # TensorFlow's pools are fixed per process, so check them in a fresh one
+        script = (
+            "from app.services.inference_backends import configure_tf_threading\n"
+            "import tensorflow as tf\n"
+            "assert configure_tf_threading(2, 1)\n"
+            "assert tf.config.threading.get_intra_op_parallelism_threads() == 2\n"
+            "tf.constant(1.0) + 1\n"
+            "assert not configure_tf_threading(3, 1)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr[-2000:]
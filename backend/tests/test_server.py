@@ -0,0 +1,197 @@
+"""
+Pre-fork Server Tests
+
+Tests for serving from forked workers that share the parent's loaded models.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tests.helpers import save_network
+
+
+def get_json(url: str):
+    """GET a URL and decode its JSON body."""
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def worker_pids(pid: int):
+    """Get the worker processes of the server."""
+    return [int(child) for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+
+
+def start_server(tmp_path, workers: int, **settings):
+    """
+    Start python -m app.server serving a NumPy model and wait until it is ready.
+
+    Args:
+        tmp_path: Directory for the model artifact
+        workers: Number of worker processes
+        **settings: Extra settings passed in the environment
+
+    Returns:
+        The server process and its base URL
+    """
+    save_network(tmp_path / "alpha.npz")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = {
+        **os.environ,
+        "INFERENCE_BACKEND": "numpy",
+        "EXTRA_MODELS": json.dumps({"alpha": {"model_path": str(tmp_path / "alpha.h5")}}),
+        "PRELOAD_MODELS": '["alpha"]',
+        "LOG_LEVEL": "WARNING",
+        **settings,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            get_json(f"{base_url}/ready")
+            return process, base_url
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.fail("Server did not become ready")
+            time.sleep(0.1)
+
+
+class TestShareableModels:
+    """Tests for deciding which models load before forking."""
+
+    def test_fork_safe_backend_shares_models(self):
+        """Test that models of the numpy backend are loaded in the parent."""
+        from app.config import get_settings
+        from app.server import shareable_models
+
+        with patch.object(get_settings(), "INFERENCE_BACKEND", "numpy"):
+            assert shareable_models(["character", "digit"]) == ["character", "digit"]
+
+    @pytest.mark.parametrize("backend", ["keras", "tflite", "onnxruntime"])
+    def test_fork_unsafe_backend_loads_per_worker(self, backend):
+        """Test that runtimes that don't survive a fork are loaded by each worker."""
+        from app.config import get_settings
+        from app.server import shareable_models
+
+        with patch.object(get_settings(), "INFERENCE_BACKEND", backend):
+            assert shareable_models(["character", "digit"]) == []
+
+
+@pytest.mark.skipif(not Path("/proc/self/task").exists(), reason="Requires Linux /proc")
+class TestRestartBackoff:
+    """Tests for restarting workers that die soon after starting."""
+
+    def test_rapid_failures_back_off_then_give_up(self):
+        """Test that the restart delay doubles up to the cap and the server gives up after the limit."""
+        from app.config import get_settings
+        from app.server import PreforkServer
+
+        server = PreforkServer(workers=1)
+        with patch.multiple(get_settings(), WORKER_MIN_UPTIME_S=10.0, WORKER_RESTART_BACKOFF_S=0.5,
+                            WORKER_RESTART_MAX_BACKOFF_S=1.5, WORKER_MAX_RAPID_FAILURES=5):
+            assert [server.restart_delay(0.1) for _ in range(4)] == [0.5, 1.0, 1.5, 1.5]
+            assert server.restart_delay(0.1) is None
+
+    def test_long_lived_worker_resets_backoff(self):
+        """Test that a worker which ran past the minimum uptime restarts at once and resets the count."""
+        from app.config import get_settings
+        from app.server import PreforkServer
+
+        server = PreforkServer(workers=1)
+        with patch.multiple(get_settings(), WORKER_MIN_UPTIME_S=10.0, WORKER_RESTART_BACKOFF_S=0.5,
+                            WORKER_RESTART_MAX_BACKOFF_S=30.0, WORKER_MAX_RAPID_FAILURES=3):
+            assert server.restart_delay(0.1) == 0.5
+            assert server.restart_delay(0.1) == 1.0
+            assert server.restart_delay(60.0) == 0.0
+            assert server.restart_delay(0.1) == 0.5
+
+
+class TestPreforkServer:
+    """Tests for the pre-fork server process."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        """Start python -m app.server with two workers serving a NumPy model."""
+        process, base_url = start_server(tmp_path, workers=2)
+
+        yield process, base_url
+
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    def test_workers_serve_preloaded_model(self, server):
+        """Test that every worker answers with the model the parent loaded."""
+        process, base_url = server
+
+        assert len(worker_pids(process.pid)) == 2
+        for _ in range(8):
+            models = get_json(f"{base_url}/metrics")["models"]["models"]
+            assert models["alpha"]["state"] == "ready"
+            assert models["alpha"]["loads"] == 1
+
+    def test_dead_worker_is_replaced(self, server):
+        """Test that the parent forks a new worker when one dies."""
+        process, base_url = server
+        killed = worker_pids(process.pid)[0]
+
+        os.kill(killed, signal.SIGKILL)
+
+        deadline = time.monotonic() + 10
+        while killed in worker_pids(process.pid) or len(worker_pids(process.pid)) < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert get_json(f"{base_url}/ready")["status"] == "ready"
+
+    def test_server_exits_when_workers_keep_dying(self, tmp_path):
+        """Test that the parent stops instead of fork-looping when workers die right after starting."""
+        process, _ = start_server(
+            tmp_path, workers=1,
+            WORKER_MIN_UPTIME_S="60", WORKER_RESTART_BACKOFF_S="0.05", WORKER_MAX_RAPID_FAILURES="2",
+        )
+        try:
+            first = worker_pids(process.pid)[0]
+            os.kill(first, signal.SIGKILL)
+
+            deadline = time.monotonic() + 10
+            while not [pid for pid in worker_pids(process.pid) if pid != first]:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+            os.kill([pid for pid in worker_pids(process.pid) if pid != first][0], signal.SIGKILL)
+
+            assert process.wait(timeout=30) == 1
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+    def test_sigterm_stops_workers(self, server):
+        """Test that SIGTERM on the parent stops every worker."""
+        process, _ = server
+        workers = worker_pids(process.pid)
+
+        process.send_signal(signal.SIGTERM)
+
+        assert process.wait(timeout=30) == 0
+        for pid in workers:
+            assert not Path(f"/proc/{pid}").exists()
@@ -0,0 +1,224 @@
+"""
+Singleflight Tests
+
+Tests for coalescing identical in-flight requests.
+"""
+
+import asyncio
+
+import pytest
+
+
+class TestSingleFlight:
+    """Tests for the coalescing layer."""
+
+    def test_concurrent_identical_calls_share_one_execution(self):
+        """Test that concurrent calls with the same key run the work once."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        executions = []
+
+        async def work():
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(*[flights.do(("predict", b"same"), work) for _ in range(5)])
+
+        results = asyncio.run(run())
+
+        assert results == ["result"] * 5
+        assert len(executions) == 1
+
+        stats = flights.stats()
+        assert stats["kinds"]["predict"] == {"calls": 5, "executions": 1, "coalesced": 4, "coalesced_ratio": 0.8}
+        assert stats["in_flight"] == 0
+
+    def test_different_keys_run_separately(self):
+        """Test that calls with different keys are not coalesced."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+
+        async def run():
+            return await asyncio.gather(
+                flights.do(("decode", b"a"), lambda: asyncio.sleep(0.01, result="a")),
+                flights.do(("decode", b"b"), lambda: asyncio.sleep(0.01, result="b")),
+            )
+
+        assert asyncio.run(run()) == ["a", "b"]
+        assert flights.stats()["kinds"]["decode"]["executions"] == 2
+
+    def test_completed_calls_are_not_reused(self):
+        """Test that a finished computation is not returned to later callers."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        counter = iter(range(10))
+
+        async def work():
+            return next(counter)
+
+        async def run():
+            first = await flights.do(("predict", b"x"), work)
+            second = await flights.do(("predict", b"x"), work)
+            return first, second
+
+        assert asyncio.run(run()) == (0, 1)
+
+    def test_errors_reach_every_caller(self):
+        """Test that an exception is raised in all coalesced callers."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("decode failed")
+
+        async def run():
+            return await asyncio.gather(
+                *[flights.do(("decode", b"bad"), work) for _ in range(3)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_caller_does_not_cancel_shared_work(self):
+        """Test that cancelling one caller leaves the computation running for the others."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def run():
+            first = asyncio.ensure_future(flights.do(("predict", b"k"), work))
+            second = asyncio.ensure_future(flights.do(("predict", b"k"), work))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == "done"
+
+    def test_interactive_follower_raises_shared_work_lane(self):
+        """Test that shared work waiting behind a bulk backlog moves up when an interactive caller joins."""
+        import threading
+
+        from app.services.executor import InferenceExecutor, work_scope
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        executor = InferenceExecutor(max_workers=1, max_queue_size=64, lane_weights={"interactive": 4, "bulk": 1})
+        release = threading.Event()
+        order = []
+
+        async def submit(lane, func):
+            with work_scope(lane, None):
+                return await func()
+
+        async def run():
+            blocker = asyncio.ensure_future(submit("bulk", lambda: executor.run(release.wait)))
+            await asyncio.sleep(0.02)
+            backlog = [
+                asyncio.ensure_future(submit("bulk", lambda i=i: executor.run(order.append, f"bulk-{i}")))
+                for i in range(3)
+            ]
+            shared = lambda: flights.do(("decode", b"k"), lambda: executor.run(order.append, "shared"))  # noqa: E731
+            leader = asyncio.ensure_future(submit("bulk", shared))
+            await asyncio.sleep(0.02)
+            follower = asyncio.ensure_future(submit("interactive", shared))
+            await asyncio.sleep(0.02)
+            release.set()
+            await asyncio.gather(blocker, leader, follower, *backlog)
+
+        asyncio.run(run())
+        executor.shutdown()
+
+        assert order[0] == "shared"
+
+    def test_leader_deadline_lapse_does_not_fail_followers(self):
+        """Test that shared work keeps running for a follower after the first caller's deadline lapses."""
+        from app.services.deadlines import Deadline, deadline_scope
+        from app.services.executor import InferenceExecutor
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return await executor.run(lambda: "done")
+
+        async def call(timeout_ms):
+            with deadline_scope(Deadline(timeout_ms)):
+                return await flights.do(("predict", b"k"), work)
+
+        async def run():
+            return await asyncio.gather(call(10), call(5000))
+
+        assert asyncio.run(run()) == ["done", "done"]
+        executor.shutdown()
+
+
+class TestCoalescedPrediction:
+    """Tests for coalescing in the prediction routes."""
+
+    def test_concurrent_identical_uploads_share_decode_and_inference(self):
+        """Test that a burst of identical uploads runs one decode and one forward pass."""
+        import io
+        from unittest.mock import MagicMock, patch
+
+        import httpx
+        import numpy as np
+        from PIL import Image
+
+        from app.api.dependencies import get_cache, get_coalescer, get_near_duplicate_cache
+        from app.main import app
+        from app.services.model_registry import get_model_registry
+        from app.services.prediction_cache import PredictionCache
+        from app.services.singleflight import SingleFlight
+        from app.services.tensor_cache import TensorCache
+
+        service = get_model_registry().get("character")
+        stub_model = MagicMock()
+        stub_model.predict.side_effect = lambda batch: np.eye(46, dtype=np.float32)[[3] * len(batch)]
+
+        buffer = io.BytesIO()
+        Image.new("L", (64, 64), color=200).save(buffer, format="PNG")
+        image_bytes = buffer.getvalue()
+
+        flights = SingleFlight()
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*[
+                    client.post("/api/v1/predict", files={"file": ("a.png", image_bytes, "image/png")})
+                    for _ in range(4)
+                ])
+
+        overrides = {
+            get_coalescer: lambda: flights,
+            get_cache: lambda: PredictionCache(max_entries=0),
+            get_near_duplicate_cache: lambda: TensorCache(max_entries=0),
+        }
+
+        with patch.object(service, "_model", stub_model), patch.object(service, "_is_loaded", True), \
+                patch.dict(app.dependency_overrides, overrides):
+            responses = asyncio.run(run())
+
+        assert all(r.status_code == 200 for r in responses)
+        assert {r.json()["prediction"] for r in responses} == {"ت"}
+        assert stub_model.predict.call_count == 1
+
+        kinds = flights.stats()["kinds"]
+        assert kinds["decode"]["executions"] == 1
+        assert kinds["decode"]["coalesced"] == 3
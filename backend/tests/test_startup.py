@@ -0,0 +1,108 @@
+"""
+Startup Tests
+
+Tests for cold-start budgets: what importing the app pulls in, how long it
+takes, and how long a model takes to load and serve its first request.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def imports():
+    """Profile a cold import of app.main once for the whole module."""
+    from app.startup_profile import profile_imports
+
+    return profile_imports()
+
+
+class TestImportBudget:
+    """Tests for the cost of importing the app in a fresh worker."""
+
+    def test_app_import_defers_heavy_modules(self, imports):
+        """Test that importing app.main doesn't pull in TensorFlow or OpenCV."""
+        assert imports["deferred_imported"] == []
+
+    def test_app_import_within_budget(self, imports):
+        """Test that importing app.main stays within the import budget."""
+        from app.startup_profile import STARTUP_BUDGETS_MS
+
+        assert 0 < imports["total_ms"] <= STARTUP_BUDGETS_MS["import"]
+
+    def test_import_report_breaks_down_modules(self, imports):
+        """Test that the report attributes import time to modules and packages."""
+        names = [name for name, _, _ in imports["modules"]]
+
+        assert "app.main" in names
+        assert "fastapi" in imports["packages"]
+
+
+class TestModelBudget:
+    """Tests for model load and first-inference budgets."""
+
+    def test_model_load_and_first_inference_within_budget(self, numpy_configs):
+        """Test that a model loads and serves its first inference within budget."""
+        from app.services.model_registry import ModelRegistry
+        from app.startup_profile import check_budgets, profile_models
+
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        models = profile_models(["alpha"], registry=registry)
+
+        assert models["alpha"]["state"] == "ready"
+        assert models["alpha"]["load_ms"] > 0
+        assert models["alpha"]["first_inference_ms"] > 0
+        assert check_budgets({"models": models}) == []
+
+    def test_missing_artifact_reports_no_times(self, numpy_configs, tmp_path):
+        """Test that a model without an artifact is reported rather than timed."""
+        from app.services.model_registry import ModelRegistry
+        from app.startup_profile import profile_models
+
+        (tmp_path / "beta.npz").unlink()
+        registry = ModelRegistry(numpy_configs, memory_budget_bytes=0)
+        models = profile_models(["beta"], registry=registry)
+
+        assert models["beta"] == {
+            "state": "missing",
+            "backend": "numpy",
+            "load_ms": None,
+            "first_inference_ms": None,
+        }
+
+    def test_budget_violations_are_reported(self):
+        """Test that exceeding a budget or importing a deferred module is flagged."""
+        from app.startup_profile import check_budgets
+
+        report = {
+            "imports": {"target": "app.main", "total_ms": 10.0, "deferred_imported": ["tensorflow"]},
+            "models": {"alpha": {"load_ms": 50.0, "first_inference_ms": 5.0}},
+        }
+
+        violations = check_budgets(report, {"import": 100.0, "model_load": 20.0, "first_inference": 10.0})
+
+        assert violations == [
+            "import app.main: pulls in deferred module tensorflow",
+            "alpha model_load: 50ms > 20ms",
+        ]
+
+
+class TestProfileCommand:
+    """Tests for the startup profiling command."""
+
+    def test_command_reports_imports(self):
+        """Test that python -m app.startup_profile runs and reports import times."""
+        from app.startup_profile import BACKEND_DIR
+
+        result = subprocess.run(
+            [sys.executable, "-m", "app.startup_profile", "--skip-models", "--check", "--top", "5"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Import of app.main" in result.stdout
+        assert "Deferred modules imported: none" in result.stdout
@@ -0,0 +1,110 @@
+"""
+Tensor Cache Tests
+
+Tests for the perceptual-hash cache of near-duplicate preprocessed images.
+"""
+
+import base64
+import io
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def make_glyph(offset: int = 0) -> np.ndarray:
+    """Create a preprocessed (1, 64, 64, 1) tensor with a vertical stroke."""
+    image = np.zeros((64, 64), dtype=np.float32)
+    image[10:54, 28 + offset:36 + offset] = 1.0
+    return image.reshape(1, 64, 64, 1)
+
+
+class TestPerceptualHash:
+    """Tests for the perceptual hash."""
+
+    def test_near_duplicates_share_a_hash(self):
+        """Test that a few anti-aliasing pixel changes keep the hash."""
+        from app.services.tensor_cache import perceptual_hash
+
+        glyph = make_glyph()
+        noisy = glyph.copy()
+        noisy[0, 10:14, 27, 0] = 0.02
+
+        assert perceptual_hash(glyph, 32, 16) == perceptual_hash(noisy, 32, 16)
+
+    def test_different_glyphs_differ(self):
+        """Test that a visibly different drawing gets a different hash."""
+        from app.services.tensor_cache import perceptual_hash
+
+        assert perceptual_hash(make_glyph(), 32, 16) != perceptual_hash(make_glyph(offset=12), 32, 16)
+
+    def test_precision_controls_matching(self):
+        """Test that a coarser hash matches inputs a finer hash tells apart."""
+        from app.services.tensor_cache import perceptual_hash
+
+        glyph, shifted = make_glyph(), make_glyph(offset=1)
+
+        assert perceptual_hash(glyph, 64, 256) != perceptual_hash(shifted, 64, 256)
+        assert perceptual_hash(glyph, 4, 4) == perceptual_hash(shifted, 4, 4)
+
+    def test_stats_report_inferences_saved(self):
+        """Test that cache hits are reported as saved inferences."""
+        from app.services.tensor_cache import TensorCache
+
+        service = MagicMock(generation=1)
+        service.name = "character"
+        cache = TensorCache(max_entries=8, grid_size=16, levels=8)
+
+        key = cache.make_key(service, make_glyph())
+        cache.put(key, ("ا", 0.9, []))
+        cache.get(cache.make_key(service, make_glyph()))
+
+        stats = cache.stats()
+        assert stats["inferences_saved"] == 1
+        assert stats["grid_size"] == 16 and stats["levels"] == 8
+
+
+class TestNearDuplicateCanvas:
+    """Tests for near-duplicate canvas requests."""
+
+    def create_canvas(self, extra_pixel: bool = False) -> str:
+        """Create a base64 canvas drawing, optionally with one extra anti-aliased pixel."""
+        image = Image.new("RGB", (280, 280), color="white")
+        draw = ImageDraw.Draw(image)
+        draw.line([(140, 40), (140, 240)], fill="black", width=20)
+        if extra_pixel:
+            image.putpixel((10, 10), (250, 250, 250))
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    def test_near_duplicate_canvas_skips_forward_pass(self):
+        """Test that a near-duplicate drawing reuses the earlier prediction."""
+        from app.services.model_registry import get_model_registry
+        from app.services.tensor_cache import get_tensor_cache
+
+        service = get_model_registry().get("character")
+        probs = np.zeros((1, 46), dtype=np.float32)
+        probs[0, 2] = 1.0
+        stub_model = MagicMock()
+        stub_model.predict.return_value = probs
+
+        get_tensor_cache().invalidate()
+        first_canvas, second_canvas = self.create_canvas(), self.create_canvas(extra_pixel=True)
+        assert first_canvas != second_canvas
+
+        with patch.object(service, "_model", stub_model), patch.object(service, "_is_loaded", True):
+            first = client.post("/api/v1/predict/canvas", json={"image_data": first_canvas})
+            second = client.post("/api/v1/predict/canvas", json={"image_data": second_canvas})
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["cached"] is False
+        assert second.json()["cached"] is True
+        assert second.json()["prediction"] == first.json()["prediction"] == "پ"
+        assert stub_model.predict.call_count == 1
@@ -0,0 +1,116 @@
+"""
+Thread Calibration Tests
+
+Tests for calibrating TensorFlow's thread pools and caching the result.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def calibration_enabled():
+    """Enable thread calibration with a fixed cache key."""
+    from app.services import thread_calibration
+
+    with patch.object(thread_calibration.settings, "TF_THREAD_CALIBRATION", True), \
+            patch.object(thread_calibration, "calibration_key", return_value="host"):
+        yield
+
+
+class TestCandidates:
+    """Tests for choosing which thread settings to measure."""
+
+    def test_candidates_span_one_thread_to_every_core(self):
+        """Test that the candidates include each worker's share of the cores and every core."""
+        from app.services.thread_calibration import candidate_settings
+
+        candidates = candidate_settings(cores=16, workers=4)
+
+        assert sorted({intra for intra, _ in candidates}) == [1, 2, 4, 16]
+        assert {inter for _, inter in candidates} == {1, 2}
+        assert candidate_settings(cores=1, workers=4) == [(1, 1), (1, 2)]
+
+    def test_best_setting_across_batch_sizes_is_chosen(self):
+        """Test that a setting good at every batch size beats one that only wins at the largest."""
+        from app.services.thread_calibration import calibrate
+
+        throughput = {
+            (1, 1): {"1": 100.0, "32": 400.0},
+            (1, 2): {"1": 100.0, "32": 400.0},
+            (2, 1): {"1": 180.0, "32": 900.0},
+            (2, 2): {"1": 150.0, "32": 850.0},
+            (4, 1): {"1": 60.0, "32": 1000.0},
+            (4, 2): {"1": 60.0, "32": 950.0},
+        }
+
+        with patch("app.services.thread_calibration.measure_setting",
+                   side_effect=lambda path, intra, inter, processes: throughput[(intra, inter)]) as measure:
+            result = calibrate("model.h5", cores=4, workers=2)
+
+        assert (result["intra_op_threads"], result["inter_op_threads"]) == (2, 1)
+        assert len(result["results"]) == 6
+        # Both workers are measured at the same time
+        assert {call.args[3] for call in measure.call_args_list} == {2}
+
+
+class TestThreadCalibration:
+    """Tests for resolving the thread pools of a process."""
+
+    def test_settings_are_used_when_calibration_is_disabled(self, tmp_path):
+        """Test that without calibration the configured thread pools are used."""
+        from app.config import get_settings
+        from app.services.thread_calibration import ThreadCalibration
+
+        calibration = ThreadCalibration(cache_path=str(tmp_path / "calibration.json"))
+
+        with patch("app.services.thread_calibration.calibrate") as calibrate:
+            threads = calibration.resolve("model.h5")
+
+        calibrate.assert_not_called()
+        assert threads == (get_settings().TF_INTRA_OP_THREADS, get_settings().TF_INTER_OP_THREADS)
+        assert calibration.stats()["source"] == "settings"
+
+    def test_first_boot_calibrates_and_later_boots_use_cache(self, tmp_path, calibration_enabled):
+        """Test that the calibration is persisted and reused instead of measured again."""
+        from app.services.thread_calibration import ThreadCalibration
+
+        cache_path = tmp_path / "calibration.json"
+        calibrate = MagicMock(return_value={"intra_op_threads": 3, "inter_op_threads": 1})
+
+        with patch("app.services.thread_calibration.calibrate", calibrate):
+            first = ThreadCalibration(cache_path=str(cache_path))
+            assert first.resolve("model.h5") == (3, 1)
+            assert first.resolve("other.h5") == (3, 1)
+
+            second = ThreadCalibration(cache_path=str(cache_path))
+            assert second.resolve("model.h5") == (3, 1)
+
+        calibrate.assert_called_once()
+        assert first.stats()["source"] == "calibrated"
+        assert second.stats()["source"] == "cache"
+        assert json.loads(cache_path.read_text())["host"]["intra_op_threads"] == 3
+
+    def test_failed_calibration_falls_back_to_settings(self, tmp_path, calibration_enabled):
+        """Test that a calibration error doesn't keep the model from loading."""
+        from app.services.thread_calibration import ThreadCalibration
+
+        calibration = ThreadCalibration(cache_path=str(tmp_path / "calibration.json"))
+
+        with patch("app.services.thread_calibration.calibrate", side_effect=RuntimeError("boom")):
+            calibration.resolve("model.h5")
+
+        assert calibration.stats()["source"] == "settings"
+        assert not (tmp_path / "calibration.json").exists()
+
+    def test_setting_is_measured_in_fresh_process(self, keras_model_path, monkeypatch):
+        """Test that a thread setting is measured end to end in a child process."""
+        from app.services.thread_calibration import measure_setting
+
+        monkeypatch.setenv("TF_THREAD_CALIBRATION_BATCH_SIZES", "[1, 4]")
+        images_per_s = measure_setting(keras_model_path, intra=1, inter=1, processes=1)
+
+        assert set(images_per_s) == {"1", "4"}
+        assert all(value > 0 for value in images_per_s.values())
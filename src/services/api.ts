@@ -15,12 +15,17 @@ import type {
 // API base URL - use environment variable or default to localhost
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// 30 second timeout for predictions, also sent to the backend so it drops
+// work for requests we have already given up on
+const REQUEST_TIMEOUT_MS = 30000;
+
 // Create axios instance with default config
 const api = axios.create({
   baseURL: API_BASE_URL,
-  timeout: 30000, // 30 second timeout for predictions
+  timeout: REQUEST_TIMEOUT_MS,
   headers: {
     'Accept': 'application/json',
+    'X-Request-Timeout': String(REQUEST_TIMEOUT_MS),
   },
 });
 